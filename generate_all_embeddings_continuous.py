@@ -2,6 +2,11 @@
 """
 Generate embeddings for all transcripts that don't have them yet
 Runs continuously until all embeddings are complete
+
+Each batch of transcripts is embedded with EmbeddingsManager.process_transcripts:
+chunks are packed many per request, a few requests run concurrently, and
+chunks already in embedding_cache are not re-embedded. Rate limits are
+handled by backoff on 429s rather than fixed sleeps.
 """
 
 import os
@@ -11,6 +16,7 @@ import argparse
 sys.path.insert(0, '/var/www/call-recording-system')
 
 from src.insights.embeddings_manager import EmbeddingsManager
+from src.insights.embedding_providers import EMBEDDING_PROVIDER, get_embedding_provider
 import psycopg2
 from psycopg2.extras import RealDictCursor
 
@@ -18,16 +24,20 @@ from psycopg2.extras import RealDictCursor
 from dotenv import load_dotenv
 load_dotenv()
 
-if not os.getenv('OPENAI_API_KEY'):
-    print("ERROR: OPENAI_API_KEY not set in environment. Add it to .env file.")
-    sys.exit(1)
-
 def main():
     parser = argparse.ArgumentParser(description='Generate embeddings continuously')
     parser.add_argument('--batch-size', type=int, default=100, help='Number of transcripts per batch')
     parser.add_argument('--max-total', type=int, default=None, help='Maximum total to process (for testing)')
+    parser.add_argument('--concurrency', type=int, default=None,
+                        help='Embedding requests in flight (default: EMBEDDING_CONCURRENCY)')
+    parser.add_argument('--provider', choices=['openai', 'local', 'hash'], default=EMBEDDING_PROVIDER,
+                        help='Embedding backend (default: EMBEDDING_PROVIDER); local runs on this CPU')
     args = parser.parse_args()
 
+    if args.provider == 'openai' and not os.getenv('OPENAI_API_KEY'):
+        print("ERROR: OPENAI_API_KEY not set in environment. Add it to .env file.")
+        sys.exit(1)
+
     BATCH_SIZE = args.batch_size
     MAX_TOTAL = args.max_total
 
@@ -45,12 +55,14 @@ def main():
     cursor = conn.cursor()
 
     # Initialize embeddings manager
-    mgr = EmbeddingsManager()
+    mgr = EmbeddingsManager(get_embedding_provider(args.provider))
+    # Transcripts embedded by another model are re-embedded with this one
+    models = list(mgr.provider.storage_models)
 
     processed_total = 0
     batch_num = 0
 
-    print(f"Starting continuous embedding generation with batch size {BATCH_SIZE}")
+    print(f"Starting continuous embedding generation with batch size {BATCH_SIZE} ({mgr.embedding_model})")
     print("=" * 60)
 
     while True:
@@ -58,20 +70,17 @@ def main():
 
         # Get next batch of transcripts without embeddings
         cursor.execute("""
-            SELECT t.recording_id, t.transcript_text, t.customer_name, t.employee_name,
-                   t.call_date, t.duration_seconds, t.word_count,
-                   i.customer_sentiment, i.call_quality_score, i.customer_satisfaction_score,
-                   i.call_type, i.issue_category, i.summary, i.key_topics
+            SELECT t.recording_id
             FROM transcripts t
-            LEFT JOIN insights i ON t.recording_id = i.recording_id
             WHERE t.transcript_text IS NOT NULL
               AND LENGTH(t.transcript_text) > 100
               AND NOT EXISTS (
                   SELECT 1 FROM transcript_embeddings te
                   WHERE te.recording_id = t.recording_id
+                    AND COALESCE(te.embedding_model, 'openai/text-embedding-ada-002') = ANY(%(models)s)
               )
-            LIMIT %s
-        """, (BATCH_SIZE,))
+            LIMIT %(limit)s
+        """, {'models': models, 'limit': BATCH_SIZE})
 
         records = cursor.fetchall()
 
@@ -85,37 +94,22 @@ def main():
 
         print(f"\n📦 Batch {batch_num}: Found {len(records)} transcripts without embeddings")
 
-        batch_success = 0
-        batch_failed = 0
-
-        for i, record in enumerate(records, 1):
-            recording_id = record['recording_id']
-            print(f"  [{i}/{len(records)}] Processing {recording_id}...", end="")
-
-            try:
-                # Process the transcript
-                if mgr.process_transcript(recording_id):
-                    batch_success += 1
-                    processed_total += 1
-                    print(" ✅")
-                else:
-                    batch_failed += 1
-                    print(" ❌ Failed")
-
-                # Rate limiting - avoid hitting API limits
-                if i % 10 == 0:
-                    print(f"    Progress: {i}/{len(records)} in batch, {processed_total} total")
-                    time.sleep(2)  # Pause every 10 requests
-
-            except Exception as e:
-                batch_failed += 1
-                print(f" ❌ Error: {e}")
+        batch_start = time.monotonic()
+        batch_stats = mgr.process_transcripts(
+            [record['recording_id'] for record in records],
+            concurrency=args.concurrency
+        )
+        batch_success = batch_stats['processed']
+        batch_failed = batch_stats['failed']
+        processed_total += batch_success
+        elapsed = time.monotonic() - batch_start
 
         # Batch summary
         print(f"\n✅ Batch {batch_num} complete:")
         print(f"   - Success: {batch_success}")
         print(f"   - Failed: {batch_failed}")
         print(f"   - Total processed so far: {processed_total}")
+        print(f"   - Time: {elapsed:.1f}s ({len(records) / max(elapsed, 0.001):.1f} transcripts/s)")
 
         # Get current database totals
         cursor.execute("SELECT COUNT(*) as total FROM transcript_embeddings WHERE embedding IS NOT NULL")
@@ -129,16 +123,18 @@ def main():
               AND NOT EXISTS (
                   SELECT 1 FROM transcript_embeddings te
                   WHERE te.recording_id = t.recording_id
+                    AND COALESCE(te.embedding_model, 'openai/text-embedding-ada-002') = ANY(%(models)s)
               )
-        """)
+        """, {'models': models})
         remaining = cursor.fetchone()['remaining']
 
         print(f"📊 Database status: {db_total} embeddings, {remaining} remaining")
         print("=" * 60)
 
-        # Brief pause between batches
-        if remaining > 0:
-            time.sleep(3)
+        # Every batch failing means the API is down; don't spin on it
+        if batch_success == 0 and batch_failed:
+            print("\n⚠️  Whole batch failed. Stopping.")
+            break
 
     # Final statistics
     cursor.execute("SELECT COUNT(*) as total FROM transcript_embeddings WHERE embedding IS NOT NULL")
@@ -146,6 +142,7 @@ def main():
     print(f"\n🏁 Final statistics:")
     print(f"   - Total embeddings in database: {final_total}")
     print(f"   - Processed in this session: {processed_total}")
+    print(f"   - Embedding stats: {mgr.get_stats()}")
 
     cursor.close()
     conn.close()
@@ -12,6 +12,11 @@ Metrics:
 6. Key quotes extraction - Better RAG retrieval
 7. Question-answer pairs - Training data
 8. Urgency classification - Prioritization
+
+Talk-to-listen is measured from diarized segment timestamps. The LLM
+extractors run through the shared rate-limited executor, either
+concurrently with one call each (--mode parallel) or as one combined call
+that sends the transcript once (--mode combined).
 """
 
 import os
@@ -20,6 +25,7 @@ import json
 import logging
 import time
 import re
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Any
@@ -30,7 +36,9 @@ sys.path.insert(0, '/var/www/call-recording-system')
 
 import psycopg2
 from psycopg2.extras import Json
-import requests
+
+from rag_integration.services.llm_executor import get_llm_executor
+from rag_integration.services.conversation_dynamics import analyze_conversation, to_talk_listen_ratio
 
 logging.basicConfig(
     level=logging.INFO,
@@ -50,9 +58,6 @@ DB_CONFIG = {
     'port': 5432
 }
 
-OPENROUTER_API_KEY = os.getenv('OPENROUTER_API_KEY')
-OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
-
 # MODEL CONFIGURATION - Updated 2025-12-20
 # Primary: FREE model with best quality
 # Secondary: Low-cost backup
@@ -67,55 +72,32 @@ COMPETITORS = [
 ]
 
 
-class Layer5Processor:
-    """Process Layer 5 advanced metrics"""
-
-    def __init__(self):
-        self.model = "google/gemma-3-12b-it:free"  # FREE - Best quality, reliable JSON
-        self.headers = {
-            "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "https://call-insights.local",
-            "X-Title": "Call Insights Layer 5"
-        }
-
-    def _call_llm(self, prompt: str, max_tokens: int = 2000) -> Optional[str]:
-        """Call OpenRouter LLM"""
-        try:
-            response = requests.post(
-                OPENROUTER_URL,
-                headers=self.headers,
-                json={
-                    "model": self.model,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "max_tokens": max_tokens,
-                    "temperature": 0.3
-                },
-                timeout=60
-            )
-            response.raise_for_status()
-            return response.json()['choices'][0]['message']['content']
-        except Exception as e:
-            logger.error(f"LLM error: {e}")
-            return None
-
-    def extract_buying_signals(self, transcript: str) -> Dict:
-        """Extract buying signals from transcript"""
-        prompt = f"""Analyze this call transcript for BUYING SIGNALS.
-
-TRANSCRIPT:
-{transcript[:8000]}
-
-Identify:
+# Processing mode: "parallel" runs the LLM extractors concurrently (one
+# call each); "combined" extracts every section in a single call and only
+# re-requests sections that fail validation
+LAYER5_MODE = os.getenv('LAYER5_MODE', 'parallel').lower()
+LAYER5_COMBINED_MAX_TOKENS = int(os.getenv('LAYER5_COMBINED_MAX_TOKENS', '6000'))
+
+NUMBER = (int, float)
+
+# One entry per results key. Each section's prompt is
+#   "{intro}\n\nTRANSCRIPT:\n{transcript[:chars]}\n\n{instructions}\n\nReturn JSON:\n{schema}"
+# and the combined prompt sends the transcript once with every section's
+# instructions and schema. `required` is what a section must contain (with
+# these types) to be accepted from a combined response; `default` replaces
+# an unparseable response.
+SECTIONS = {
+    "buying_signals": {
+        "intro": "Analyze this call transcript for BUYING SIGNALS.",
+        "chars": 8000,
+        "instructions": """Identify:
 1. Explicit interest statements ("I want to buy", "We're looking for", "Send me a quote")
 2. Timeline mentions ("Need this by", "Looking to implement in Q1")
 3. Budget discussions ("Our budget is", "How much does it cost")
 4. Decision maker indicators ("I'll need to check with my boss", "I have authority to sign")
 5. Pain points they want solved
-6. Comparison shopping signals ("We're also looking at", "How do you compare to")
-
-Return JSON:
-{{
+6. Comparison shopping signals ("We're also looking at", "How do you compare to")""",
+        "schema": """{
     "buying_signals_detected": true/false,
     "signal_strength": "strong/medium/weak/none",
     "explicit_interest": ["list of interest statements"],
@@ -131,31 +113,14 @@ Return JSON:
     "demo_requested": true/false,
     "quote_requested": true/false,
     "sales_opportunity_score": 1-10
-}}
-
-Return ONLY valid JSON."""
-
-        result = self._call_llm(prompt)
-        try:
-            return json.loads(result) if result else {}
-        except:
-            return {"buying_signals_detected": False, "sales_opportunity_score": 0}
-
-    def extract_competitor_mentions(self, transcript: str) -> Dict:
-        """Extract competitor mentions and context"""
-        # First, do keyword search
-        mentioned = []
-        transcript_lower = transcript.lower()
-        for comp in COMPETITORS:
-            if comp.lower() in transcript_lower:
-                mentioned.append(comp)
-
-        prompt = f"""Analyze this call transcript for COMPETITOR MENTIONS and competitive intelligence.
-
-TRANSCRIPT:
-{transcript[:8000]}
-
-Known competitors to look for: {', '.join(COMPETITORS)}
+}""",
+        "required": {"buying_signals_detected": bool, "sales_opportunity_score": NUMBER},
+        "default": {"buying_signals_detected": False, "sales_opportunity_score": 0},
+    },
+    "competitor_intelligence": {
+        "intro": "Analyze this call transcript for COMPETITOR MENTIONS and competitive intelligence.",
+        "chars": 8000,
+        "instructions": f"""Known competitors to look for: {', '.join(COMPETITORS)}
 
 Identify:
 1. Direct competitor mentions by name
@@ -163,13 +128,11 @@ Identify:
 3. Feature comparisons
 4. Pricing comparisons
 5. Switching intent or barriers
-6. Reasons for considering alternatives
-
-Return JSON:
-{{
+6. Reasons for considering alternatives""",
+        "schema": """{
     "competitors_mentioned": ["list of competitor names"],
     "competitor_context": [
-        {{"name": "CompetitorX", "context": "how they were mentioned", "sentiment": "positive/negative/neutral"}}
+        {"name": "CompetitorX", "context": "how they were mentioned", "sentiment": "positive/negative/neutral"}
     ],
     "feature_comparisons": ["list of features compared"],
     "pricing_mentioned": true/false,
@@ -179,82 +142,14 @@ Return JSON:
     "competitive_advantage_opportunities": ["what we do better"],
     "competitive_disadvantages_mentioned": ["what competitor does better"],
     "win_probability_impact": "positive/negative/neutral"
-}}
-
-Return ONLY valid JSON."""
-
-        result = self._call_llm(prompt)
-        try:
-            data = json.loads(result) if result else {}
-            # Add keyword-detected competitors
-            if mentioned and 'competitors_mentioned' in data:
-                data['competitors_mentioned'] = list(set(data['competitors_mentioned'] + mentioned))
-            return data
-        except:
-            return {"competitors_mentioned": mentioned}
-
-    def analyze_talk_listen_ratio(self, transcript: str, segments: List = None) -> Dict:
-        """Analyze talk-to-listen ratio from transcript or segments"""
-        # If we have diarization segments, calculate precisely
-        if segments:
-            speaker_words = {}
-            for seg in segments:
-                speaker = seg.get('speaker', 'unknown')
-                words = len(seg.get('text', '').split())
-                speaker_words[speaker] = speaker_words.get(speaker, 0) + words
-
-            total_words = sum(speaker_words.values())
-            ratios = {s: round(w/total_words*100, 1) for s, w in speaker_words.items()}
-            
-            # Identify agent vs customer (agent usually talks less in good calls)
-            return {
-                "speaker_word_counts": speaker_words,
-                "speaker_percentages": ratios,
-                "total_words": total_words,
-                "dominant_speaker": max(speaker_words, key=speaker_words.get) if speaker_words else None,
-                "balance_score": 10 - abs(50 - min(ratios.values())) / 5 if ratios else 5
-            }
-
-        # Estimate from transcript patterns
-        prompt = f"""Analyze this call transcript for TALK-TO-LISTEN RATIO.
-
-TRANSCRIPT:
-{transcript[:6000]}
-
-Estimate:
-1. Who talked more - agent or customer?
-2. Approximate percentage split
-3. Was the agent a good listener?
-4. Did agent interrupt customer?
-
-Return JSON:
-{{
-    "agent_talk_percentage": 40,
-    "customer_talk_percentage": 60,
-    "agent_listening_quality": "excellent/good/fair/poor",
-    "interruptions_detected": true/false,
-    "interruption_count_estimate": 0,
-    "monologue_detected": true/false,
-    "balance_score": 1-10,
-    "recommendation": "brief recommendation"
-}}
-
-Return ONLY valid JSON."""
-
-        result = self._call_llm(prompt)
-        try:
-            return json.loads(result) if result else {}
-        except:
-            return {"balance_score": 5}
-
-    def calculate_compliance_score(self, transcript: str) -> Dict:
-        """Calculate compliance score for risk management"""
-        prompt = f"""Analyze this call transcript for COMPLIANCE and RISK factors.
-
-TRANSCRIPT:
-{transcript[:8000]}
-
-Check for:
+}""",
+        "required": {"competitors_mentioned": list},
+        "default": {"competitors_mentioned": []},
+    },
+    "compliance": {
+        "intro": "Analyze this call transcript for COMPLIANCE and RISK factors.",
+        "chars": 8000,
+        "instructions": """Check for:
 1. Proper greeting and identification
 2. Privacy/GDPR compliance (asking permission to record, data handling)
 3. Accurate information provided (no false promises)
@@ -262,10 +157,8 @@ Check for:
 5. No discriminatory language
 6. Professional conduct
 7. Proper call closure
-8. Required disclosures made
-
-Return JSON:
-{{
+8. Required disclosures made""",
+        "schema": """{
     "compliance_score": 1-100,
     "risk_level": "low/medium/high/critical",
     "proper_greeting": true/false,
@@ -281,119 +174,83 @@ Return JSON:
     "compliance_issues": ["list of specific issues"],
     "compliance_recommendations": ["list of recommendations"],
     "legal_risk_phrases": ["any risky statements made"]
-}}
-
-Return ONLY valid JSON."""
-
-        result = self._call_llm(prompt)
-        try:
-            return json.loads(result) if result else {}
-        except:
-            return {"compliance_score": 50, "risk_level": "medium"}
-
-    def extract_key_quotes(self, transcript: str) -> Dict:
-        """Extract key quotes for better RAG retrieval"""
-        prompt = f"""Extract KEY QUOTES from this call transcript for knowledge base indexing.
-
-TRANSCRIPT:
-{transcript[:8000]}
-
-Extract:
+}""",
+        "required": {"compliance_score": NUMBER, "risk_level": str},
+        "default": {"compliance_score": 50, "risk_level": "medium"},
+    },
+    "key_quotes": {
+        "intro": "Extract KEY QUOTES from this call transcript for knowledge base indexing.",
+        "chars": 8000,
+        "instructions": """Extract:
 1. Customer pain points (verbatim quotes)
 2. Product feedback (positive and negative)
 3. Feature requests
 4. Objections raised
 5. Success stories / testimonials
 6. Memorable statements
-7. Questions that need documentation
-
-Return JSON:
-{{
+7. Questions that need documentation""",
+        "schema": """{
     "pain_point_quotes": [
-        {{"quote": "exact quote", "context": "brief context", "speaker": "customer/agent"}}
+        {"quote": "exact quote", "context": "brief context", "speaker": "customer/agent"}
     ],
     "positive_feedback": [
-        {{"quote": "exact quote", "feature": "related feature"}}
+        {"quote": "exact quote", "feature": "related feature"}
     ],
     "negative_feedback": [
-        {{"quote": "exact quote", "issue": "related issue"}}
+        {"quote": "exact quote", "issue": "related issue"}
     ],
     "feature_requests": [
-        {{"quote": "exact quote", "feature_requested": "description"}}
+        {"quote": "exact quote", "feature_requested": "description"}
     ],
     "objections": [
-        {{"quote": "exact quote", "objection_type": "price/timing/competition/other"}}
+        {"quote": "exact quote", "objection_type": "price/timing/competition/other"}
     ],
     "testimonial_quotes": ["list of positive testimonials"],
     "key_questions_asked": ["important questions from customer"],
     "quotable_moments": ["other memorable quotes"],
     "rag_keywords": ["key terms for search indexing"]
-}}
-
-Return ONLY valid JSON."""
-
-        result = self._call_llm(prompt)
-        try:
-            return json.loads(result) if result else {}
-        except:
-            return {"key_quotes": [], "rag_keywords": []}
-
-    def extract_qa_pairs(self, transcript: str) -> Dict:
-        """Extract question-answer pairs for training data"""
-        prompt = f"""Extract QUESTION-ANSWER PAIRS from this call transcript for training data.
-
-TRANSCRIPT:
-{transcript[:8000]}
-
-Find all questions asked and their answers. Focus on:
+}""",
+        "required": {"pain_point_quotes": list, "rag_keywords": list},
+        "default": {"key_quotes": [], "rag_keywords": []},
+    },
+    "qa_pairs": {
+        "intro": "Extract QUESTION-ANSWER PAIRS from this call transcript for training data.",
+        "chars": 8000,
+        "instructions": """Find all questions asked and their answers. Focus on:
 1. Product/feature questions
 2. Pricing questions
 3. Technical questions
 4. Process questions
-5. Policy questions
-
-Return JSON:
-{{
+5. Policy questions""",
+        "schema": """{
     "qa_pairs": [
-        {{
+        {
             "question": "exact question asked",
             "answer": "answer provided",
             "category": "product/pricing/technical/process/policy/other",
             "answer_quality": "complete/partial/incorrect/unanswered",
             "could_be_faq": true/false
-        }}
+        }
     ],
     "unanswered_questions": ["questions that weren't answered"],
     "questions_needing_followup": ["questions that need more info"],
     "potential_kb_articles": ["topics that should be documented"],
     "training_value_score": 1-10
-}}
-
-Return ONLY valid JSON."""
-
-        result = self._call_llm(prompt)
-        try:
-            return json.loads(result) if result else {}
-        except:
-            return {"qa_pairs": [], "training_value_score": 0}
-
-    def classify_urgency(self, transcript: str) -> Dict:
-        """Classify call urgency for prioritization"""
-        prompt = f"""Classify the URGENCY of this call for prioritization.
-
-TRANSCRIPT:
-{transcript[:6000]}
-
-Analyze:
+}""",
+        "required": {"qa_pairs": list, "training_value_score": NUMBER},
+        "default": {"qa_pairs": [], "training_value_score": 0},
+    },
+    "urgency": {
+        "intro": "Classify the URGENCY of this call for prioritization.",
+        "chars": 6000,
+        "instructions": """Analyze:
 1. Time-sensitive language ("urgent", "ASAP", "deadline")
 2. Business impact mentioned
 3. Escalation requests
 4. Emotional intensity
 5. Repeat caller indicators
-6. SLA implications
-
-Return JSON:
-{{
+6. SLA implications""",
+        "schema": """{
     "urgency_level": "critical/high/medium/low",
     "urgency_score": 1-10,
     "time_sensitive": true/false,
@@ -408,56 +265,257 @@ Return JSON:
     "recommended_response_time": "immediate/same-day/24h/48h/standard",
     "requires_immediate_action": true/false,
     "action_items": ["immediate actions needed"]
-}}
+}""",
+        "required": {"urgency_level": str, "urgency_score": NUMBER},
+        "default": {"urgency_level": "medium", "urgency_score": 5},
+    },
+}
 
-Return ONLY valid JSON."""
 
-        result = self._call_llm(prompt)
+def parse_json_response(content: Optional[str]) -> Optional[Any]:
+    """Parse JSON from an LLM response, tolerating markdown fences and surrounding text"""
+    if not content:
+        return None
+    try:
+        return json.loads(content)
+    except ValueError:
+        pass
+
+    if '```json' in content:
+        content = content.split('```json')[1].split('```')[0]
+    elif '```' in content:
+        content = content.split('```')[1].split('```')[0]
+
+    start = content.find('{')
+    end = content.rfind('}') + 1
+    if start >= 0 and end > start:
         try:
-            return json.loads(result) if result else {}
-        except:
-            return {"urgency_level": "medium", "urgency_score": 5}
+            return json.loads(content[start:end])
+        except ValueError:
+            pass
+    return None
+
+
+def validate_section(section: str, data: Any) -> bool:
+    """True if `data` has every required key of the section with the expected type"""
+    if not isinstance(data, dict):
+        return False
+    for key, types in SECTIONS[section]["required"].items():
+        value = data.get(key)
+        # bool is an int subclass; scores must be real numbers
+        if not isinstance(value, types) or (types is NUMBER and isinstance(value, bool)):
+            return False
+    return True
 
-    def process_transcript(self, recording_id: str, transcript: str, segments: List = None) -> Dict:
-        """Process all Layer 5 metrics for a transcript"""
-        logger.info(f"Processing Layer 5 metrics for {recording_id}")
 
-        results = {
-            "recording_id": recording_id,
-            "processed_at": datetime.now().isoformat(),
-            "layer": 5
+class Layer5Processor:
+    """Process Layer 5 advanced metrics"""
+
+    def __init__(self, mode: str = LAYER5_MODE):
+        self.model = "google/gemma-3-12b-it:free"  # FREE - Best quality, reliable JSON
+        self.mode = mode
+        # Shared OpenRouter executor: bounded concurrency, per-model rate
+        # limit and 429 backoff across every extractor and transcript
+        self.executor = get_llm_executor()
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            'transcripts': 0,
+            'llm_calls': 0,
+            'prompt_chars': 0,
+            'combined_retries': 0,
         }
 
-        # Process each metric
-        logger.info(f"  Extracting buying signals...")
-        results["buying_signals"] = self.extract_buying_signals(transcript)
-        time.sleep(1)
+    def _count(self, key: str, n: int = 1):
+        with self._stats_lock:
+            self.stats[key] += n
+
+    def _call_llm(self, prompt: str, max_tokens: int = 2000) -> Optional[str]:
+        """Call OpenRouter LLM"""
+        self._count('llm_calls')
+        self._count('prompt_chars', len(prompt))
+        result = self.executor.call(prompt, max_tokens=max_tokens, model=self.model,
+                                    fallback_model=SECONDARY_MODEL, temperature=0.3)
+        if not result["success"]:
+            logger.error(f"LLM error: {result['error']}")
+            return None
+        return result["content"]
+
+    def _section_prompt(self, section: str, transcript: str) -> str:
+        spec = SECTIONS[section]
+        return f"""{spec['intro']}
+
+TRANSCRIPT:
+{transcript[:spec['chars']]}
+
+{spec['instructions']}
+
+Return JSON:
+{spec['schema']}
+
+Return ONLY valid JSON."""
+
+    def _combined_prompt(self, sections: List[str], transcript: str) -> str:
+        chars = max(SECTIONS[section]['chars'] for section in sections)
+        parts = [
+            f"""Analyze this call transcript and extract {len(sections)} sections of advanced call metrics.
+
+TRANSCRIPT:
+{transcript[:chars]}
+
+Return ONE JSON object whose keys are exactly: {', '.join(sections)}.
+Each key's value is a JSON object following that section's schema."""
+        ]
+        for section in sections:
+            spec = SECTIONS[section]
+            parts.append(f"""## {section}: {spec['intro']}
+
+{spec['instructions']}
+
+Schema:
+{spec['schema']}""")
+        parts.append("Return ONLY valid JSON.")
+        return "\n\n".join(parts)
+
+    def _finish_section(self, section: str, content: Optional[str], data: Any, transcript: str) -> Dict:
+        """Apply the per-section fallbacks to a parsed response"""
+        if section == "competitor_intelligence":
+            # Keyword search catches names the model misses
+            transcript_lower = transcript.lower()
+            mentioned = [comp for comp in COMPETITORS if comp.lower() in transcript_lower]
+            if not isinstance(data, dict):
+                return {"competitors_mentioned": mentioned}
+            if mentioned and isinstance(data.get('competitors_mentioned'), list):
+                data['competitors_mentioned'] = list(set(data['competitors_mentioned'] + mentioned))
+            return data
+
+        if content is None:
+            return {}
+        if not isinstance(data, dict):
+            return dict(SECTIONS[section]["default"])
+        return data
+
+    def _run_section(self, section: str, transcript: str) -> Dict:
+        content = self._call_llm(self._section_prompt(section, transcript))
+        return self._finish_section(section, content, parse_json_response(content), transcript)
+
+    def _run_sections(self, sections: List[str], transcript: str) -> Dict[str, Dict]:
+        """Run one extractor call per section concurrently"""
+        jobs = [(section, self._section_prompt(section, transcript)) for section in sections]
+        self._count('llm_calls', len(jobs))
+        self._count('prompt_chars', sum(len(prompt) for _, prompt in jobs))
+
+        results = {}
+        for section, result in self.executor.map(jobs, max_tokens=2000, model=self.model,
+                                                 fallback_model=SECONDARY_MODEL, temperature=0.3):
+            content = result["content"] if result["success"] else None
+            if content is None:
+                logger.error(f"LLM error ({section}): {result['error']}")
+            results[section] = self._finish_section(section, content, parse_json_response(content), transcript)
+        return results
+
+    def _run_combined(self, sections: List[str], transcript: str) -> Dict[str, Dict]:
+        """
+        Extract every section in one call.
+
+        Sections that are missing or fail validation are re-requested
+        individually (concurrently).
+        """
+        content = self._call_llm(self._combined_prompt(sections, transcript),
+                                 max_tokens=LAYER5_COMBINED_MAX_TOKENS)
+        data = parse_json_response(content)
+        if not isinstance(data, dict):
+            data = {}
+
+        results = {}
+        for section in sections:
+            if validate_section(section, data.get(section)):
+                results[section] = self._finish_section(section, content, data[section], transcript)
+
+        retry = [section for section in sections if section not in results]
+        if retry:
+            logger.info(f"  Combined response invalid for {', '.join(retry)}, re-requesting individually")
+            self._count('combined_retries', len(retry))
+            results.update(self._run_sections(retry, transcript))
+        return results
+
+    def extract_buying_signals(self, transcript: str) -> Dict:
+        """Extract buying signals from transcript"""
+        return self._run_section("buying_signals", transcript)
+
+    def extract_competitor_mentions(self, transcript: str) -> Dict:
+        """Extract competitor mentions and context"""
+        return self._run_section("competitor_intelligence", transcript)
+
+    def analyze_talk_listen_ratio(self, transcript: str, segments: List = None,
+                                  direction: str = None) -> Dict:
+        """
+        Talk-to-listen ratio measured from diarization segments
 
-        logger.info(f"  Analyzing competitor mentions...")
-        results["competitor_intelligence"] = self.extract_competitor_mentions(transcript)
-        time.sleep(1)
+        Talk time, interruptions, monologues and silence come from the
+        segment timestamps (conversation_dynamics); transcripts without
+        speaker labels get method "unavailable" instead of an estimate.
+        """
+        return to_talk_listen_ratio(analyze_conversation(segments, direction))
 
-        logger.info(f"  Calculating talk-listen ratio...")
-        results["talk_listen_ratio"] = self.analyze_talk_listen_ratio(transcript, segments)
-        time.sleep(1)
+    def calculate_compliance_score(self, transcript: str) -> Dict:
+        """Calculate compliance score for risk management"""
+        return self._run_section("compliance", transcript)
 
-        logger.info(f"  Evaluating compliance...")
-        results["compliance"] = self.calculate_compliance_score(transcript)
-        time.sleep(1)
+    def extract_key_quotes(self, transcript: str) -> Dict:
+        """Extract key quotes for better RAG retrieval"""
+        return self._run_section("key_quotes", transcript)
 
-        logger.info(f"  Extracting key quotes...")
-        results["key_quotes"] = self.extract_key_quotes(transcript)
-        time.sleep(1)
+    def extract_qa_pairs(self, transcript: str) -> Dict:
+        """Extract question-answer pairs for training data"""
+        return self._run_section("qa_pairs", transcript)
 
-        logger.info(f"  Extracting Q&A pairs...")
-        results["qa_pairs"] = self.extract_qa_pairs(transcript)
-        time.sleep(1)
+    def classify_urgency(self, transcript: str) -> Dict:
+        """Classify call urgency for prioritization"""
+        return self._run_section("urgency", transcript)
+
+    def process_transcript(self, recording_id: str, transcript: str, segments: List = None,
+                           mode: str = None, direction: str = None) -> Dict:
+        """
+        Process all Layer 5 metrics for a transcript
+
+        Args:
+            segments: Diarized transcript_segments, for talk/listen metrics
+            mode: "parallel" or "combined" (default: the processor's mode)
+            direction: Call direction, to tell the agent from the customer
+        """
+        mode = mode or self.mode
+        logger.info(f"Processing Layer 5 metrics for {recording_id} ({mode})")
+        self._count('transcripts')
 
-        logger.info(f"  Classifying urgency...")
-        results["urgency"] = self.classify_urgency(transcript)
+        results = {
+            "recording_id": recording_id,
+            "processed_at": datetime.now().isoformat(),
+            "layer": 5
+        }
 
+        # Talk-listen is measured from diarization, no LLM call
+        results["talk_listen_ratio"] = self.analyze_talk_listen_ratio(transcript, segments, direction)
+
+        sections = list(SECTIONS)
+        if mode == "combined":
+            extracted = self._run_combined(sections, transcript)
+        else:
+            extracted = self._run_sections(sections, transcript)
+
+        # Keep the section order stable in the saved/printed results
+        for section in sections:
+            results[section] = extracted.get(section, {})
         return results
 
+    def get_stats(self) -> Dict[str, Any]:
+        """LLM calls and prompt size per transcript so far"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        if stats['transcripts']:
+            stats['llm_calls_per_transcript'] = round(stats['llm_calls'] / stats['transcripts'], 2)
+            stats['prompt_chars_per_transcript'] = stats['prompt_chars'] // stats['transcripts']
+        return stats
+
     def save_to_database(self, results: Dict) -> bool:
         """Save Layer 5 results to database"""
         try:
@@ -525,9 +583,10 @@ Return ONLY valid JSON."""
             return False
 
 
-def process_batch(limit: int = 50):
+def process_batch(limit: int = 50, mode: str = LAYER5_MODE):
     """Process batch of transcripts through Layer 5"""
-    processor = Layer5Processor()
+    processor = Layer5Processor(mode=mode)
+    started = time.time()
 
     try:
         conn = psycopg2.connect(**DB_CONFIG)
@@ -535,7 +594,7 @@ def process_batch(limit: int = 50):
 
         # Get transcripts that need Layer 5 processing
         cur.execute("""
-            SELECT t.recording_id, t.transcript_text, t.transcript_segments
+            SELECT t.recording_id, t.transcript_text, t.transcript_segments, t.direction
             FROM transcripts t
             LEFT JOIN call_advanced_metrics m ON t.recording_id = m.recording_id
             WHERE t.transcript_text IS NOT NULL 
@@ -551,17 +610,19 @@ def process_batch(limit: int = 50):
         logger.info(f"Found {len(transcripts)} transcripts for Layer 5 processing")
 
         processed = 0
-        for recording_id, transcript, segments in transcripts:
+        for recording_id, transcript, segments, direction in transcripts:
             try:
-                results = processor.process_transcript(recording_id, transcript, segments)
+                results = processor.process_transcript(recording_id, transcript, segments,
+                                                       direction=direction)
                 if processor.save_to_database(results):
                     processed += 1
                     logger.info(f"  Saved Layer 5 for {recording_id}")
-                time.sleep(2)  # Rate limit
             except Exception as e:
                 logger.error(f"Error processing {recording_id}: {e}")
 
-        logger.info(f"\nProcessed {processed}/{len(transcripts)} transcripts")
+        elapsed = time.time() - started
+        logger.info(f"\nProcessed {processed}/{len(transcripts)} transcripts in {elapsed:.1f}s")
+        logger.info(f"LLM usage: {processor.get_stats()}")
 
     except Exception as e:
         logger.error(f"Batch processing error: {e}")
@@ -572,27 +633,30 @@ def main():
     parser = argparse.ArgumentParser(description='Layer 5 Advanced Metrics')
     parser.add_argument('--limit', type=int, default=50)
     parser.add_argument('--recording-id', type=str, help='Process single recording')
+    parser.add_argument('--mode', choices=['parallel', 'combined'], default=LAYER5_MODE,
+                        help='parallel: one concurrent call per section; combined: one call for all sections')
     args = parser.parse_args()
 
     if args.recording_id:
         # Process single recording
         conn = psycopg2.connect(**DB_CONFIG)
         cur = conn.cursor()
-        cur.execute("SELECT transcript_text, transcript_segments FROM transcripts WHERE recording_id = %s", 
+        cur.execute("SELECT transcript_text, transcript_segments, direction FROM transcripts WHERE recording_id = %s",
                     (args.recording_id,))
         result = cur.fetchone()
         cur.close()
         conn.close()
 
         if result:
-            processor = Layer5Processor()
-            results = processor.process_transcript(args.recording_id, result[0], result[1])
+            processor = Layer5Processor(mode=args.mode)
+            results = processor.process_transcript(args.recording_id, result[0], result[1],
+                                                   direction=result[2])
             processor.save_to_database(results)
             print(json.dumps(results, indent=2, default=str))
         else:
             print(f"Recording {args.recording_id} not found")
     else:
-        process_batch(limit=args.limit)
+        process_batch(limit=args.limit, mode=args.mode)
 
 
 if __name__ == '__main__':
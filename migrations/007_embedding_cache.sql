@@ -0,0 +1,19 @@
+-- Migration: Create embedding_cache table
+-- Date: 2026-10-16
+-- Purpose: Content-hash keyed embedding cache so unchanged chunks are never re-embedded
+--          (re-transcription, re-chunking, re-running the backfill)
+
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    content_hash TEXT PRIMARY KEY,      -- sha256 of model + exact text
+    model TEXT NOT NULL,
+    dimensions INTEGER NOT NULL,
+    embedding REAL[] NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_embedding_cache_model ON embedding_cache(model);
+
+GRANT SELECT, INSERT, UPDATE, DELETE ON embedding_cache TO call_insights_user;
+
+COMMENT ON TABLE embedding_cache IS 'Embeddings keyed by content hash, written by src.insights.embeddings_manager';
+COMMENT ON COLUMN embedding_cache.content_hash IS 'sha256 hex of "<model>\n<text>"; a model change never reuses vectors';
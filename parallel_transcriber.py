@@ -1,7 +1,14 @@
 #!/usr/bin/env python3
 """
 Parallel Salad Transcription Processor
-Runs multiple transcription jobs concurrently to speed up processing.
+Keeps many transcription jobs in flight at once to speed up processing.
+
+All jobs are submitted up front (up to --max-in-flight) and polled from a
+single thread by SaladJobTracker; each finished transcript is saved by a
+small pool of --workers threads as soon as it completes. With
+SALAD_WEBHOOK_URL set and --webhook-port given, Salad's completion
+callbacks trigger an immediate status check instead of waiting for the
+next poll.
 """
 
 import os
@@ -9,17 +16,18 @@ import sys
 import json
 import logging
 import time
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 
 load_dotenv('/var/www/call-recording-system/.env')
 sys.path.insert(0, '/var/www/call-recording-system')
 
 import psycopg2
-from src.transcription.salad_transcriber_enhanced import SaladTranscriberEnhanced
+from src.transcription.salad_transcriber_enhanced import SaladTranscriberEnhanced, TranscriptionResult
+from src.transcription.salad_job_tracker import SaladJobTracker, SALAD_MAX_IN_FLIGHT
 
 logging.basicConfig(
     level=logging.INFO,
@@ -43,8 +51,11 @@ DB_CONFIG = {
 class ParallelTranscriber:
     """Run multiple Salad transcription jobs in parallel"""
 
-    def __init__(self, max_workers: int = 3):
+    def __init__(self, max_workers: int = 3, max_in_flight: int = SALAD_MAX_IN_FLIGHT,
+                 webhook_port: Optional[int] = None):
         self.max_workers = max_workers
+        self.max_in_flight = max_in_flight
+        self.webhook_port = webhook_port
         self.queue_dir = Path('/var/www/call-recording-system/data/audio_queue')
         self.processed_dir = Path('/var/www/call-recording-system/data/processed')
         self.failed_dir = Path('/var/www/call-recording-system/data/failed')
@@ -55,6 +66,8 @@ class ParallelTranscriber:
         
         # Stats
         self.stats = {'processed': 0, 'failed': 0, 'total_time': 0}
+        self._stats_lock = threading.Lock()
+        self._files: Dict[str, Path] = {}
 
     def _load_metadata(self) -> Dict:
         """Load RingCentral metadata"""
@@ -69,131 +82,130 @@ class ParallelTranscriber:
         return metadata
 
     def _get_transcriber(self):
-        """Create a new transcriber instance (thread-safe)"""
+        """Create the transcriber whose SDK client the job tracker polls with"""
         return SaladTranscriberEnhanced(
             api_key=os.getenv('SALAD_API_KEY'),
             organization_name=os.getenv('SALAD_ORG_NAME', 'mst'),
+            webhook_url=os.getenv('SALAD_WEBHOOK_URL') or None,
             enable_diarization=True,
             enable_summarization=True,
             enable_monitoring=False,  # Disable per-instance monitoring for parallel
-            polling_interval=5,  # Slightly longer poll for parallel
             max_wait_time=1800  # 30 min max per job
         )
 
-    def _process_single(self, audio_file: Path) -> Dict:
-        """Process a single file (called by thread pool)"""
-        recording_id = audio_file.stem
-        start_time = time.time()
-        
-        result = {
-            'recording_id': recording_id,
-            'success': False,
-            'error': None,
-            'words': 0,
-            'time': 0
-        }
-        
+    def _save_result(self, recording_id: str, tx_result: TranscriptionResult):
+        """Save a finished transcript (called by the tracker's dispatch pool)"""
+        audio_file = self._files[recording_id]
+
         try:
-            # Get audio URL
-            audio_url = f"http://31.97.102.13:8080/audio/{audio_file.name}"
-            
+            if not tx_result or not tx_result.text:
+                raise Exception("No text returned")
+
             # Get metadata
             meta = self.rc_metadata.get(recording_id, {})
-            
-            # Create transcriber for this thread
-            transcriber = self._get_transcriber()
-            
-            # Transcribe
-            logger.info(f"[{recording_id}] Starting transcription...")
-            tx_result = transcriber.transcribe_file(audio_url)
-            
-            if tx_result and tx_result.text:
-                # Parse date
-                start_time_str = meta.get('start_time', '')
-                call_date, call_time = None, None
-                if start_time_str:
-                    try:
-                        dt = datetime.fromisoformat(start_time_str.replace('Z', '+00:00'))
-                        call_date = dt.date()
-                        call_time = dt.time()
-                    except:
-                        pass
-                
-                # Save to database
-                conn = psycopg2.connect(**DB_CONFIG)
-                cur = conn.cursor()
-                
-                cur.execute("SELECT recording_id FROM transcripts WHERE recording_id = %s", (recording_id,))
-                exists = cur.fetchone()
-                
-                if exists:
-                    cur.execute("""
-                        UPDATE transcripts SET
-                            transcript_text = %s, word_count = %s, confidence_score = %s,
-                            duration_seconds = %s, call_date = %s, call_time = %s,
-                            direction = %s, updated_at = NOW()
-                        WHERE recording_id = %s
-                    """, (tx_result.text, tx_result.word_count, tx_result.confidence,
-                          tx_result.duration_seconds, call_date, call_time,
-                          meta.get('direction', 'Unknown'), recording_id))
-                else:
-                    cur.execute("""
-                        INSERT INTO transcripts (recording_id, transcript_text, word_count,
-                            confidence_score, duration_seconds, call_date, call_time, direction)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                    """, (recording_id, tx_result.text, tx_result.word_count, tx_result.confidence,
-                          tx_result.duration_seconds, call_date, call_time,
-                          meta.get('direction', 'Unknown')))
-                
-                conn.commit()
-                cur.close()
-                conn.close()
-                
-                # Move file
-                audio_file.rename(self.processed_dir / audio_file.name)
-                
-                result['success'] = True
-                result['words'] = tx_result.word_count
-                
-                logger.info(f"[{recording_id}] SUCCESS: {tx_result.word_count} words")
+
+            # Parse date
+            start_time_str = meta.get('start_time', '')
+            call_date, call_time = None, None
+            if start_time_str:
+                try:
+                    dt = datetime.fromisoformat(start_time_str.replace('Z', '+00:00'))
+                    call_date = dt.date()
+                    call_time = dt.time()
+                except:
+                    pass
+
+            # Save to database
+            conn = psycopg2.connect(**DB_CONFIG)
+            cur = conn.cursor()
+
+            cur.execute("SELECT recording_id FROM transcripts WHERE recording_id = %s", (recording_id,))
+            exists = cur.fetchone()
+
+            if exists:
+                cur.execute("""
+                    UPDATE transcripts SET
+                        transcript_text = %s, word_count = %s, confidence_score = %s,
+                        duration_seconds = %s, call_date = %s, call_time = %s,
+                        direction = %s, updated_at = NOW()
+                    WHERE recording_id = %s
+                """, (tx_result.text, tx_result.word_count, tx_result.confidence,
+                      tx_result.duration_seconds, call_date, call_time,
+                      meta.get('direction', 'Unknown'), recording_id))
             else:
-                raise Exception("No text returned")
-                
+                cur.execute("""
+                    INSERT INTO transcripts (recording_id, transcript_text, word_count,
+                        confidence_score, duration_seconds, call_date, call_time, direction)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                """, (recording_id, tx_result.text, tx_result.word_count, tx_result.confidence,
+                      tx_result.duration_seconds, call_date, call_time,
+                      meta.get('direction', 'Unknown')))
+
+            conn.commit()
+            cur.close()
+            conn.close()
+
+            # Move file
+            audio_file.rename(self.processed_dir / audio_file.name)
+
+            with self._stats_lock:
+                self.stats['processed'] += 1
+            logger.info(f"[{recording_id}] SUCCESS: {tx_result.word_count} words "
+                        f"({tx_result.processing_time_seconds:.0f}s)")
+
         except Exception as e:
-            result['error'] = str(e)
-            logger.error(f"[{recording_id}] FAILED: {e}")
-            try:
-                audio_file.rename(self.failed_dir / audio_file.name)
-            except:
-                pass
-        
-        result['time'] = time.time() - start_time
-        return result
+            self._mark_failed(recording_id, str(e))
+
+    def _mark_failed(self, recording_id: str, error: str):
+        """Move a file whose transcription or save failed to failed_dir"""
+        with self._stats_lock:
+            self.stats['failed'] += 1
+        logger.error(f"[{recording_id}] FAILED: {error}")
+        try:
+            audio_file = self._files[recording_id]
+            audio_file.rename(self.failed_dir / audio_file.name)
+        except:
+            pass
 
     def process_batch(self, limit: int = 50):
-        """Process batch with parallel workers"""
+        """Submit the batch to Salad and save transcripts as they finish"""
         audio_files = sorted(self.queue_dir.glob('*.mp3'))[:limit]
-        
-        logger.info(f"Starting parallel processing: {len(audio_files)} files, {self.max_workers} workers")
+        if not audio_files:
+            logger.info("No audio files queued")
+            return
+
+        logger.info(f"Starting parallel processing: {len(audio_files)} files, "
+                    f"{self.max_in_flight} in flight, {self.max_workers} save workers")
         start_time = time.time()
-        
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = {executor.submit(self._process_single, f): f for f in audio_files}
-            
-            for future in as_completed(futures):
-                result = future.result()
-                if result['success']:
-                    self.stats['processed'] += 1
-                else:
-                    self.stats['failed'] += 1
-        
+
+        tracker = SaladJobTracker(
+            self._get_transcriber(),
+            on_complete=self._save_result,
+            on_failure=self._mark_failed,
+            max_in_flight=self.max_in_flight,
+            dispatch_workers=self.max_workers
+        )
+        if self.webhook_port:
+            tracker.start_webhook_server(port=self.webhook_port)
+
+        try:
+            for audio_file in audio_files:
+                recording_id = audio_file.stem
+                self._files[recording_id] = audio_file
+                tracker.submit(recording_id, f"http://31.97.102.13:8080/audio/{audio_file.name}")
+            tracker_stats = tracker.run()
+        finally:
+            tracker.close()
+
         total_time = time.time() - start_time
         self.stats['total_time'] = total_time
-        
+
         logger.info(f"\n{'='*50}")
         logger.info(f"BATCH COMPLETE")
         logger.info(f"  Processed: {self.stats['processed']}")
         logger.info(f"  Failed: {self.stats['failed']}")
+        logger.info(f"  Retried: {tracker_stats['retried']}")
+        logger.info(f"  Status polls: {tracker_stats['polls']} (webhooks: {tracker_stats['webhooks']})")
         logger.info(f"  Total time: {total_time:.1f}s")
         logger.info(f"  Avg per file: {total_time/len(audio_files):.1f}s")
         logger.info(f"  Files/minute: {len(audio_files)/(total_time/60):.1f}")
@@ -204,10 +216,15 @@ def main():
     import argparse
     parser = argparse.ArgumentParser()
     parser.add_argument('--limit', type=int, default=50, help='Number of files to process')
-    parser.add_argument('--workers', type=int, default=3, help='Number of parallel workers')
+    parser.add_argument('--workers', type=int, default=3, help='Threads saving finished transcripts')
+    parser.add_argument('--max-in-flight', type=int, default=SALAD_MAX_IN_FLIGHT,
+                        help='Salad jobs submitted at once')
+    parser.add_argument('--webhook-port', type=int,
+                        help='Accept Salad completion webhooks on this port (set SALAD_WEBHOOK_URL)')
     args = parser.parse_args()
     
-    processor = ParallelTranscriber(max_workers=args.workers)
+    processor = ParallelTranscriber(max_workers=args.workers, max_in_flight=args.max_in_flight,
+                                    webhook_port=args.webhook_port)
     processor.process_batch(limit=args.limit)
 
 
@@ -9,6 +9,7 @@ Usage:
     python process_all_layers_master.py --all --limit 100  # Process all layers
     python process_all_layers_master.py --layer 3 --limit 50  # Process specific layer
     python process_all_layers_master.py --continuous       # Run until all complete
+    python process_all_layers_master.py --all --workers 16 --rpm 600  # More concurrency
 
 Models Used:
     Primary:   google/gemma-3-12b-it:free (FREE)
@@ -19,8 +20,8 @@ import os
 import sys
 import argparse
 import logging
-import time
 import json
+from collections import Counter
 from datetime import datetime
 
 sys.path.insert(0, '/var/www/call-recording-system')
@@ -30,8 +31,11 @@ from dotenv import load_dotenv
 load_dotenv('/var/www/call-recording-system/.env')
 
 import psycopg2
-from psycopg2.extras import RealDictCursor, Json
-import requests
+from psycopg2.extras import RealDictCursor, Json, execute_values
+
+from rag_integration.services.response_cache import invalidate_report_cache
+from rag_integration.services.report_rollups import refresh_report_rollups
+from rag_integration.services.llm_executor import get_llm_executor
 
 # Set up logging
 log_dir = '/var/www/call-recording-system/logs'
@@ -74,7 +78,9 @@ else:
 PRIMARY_MODEL = 'google/gemini-2.0-flash-001'
 SECONDARY_MODEL = 'google/gemini-2.0-flash-001'
 OPENROUTER_API_KEY = os.getenv('OPENROUTER_API_KEY', '')
-OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+# Rows per batched INSERT/UPDATE (one commit per batch)
+WRITE_BATCH_SIZE = int(os.getenv('LAYER_WRITE_BATCH_SIZE', '50'))
 
 
 def get_db_connection():
@@ -104,74 +110,103 @@ def get_employee_by_extension(extension: str) -> str:
         conn.close()
 
 
-def update_extension_mapping(extension: str, employee_name: str):
-    """Update the extension-to-employee mapping with new data"""
-    if not extension or not employee_name or employee_name in ('Unknown', ''):
+def update_extension_mappings(conn, sightings: Counter):
+    """
+    Update the extension-to-employee mapping with new data.
+
+    Args:
+        conn: Open database connection (committed here)
+        sightings: Counter of (extension, employee_name) seen in this batch
+    """
+    rows = [
+        (extension, employee_name, count)
+        for (extension, employee_name), count in sightings.items()
+        if extension and employee_name and employee_name not in ('Unknown', '')
+    ]
+    if not rows:
         return
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
-        cur.execute("""
+    with conn.cursor() as cur:
+        execute_values(cur, """
             INSERT INTO extension_employee_map (extension_number, employee_name, occurrence_count, last_seen)
-            VALUES (%s, %s, 1, NOW())
+            VALUES %s
             ON CONFLICT (extension_number, employee_name)
             DO UPDATE SET
-                occurrence_count = extension_employee_map.occurrence_count + 1,
+                occurrence_count = extension_employee_map.occurrence_count + EXCLUDED.occurrence_count,
                 last_seen = NOW(),
                 confidence_score = CASE
-                    WHEN extension_employee_map.occurrence_count + 1 >= 50 THEN 0.95
-                    WHEN extension_employee_map.occurrence_count + 1 >= 20 THEN 0.85
-                    WHEN extension_employee_map.occurrence_count + 1 >= 10 THEN 0.75
-                    WHEN extension_employee_map.occurrence_count + 1 >= 5 THEN 0.65
+                    WHEN extension_employee_map.occurrence_count + EXCLUDED.occurrence_count >= 50 THEN 0.95
+                    WHEN extension_employee_map.occurrence_count + EXCLUDED.occurrence_count >= 20 THEN 0.85
+                    WHEN extension_employee_map.occurrence_count + EXCLUDED.occurrence_count >= 10 THEN 0.75
+                    WHEN extension_employee_map.occurrence_count + EXCLUDED.occurrence_count >= 5 THEN 0.65
                     ELSE 0.5
                 END
-        """, (extension, employee_name))
-        conn.commit()
-    finally:
-        conn.close()
+        """, rows, template="(%s, %s, %s, NOW())")
+    conn.commit()
+
+
+class BatchWriter:
+    """
+    Buffers result rows and writes them with one execute_values + commit
+    per batch instead of a commit per record.
+
+    Rows are keyed by their first column (recording_id) so a record seen
+    twice in a batch can't trip ON CONFLICT. If a batch fails, its rows are
+    retried one by one so a single bad record doesn't lose the rest.
+    """
+
+    def __init__(self, conn, sql: str, template: str = None, batch_size: int = WRITE_BATCH_SIZE):
+        self.conn = conn
+        self.sql = sql
+        self.template = template
+        self.batch_size = batch_size
+        self.written = 0
+        self._rows = {}
+
+    def add(self, row: tuple):
+        self._rows[row[0]] = row
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def _write(self, rows: list):
+        with self.conn.cursor() as cur:
+            execute_values(cur, self.sql, rows, template=self.template, page_size=len(rows))
+        self.conn.commit()
+        self.written += len(rows)
+
+    def flush(self):
+        rows, self._rows = list(self._rows.values()), {}
+        if not rows:
+            return
+        try:
+            self._write(rows)
+        except Exception as e:
+            self.conn.rollback()
+            logger.error(f"Batch write of {len(rows)} rows failed ({e}), retrying individually")
+            for row in rows:
+                try:
+                    self._write([row])
+                except Exception as row_error:
+                    self.conn.rollback()
+                    logger.error(f"  {row[0]}: {row_error}")
 
 
 def call_llm(prompt: str, max_tokens: int = 500, model: str = None) -> dict:
     """Call OpenRouter LLM with fallback to secondary model"""
-    model = model or PRIMARY_MODEL
+    return get_llm_executor().call(
+        prompt, max_tokens=max_tokens, model=model or PRIMARY_MODEL, fallback_model=SECONDARY_MODEL
+    )
 
-    try:
-        response = requests.post(
-            OPENROUTER_URL,
-            headers={
-                "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": model,
-                "messages": [{"role": "user", "content": prompt}],
-                "max_tokens": max_tokens,
-                "temperature": 0.1
-            },
-            timeout=60
-        )
-
-        # Rate limit handling - wait and retry on 429
-        if response.status_code == 429:
-            logger.warning(f"Rate limited on {model}, waiting 5s...")
-            time.sleep(5)
-            return call_llm(prompt, max_tokens, model)  # Retry same model
-
-        if response.status_code == 200:
-            content = response.json()['choices'][0]['message']['content']
-            return {"success": True, "content": content}
-        else:
-            # Try secondary model
-            if model == PRIMARY_MODEL:
-                logger.warning(f"Primary model failed ({response.status_code}), trying secondary...")
-                return call_llm(prompt, max_tokens, SECONDARY_MODEL)
-            return {"success": False, "error": f"HTTP {response.status_code}"}
 
-    except Exception as e:
-        if model == PRIMARY_MODEL:
-            logger.warning(f"Primary model error: {e}, trying secondary...")
-            return call_llm(prompt, max_tokens, SECONDARY_MODEL)
-        return {"success": False, "error": str(e)}
+def run_llm_batch(jobs: list, max_tokens: int):
+    """
+    Run (record, prompt) jobs on the shared LLM executor.
+
+    Yields (record, result) as each call finishes; DB writes stay on the
+    caller's thread and connection.
+    """
+    return get_llm_executor().map(
+        jobs, max_tokens=max_tokens, model=PRIMARY_MODEL, fallback_model=SECONDARY_MODEL
+    )
 
 
 def parse_json_response(content: str) -> dict:
@@ -318,32 +353,31 @@ def process_layer1(limit: int = 50) -> int:
     records = cur.fetchall()
     logger.info(f"Layer 1: Found {len(records)} records to process")
 
-    success = 0
-    for i, rec in enumerate(records, 1):
-        try:
-            # Determine employee vs customer based on call direction
-            direction = rec.get('direction', 'Unknown')
-
-            # For Inbound: TO party is employee, FROM party is customer
-            # For Outbound: FROM party is employee, TO party is customer
-            if direction == 'Inbound':
-                likely_employee_name = rec.get('to_name')
-                likely_employee_ext = rec.get('to_extension_number')
-                likely_customer_name = rec.get('from_name')
-                likely_customer_phone = rec.get('from_phone_number')
-                likely_customer_location = rec.get('from_location')
-            else:  # Outbound or Unknown
-                likely_employee_name = rec.get('from_name')
-                likely_employee_ext = rec.get('from_extension_number')
-                likely_customer_name = rec.get('to_name')
-                likely_customer_phone = rec.get('to_phone_number')
-                likely_customer_location = rec.get('to_location')
-
-            # Build context from call_log metadata
-            call_time = rec.get('start_time')
-            call_time_str = call_time.strftime('%Y-%m-%d %H:%M') if call_time else 'Unknown'
-
-            call_context = f"""
+    jobs = []
+    for rec in records:
+        # Determine employee vs customer based on call direction
+        direction = rec.get('direction', 'Unknown')
+
+        # For Inbound: TO party is employee, FROM party is customer
+        # For Outbound: FROM party is employee, TO party is customer
+        if direction == 'Inbound':
+            rec['likely_employee_name'] = rec.get('to_name')
+            rec['likely_employee_ext'] = rec.get('to_extension_number')
+            rec['likely_customer_name'] = rec.get('from_name')
+            rec['likely_customer_phone'] = rec.get('from_phone_number')
+            rec['likely_customer_location'] = rec.get('from_location')
+        else:  # Outbound or Unknown
+            rec['likely_employee_name'] = rec.get('from_name')
+            rec['likely_employee_ext'] = rec.get('from_extension_number')
+            rec['likely_customer_name'] = rec.get('to_name')
+            rec['likely_customer_phone'] = rec.get('to_phone_number')
+            rec['likely_customer_location'] = rec.get('to_location')
+
+        # Build context from call_log metadata
+        call_time = rec.get('start_time')
+        call_time_str = call_time.strftime('%Y-%m-%d %H:%M') if call_time else 'Unknown'
+
+        call_context = f"""
 Call Metadata:
 - Date/Time: {call_time_str}
 - Direction: {direction}
@@ -353,59 +387,72 @@ Call Metadata:
 - Duration: {rec.get('duration_seconds', 0)} seconds
 - From: {rec.get('from_name') or rec.get('from_phone_number') or 'Unknown'} (ext: {rec.get('from_extension_number') or 'N/A'}, location: {rec.get('from_location') or 'N/A'})
 - To: {rec.get('to_name') or rec.get('to_phone_number') or 'Unknown'} (ext: {rec.get('to_extension_number') or 'N/A'}, location: {rec.get('to_location') or 'N/A'})
-- Likely Employee: {likely_employee_name or 'Unknown'} (ext: {likely_employee_ext or 'N/A'})
-- Likely Customer: {likely_customer_name or likely_customer_phone or 'Unknown'} (location: {likely_customer_location or 'N/A'})
+- Likely Employee: {rec['likely_employee_name'] or 'Unknown'} (ext: {rec['likely_employee_ext'] or 'N/A'})
+- Likely Customer: {rec['likely_customer_name'] or rec['likely_customer_phone'] or 'Unknown'} (location: {rec['likely_customer_location'] or 'N/A'})
 """
-            prompt = f"""Extract names from this call transcript. Return ONLY JSON:
+        prompt = f"""Extract names from this call transcript. Return ONLY JSON:
 {{"employee_name": "name or Unknown", "customer_name": "name or Unknown", "customer_company": "company or Unknown"}}
 
 {call_context}
 Transcript (first 2500 chars):
 {rec['transcript_text'][:2500]}"""
+        jobs.append((rec, prompt))
+
+    writer = BatchWriter(conn, """
+        UPDATE transcripts t
+        SET customer_name = v.customer_name, employee_name = v.employee_name, customer_company = v.customer_company
+        FROM (VALUES %s) AS v(recording_id, customer_name, employee_name, customer_company)
+        WHERE t.recording_id = v.recording_id
+    """)
+    extension_sightings = Counter()
 
-            result = call_llm(prompt, max_tokens=150)
-            if result['success']:
-                data = parse_json_response(result['content'])
-                customer = data.get('customer_name', 'Unknown')
-                employee = data.get('employee_name', 'Unknown')
-                company = data.get('customer_company', 'Unknown')
-
-                # Use call_log data if AI couldn't extract names
-                if (not employee or employee == 'Unknown') and likely_employee_name:
-                    employee = likely_employee_name
-                    logger.info(f"    -> Employee from call_log ({direction}): {employee}")
-
-                if (not customer or customer == 'Unknown') and likely_customer_name:
-                    customer = likely_customer_name
-                    logger.info(f"    -> Customer from call_log: {customer}")
-
-                # Try extension mapping as fallback
-                if (not employee or employee == 'Unknown') and likely_employee_ext:
-                    mapped_employee = get_employee_by_extension(likely_employee_ext)
-                    if mapped_employee:
-                        employee = mapped_employee
-                        logger.info(f"    -> Employee from extension {likely_employee_ext}: {employee}")
-
-                if customer and customer != 'Unknown' or employee and employee != 'Unknown':
-                    cur.execute("""
-                        UPDATE transcripts
-                        SET customer_name = %s, employee_name = %s, customer_company = %s
-                        WHERE recording_id = %s
-                    """, (customer, employee, company, rec['recording_id']))
-                    conn.commit()
-                    success += 1
-                    logger.info(f"  [{i}/{len(records)}] {rec['recording_id']}: {customer} / {employee}")
-
-                    # Update extension mapping for future lookups (use correct extension based on direction)
-                    if employee and employee != 'Unknown' and likely_employee_ext:
-                        update_extension_mapping(likely_employee_ext, employee)
-
-            time.sleep(1)
+    for i, (rec, result) in enumerate(run_llm_batch(jobs, max_tokens=150), 1):
+        try:
+            if not result['success']:
+                logger.warning(f"  [{i}/{len(records)}] {rec['recording_id']}: LLM failed ({result['error']})")
+                continue
+            data = parse_json_response(result['content'])
+            customer = data.get('customer_name', 'Unknown')
+            employee = data.get('employee_name', 'Unknown')
+            company = data.get('customer_company', 'Unknown')
+            direction = rec.get('direction', 'Unknown')
+            likely_employee_ext = rec['likely_employee_ext']
+
+            # Use call_log data if AI couldn't extract names
+            if (not employee or employee == 'Unknown') and rec['likely_employee_name']:
+                employee = rec['likely_employee_name']
+                logger.info(f"    -> Employee from call_log ({direction}): {employee}")
+
+            if (not customer or customer == 'Unknown') and rec['likely_customer_name']:
+                customer = rec['likely_customer_name']
+                logger.info(f"    -> Customer from call_log: {customer}")
+
+            # Try extension mapping as fallback
+            if (not employee or employee == 'Unknown') and likely_employee_ext:
+                mapped_employee = get_employee_by_extension(likely_employee_ext)
+                if mapped_employee:
+                    employee = mapped_employee
+                    logger.info(f"    -> Employee from extension {likely_employee_ext}: {employee}")
+
+            if customer and customer != 'Unknown' or employee and employee != 'Unknown':
+                writer.add((rec['recording_id'], customer, employee, company))
+                logger.info(f"  [{i}/{len(records)}] {rec['recording_id']}: {customer} / {employee}")
+
+                # Update extension mapping for future lookups (use correct extension based on direction)
+                if employee and employee != 'Unknown' and likely_employee_ext:
+                    extension_sightings[(likely_employee_ext, employee)] += 1
         except Exception as e:
             logger.error(f"  [{i}] Error: {e}")
-            conn.rollback()
+
+    writer.flush()
+    try:
+        update_extension_mappings(conn, extension_sightings)
+    except Exception as e:
+        logger.error(f"Layer 1: Extension mapping update failed: {e}")
+        conn.rollback()
 
     conn.close()
+    success = writer.written
     logger.info(f"Layer 1: Completed {success}/{len(records)}")
     return success
 
@@ -436,12 +483,11 @@ def process_layer2(limit: int = 50) -> int:
     records = cur.fetchall()
     logger.info(f"Layer 2: Found {len(records)} records to process")
 
-    success = 0
-    for i, rec in enumerate(records, 1):
-        try:
-            # Build context from call_log metadata
-            call_result = rec.get('call_result', 'Unknown')
-            call_context = f"""
+    jobs = []
+    for rec in records:
+        # Build context from call_log metadata
+        call_result = rec.get('call_result', 'Unknown')
+        call_context = f"""
 Call Metadata:
 - Direction: {rec.get('direction', 'Unknown')}
 - Result: {call_result} (e.g., Accepted, Missed, Voicemail, No Answer)
@@ -450,7 +496,7 @@ Call Metadata:
 - From: {rec.get('from_name') or rec.get('from_phone_number') or 'Unknown'} (ext: {rec.get('from_extension_number', 'N/A')})
 - To: {rec.get('to_name') or rec.get('to_phone_number') or 'Unknown'} (ext: {rec.get('to_extension_number', 'N/A')})
 """
-            prompt = f"""Analyze this customer service call. Return ONLY JSON:
+        prompt = f"""Analyze this customer service call. Return ONLY JSON:
 {{
     "customer_sentiment": "positive/negative/neutral",
     "call_quality_score": 1-10,
@@ -467,43 +513,46 @@ Employee: {rec.get('employee_name', 'Unknown')}
 
 Transcript:
 {rec['transcript_text'][:4000]}"""
+        jobs.append((rec, prompt))
+
+    writer = BatchWriter(conn, """
+        INSERT INTO insights (recording_id, customer_sentiment, call_quality_score,
+            call_type, summary, key_topics, first_call_resolution, follow_up_needed)
+        VALUES %s
+        ON CONFLICT (recording_id) DO UPDATE SET
+            customer_sentiment = EXCLUDED.customer_sentiment,
+            call_quality_score = EXCLUDED.call_quality_score,
+            call_type = EXCLUDED.call_type,
+            summary = EXCLUDED.summary,
+            key_topics = EXCLUDED.key_topics,
+            first_call_resolution = EXCLUDED.first_call_resolution,
+            follow_up_needed = EXCLUDED.follow_up_needed
+    """)
 
-            result = call_llm(prompt, max_tokens=400)
-            if result['success']:
-                data = parse_json_response(result['content'])
-                if data:
-                    cur.execute("""
-                        INSERT INTO insights (recording_id, customer_sentiment, call_quality_score,
-                            call_type, summary, key_topics, first_call_resolution, follow_up_needed)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                        ON CONFLICT (recording_id) DO UPDATE SET
-                            customer_sentiment = EXCLUDED.customer_sentiment,
-                            call_quality_score = EXCLUDED.call_quality_score,
-                            call_type = EXCLUDED.call_type,
-                            summary = EXCLUDED.summary,
-                            key_topics = EXCLUDED.key_topics,
-                            first_call_resolution = EXCLUDED.first_call_resolution,
-                            follow_up_needed = EXCLUDED.follow_up_needed
-                    """, (
-                        rec['recording_id'],
-                        data.get('customer_sentiment', 'neutral'),
-                        data.get('call_quality_score', 5),
-                        data.get('call_type', 'general'),
-                        data.get('summary', ''),
-                        data.get('key_topics', []),
-                        data.get('first_call_resolution', False),
-                        data.get('follow_up_needed', False)
-                    ))
-                    conn.commit()
-                    success += 1
-                    logger.info(f"  [{i}/{len(records)}] {rec['recording_id']}: {data.get('customer_sentiment')} / {data.get('call_quality_score')}")
-
-            time.sleep(1)
+    for i, (rec, result) in enumerate(run_llm_batch(jobs, max_tokens=400), 1):
+        try:
+            if not result['success']:
+                logger.warning(f"  [{i}/{len(records)}] {rec['recording_id']}: LLM failed ({result['error']})")
+                continue
+            data = parse_json_response(result['content'])
+            if data:
+                writer.add((
+                    rec['recording_id'],
+                    data.get('customer_sentiment', 'neutral'),
+                    data.get('call_quality_score', 5),
+                    data.get('call_type', 'general'),
+                    data.get('summary', ''),
+                    data.get('key_topics', []),
+                    data.get('first_call_resolution', False),
+                    data.get('follow_up_needed', False)
+                ))
+                logger.info(f"  [{i}/{len(records)}] {rec['recording_id']}: {data.get('customer_sentiment')} / {data.get('call_quality_score')}")
         except Exception as e:
             logger.error(f"  [{i}] Error: {e}")
-            conn.rollback()
 
+    writer.flush()
     conn.close()
+    success = writer.written
     logger.info(f"Layer 2: Completed {success}/{len(records)}")
     return success
 
@@ -534,11 +583,10 @@ def process_layer3(limit: int = 50) -> int:
     records = cur.fetchall()
     logger.info(f"Layer 3: Found {len(records)} records to process")
 
-    success = 0
-    for i, rec in enumerate(records, 1):
-        try:
-            # Build context from call_log metadata
-            call_context = f"""
+    jobs = []
+    for rec in records:
+        # Build context from call_log metadata
+        call_context = f"""
 Call Metadata:
 - Direction: {rec.get('direction', 'Unknown')}
 - Result: {rec.get('call_result', 'Unknown')}
@@ -549,7 +597,7 @@ Call Metadata:
 - Customer: {rec.get('customer_name', 'Unknown')}
 - Employee: {rec.get('employee_name', 'Unknown')}
 """
-            prompt = f"""Analyze call resolution quality. Return ONLY JSON:
+        prompt = f"""Analyze call resolution quality. Return ONLY JSON:
 {{
     "resolution_status": "resolved/partial/unresolved",
     "first_contact_resolution": true/false,
@@ -564,43 +612,46 @@ Call Metadata:
 {call_context}
 Transcript:
 {rec['transcript_text'][:4000]}"""
+        jobs.append((rec, prompt))
+
+    writer = BatchWriter(conn, """
+        INSERT INTO call_resolutions (recording_id, resolution_status, first_contact_resolution,
+            closure_score, empathy_score, solution_summarized, understanding_confirmed,
+            churn_risk, problem_complexity)
+        VALUES %s
+        ON CONFLICT (recording_id) DO UPDATE SET
+            resolution_status = EXCLUDED.resolution_status,
+            first_contact_resolution = EXCLUDED.first_contact_resolution,
+            closure_score = EXCLUDED.closure_score,
+            empathy_score = EXCLUDED.empathy_score,
+            churn_risk = EXCLUDED.churn_risk
+    """)
 
-            result = call_llm(prompt, max_tokens=350)
-            if result['success']:
-                data = parse_json_response(result['content'])
-                if data:
-                    cur.execute("""
-                        INSERT INTO call_resolutions (recording_id, resolution_status, first_contact_resolution,
-                            closure_score, empathy_score, solution_summarized, understanding_confirmed,
-                            churn_risk, problem_complexity)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        ON CONFLICT (recording_id) DO UPDATE SET
-                            resolution_status = EXCLUDED.resolution_status,
-                            first_contact_resolution = EXCLUDED.first_contact_resolution,
-                            closure_score = EXCLUDED.closure_score,
-                            empathy_score = EXCLUDED.empathy_score,
-                            churn_risk = EXCLUDED.churn_risk
-                    """, (
-                        rec['recording_id'],
-                        data.get('resolution_status', 'unresolved'),
-                        data.get('first_contact_resolution', False),
-                        data.get('closure_score', 5),
-                        data.get('empathy_score', 5),
-                        data.get('solution_summarized', False),
-                        data.get('understanding_confirmed', False),
-                        data.get('churn_risk', 'none'),
-                        data.get('problem_complexity', 'medium')
-                    ))
-                    conn.commit()
-                    success += 1
-                    logger.info(f"  [{i}/{len(records)}] {rec['recording_id']}: {data.get('resolution_status')} / closure:{data.get('closure_score')}")
-
-            time.sleep(1)
+    for i, (rec, result) in enumerate(run_llm_batch(jobs, max_tokens=350), 1):
+        try:
+            if not result['success']:
+                logger.warning(f"  [{i}/{len(records)}] {rec['recording_id']}: LLM failed ({result['error']})")
+                continue
+            data = parse_json_response(result['content'])
+            if data:
+                writer.add((
+                    rec['recording_id'],
+                    data.get('resolution_status', 'unresolved'),
+                    data.get('first_contact_resolution', False),
+                    data.get('closure_score', 5),
+                    data.get('empathy_score', 5),
+                    data.get('solution_summarized', False),
+                    data.get('understanding_confirmed', False),
+                    data.get('churn_risk', 'none'),
+                    data.get('problem_complexity', 'medium')
+                ))
+                logger.info(f"  [{i}/{len(records)}] {rec['recording_id']}: {data.get('resolution_status')} / closure:{data.get('closure_score')}")
         except Exception as e:
             logger.error(f"  [{i}] Error: {e}")
-            conn.rollback()
 
+    writer.flush()
     conn.close()
+    success = writer.written
     logger.info(f"Layer 3: Completed {success}/{len(records)}")
     return success
 
@@ -633,11 +684,10 @@ def process_layer4(limit: int = 50) -> int:
     records = cur.fetchall()
     logger.info(f"Layer 4: Found {len(records)} records to process")
 
-    success = 0
-    for i, rec in enumerate(records, 1):
-        try:
-            # Build context from call_log metadata
-            call_context = f"""
+    jobs = []
+    for rec in records:
+        # Build context from call_log metadata
+        call_context = f"""
 Call Metadata:
 - Direction: {rec.get('direction', 'Unknown')}
 - Result: {rec.get('call_result', 'Unknown')}
@@ -646,7 +696,7 @@ Call Metadata:
 - From: {rec.get('from_name') or rec.get('from_phone_number') or 'Unknown'} (ext: {rec.get('from_extension_number') or 'N/A'})
 - To: {rec.get('to_name') or rec.get('to_phone_number') or 'Unknown'} (ext: {rec.get('to_extension_number') or 'N/A'})
 """
-            prompt = f"""Generate coaching recommendations for this call. Return ONLY JSON:
+        prompt = f"""Generate coaching recommendations for this call. Return ONLY JSON:
 {{
     "process_improvements": ["improvement1", "improvement2"],
     "employee_strengths": ["strength1", "strength2"],
@@ -665,41 +715,44 @@ Sentiment: {rec.get('customer_sentiment', 'unknown')}
 
 Transcript:
 {rec['transcript_text'][:4000]}"""
+        jobs.append((rec, prompt))
+
+    writer = BatchWriter(conn, """
+        INSERT INTO call_recommendations (recording_id, process_improvements,
+            employee_strengths, employee_improvements, suggested_phrases,
+            follow_up_actions, escalation_required, risk_level, efficiency_score)
+        VALUES %s
+        ON CONFLICT (recording_id) DO UPDATE SET
+            process_improvements = EXCLUDED.process_improvements,
+            employee_strengths = EXCLUDED.employee_strengths,
+            employee_improvements = EXCLUDED.employee_improvements
+    """)
 
-            result = call_llm(prompt, max_tokens=450)
-            if result['success']:
-                data = parse_json_response(result['content'])
-                if data:
-                    cur.execute("""
-                        INSERT INTO call_recommendations (recording_id, process_improvements,
-                            employee_strengths, employee_improvements, suggested_phrases,
-                            follow_up_actions, escalation_required, risk_level, efficiency_score)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        ON CONFLICT (recording_id) DO UPDATE SET
-                            process_improvements = EXCLUDED.process_improvements,
-                            employee_strengths = EXCLUDED.employee_strengths,
-                            employee_improvements = EXCLUDED.employee_improvements
-                    """, (
-                        rec['recording_id'],
-                        data.get('process_improvements', []),
-                        data.get('employee_strengths', []),
-                        data.get('employee_improvements', []),
-                        data.get('suggested_phrases', []),
-                        data.get('follow_up_actions', []),
-                        data.get('escalation_required', False),
-                        data.get('risk_level', 'low'),
-                        data.get('efficiency_score', 5)
-                    ))
-                    conn.commit()
-                    success += 1
-                    logger.info(f"  [{i}/{len(records)}] {rec['recording_id']}: efficiency:{data.get('efficiency_score')}")
-
-            time.sleep(1)
+    for i, (rec, result) in enumerate(run_llm_batch(jobs, max_tokens=450), 1):
+        try:
+            if not result['success']:
+                logger.warning(f"  [{i}/{len(records)}] {rec['recording_id']}: LLM failed ({result['error']})")
+                continue
+            data = parse_json_response(result['content'])
+            if data:
+                writer.add((
+                    rec['recording_id'],
+                    data.get('process_improvements', []),
+                    data.get('employee_strengths', []),
+                    data.get('employee_improvements', []),
+                    data.get('suggested_phrases', []),
+                    data.get('follow_up_actions', []),
+                    data.get('escalation_required', False),
+                    data.get('risk_level', 'low'),
+                    data.get('efficiency_score', 5)
+                ))
+                logger.info(f"  [{i}/{len(records)}] {rec['recording_id']}: efficiency:{data.get('efficiency_score')}")
         except Exception as e:
             logger.error(f"  [{i}] Error: {e}")
-            conn.rollback()
 
+    writer.flush()
     conn.close()
+    success = writer.written
     logger.info(f"Layer 4: Completed {success}/{len(records)}")
     return success
 
@@ -730,11 +783,10 @@ def process_layer5(limit: int = 50) -> int:
     records = cur.fetchall()
     logger.info(f"Layer 5: Found {len(records)} records to process")
 
-    success = 0
-    for i, rec in enumerate(records, 1):
-        try:
-            # Build context from call_log metadata
-            call_context = f"""
+    jobs = []
+    for rec in records:
+        # Build context from call_log metadata
+        call_context = f"""
 Call Metadata:
 - Direction: {rec.get('direction', 'Unknown')}
 - Result: {rec.get('call_result', 'Unknown')}
@@ -745,7 +797,7 @@ Call Metadata:
 - Customer: {rec.get('customer_name', 'Unknown')}
 - Employee: {rec.get('employee_name', 'Unknown')}
 """
-            prompt = f"""Extract advanced metrics from this call. Return ONLY JSON:
+        prompt = f"""Extract advanced metrics from this call. Return ONLY JSON:
 {{
     "buying_signals": ["signal1"] or [],
     "competitor_mentions": ["competitor1"] or [],
@@ -759,40 +811,43 @@ Call Metadata:
 {call_context}
 Transcript:
 {rec['transcript_text'][:4000]}"""
+        jobs.append((rec, prompt))
+
+    writer = BatchWriter(conn, """
+        INSERT INTO call_advanced_metrics (recording_id, buying_signals,
+            competitor_intelligence, urgency, urgency_score, compliance_score,
+            key_quotes, sales_opportunity_score)
+        VALUES %s
+        ON CONFLICT (recording_id) DO UPDATE SET
+            buying_signals = EXCLUDED.buying_signals,
+            urgency = EXCLUDED.urgency,
+            key_quotes = EXCLUDED.key_quotes
+    """)
 
-            result = call_llm(prompt, max_tokens=400)
-            if result['success']:
-                data = parse_json_response(result['content'])
-                if data:
-                    cur.execute("""
-                        INSERT INTO call_advanced_metrics (recording_id, buying_signals,
-                            competitor_intelligence, urgency, urgency_score, compliance_score,
-                            key_quotes, sales_opportunity_score)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                        ON CONFLICT (recording_id) DO UPDATE SET
-                            buying_signals = EXCLUDED.buying_signals,
-                            urgency = EXCLUDED.urgency,
-                            key_quotes = EXCLUDED.key_quotes
-                    """, (
-                        rec['recording_id'],
-                        Json(data.get('buying_signals', [])),
-                        Json({'competitors': data.get('competitor_mentions', [])}),
-                        Json({'level': data.get('urgency_level', 'low')}),
-                        data.get('urgency_score', 5),
-                        data.get('compliance_score', 8),
-                        Json(data.get('key_quotes', [])),
-                        data.get('sales_opportunity_score', 5)
-                    ))
-                    conn.commit()
-                    success += 1
-                    logger.info(f"  [{i}/{len(records)}] {rec['recording_id']}: urgency:{data.get('urgency_level')}")
-
-            time.sleep(1)
+    for i, (rec, result) in enumerate(run_llm_batch(jobs, max_tokens=400), 1):
+        try:
+            if not result['success']:
+                logger.warning(f"  [{i}/{len(records)}] {rec['recording_id']}: LLM failed ({result['error']})")
+                continue
+            data = parse_json_response(result['content'])
+            if data:
+                writer.add((
+                    rec['recording_id'],
+                    Json(data.get('buying_signals', [])),
+                    Json({'competitors': data.get('competitor_mentions', [])}),
+                    Json({'level': data.get('urgency_level', 'low')}),
+                    data.get('urgency_score', 5),
+                    data.get('compliance_score', 8),
+                    Json(data.get('key_quotes', [])),
+                    data.get('sales_opportunity_score', 5)
+                ))
+                logger.info(f"  [{i}/{len(records)}] {rec['recording_id']}: urgency:{data.get('urgency_level')}")
         except Exception as e:
             logger.error(f"  [{i}] Error: {e}")
-            conn.rollback()
 
+    writer.flush()
     conn.close()
+    success = writer.written
     logger.info(f"Layer 5: Completed {success}/{len(records)}")
     return success
 
@@ -807,9 +862,21 @@ def main():
     parser.add_argument('--limit', type=int, default=50, help='Records per batch (default: 50)')
     parser.add_argument('--all', action='store_true', help='Process all layers')
     parser.add_argument('--continuous', action='store_true', help='Run until all complete')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Concurrent LLM requests (default: RAG_LLM_MAX_WORKERS or 8)')
+    parser.add_argument('--rpm', type=float, default=None,
+                        help='Requests per minute per model (default: RAG_LLM_RPM or 240)')
 
     args = parser.parse_args()
 
+    # Size the shared executor before any layer uses it
+    executor_options = {}
+    if args.workers:
+        executor_options['max_workers'] = args.workers
+    if args.rpm:
+        executor_options['requests_per_minute'] = args.rpm
+    executor = get_llm_executor(**executor_options)
+
     # Always show status
     status = print_status()
 
@@ -821,6 +888,10 @@ def main():
         layer_funcs = {1: process_layer1, 2: process_layer2, 3: process_layer3,
                        4: process_layer4, 5: process_layer5}
         result = layer_funcs[args.layer](args.limit)
+        if result:
+            refresh_report_rollups()
+            invalidate_report_cache()
+        logger.info(f"LLM executor: {executor.get_stats()}")
         print_status()
         return
 
@@ -840,7 +911,11 @@ def main():
                 if status[pending_key] > 0:
                     layer_funcs = {1: process_layer1, 2: process_layer2, 3: process_layer3,
                                    4: process_layer4, 5: process_layer5}
-                    layer_funcs[layer_num](args.limit)
+                    if layer_funcs[layer_num](args.limit):
+                        # New layer data: roll up the touched days, then drop
+                        # the cached dashboard reports built from the old ones
+                        refresh_report_rollups()
+                        invalidate_report_cache()
 
             if not args.continuous:
                 break
@@ -848,6 +923,7 @@ def main():
             print_status()
             logger.info("Continuing to next batch...")
 
+        logger.info(f"LLM executor: {executor.get_stats()}")
         print_status()
         return
 
@@ -2,6 +2,8 @@
 
 import os
 import sys
+import asyncio
+import functools
 import smtplib
 import ssl
 from datetime import datetime
@@ -26,6 +28,9 @@ import uvicorn
 from rag_integration.config.settings import get_config
 from rag_integration.config.employee_names import get_canonical_employee_list, CANONICAL_EMPLOYEES, get_employee_name_variations
 from rag_integration.services.db_reader import DatabaseReader
+from rag_integration.services.db_pool import run_blocking, run_llm, get_pool_stats, close_all_pools
+from rag_integration.services.response_cache import get_report_cache, invalidate_report_cache
+from rag_integration.services.answer_cache import get_answer_cache
 from rag_integration.services.gemini_file_search import GeminiFileSearchService
 from rag_integration.services.vertex_rag import VertexRAGService
 from rag_integration.services.query_router import UnifiedQueryService, QueryRouter
@@ -63,6 +68,12 @@ _pipeline = None
 _db_reader = None
 
 
+@app.on_event("shutdown")
+def shutdown_db_pools():
+    """Release pooled database connections on shutdown."""
+    close_all_pools()
+
+
 def get_config_instance():
     global _config
     if _config is None:
@@ -76,7 +87,7 @@ def get_query_service():
         config = get_config_instance()
         gemini = GeminiFileSearchService(config.gemini_api_key)
         vertex = VertexRAGService(config.gcp_project, config.vertex_location)
-        _query_service = UnifiedQueryService(gemini, vertex)
+        _query_service = UnifiedQueryService(gemini, vertex, answer_cache=get_answer_cache())
     return _query_service
 
 
@@ -136,6 +147,35 @@ def get_employee_filter(request: Request) -> Optional[str]:
     return user.get('employee_name')
 
 
+def get_cache_scope(request: Request) -> str:
+    """Cache scope: admins share one view, everyone else is scoped to their employee filter."""
+    if is_admin(request):
+        return "admin"
+    return f"employee:{get_employee_filter(request) or ''}"
+
+
+def cached_report(endpoint: str):
+    """
+    Cache an endpoint's response per (query params, cache scope).
+
+    Unauthenticated requests bypass the cache so the endpoint's own auth
+    checks run; errors are never cached.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(request: Request, **kwargs):
+            if not check_auth(request):
+                return await func(request, **kwargs)
+            return await get_report_cache().get_or_compute(
+                endpoint,
+                kwargs,
+                get_cache_scope(request),
+                lambda: func(request, **kwargs)
+            )
+        return wrapper
+    return decorator
+
+
 # Pydantic models
 class QueryRequest(BaseModel):
     query: str
@@ -149,6 +189,7 @@ class QueryResponse(BaseModel):
     citations: List[Dict] = []
     filters: Optional[Dict] = None
     query_time_ms: int
+    cache_hit: Optional[str] = None
 
 
 class ExportRequest(BaseModel):
@@ -361,9 +402,9 @@ async def dashboard(request: Request):
 
     try:
         db = get_db()
-        stats = db.get_statistics()
+        stats = await run_blocking(db.get_statistics)
         pipeline = get_pipeline()
-        pipeline_status = pipeline.get_status()
+        pipeline_status = await run_blocking(pipeline.get_status)
 
         return templates.TemplateResponse("index.html", {
             "request": request,
@@ -426,7 +467,7 @@ async def query_submit(
         elif date_range == 'custom' and start_date and end_date:
             query_with_context = f"{query} (limit to date range {start_date} to {end_date})"
 
-        result = service.query(query_with_context, force_system=force_system)
+        result = await run_llm(service.query, query_with_context, force_system=force_system)
 
         # Add date range info to result
         if date_range:
@@ -470,7 +511,7 @@ async def reports_page(request: Request):
     # Get list of customer companies
     try:
         db = get_db()
-        customers = db.get_customer_companies(limit=100)
+        customers = await run_blocking(db.get_customer_companies, limit=100)
     except Exception:
         customers = []
 
@@ -491,7 +532,7 @@ async def export_page(request: Request):
         return RedirectResponse(url="/?error=Admin+access+required", status_code=303)
 
     pipeline = get_pipeline()
-    status = pipeline.get_status()
+    status = await run_blocking(pipeline.get_status)
 
     return templates.TemplateResponse("export.html", {
         "request": request,
@@ -508,7 +549,7 @@ async def api_query(request: Request, query_request: QueryRequest):
 
     try:
         service = get_query_service()
-        result = service.query(query_request.query, query_request.force_system)
+        result = await run_llm(service.query, query_request.query, query_request.force_system)
 
         return QueryResponse(
             query=result["query"],
@@ -516,7 +557,8 @@ async def api_query(request: Request, query_request: QueryRequest):
             response=result["response"],
             citations=result.get("citations", []),
             filters=result.get("filters"),
-            query_time_ms=result.get("query_time_ms", 0)
+            query_time_ms=result.get("query_time_ms", 0),
+            cache_hit=result.get("cache_hit")
         )
     except Exception as e:
         logger.error(f"API query error: {e}")
@@ -574,8 +616,11 @@ async def api_status(request: Request):
         pipeline = get_pipeline()
 
         return {
-            "database": db.get_statistics(),
-            "pipeline": pipeline.get_status(),
+            "database": await run_blocking(db.get_statistics),
+            "pipeline": await run_blocking(pipeline.get_status),
+            "db_pools": get_pool_stats(),
+            "report_cache": get_report_cache().get_stats(),
+            "answer_cache": get_answer_cache().get_stats(),
             "timestamp": datetime.now().isoformat()
         }
     except Exception as e:
@@ -583,7 +628,20 @@ async def api_status(request: Request):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/v1/rag/cache/invalidate")
+async def api_invalidate_report_cache(request: Request, endpoint: Optional[str] = None):
+    """Drop cached report responses (admin only); all endpoints unless one is given."""
+    if not check_auth(request):
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    if not is_admin(request):
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    dropped = invalidate_report_cache(endpoint=endpoint)
+    return {"status": "invalidated", "endpoint": endpoint or "all", "entries_dropped": dropped}
+
+
 @app.get("/api/v1/rag/reports/churn")
+@cached_report("reports/churn")
 async def api_churn_report(request: Request, min_score: int = 7, date_range: str = None, start_date: str = None, end_date: str = None):
     """Get churn risk report with actual data."""
     if not check_auth(request):
@@ -599,7 +657,7 @@ async def api_churn_report(request: Request, min_score: int = 7, date_range: str
         employee_filter = get_employee_filter(request)
 
         # Get actual churn risk data from database with date filtering
-        churn_data = db.get_churn_risk_data(risk_level, date_range=date_range, start_date=start_date, end_date=end_date, employee_filter=employee_filter)
+        churn_data = await run_blocking(db.get_churn_risk_data, risk_level, date_range=date_range, start_date=start_date, end_date=end_date, employee_filter=employee_filter)
 
         if churn_data['total_high_risk'] == 0:
             return {
@@ -689,7 +747,7 @@ HANDLING UNKNOWN VALUES:
 - Include these unknown entries in your analysis - they may represent important at-risk customers we haven't identified yet"""
 
         service = get_query_service()
-        result = service.query(prompt, force_system="gemini")
+        result = await run_llm(service.query, prompt, force_system="gemini", use_cache=False)
 
         return {
             "report": "churn_risk",
@@ -721,7 +779,7 @@ async def api_agent_report(request: Request, agent_name: str, date_range: Option
         db = get_db()
 
         # Get actual metrics from database
-        metrics = db.get_agent_performance(agent_name, date_range)
+        metrics = await run_blocking(db.get_agent_performance, agent_name, date_range)
 
         if metrics['total_calls'] == 0:
             return {
@@ -797,7 +855,7 @@ Based on this data, provide:
 CRITICAL: Use the actual numbers and dates provided. Do NOT use placeholder text or invent dates."""
 
         service = get_query_service()
-        result = service.query(prompt, force_system="gemini")
+        result = await run_llm(service.query, prompt, force_system="gemini", use_cache=False)
 
         return {
             "report": "agent_performance",
@@ -825,7 +883,7 @@ async def api_customer_report(request: Request, company_name: str, date_range: s
         employee_filter = get_employee_filter(request)
 
         # Get actual customer data from database with date filtering
-        customer_data = db.get_customer_report(company_name, date_range=date_range, start_date=start_date, end_date=end_date, employee_filter=employee_filter)
+        customer_data = await run_blocking(db.get_customer_report, company_name, date_range=date_range, start_date=start_date, end_date=end_date, employee_filter=employee_filter)
 
         if customer_data.get('total_calls', 0) == 0:
             return {
@@ -916,7 +974,7 @@ Based on this data, provide:
 CRITICAL: Use the actual data and dates provided. Do NOT use placeholder text or invent dates."""
 
         service = get_query_service()
-        result = service.query(prompt, force_system="gemini")
+        result = await run_llm(service.query, prompt, force_system="gemini", use_cache=False)
 
         return {
             "report": "customer",
@@ -939,7 +997,7 @@ async def api_list_customers(request: Request, limit: int = 50):
 
     try:
         db = get_db()
-        companies = db.get_customer_companies(limit)
+        companies = await run_blocking(db.get_customer_companies, limit)
 
         return {
             "customers": companies,
@@ -951,6 +1009,7 @@ async def api_list_customers(request: Request, limit: int = 50):
 
 
 @app.get("/api/v1/rag/reports/quality")
+@cached_report("reports/quality")
 async def api_quality_report(request: Request, focus: str = "low_quality", date_range: str = None, start_date: str = None, end_date: str = None):
     """Get call quality report with actual data.
 
@@ -970,7 +1029,7 @@ async def api_quality_report(request: Request, focus: str = "low_quality", date_
         employee_filter = get_employee_filter(request)
 
         # Get actual quality data from database
-        quality_data = db.get_quality_report_data(focus, date_range, start_date, end_date, employee_filter=employee_filter)
+        quality_data = await run_blocking(db.get_quality_report_data, focus, date_range, start_date, end_date, employee_filter=employee_filter)
 
         # Format the low quality calls for the prompt
         calls_str = ""
@@ -1090,7 +1149,7 @@ HANDLING UNKNOWN VALUES:
 - Include these unknown entries in quality analysis - they represent calls that need attention regardless of identity"""
 
         service = get_query_service()
-        result = service.query(prompt, force_system="gemini")
+        result = await run_llm(service.query, prompt, force_system="gemini", use_cache=False)
 
         return {
             "report": "quality",
@@ -1105,6 +1164,7 @@ HANDLING UNKNOWN VALUES:
 
 
 @app.get("/api/v1/rag/reports/sentiment")
+@cached_report("reports/sentiment")
 async def api_sentiment_report(request: Request, analysis: str = "negative", date_range: str = None, start_date: str = None, end_date: str = None):
     """Get sentiment analysis report with actual data.
 
@@ -1124,7 +1184,7 @@ async def api_sentiment_report(request: Request, analysis: str = "negative", dat
         employee_filter = get_employee_filter(request)
 
         # Get actual sentiment data from database
-        sentiment_data = db.get_sentiment_report_data(analysis, date_range, start_date, end_date, employee_filter=employee_filter)
+        sentiment_data = await run_blocking(db.get_sentiment_report_data, analysis, date_range, start_date, end_date, employee_filter=employee_filter)
 
         if sentiment_data.get('total_matching', 0) == 0:
             return {
@@ -1246,7 +1306,7 @@ HANDLING UNKNOWN VALUES:
 - These unknown entries may represent important patterns - include them in your analysis"""
 
         service = get_query_service()
-        result = service.query(prompt, force_system="gemini")
+        result = await run_llm(service.query, prompt, force_system="gemini", use_cache=False)
 
         return {
             "report": "sentiment",
@@ -1293,8 +1353,8 @@ async def knowledge_base_page(request: Request):
         return RedirectResponse(url="/login", status_code=303)
 
     kb = get_kb_service()
-    stats = kb.get_stats(days=30)
-    recent_searches = kb.get_recent_searches(limit=10)
+    stats = await run_blocking(kb.get_stats, days=30)
+    recent_searches = await run_blocking(kb.get_recent_searches, limit=10)
 
     return templates.TemplateResponse("knowledge_base.html", {
         "request": request,
@@ -1339,7 +1399,16 @@ async def kb_search_get(
         if category:
             filters['category'] = category
 
-        search_results = kb.search(q, agent_id=session_id, filters=filters if filters else None, offset=offset, sort=sort)
+        # Pagination only needs the next page of database results, not a new summary
+        search_results = await run_blocking(
+            kb.search,
+            q,
+            agent_id=session_id,
+            filters=filters if filters else None,
+            offset=offset,
+            sort=sort,
+            summary='none'
+        )
         return JSONResponse({
             "results": search_results.get('results', []),
             "total_matches": search_results.get('total_matches', 0),
@@ -1347,7 +1416,7 @@ async def kb_search_get(
         })
 
     # Regular HTML response
-    stats = kb.get_stats(days=30)
+    stats = await run_blocking(kb.get_stats, days=30)
     search_results = None
     active_filters = {}
     if q:
@@ -1363,7 +1432,9 @@ async def kb_search_get(
             filters['category'] = category
             active_filters['category'] = category
 
-        search_results = kb.search(q, agent_id=session_id, filters=filters if filters else None, sort=sort)
+        search_results = await run_blocking(
+            kb.search, q, agent_id=session_id, filters=filters if filters else None, sort=sort
+        )
 
     return templates.TemplateResponse("kb_search.html", {
         "request": request,
@@ -1388,8 +1459,8 @@ async def kb_search_submit(
     kb = get_kb_service()
     session_id = request.cookies.get('session', 'anonymous')
 
-    results = kb.search(query, agent_id=session_id)
-    stats = kb.get_stats(days=30)
+    results = await run_blocking(kb.search, query, agent_id=session_id)
+    stats = await run_blocking(kb.get_stats, days=30)
 
     return templates.TemplateResponse("kb_search.html", {
         "request": request,
@@ -1408,8 +1479,8 @@ async def kb_stats_page(request: Request):
         return RedirectResponse(url="/login", status_code=303)
 
     kb = get_kb_service()
-    stats = kb.get_stats(days=30)
-    recent_searches = kb.get_recent_searches(limit=50)
+    stats = await run_blocking(kb.get_stats, days=30)
+    recent_searches = await run_blocking(kb.get_recent_searches, limit=50)
 
     return templates.TemplateResponse("kb_stats.html", {
         "request": request,
@@ -1423,19 +1494,50 @@ async def kb_stats_page(request: Request):
 @app.get("/api/v1/kb/search")
 async def api_kb_search(
     request: Request,
-    q: str
+    q: str,
+    summary: str = "inline"
 ):
-    """API: Search knowledge base using RAG"""
+    """API: Search knowledge base using RAG
+
+    Args:
+        summary: 'inline' (wait briefly for the AI summary), 'deferred'
+            (return immediately; fetch via /api/v1/kb/summary/{search_id}) or 'none'
+    """
     if not check_auth(request):
         raise HTTPException(status_code=401, detail="Not authenticated")
+    if summary not in ('inline', 'deferred', 'none'):
+        raise HTTPException(status_code=400, detail="summary must be 'inline', 'deferred' or 'none'")
 
     kb = get_kb_service()
     session_id = request.cookies.get('session', 'anonymous')
 
-    results = kb.search(q, agent_id=session_id)
+    results = await run_blocking(kb.search, q, agent_id=session_id, summary=summary)
     return results
 
 
+@app.get("/api/v1/kb/summary/{search_id}")
+async def api_kb_summary(
+    request: Request,
+    search_id: int,
+    wait: float = 0
+):
+    """API: Fetch the AI summary for a search that returned rag_summary_pending"""
+    if not check_auth(request):
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    kb = get_kb_service()
+    wait = min(max(wait, 0), 20)
+    future = kb.pending_summary(search_id)
+    if future is not None and wait:
+        # Long-poll on the event loop rather than holding a run_blocking
+        # thread; shield keeps a timeout from cancelling the summary
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), wait)
+        except Exception:
+            pass  # still running or failed: get_summary reports which
+    return await run_blocking(kb.get_summary, search_id)
+
+
 @app.post("/api/v1/kb/feedback")
 async def api_kb_feedback(
     request: Request,
@@ -1451,7 +1553,8 @@ async def api_kb_feedback(
     kb = get_kb_service()
     session_id = request.cookies.get('session', 'anonymous')
 
-    result = kb.submit_feedback(
+    result = await run_blocking(
+        kb.submit_feedback,
         search_id=search_id,
         helpful=helpful,
         result_index=result_index,
@@ -1472,7 +1575,7 @@ async def api_kb_stats(
         raise HTTPException(status_code=401, detail="Not authenticated")
 
     kb = get_kb_service()
-    stats = kb.get_stats(days=days)
+    stats = await run_blocking(kb.get_stats, days=days)
 
     return stats
 
@@ -2180,6 +2283,7 @@ async def sales_intelligence_page(request: Request):
 
 
 @app.get("/api/v1/rag/reports/sales-pipeline")
+@cached_report("reports/sales-pipeline")
 async def api_sales_pipeline_report(
     request: Request,
     min_score: int = 5,
@@ -2195,7 +2299,8 @@ async def api_sales_pipeline_report(
         db = get_db()
         employee_filter = get_employee_filter(request)
 
-        data = db.get_sales_pipeline_data(
+        data = await run_blocking(
+            db.get_sales_pipeline_data,
             min_score=min_score,
             date_range=date_range,
             start_date=start_date,
@@ -2252,7 +2357,7 @@ Based on this data, provide:
 Use the actual customer names, dates, and scores from the data."""
 
         service = get_query_service()
-        result = service.query(prompt, force_system="gemini")
+        result = await run_llm(service.query, prompt, force_system="gemini", use_cache=False)
 
         return {
             "report": "sales_pipeline",
@@ -2266,6 +2371,7 @@ Use the actual customer names, dates, and scores from the data."""
 
 
 @app.get("/api/v1/rag/reports/competitor-intelligence")
+@cached_report("reports/competitor-intelligence")
 async def api_competitor_intelligence_report(
     request: Request,
     competitor: str = None,
@@ -2281,7 +2387,8 @@ async def api_competitor_intelligence_report(
         db = get_db()
         employee_filter = get_employee_filter(request)
 
-        data = db.get_competitor_intelligence_data(
+        data = await run_blocking(
+            db.get_competitor_intelligence_data,
             competitor=competitor,
             date_range=date_range,
             start_date=start_date,
@@ -2337,7 +2444,7 @@ Based on this data, provide:
 Use the actual company names and dates from the data."""
 
         service = get_query_service()
-        result = service.query(prompt, force_system="gemini")
+        result = await run_llm(service.query, prompt, force_system="gemini", use_cache=False)
 
         return {
             "report": "competitor_intelligence",
@@ -2367,7 +2474,8 @@ async def api_compliance_risk_report(
         db = get_db()
         employee_filter = get_employee_filter(request)
 
-        data = db.get_compliance_risk_data(
+        data = await run_blocking(
+            db.get_compliance_risk_data,
             max_score=max_score,
             risk_level=risk_level,
             date_range=date_range,
@@ -2431,7 +2539,7 @@ Based on this data, provide:
 Use the actual agent names, dates, and scores from the data."""
 
         service = get_query_service()
-        result = service.query(prompt, force_system="gemini")
+        result = await run_llm(service.query, prompt, force_system="gemini", use_cache=False)
 
         return {
             "report": "compliance_risk",
@@ -2460,7 +2568,8 @@ async def api_urgency_queue_report(
         db = get_db()
         employee_filter = get_employee_filter(request)
 
-        data = db.get_urgency_queue_data(
+        data = await run_blocking(
+            db.get_urgency_queue_data,
             min_score=min_score,
             date_range=date_range,
             start_date=start_date,
@@ -2519,7 +2628,7 @@ Based on this data, provide:
 Use the actual customer names, dates, and scores from the data."""
 
         service = get_query_service()
-        result = service.query(prompt, force_system="gemini")
+        result = await run_llm(service.query, prompt, force_system="gemini", use_cache=False)
 
         return {
             "report": "urgency_queue",
@@ -2549,7 +2658,8 @@ async def api_key_quotes_report(
         db = get_db()
         employee_filter = get_employee_filter(request)
 
-        data = db.get_key_quotes_data(
+        data = await run_blocking(
+            db.get_key_quotes_data,
             search_term=search,
             quote_type=quote_type,
             date_range=date_range,
@@ -2603,7 +2713,7 @@ Based on this data, provide:
 Preserve the exact wording of quotes - they are verbatim from customers."""
 
         service = get_query_service()
-        result = service.query(prompt, force_system="gemini")
+        result = await run_llm(service.query, prompt, force_system="gemini", use_cache=False)
 
         return {
             "report": "key_quotes",
@@ -2634,7 +2744,8 @@ async def api_qa_training_report(
         db = get_db()
         employee_filter = get_employee_filter(request)
 
-        data = db.get_qa_training_data(
+        data = await run_blocking(
+            db.get_qa_training_data,
             category=category,
             quality=quality,
             faq_only=faq_only,
@@ -2698,7 +2809,7 @@ Based on this data, provide:
 Focus on actionable insights for improving documentation and training."""
 
         service = get_query_service()
-        result = service.query(prompt, force_system="gemini")
+        result = await run_llm(service.query, prompt, force_system="gemini", use_cache=False)
 
         return {
             "report": "qa_training",
@@ -3133,7 +3244,8 @@ async def api_sales_call_analysis(
         config = get_config_instance()
         client = genai.Client(api_key=config.gemini_api_key)
 
-        response = client.models.generate_content(
+        response = await run_llm(
+            client.models.generate_content,
             model="gemini-2.0-flash",
             contents=f"{HORMOZI_ANALYSIS_PROMPT}\n\n{call_context}",
             config=types.GenerateContentConfig(
@@ -3453,7 +3565,8 @@ Format your response as JSON:
 }}
 """
 
-        response = client.models.generate_content(
+        response = await run_llm(
+            client.models.generate_content,
             model="gemini-2.0-flash",
             contents=prompt,
             config=types.GenerateContentConfig(
@@ -3533,7 +3646,8 @@ Format as JSON:
 }}
 """
 
-        response = client.models.generate_content(
+        response = await run_llm(
+            client.models.generate_content,
             model="gemini-2.0-flash",
             contents=prompt,
             config=types.GenerateContentConfig(
@@ -3666,7 +3780,8 @@ async def api_dashboard_metrics(
 
     try:
         service = get_metrics_service()
-        metrics = service.get_combined_metrics(
+        metrics = await run_blocking(
+            service.get_combined_metrics,
             employee_name=target_employee,
             period=period,
             start_date=start_date,
@@ -3685,6 +3800,7 @@ async def api_dashboard_metrics(
 
 
 @app.get("/api/v1/dashboard/admin/team")
+@cached_report("dashboard/admin/team")
 async def api_admin_team_metrics(
     request: Request,
     period: str = "today",
@@ -3705,7 +3821,7 @@ async def api_admin_team_metrics(
 
     try:
         service = get_metrics_service()
-        team_metrics = service.get_team_metrics(period=period, min_activity=min_activity)
+        team_metrics = await run_blocking(service.get_team_metrics, period=period, min_activity=min_activity)
 
         # Calculate team totals
         team_totals = {
@@ -3762,7 +3878,7 @@ async def api_export_team_metrics(
 
     try:
         service = get_metrics_service()
-        team_metrics = service.get_team_metrics(period=period)
+        team_metrics = await run_blocking(service.get_team_metrics, period=period)
 
         # Generate CSV
         import csv
@@ -4011,7 +4127,7 @@ async def api_list_triggers(
 
     try:
         service = get_trigger_service()
-        triggers = service.list_triggers(active_only=active_only)
+        triggers = await run_blocking(service.list_triggers, active_only=active_only)
 
         # Convert datetime objects to strings for JSON serialization
         for t in triggers:
@@ -4040,7 +4156,7 @@ async def api_create_trigger(request: Request):
         user = get_current_user(request)
 
         service = get_trigger_service()
-        trigger_id = service.create_trigger(body, created_by=user.get('username'))
+        trigger_id = await run_blocking(service.create_trigger, body, created_by=user.get('username'))
 
         return {
             "success": True,
@@ -4064,7 +4180,7 @@ async def api_get_trigger(request: Request, trigger_id: int):
 
     try:
         service = get_trigger_service()
-        trigger = service.get_trigger(trigger_id)
+        trigger = await run_blocking(service.get_trigger, trigger_id)
 
         if not trigger:
             raise HTTPException(status_code=404, detail="Trigger not found")
@@ -4095,7 +4211,7 @@ async def api_update_trigger(request: Request, trigger_id: int):
     try:
         body = await request.json()
         service = get_trigger_service()
-        success = service.update_trigger(trigger_id, body)
+        success = await run_blocking(service.update_trigger, trigger_id, body)
 
         if not success:
             raise HTTPException(status_code=404, detail="Trigger not found or no changes made")
@@ -4120,7 +4236,7 @@ async def api_delete_trigger(request: Request, trigger_id: int):
 
     try:
         service = get_trigger_service()
-        success = service.delete_trigger(trigger_id)
+        success = await run_blocking(service.delete_trigger, trigger_id)
 
         if not success:
             raise HTTPException(status_code=404, detail="Trigger not found")
@@ -4154,43 +4270,47 @@ async def api_test_trigger(
         trigger_service = get_trigger_service()
         metrics_service = get_metrics_service()
 
-        trigger = trigger_service.get_trigger(trigger_id)
+        trigger = await run_blocking(trigger_service.get_trigger, trigger_id)
         if not trigger:
             raise HTTPException(status_code=404, detail="Trigger not found")
 
-        # Get employees to test
-        if employee:
-            employees = [employee]
-        elif trigger.get('applies_to') == 'specific_users' and trigger.get('target_employees'):
-            employees = trigger['target_employees']
-        else:
-            # Get first 5 active employees for testing
-            team = metrics_service.get_team_metrics(period='today')
-            employees = [m['employee_name'] for m in team[:5]]
-
-        results = []
-        for emp in employees:
-            metrics = metrics_service.get_combined_metrics(emp, 'today')
-            evaluation = trigger_service.evaluate_trigger(trigger, emp, metrics)
-            recipients = trigger_service._get_recipients(trigger, emp)
-
-            results.append({
-                'employee': emp,
-                'would_fire': evaluation['should_fire'],
-                'reason': evaluation.get('reason', ''),
-                'recipients': recipients,
-                'metrics_summary': {
-                    'answer_rate': metrics.get('calls', {}).get('answer_rate', 0),
-                    'quality_score': metrics.get('quality', {}).get('avg_quality_score', 0),
-                    'productivity_score': metrics.get('productivity', {}).get('score', 0)
-                }
-            })
+        def test_employees() -> List[Dict[str, Any]]:
+            # Get employees to test
+            if employee:
+                employees = [employee]
+            elif trigger.get('applies_to') == 'specific_users' and trigger.get('target_employees'):
+                employees = trigger['target_employees']
+            else:
+                # Get first 5 active employees for testing
+                team = metrics_service.get_team_metrics(period='today')
+                employees = [m['employee_name'] for m in team[:5]]
+
+            results = []
+            for emp in employees:
+                metrics = metrics_service.get_combined_metrics(emp, 'today')
+                evaluation = trigger_service.evaluate_trigger(trigger, emp, metrics)
+                recipients = trigger_service._get_recipients(trigger, emp)
+
+                results.append({
+                    'employee': emp,
+                    'would_fire': evaluation['should_fire'],
+                    'reason': evaluation.get('reason', ''),
+                    'recipients': recipients,
+                    'metrics_summary': {
+                        'answer_rate': metrics.get('calls', {}).get('answer_rate', 0),
+                        'quality_score': metrics.get('quality', {}).get('avg_quality_score', 0),
+                        'productivity_score': metrics.get('productivity', {}).get('score', 0)
+                    }
+                })
+            return results
+
+        results = await run_blocking(test_employees)
 
         return {
             "success": True,
             "trigger_name": trigger.get('name'),
             "test_results": results,
-            "message": f"Tested against {len(employees)} employees"
+            "message": f"Tested against {len(results)} employees"
         }
 
     except HTTPException:
@@ -4216,7 +4336,8 @@ async def api_trigger_history(
 
     try:
         service = get_trigger_service()
-        history = service.get_trigger_history(
+        history = await run_blocking(
+            service.get_trigger_history,
             trigger_id=trigger_id,
             employee_name=employee,
             limit=limit
@@ -4247,14 +4368,14 @@ async def learning_module_page(request: Request):
     try:
         db = get_db()
         # Original learning stats
-        stats = db.get_learning_module_stats()
-        recent_sessions = db.get_video_meetings(limit=15)
-        attention_needed = db.get_learning_attention_needed(limit=10)
+        stats = await run_blocking(db.get_learning_module_stats)
+        recent_sessions = await run_blocking(db.get_video_meetings, limit=15)
+        attention_needed = await run_blocking(db.get_learning_attention_needed, limit=10)
 
         # New coaching data - combines calls + video meetings
-        coaching_stats = db.get_coaching_summary_stats()
-        coaching_feed = db.get_coaching_feed(limit=30)
-        coaching_queue = db.get_coaching_queue(limit=15)
+        coaching_stats = await run_blocking(db.get_coaching_summary_stats)
+        coaching_feed = await run_blocking(db.get_coaching_feed, limit=30)
+        coaching_queue = await run_blocking(db.get_coaching_queue, limit=15)
 
         return templates.TemplateResponse("learning_module.html", {
             "request": request,
@@ -4288,8 +4409,8 @@ async def video_meetings_page(request: Request):
 
     try:
         db = get_db()
-        stats = db.get_video_meeting_stats()
-        meetings = db.get_video_meetings(limit=20)
+        stats = await run_blocking(db.get_video_meeting_stats)
+        meetings = await run_blocking(db.get_video_meetings, limit=20)
 
         return templates.TemplateResponse("video_meetings.html", {
             "request": request,
@@ -4316,7 +4437,7 @@ async def video_meeting_detail_page(request: Request, meeting_id: int):
 
     try:
         db = get_db()
-        meeting = db.get_video_meeting_detail(meeting_id)
+        meeting = await run_blocking(db.get_video_meeting_detail, meeting_id)
 
         if not meeting:
             raise HTTPException(status_code=404, detail="Meeting not found")
@@ -4351,7 +4472,8 @@ async def api_video_meetings(
 
     try:
         db = get_db()
-        result = db.get_video_meetings(
+        result = await run_blocking(
+            db.get_video_meetings,
             limit=limit,
             offset=offset,
             meeting_type=meeting_type,
@@ -4383,7 +4505,7 @@ async def api_video_meeting_stats(request: Request):
 
     try:
         db = get_db()
-        stats = db.get_video_meeting_stats()
+        stats = await run_blocking(db.get_video_meeting_stats)
         return {"success": True, "data": stats}
 
     except Exception as e:
@@ -4399,7 +4521,7 @@ async def api_video_meeting_detail(request: Request, meeting_id: int):
 
     try:
         db = get_db()
-        meeting = db.get_video_meeting_detail(meeting_id)
+        meeting = await run_blocking(db.get_video_meeting_detail, meeting_id)
 
         if not meeting:
             raise HTTPException(status_code=404, detail="Meeting not found")
@@ -4432,7 +4554,8 @@ async def api_training_report(
 
     try:
         db = get_db()
-        report = db.get_video_training_report(
+        report = await run_blocking(
+            db.get_video_training_report,
             trainer=trainer,
             date_range=date_range,
             start_date=start_date,
@@ -4493,7 +4616,8 @@ async def api_coaching_feed(
 
     try:
         db = get_db()
-        feed = db.get_coaching_feed(
+        feed = await run_blocking(
+            db.get_coaching_feed,
             employee_name=employee,
             limit=limit,
             include_calls=include_calls,
@@ -4518,8 +4642,8 @@ async def api_employee_coaching(
 
     try:
         db = get_db()
-        progress = db.get_employee_coaching_progress(employee_name, period)
-        coaching_feed = db.get_coaching_feed(employee_name=employee_name, limit=20)
+        progress = await run_blocking(db.get_employee_coaching_progress, employee_name, period)
+        coaching_feed = await run_blocking(db.get_coaching_feed, employee_name=employee_name, limit=20)
 
         return {
             "success": True,
@@ -4540,7 +4664,7 @@ async def api_coaching_queue(request: Request, limit: int = 20):
 
     try:
         db = get_db()
-        queue = db.get_coaching_queue(limit=limit)
+        queue = await run_blocking(db.get_coaching_queue, limit=limit)
         return {"success": True, "data": queue, "count": len(queue)}
 
     except Exception as e:
@@ -4556,7 +4680,7 @@ async def api_coaching_stats(request: Request):
 
     try:
         db = get_db()
-        stats = db.get_coaching_summary_stats()
+        stats = await run_blocking(db.get_coaching_summary_stats)
         return {"success": True, "data": stats}
 
     except Exception as e:
@@ -19,6 +19,7 @@ from datetime import date
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from rag_integration.services.dashboard_metrics import DashboardMetricsService
+from rag_integration.services.employee_aliases import sync_employee_aliases
 
 # Configure logging
 logging.basicConfig(
@@ -53,6 +54,13 @@ def aggregate_metrics(target_date: date = None) -> dict:
     try:
         logger.info(f"Aggregating daily metrics for {target_date}")
 
+        # Map names from calls logged since the last alias sync, so the
+        # set-based metric queries attribute them to the right employee
+        try:
+            sync_employee_aliases(service.db_url)
+        except Exception as e:
+            logger.warning(f"Employee alias sync failed, using existing aliases: {e}")
+
         # Aggregate daily metrics for all employees
         employee_count = service.aggregate_daily_metrics(target_date)
         stats['employees_processed'] = employee_count
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Compute Conversation Dynamics Job
+
+Computes talk/listen time, silence, interruptions and monologues from the
+diarized segments of every transcript not yet analyzed, in one batched
+pass over the backlog. Cheap enough to run after each transcription batch.
+
+Usage:
+    python -m rag_integration.jobs.compute_conversation_dynamics [--refresh] [--limit N]
+"""
+
+import os
+import sys
+import time
+import argparse
+import logging
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from rag_integration.services.conversation_dynamics import (
+    DYNAMICS_BATCH_SIZE,
+    compute_conversation_dynamics
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compute conversation dynamics from diarized transcripts'
+    )
+    parser.add_argument(
+        '--refresh', action='store_true',
+        help='Re-analyze transcripts that already have dynamics (after changing thresholds)'
+    )
+    parser.add_argument(
+        '--batch-size', type=int, default=DYNAMICS_BATCH_SIZE,
+        help=f'Transcripts per read/write batch (default: {DYNAMICS_BATCH_SIZE})'
+    )
+    parser.add_argument(
+        '--limit', type=int,
+        help='Stop after this many transcripts'
+    )
+
+    args = parser.parse_args()
+
+    started = time.time()
+    try:
+        stats = compute_conversation_dynamics(
+            refresh=args.refresh, batch_size=args.batch_size, limit=args.limit
+        )
+    except Exception as e:
+        logger.error(f"Conversation dynamics failed: {e}")
+        sys.exit(1)
+
+    elapsed = time.time() - started
+    print(f"Transcripts scanned: {stats['scanned']} in {elapsed:.1f}s")
+    print(f"  Diarized: {stats['diarized']}")
+    print(f"  No speaker labels: {stats['not_diarized']}")
+
+
+if __name__ == '__main__':
+    main()
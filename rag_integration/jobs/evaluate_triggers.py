@@ -16,12 +16,17 @@ import sys
 import argparse
 import logging
 from datetime import datetime
+from typing import Dict, List
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from rag_integration.services.dashboard_triggers import DashboardTriggerService
 from rag_integration.services.dashboard_metrics import DashboardMetricsService
+from rag_integration.config.employee_names import (
+    canonicalize_employee_name,
+    get_canonical_employee_list
+)
 
 # Configure logging
 logging.basicConfig(
@@ -31,10 +36,41 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def build_metrics_snapshot(metrics_service: DashboardMetricsService,
+                           triggers: List[dict]) -> Dict[str, dict]:
+    """
+    Compute today's metrics for every employee any trigger applies to,
+    with one set-based metrics query.
+
+    Returns:
+        Employee name -> metrics, keyed by canonical names and by the
+        names listed in specific_users triggers
+    """
+    targets = set()
+    for trigger in triggers:
+        if trigger.get('applies_to') == 'specific_users' and trigger.get('target_employees'):
+            targets.update(trigger['target_employees'])
+
+    canonical = {name: canonicalize_employee_name(name) or name for name in targets}
+    employees = list(dict.fromkeys(get_canonical_employee_list() + list(canonical.values())))
+
+    snapshot = metrics_service.get_metrics_by_employee('today', employees=employees)
+    for name, canonical_name in canonical.items():
+        if name not in snapshot:
+            snapshot[name] = dict(snapshot[canonical_name], employee_name=name)
+
+    return snapshot
+
+
 def evaluate_triggers(frequency: str = 'daily') -> dict:
     """
     Evaluate all triggers of a given frequency.
 
+    Metrics for the whole team are computed once per run and each trigger
+    is evaluated against that snapshot in memory. Cooldowns are read in one
+    query and saved as each trigger fires; the trigger log is written in one
+    batch at the end.
+
     Args:
         frequency: 'realtime', 'hourly', 'daily', or 'weekly'
 
@@ -53,12 +89,26 @@ def evaluate_triggers(frequency: str = 'daily') -> dict:
         'details': []
     }
 
+    log_entries = []
+
     try:
         # Get active triggers matching the frequency
         all_triggers = trigger_service.list_triggers(active_only=True)
         triggers = [t for t in all_triggers if t.get('frequency') == frequency]
 
         logger.info(f"Found {len(triggers)} active {frequency} triggers")
+        if not triggers:
+            return stats
+
+        snapshot = build_metrics_snapshot(metrics_service, triggers)
+        can_fire = trigger_service.get_cooldown_status([t['id'] for t in triggers])
+
+        # Active employees, in the order get_team_metrics used to return them
+        team = sorted(
+            get_canonical_employee_list(),
+            key=lambda emp: snapshot[emp]['productivity']['score'],
+            reverse=True
+        )
 
         for trigger in triggers:
             stats['triggers_evaluated'] += 1
@@ -66,53 +116,56 @@ def evaluate_triggers(frequency: str = 'daily') -> dict:
             trigger_name = trigger.get('name', f'Trigger {trigger_id}')
 
             try:
+                # Cooldown is per trigger: once it fires for one employee it
+                # rests for cooldown_minutes
+                if not can_fire.get(trigger_id, True):
+                    logger.debug(f"Trigger {trigger_id} in cooldown")
+                    continue
+
                 # Get employees to evaluate
                 if trigger.get('applies_to') == 'specific_users' and trigger.get('target_employees'):
                     employees = trigger['target_employees']
                 else:
-                    # Get all active employees
-                    team = metrics_service.get_team_metrics(period='today', min_activity=0)
-                    employees = [m['employee_name'] for m in team]
+                    employees = team
 
                 logger.info(f"Evaluating trigger '{trigger_name}' for {len(employees)} employees")
 
+                evaluations = trigger_service.evaluate_trigger_batch(
+                    trigger, {employee: snapshot[employee] for employee in employees}
+                )
+
                 for employee in employees:
-                    # Check cooldown
-                    if not trigger_service.check_cooldown(trigger_id):
-                        logger.debug(f"Trigger {trigger_id} in cooldown for {employee}")
+                    evaluation = evaluations[employee]
+                    if not evaluation['should_fire']:
                         continue
 
-                    # Get metrics
-                    metrics = metrics_service.get_combined_metrics(employee, 'today')
-
-                    # Evaluate trigger
-                    evaluation = trigger_service.evaluate_trigger(trigger, employee, metrics)
-
-                    if evaluation['should_fire']:
-                        logger.info(f"Trigger '{trigger_name}' fired for {employee}: {evaluation['reason']}")
-
-                        # Fire the trigger
-                        result = trigger_service.fire_trigger(
-                            trigger, employee, evaluation, metrics
+                    logger.info(f"Trigger '{trigger_name}' fired for {employee}: {evaluation['reason']}")
+
+                    # Fire the trigger (cooldown saved now, logged in one batch below)
+                    result = trigger_service.fire_trigger(
+                        trigger, employee, evaluation, snapshot[employee], record=False
+                    )
+
+                    if result['success']:
+                        log_entries.append(result['log_entry'])
+                        stats['triggers_fired'] += 1
+                        if result['email_sent']:
+                            stats['emails_sent'] += 1
+
+                        stats['details'].append({
+                            'trigger': trigger_name,
+                            'employee': employee,
+                            'reason': evaluation['reason'],
+                            'email_sent': result['email_sent'],
+                            'recipients': result['recipients']
+                        })
+                        can_fire[trigger_id] = False
+                        break
+                    else:
+                        stats['errors'].append(
+                            f"Failed to fire trigger {trigger_name} for {employee}: {result.get('error')}"
                         )
 
-                        if result['success']:
-                            stats['triggers_fired'] += 1
-                            if result['email_sent']:
-                                stats['emails_sent'] += 1
-
-                            stats['details'].append({
-                                'trigger': trigger_name,
-                                'employee': employee,
-                                'reason': evaluation['reason'],
-                                'email_sent': result['email_sent'],
-                                'recipients': result['recipients']
-                            })
-                        else:
-                            stats['errors'].append(
-                                f"Failed to fire trigger {trigger_name} for {employee}: {result.get('error')}"
-                            )
-
             except Exception as e:
                 error_msg = f"Error evaluating trigger {trigger_name}: {str(e)}"
                 logger.error(error_msg)
@@ -123,6 +176,15 @@ def evaluate_triggers(frequency: str = 'daily') -> dict:
         logger.error(error_msg)
         stats['errors'].append(error_msg)
 
+    finally:
+        if log_entries:
+            try:
+                trigger_service.record_trigger_executions(log_entries)
+            except Exception as e:
+                error_msg = f"Error recording trigger executions: {str(e)}"
+                logger.error(error_msg)
+                stats['errors'].append(error_msg)
+
     logger.info(f"Evaluation complete: {stats['triggers_fired']} triggers fired, "
                 f"{stats['emails_sent']} emails sent")
 
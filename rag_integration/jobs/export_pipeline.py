@@ -12,14 +12,20 @@ import json
 sys.path.insert(0, '/var/www/call-recording-system')
 
 from rag_integration.services.db_reader import DatabaseReader
-from rag_integration.services.jsonl_formatter import JSONLFormatter, JSONLWriter
-from rag_integration.services.gcs_uploader import GCSUploader
+from rag_integration.services.jsonl_formatter import (
+    JSONLFormatter, JSONLWriter, JSONLShardWriter, RAG_EXPORT_COMPRESS, RAG_EXPORT_SHARD_DOCS
+)
+from rag_integration.services.gcs_uploader import get_uploader, ParallelUploader
 from rag_integration.services.gemini_file_search import GeminiFileSearchService
 from rag_integration.services.vertex_rag import VertexRAGService
+from rag_integration.services.answer_cache import invalidate_answer_cache
 from rag_integration.config.settings import get_config
 
 logger = logging.getLogger(__name__)
 
+# Rows per keyset page when streaming calls out of the database
+EXPORT_PAGE_SIZE = int(os.getenv("RAG_EXPORT_PAGE_SIZE", "5000"))
+
 
 class ExportPipeline:
     """Orchestrates export from PostgreSQL to RAG systems."""
@@ -29,7 +35,7 @@ class ExportPipeline:
         self.db_reader = DatabaseReader()
         self.formatter = JSONLFormatter()
         self.writer = JSONLWriter(self.config.export_dir)
-        self.gcs = GCSUploader(self.config.gcs_bucket)
+        self.gcs = get_uploader(self.config.gcs_bucket)
 
         # Initialize RAG services (lazy)
         self._gemini = None
@@ -54,19 +60,27 @@ class ExportPipeline:
         self,
         since: Optional[datetime] = None,
         until: Optional[datetime] = None,
-        batch_size: int = 100,
+        batch_size: Optional[int] = None,
         skip_gcs: bool = False,
         skip_gemini: bool = False,
-        skip_vertex: bool = False
+        skip_vertex: bool = False,
+        compress: bool = RAG_EXPORT_COMPRESS
     ) -> Dict[str, Any]:
         """
         Run a full export pipeline.
 
+        Calls stream from the database through the formatter into
+        size-rotated JSONL shards; each finished shard starts uploading
+        while the next one is written.
+
         Args:
             since: Export calls since this date
             until: Export calls until this date
-            batch_size: Number of records per JSONL file
+            batch_size: Optional maximum records per JSONL shard (default
+                RAG_EXPORT_SHARD_DOCS; shards always rotate at RAG_EXPORT_SHARD_MB)
             skip_gcs: Skip GCS upload
+            compress: Write gzip-compressed shards (skips the Gemini import,
+                which needs plain JSONL)
             skip_gemini: Skip Gemini import
             skip_vertex: Skip Vertex AI import
 
@@ -85,10 +99,44 @@ class ExportPipeline:
         try:
             logger.info(f"Starting export pipeline (since={since}, batch_size={batch_size})")
 
-            # Step 1: Read from database
-            calls = list(self.db_reader.get_calls_for_export(since=since, until=until))
-            total = len(calls)
-            logger.info(f"Found {total} calls to export")
+            # Step 1-3: Stream from the database into JSONL shards, uploading
+            # each finished shard in the background
+            uploads = None if skip_gcs else ParallelUploader(self.gcs)
+
+            def on_shard(path: Path, documents: int):
+                results["files_created"].append(str(path))
+                if uploads:
+                    uploads.submit(path)
+
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            total = 0
+            try:
+                with JSONLShardWriter(
+                    self.config.export_dir, f"calls_{timestamp}",
+                    max_documents=batch_size or RAG_EXPORT_SHARD_DOCS, compress=compress,
+                    on_shard=on_shard
+                ) as writer:
+                    calls = self.db_reader.get_calls_for_export(
+                        since=since, until=until, stream=True, page_size=EXPORT_PAGE_SIZE
+                    )
+                    for call in calls:
+                        total += 1
+                        try:
+                            doc = self.formatter.format_call(call)
+                        except Exception as e:
+                            error_msg = f"Format error for {call.get('recording_id')}: {e}"
+                            logger.warning(error_msg)
+                            results["errors"].append(error_msg)
+                            continue
+                        writer.write(doc)
+                        results["calls_exported"] += 1
+            finally:
+                if uploads:
+                    gcs_uris, upload_errors = uploads.wait()
+                    results["gcs_uris"].extend(gcs_uris)
+                    results["errors"].extend(upload_errors)
+
+            logger.info(f"Found {total} calls to export, wrote {len(results['files_created'])} shards")
 
             if total == 0:
                 results["status"] = "success"
@@ -96,47 +144,11 @@ class ExportPipeline:
                 results["completed_at"] = datetime.now().isoformat()
                 return results
 
-            # Step 2: Format and write to JSONL
-            for i in range(0, total, batch_size):
-                batch = calls[i:i + batch_size]
-                documents = []
-
-                for call in batch:
-                    try:
-                        doc = self.formatter.format_call(call)
-                        documents.append(doc)
-                    except Exception as e:
-                        error_msg = f"Format error for {call.get('recording_id')}: {e}"
-                        logger.warning(error_msg)
-                        results["errors"].append(error_msg)
-
-                if documents:
-                    batch_num = (i // batch_size) + 1
-                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                    filename = f"calls_batch_{batch_num:04d}_{timestamp}.jsonl"
-
-                    filepath = self.writer.write_batch(documents, filename)
-                    results["files_created"].append(str(filepath))
-                    results["calls_exported"] += len(documents)
-
-                    logger.info(f"Wrote batch {batch_num}: {len(documents)} documents")
-
-            # Step 3: Upload to GCS
             if not skip_gcs:
-                logger.info("Uploading to GCS...")
-                for filepath in results["files_created"]:
-                    try:
-                        gcs_uri = self.gcs.upload_file(Path(filepath))
-                        results["gcs_uris"].append(gcs_uri)
-                    except Exception as e:
-                        error_msg = f"GCS upload error for {filepath}: {e}"
-                        logger.error(error_msg)
-                        results["errors"].append(error_msg)
-
                 results["gcs_upload"] = "success" if results["gcs_uris"] else "failed"
 
             # Step 4: Import to Gemini
-            if not skip_gemini and results.get("gcs_uris"):
+            if not skip_gemini and not compress and results.get("gcs_uris"):
                 logger.info("Importing to Gemini File Search...")
                 try:
                     for filepath in results["files_created"]:
@@ -162,6 +174,10 @@ class ExportPipeline:
                     results["errors"].append(error_msg)
                     results["vertex_import"] = "failed"
 
+            # Cached RAG answers predate the new documents
+            if "success" in (results.get("gemini_import"), results.get("vertex_import")):
+                invalidate_answer_cache()
+
             # Complete
             results["completed_at"] = datetime.now().isoformat()
             results["status"] = "success" if not results["errors"] else "partial"
@@ -205,7 +221,7 @@ class ExportPipeline:
 
             # Count exported files
             export_dir = Path(self.config.export_dir)
-            exported_files = list(export_dir.glob("*.jsonl"))
+            exported_files = list(export_dir.glob("*.jsonl")) + list(export_dir.glob("*.jsonl.gz"))
 
             return {
                 "status": "ready",
@@ -246,7 +262,7 @@ class ExportPipeline:
         cutoff = datetime.now() - timedelta(days=days)
         deleted = 0
 
-        for filepath in export_dir.glob("*.jsonl"):
+        for filepath in list(export_dir.glob("*.jsonl")) + list(export_dir.glob("*.jsonl.gz")):
             if datetime.fromtimestamp(filepath.stat().st_mtime) < cutoff:
                 try:
                     filepath.unlink()
@@ -289,7 +305,8 @@ if __name__ == "__main__":
     parser.add_argument('--incremental', type=int, metavar='DAYS', help='Run incremental export for N days')
     parser.add_argument('--status', action='store_true', help='Show pipeline status')
     parser.add_argument('--cleanup', type=int, metavar='DAYS', help='Clean up exports older than N days')
-    parser.add_argument('--batch-size', type=int, default=100, help='Batch size for export')
+    parser.add_argument('--batch-size', type=int, help='Max records per JSONL shard (default: size-based only)')
+    parser.add_argument('--compress', action='store_true', help='Write gzip-compressed shards')
     parser.add_argument('--skip-gcs', action='store_true', help='Skip GCS upload')
     parser.add_argument('--skip-gemini', action='store_true', help='Skip Gemini import')
     parser.add_argument('--skip-vertex', action='store_true', help='Skip Vertex AI import')
@@ -316,7 +333,8 @@ if __name__ == "__main__":
             batch_size=args.batch_size,
             skip_gcs=args.skip_gcs,
             skip_gemini=args.skip_gemini,
-            skip_vertex=args.skip_vertex
+            skip_vertex=args.skip_vertex,
+            compress=args.compress or RAG_EXPORT_COMPRESS
         )
         print(json.dumps(result, indent=2))
 
@@ -34,6 +34,8 @@ from google.cloud import storage
 from google.oauth2 import service_account
 import psycopg2
 
+from rag_integration.services.answer_cache import invalidate_answer_cache
+
 from dotenv import load_dotenv
 load_dotenv('/var/www/call-recording-system/.env')
 
@@ -441,6 +443,8 @@ class FreshdeskVertexImporter:
 
             import_result = self.import_to_rag(gcs_uris)
             result["import"] = import_result
+            if import_result["files_imported"]:
+                invalidate_answer_cache()
 
             # Update tracking
             records_count = len(self.get_freshdesk_data()) if not import_only else 0
@@ -5,10 +5,12 @@ RAG Sync Job - Automated export of analyzed calls to Vertex AI RAG system.
 This job runs every 60 minutes to:
 1. Find calls with all 5 layers of analysis complete
 2. Check which calls haven't been exported yet (using rag_exports table)
-3. Export new calls to JSONL format
+   and which exported calls changed since (content fingerprints)
+3. Export new and changed calls to JSONL format
 4. Upload JSONL files to Google Cloud Storage
 5. Import files into Vertex AI RAG corpus
 6. Track all exports in database to prevent duplicates
+7. Retire files whose documents have all been superseded
 
 Usage:
     python -m rag_integration.jobs.rag_sync_job [OPTIONS]
@@ -21,6 +23,8 @@ Options:
     --force-reexport    Re-export failed records
     --skip-vertex       Skip Vertex AI import (just GCS)
     --skip-gemini       Skip Gemini import
+    --no-refresh        Don't re-export calls whose content changed
+    --record-fingerprints  Fingerprint calls exported without one and exit
 """
 
 import os
@@ -38,16 +42,17 @@ import uuid
 # Add project to path
 sys.path.insert(0, '/var/www/call-recording-system')
 
-import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 from dotenv import load_dotenv
 
 from rag_integration.config.settings import get_config
-from rag_integration.services.db_reader import DatabaseReader
+from rag_integration.services.db_reader import DatabaseReader, FULL_CALL_SELECT, CONTENT_HASH_SQL
 from rag_integration.services.jsonl_formatter import JSONLFormatter, JSONLWriter
-from rag_integration.services.gcs_uploader import GCSUploader
+from rag_integration.services.gcs_uploader import get_uploader, ParallelUploader
 from rag_integration.services.vertex_rag import VertexRAGService
 from rag_integration.services.gemini_file_search import GeminiFileSearchService
+from rag_integration.services.answer_cache import invalidate_answer_cache
+from rag_integration.services.db_pool import pooled_connection
 
 load_dotenv()
 
@@ -73,10 +78,12 @@ class SyncResult:
     calls_exported: int = 0
     calls_skipped: int = 0
     calls_failed: int = 0
+    calls_refreshed: int = 0
     jsonl_files: List[str] = None
     gcs_uris: List[str] = None
     vertex_imported: bool = False
     gemini_imported: bool = False
+    files_retired: List[str] = None
     errors: List[str] = None
     status: str = "running"
 
@@ -85,6 +92,8 @@ class SyncResult:
             self.jsonl_files = []
         if self.gcs_uris is None:
             self.gcs_uris = []
+        if self.files_retired is None:
+            self.files_retired = []
         if self.errors is None:
             self.errors = []
 
@@ -97,10 +106,12 @@ class SyncResult:
             "calls_exported": self.calls_exported,
             "calls_skipped": self.calls_skipped,
             "calls_failed": self.calls_failed,
+            "calls_refreshed": self.calls_refreshed,
             "jsonl_files": self.jsonl_files,
             "gcs_uris": self.gcs_uris,
             "vertex_imported": self.vertex_imported,
             "gemini_imported": self.gemini_imported,
+            "files_retired": self.files_retired,
             "errors": self.errors,
             "status": self.status,
             "duration_seconds": (self.completed_at - self.started_at).total_seconds() if self.completed_at else None
@@ -118,12 +129,9 @@ class RAGExportTracker:
 
     @contextmanager
     def get_connection(self):
-        """Get a database connection."""
-        conn = psycopg2.connect(self.database_url)
-        try:
+        """Borrow a database connection from the shared pool."""
+        with pooled_connection(self.database_url) as conn:
             yield conn
-        finally:
-            conn.close()
 
     def get_pending_calls(self, limit: int = 100) -> List[Dict[str, Any]]:
         """
@@ -158,6 +166,55 @@ class RAGExportTracker:
                 cur.execute(query, (limit,))
                 return [dict(row) for row in cur.fetchall()]
 
+    def get_changed_calls(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Get exported calls whose content changed since they were exported.
+
+        Compares each exported call's current fingerprint with the one stored
+        at export (calls exported before fingerprints were recorded count as
+        changed). Rows carry refresh=True plus the stored exported_hash and
+        gcs_uri, which claim_exports and the file retirement use.
+        """
+        query = f"""
+            SELECT c.recording_id, c.call_date, c.employee_name, c.customer_name,
+                   re.content_hash AS exported_hash, re.gcs_uri
+            FROM ({FULL_CALL_SELECT}) c
+            INNER JOIN rag_exports re ON re.recording_id = c.recording_id
+            WHERE re.export_status = 'exported'
+              AND re.content_hash IS DISTINCT FROM {CONTENT_HASH_SQL}
+            ORDER BY re.gcs_uri, c.call_date DESC
+            LIMIT %s
+        """
+
+        with self.get_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(query, (limit,))
+                return [dict(row, refresh=True) for row in cur.fetchall()]
+
+    def get_file_siblings(self, gcs_uris: List[str], exclude: List[str]) -> List[Dict[str, Any]]:
+        """
+        Get the other exported calls sharing files with the given URIs.
+
+        Re-exporting them with the changed calls leaves the old files with
+        no current documents, so they can be removed from the corpus.
+        """
+        if not gcs_uris:
+            return []
+        query = """
+            SELECT recording_id, call_date, employee_name, customer_name,
+                   content_hash AS exported_hash, gcs_uri
+            FROM rag_exports
+            WHERE export_status = 'exported'
+              AND gcs_uri = ANY(%s)
+              AND NOT (recording_id = ANY(%s))
+            ORDER BY gcs_uri, batch_sequence
+        """
+
+        with self.get_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(query, (list(gcs_uris), list(exclude)))
+                return [dict(row, refresh=True) for row in cur.fetchall()]
+
     def mark_export_started(
         self,
         recording_id: str,
@@ -260,6 +317,199 @@ class RAGExportTracker:
             logger.error(f"Failed to mark export failed for {recording_id}: {e}")
             return False
 
+    def claim_exports(
+        self,
+        calls: List[Dict[str, Any]],
+        batch_id: str,
+        conn=None
+    ) -> List[str]:
+        """
+        Mark a batch of calls as being exported, in one statement per kind.
+
+        Creates or resets the tracking row of every call that is not
+        already exported (as mark_export_started does for one call). Calls
+        flagged refresh=True (from get_changed_calls / get_file_siblings)
+        are exported ones being re-sent; they are claimed only if their
+        stored fingerprint is still exported_hash, so two runs never
+        re-export the same change.
+
+        Args:
+            calls: Call rows with recording_id and optionally call_date,
+                employee_name, customer_name; batch_sequence is the position
+            batch_id: Sync batch ID
+            conn: Connection to use (default: a pooled one)
+
+        Returns:
+            Recording IDs claimed; the rest were already exported
+        """
+        rows = []
+        refresh_rows = []
+        seen = set()
+        for seq, call_info in enumerate(calls):
+            recording_id = call_info['recording_id']
+            if recording_id in seen:
+                continue
+            seen.add(recording_id)
+            if call_info.get('refresh'):
+                refresh_rows.append((recording_id, batch_id, seq, call_info.get('exported_hash')))
+                continue
+            call_date = call_info.get('call_date')
+            if call_date in ('None', 'null', ''):
+                call_date = None
+            rows.append((
+                recording_id, batch_id, seq, call_date,
+                call_info.get('employee_name'), call_info.get('customer_name')
+            ))
+
+        query = """
+            INSERT INTO rag_exports (
+                recording_id, export_status, batch_id, batch_sequence,
+                call_date, employee_name, customer_name,
+                layer1_complete, layer2_complete, layer3_complete,
+                layer4_complete, layer5_complete
+            ) VALUES %s
+            ON CONFLICT (recording_id) DO UPDATE SET
+                export_status = 'pending',
+                batch_id = EXCLUDED.batch_id,
+                batch_sequence = EXCLUDED.batch_sequence,
+                retry_count = rag_exports.retry_count + 1,
+                last_retry_at = CURRENT_TIMESTAMP,
+                error_message = NULL
+            WHERE rag_exports.export_status <> 'exported'
+            RETURNING recording_id
+        """
+        template = "(%s, 'pending', %s, %s, %s::date, %s, %s, TRUE, TRUE, TRUE, TRUE, TRUE)"
+        refresh_query = """
+            UPDATE rag_exports r SET
+                export_status = 'pending',
+                batch_id = v.batch_id,
+                batch_sequence = v.batch_sequence,
+                error_message = NULL
+            FROM (VALUES %s) AS v(recording_id, batch_id, batch_sequence, exported_hash)
+            WHERE r.recording_id = v.recording_id
+              AND r.export_status = 'exported'
+              AND r.content_hash IS NOT DISTINCT FROM v.exported_hash
+            RETURNING r.recording_id
+        """
+
+        claimed = []
+        with self._connection(conn) as conn:
+            with conn.cursor() as cur:
+                if rows:
+                    claimed += execute_values(cur, query, rows, template=template,
+                                              page_size=len(rows), fetch=True)
+                if refresh_rows:
+                    claimed += execute_values(cur, refresh_query, refresh_rows,
+                                              template="(%s, %s, %s::int, %s::text)",
+                                              page_size=len(refresh_rows), fetch=True)
+            conn.commit()
+        return [row[0] for row in claimed]
+
+    def record_export_outcomes(
+        self,
+        outcomes: Dict[str, Optional[str]],
+        jsonl_file: Optional[str] = None,
+        gcs_uri: Optional[str] = None,
+        content_hashes: Optional[Dict[str, str]] = None,
+        conn=None
+    ) -> bool:
+        """
+        Record the result of every call in a batch with one multi-row update.
+
+        Args:
+            outcomes: recording_id -> None when exported, or the error message
+            jsonl_file, gcs_uri: Where the exported calls were written
+            content_hashes: recording_id -> fingerprint of the exported content
+            conn: Connection to use (default: a pooled one)
+        """
+        if not outcomes:
+            return True
+
+        content_hashes = content_hashes or {}
+        rows = [
+            (recording_id, error[:1000] if error is not None else None, jsonl_file, gcs_uri,
+             content_hashes.get(recording_id))
+            for recording_id, error in outcomes.items()
+        ]
+        query = """
+            UPDATE rag_exports r SET
+                export_status = CASE WHEN v.error_message IS NULL THEN 'exported' ELSE 'failed' END,
+                exported_at = CASE WHEN v.error_message IS NULL THEN CURRENT_TIMESTAMP ELSE r.exported_at END,
+                jsonl_file = CASE WHEN v.error_message IS NULL THEN v.jsonl_file ELSE r.jsonl_file END,
+                gcs_uri = CASE WHEN v.error_message IS NULL THEN v.gcs_uri ELSE r.gcs_uri END,
+                vertex_imported = CASE WHEN v.error_message IS NULL THEN FALSE ELSE r.vertex_imported END,
+                gemini_imported = CASE WHEN v.error_message IS NULL THEN FALSE ELSE r.gemini_imported END,
+                last_retry_at = CASE WHEN v.error_message IS NULL THEN r.last_retry_at ELSE CURRENT_TIMESTAMP END,
+                content_hash = CASE WHEN v.error_message IS NULL THEN v.content_hash ELSE r.content_hash END,
+                error_message = v.error_message
+            FROM (VALUES %s) AS v(recording_id, error_message, jsonl_file, gcs_uri, content_hash)
+            WHERE r.recording_id = v.recording_id
+        """
+
+        try:
+            with self._connection(conn) as conn:
+                with conn.cursor() as cur:
+                    execute_values(cur, query, rows, template="(%s, %s::text, %s::text, %s::text, %s::text)",
+                                   page_size=len(rows))
+                conn.commit()
+                return True
+        except Exception as e:
+            logger.error(f"Failed to record export outcomes for {len(rows)} calls: {e}")
+            return False
+
+    def record_fingerprints(self) -> int:
+        """
+        Store the current fingerprint of exported calls that have none.
+
+        For calls exported before fingerprints were tracked: treats what is
+        in the corpus as current instead of re-exporting everything.
+
+        Returns:
+            Number of calls updated
+        """
+        query = f"""
+            UPDATE rag_exports re SET content_hash = {CONTENT_HASH_SQL}
+            FROM ({FULL_CALL_SELECT}) c
+            WHERE re.recording_id = c.recording_id
+              AND re.export_status = 'exported'
+              AND re.content_hash IS NULL
+        """
+
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(query)
+                updated = cur.rowcount
+            conn.commit()
+        return updated
+
+    def get_live_files(self) -> Tuple[set, set]:
+        """
+        Files still holding current documents.
+
+        Returns:
+            (file names referenced by a tracking row, batch IDs still being
+            exported - their files are not recorded yet)
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT DISTINCT gcs_uri, jsonl_file FROM rag_exports
+                    WHERE gcs_uri IS NOT NULL OR jsonl_file IS NOT NULL
+                """)
+                names = {Path(path).name for row in cur.fetchall() for path in row if path}
+                cur.execute("SELECT DISTINCT batch_id FROM rag_exports WHERE export_status = 'pending'")
+                active_batches = {row[0] for row in cur.fetchall() if row[0]}
+        return names, active_batches
+
+    @contextmanager
+    def _connection(self, conn=None):
+        """The given connection, or a pooled one."""
+        if conn is not None:
+            yield conn
+        else:
+            with self.get_connection() as pooled:
+                yield pooled
+
     def is_already_exported(self, recording_id: str) -> bool:
         """Check if a call has already been successfully exported."""
         query = """
@@ -297,34 +547,54 @@ class RAGExportTracker:
                 ready_row = cur.fetchone()
                 ready_count = ready_row['count'] if ready_row else 0
 
+                # Exported calls whose content changed since export
+                cur.execute(f"""
+                    SELECT COUNT(*) as count
+                    FROM ({FULL_CALL_SELECT}) c
+                    INNER JOIN rag_exports re ON re.recording_id = c.recording_id
+                    WHERE re.export_status = 'exported'
+                      AND re.content_hash IS DISTINCT FROM {CONTENT_HASH_SQL}
+                """)
+                changed_row = cur.fetchone()
+
                 return {
                     **dict(row),
-                    "ready_for_export": ready_count
+                    "ready_for_export": ready_count,
+                    "changed_since_export": changed_row['count'] if changed_row else 0
                 }
 
 
 class RAGSyncJob:
     """Main job that syncs analyzed calls to Vertex AI RAG."""
 
+    # All 5 layers of analysis (plus content fingerprint) for a set of calls
+    FULL_CALL_QUERY = f"""
+        SELECT c.*, {CONTENT_HASH_SQL} AS content_hash
+        FROM ({FULL_CALL_SELECT}
+            WHERE t.recording_id = ANY(%s)) c
+    """
+
     def __init__(
         self,
         batch_size: int = 100,
         max_batches: int = 10,
         skip_vertex: bool = False,
-        skip_gemini: bool = False
+        skip_gemini: bool = False,
+        refresh_changed: bool = True
     ):
         self.config = get_config()
         self.batch_size = batch_size
         self.max_batches = max_batches
         self.skip_vertex = skip_vertex
         self.skip_gemini = skip_gemini
+        self.refresh_changed = refresh_changed
 
         # Initialize services
         self.tracker = RAGExportTracker()
         self.db_reader = DatabaseReader()
         self.formatter = JSONLFormatter()
         self.writer = JSONLWriter(self.config.export_dir)
-        self.gcs = GCSUploader(self.config.gcs_bucket)
+        self.gcs = get_uploader(self.config.gcs_bucket)
 
         # Lazy initialize RAG services
         self._vertex = None
@@ -363,9 +633,26 @@ class RAGSyncJob:
 
         try:
             # Step 1: Get pending calls
-            pending_calls = self.tracker.get_pending_calls(limit=self.batch_size * self.max_batches)
+            capacity = self.batch_size * self.max_batches
+            pending_calls = self.tracker.get_pending_calls(limit=capacity)
             result.calls_found = len(pending_calls)
 
+            # Exported calls whose analysis changed since, plus the calls that
+            # share their files (so the superseded files can be retired)
+            if self.refresh_changed and len(pending_calls) < capacity:
+                changed_calls = self.tracker.get_changed_calls(limit=capacity - len(pending_calls))
+                siblings = self.tracker.get_file_siblings(
+                    sorted({c['gcs_uri'] for c in changed_calls if c.get('gcs_uri')}),
+                    [c['recording_id'] for c in changed_calls]
+                )
+                if changed_calls:
+                    logger.info(f"Found {len(changed_calls)} exported calls with changed content "
+                                f"({len(siblings)} more share their files)")
+                # Keep each old file's calls together so whole files are retired
+                refresh_calls = sorted(changed_calls + siblings, key=lambda c: c.get('gcs_uri') or '')
+                pending_calls.extend(refresh_calls)
+                result.calls_found += len(changed_calls)
+
             if force_reexport:
                 failed_calls = self.tracker.get_failed_exports(limit=50)
                 logger.info(f"Including {len(failed_calls)} failed exports for retry")
@@ -388,21 +675,36 @@ class RAGSyncJob:
                 result.completed_at = datetime.now()
                 return result
 
-            # Step 2: Process in batches
+            # Step 2: Process in batches; each batch's file uploads in the
+            # background while the next one is written
             batches_processed = 0
-            for batch_start in range(0, len(pending_calls), self.batch_size):
-                if batches_processed >= self.max_batches:
-                    logger.info(f"Reached max batches ({self.max_batches}), stopping")
-                    break
-
-                batch = pending_calls[batch_start:batch_start + self.batch_size]
-                batch_num = batches_processed + 1
-
-                logger.info(f"Processing batch {batch_num}/{min(self.max_batches, (len(pending_calls) + self.batch_size - 1) // self.batch_size)}: {len(batch)} calls")
-
-                batch_result = self._process_batch(batch, batch_id, batch_num)
-
+            batch_results = []
+            uploads = ParallelUploader(self.gcs)
+            try:
+                for batch_start in range(0, len(pending_calls), self.batch_size):
+                    if batches_processed >= self.max_batches:
+                        logger.info(f"Reached max batches ({self.max_batches}), stopping")
+                        break
+
+                    batch = pending_calls[batch_start:batch_start + self.batch_size]
+                    batch_num = batches_processed + 1
+
+                    logger.info(f"Processing batch {batch_num}/{min(self.max_batches, (len(pending_calls) + self.batch_size - 1) // self.batch_size)}: {len(batch)} calls")
+
+                    batch_results.append(self._process_batch(batch, batch_id, batch_num, uploads))
+                    batches_processed += 1
+            finally:
+                # Record outcomes once the uploads are done (claimed calls
+                # stay pending until then)
+                uploads.wait()
+                for batch_result in batch_results:
+                    self._finish_batch(batch_result)
+
+            # Refreshed calls' old file -> [(new GCS URI, new JSONL file)]
+            replaced: Dict[str, List[Tuple[str, str]]] = {}
+            for batch_result in batch_results:
                 result.calls_exported += batch_result['exported']
+                result.calls_refreshed += batch_result['refreshed']
                 result.calls_failed += batch_result['failed']
                 result.calls_skipped += batch_result['skipped']
                 if batch_result.get('jsonl_file'):
@@ -410,20 +712,35 @@ class RAGSyncJob:
                 if batch_result.get('gcs_uri'):
                     result.gcs_uris.append(batch_result['gcs_uri'])
                 result.errors.extend(batch_result.get('errors', []))
-
-                batches_processed += 1
+                for old_uri, new_files in batch_result['replaced'].items():
+                    replaced.setdefault(old_uri, []).extend(new_files)
 
             # Step 3: Import to RAG systems
             if result.gcs_uris:
+                vertex_uris = []
                 if not self.skip_vertex:
-                    result.vertex_imported = self._import_to_vertex(result.gcs_uris)
+                    vertex_uris = self._import_to_vertex(result.gcs_uris)
+                    result.vertex_imported = len(vertex_uris) == len(result.gcs_uris)
                 if not self.skip_gemini:
                     result.gemini_imported = self._import_to_gemini(result.jsonl_files)
+                # Cached RAG answers predate the new documents
+                if result.vertex_imported or result.gemini_imported:
+                    invalidate_answer_cache()
+
+                # Refreshed calls' old documents are now superseded; only drop
+                # them from a backend once their replacements are in it
+                if replaced:
+                    result.files_retired = self._retire_superseded_files(
+                        replaced,
+                        vertex_uris=set(vertex_uris),
+                        gemini_files=set(result.jsonl_files) if result.gemini_imported else set()
+                    )
 
             result.status = "success" if not result.errors else "partial"
             result.completed_at = datetime.now()
 
-            logger.info(f"Sync complete: {result.calls_exported} exported, {result.calls_failed} failed, {result.calls_skipped} skipped")
+            logger.info(f"Sync complete: {result.calls_exported} exported ({result.calls_refreshed} refreshed), "
+                        f"{result.calls_failed} failed, {result.calls_skipped} skipped")
 
         except Exception as e:
             logger.error(f"Sync job failed: {e}")
@@ -440,143 +757,154 @@ class RAGSyncJob:
         self,
         batch: List[Dict[str, Any]],
         batch_id: str,
-        batch_num: int
+        batch_num: int,
+        uploads: ParallelUploader
     ) -> Dict[str, Any]:
-        """Process a batch of calls."""
+        """
+        Claim, fetch and write a batch of calls, and submit its file for upload.
+
+        Outcomes are recorded by _finish_batch once the upload is done.
+        """
         result = {
             'exported': 0,
+            'refreshed': 0,
             'failed': 0,
             'skipped': 0,
             'errors': [],
             'jsonl_file': None,
-            'gcs_uri': None
+            'gcs_uri': None,
+            'replaced': {},
+            'upload': None,
+            'documents': [],
+            'outcomes': {},
+            'content_hashes': {},
+            'old_uris': {c['recording_id']: c.get('gcs_uri') for c in batch if c.get('refresh')},
         }
 
-        documents = []
-        recording_ids = []
-
-        for seq, call_info in enumerate(batch):
-            recording_id = call_info['recording_id']
+        documents = result['documents']
+        outcomes: Dict[str, Optional[str]] = result['outcomes']
+        content_hashes: Dict[str, str] = result['content_hashes']
 
+        with self.tracker.get_connection() as conn:
+            # Claim the batch (already-exported calls are not returned)
             try:
-                # Double-check not already exported
-                if self.tracker.is_already_exported(recording_id):
-                    result['skipped'] += 1
-                    continue
-
-                # Mark as being processed
-                self.tracker.mark_export_started(
-                    recording_id=recording_id,
-                    batch_id=batch_id,
-                    batch_sequence=seq,
-                    call_date=str(call_info.get('call_date', '')),
-                    employee_name=call_info.get('employee_name'),
-                    customer_name=call_info.get('customer_name')
-                )
-
-                # Get full call data
-                call_data = self._get_full_call_data(recording_id)
-                if not call_data:
-                    raise ValueError(f"Could not retrieve full data for {recording_id}")
-
-                # Format for JSONL
-                doc = self.formatter.format_call(call_data)
-                documents.append(doc)
-                recording_ids.append(recording_id)
-
+                claimed = self.tracker.claim_exports(batch, batch_id, conn=conn)
             except Exception as e:
-                error_msg = f"Error processing {recording_id}: {e}"
+                error_msg = f"Failed to claim batch {batch_num}: {e}"
                 logger.error(error_msg)
                 result['errors'].append(error_msg)
-                result['failed'] += 1
-                self.tracker.mark_export_failed(recording_id, str(e))
+                result['failed'] += len(batch)
+                return result
+            result['skipped'] = len({c['recording_id'] for c in batch}) - len(claimed)
 
-        # Write batch to JSONL
+            # Fetch full call data for the whole batch
+            try:
+                call_rows = self._get_full_call_data_bulk(claimed, conn)
+            except Exception as e:
+                call_rows = {}
+                logger.error(f"Failed to fetch call data for batch {batch_num}: {e}")
+                outcomes.update({recording_id: str(e) for recording_id in claimed})
+            finally:
+                # End the read's transaction; outcomes are recorded later on
+                # a connection of their own
+                conn.rollback()
+
+        if not outcomes:
+            for recording_id in claimed:
+                try:
+                    call_data = call_rows.get(recording_id)
+                    if not call_data:
+                        raise ValueError(f"Could not retrieve full data for {recording_id}")
+
+                    # Format for JSONL
+                    content_hashes[recording_id] = call_data['content_hash']
+                    documents.append((recording_id, self.formatter.format_call(call_data)))
+
+                except Exception as e:
+                    outcomes[recording_id] = str(e)
+
+        for recording_id, error in outcomes.items():
+            error_msg = f"Error processing {recording_id}: {error}"
+            logger.error(error_msg)
+            result['errors'].append(error_msg)
+            result['failed'] += 1
+
+        # Write batch to JSONL and upload it in the background
         if documents:
             try:
                 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
                 filename = f"rag_sync_{batch_id}_batch{batch_num:03d}_{timestamp}.jsonl"
-                filepath = self.writer.write_batch(documents, filename)
+                filepath = self.writer.write_batch([doc for _, doc in documents], filename)
                 result['jsonl_file'] = str(filepath)
 
                 logger.info(f"Wrote {len(documents)} documents to {filepath}")
 
-                # Upload to GCS
-                gcs_uri = self.gcs.upload_file(filepath)
+                result['upload'] = uploads.submit(filepath)
+            except Exception as e:
+                self._fail_documents(result, f"Failed to write batch: {e}")
+
+        return result
+
+    def _finish_batch(self, result: Dict[str, Any]):
+        """Take a batch's upload result and record every outcome of the batch."""
+        documents = result['documents']
+        outcomes = result['outcomes']
+
+        if result['upload'] is not None:
+            # ParallelUploader.wait() already logged a failed upload
+            error = result['upload'].exception()
+            if error is not None:
+                self._fail_documents(result, f"Failed to upload batch: {error}", log=False)
+            else:
+                gcs_uri = result['upload'].result()
                 result['gcs_uri'] = gcs_uri
                 logger.info(f"Uploaded to {gcs_uri}")
 
                 # Mark all as exported
-                for recording_id in recording_ids:
-                    self.tracker.mark_export_success(
-                        recording_id=recording_id,
-                        jsonl_file=str(filepath),
-                        gcs_uri=gcs_uri,
-                        vertex_imported=False,  # Will be updated after import
-                        gemini_imported=False
-                    )
-                    result['exported'] += 1
-
-            except Exception as e:
-                error_msg = f"Failed to write/upload batch: {e}"
-                logger.error(error_msg)
-                result['errors'].append(error_msg)
-                for recording_id in recording_ids:
-                    self.tracker.mark_export_failed(recording_id, str(e))
-                    result['failed'] += 1
+                old_uris = result['old_uris']
+                for recording_id, _ in documents:
+                    outcomes[recording_id] = None
+                    if recording_id in old_uris:
+                        result['refreshed'] += 1
+                        if old_uris[recording_id]:
+                            result['replaced'].setdefault(old_uris[recording_id], []).append(
+                                (gcs_uri, result['jsonl_file'])
+                            )
+                result['exported'] += len(documents)
+
+        # Record every outcome (vertex/gemini flags are set after import)
+        self.tracker.record_export_outcomes(
+            outcomes, jsonl_file=result['jsonl_file'], gcs_uri=result['gcs_uri'],
+            content_hashes=result['content_hashes']
+        )
 
-        return result
+    @staticmethod
+    def _fail_documents(result: Dict[str, Any], error_msg: str, log: bool = True):
+        """Mark every formatted document of a batch as failed."""
+        if log:
+            logger.error(error_msg)
+        result['errors'].append(error_msg)
+        for recording_id, _ in result['documents']:
+            result['outcomes'][recording_id] = error_msg
+        result['failed'] += len(result['documents'])
 
     def _get_full_call_data(self, recording_id: str) -> Optional[Dict[str, Any]]:
         """Get full call data with all 5 layers."""
-        query = """
-            SELECT
-                t.recording_id, t.call_date, t.call_time, t.duration_seconds,
-                t.direction, t.from_number, t.to_number,
-                t.customer_name, t.customer_company, t.customer_phone,
-                t.employee_name, t.employee_department, t.transcript_text,
-                t.word_count, t.confidence_score as transcript_confidence,
-
-                i.customer_sentiment, i.call_quality_score, i.customer_satisfaction_score,
-                i.call_type, i.issue_category, i.summary, i.key_topics,
-                i.churn_risk_score, i.coaching_notes, i.follow_up_needed,
-                i.escalation_required, i.first_call_resolution,
-                i.sentiment_reasoning, i.quality_reasoning, i.overall_call_rating,
-
-                cr.problem_complexity, cr.resolution_status, cr.resolution_details,
-                cr.resolution_effectiveness, cr.empathy_score, cr.empathy_demonstrated,
-                cr.active_listening_score, cr.employee_knowledge_level,
-                cr.confidence_in_solution, cr.training_needed,
-                cr.churn_risk as resolution_churn_risk, cr.revenue_impact,
-                cr.customer_effort_score, cr.first_contact_resolution, cr.closure_score,
-                cr.solution_summarized, cr.understanding_confirmed,
-                cr.asked_if_anything_else, cr.next_steps_provided,
-                cr.timeline_given, cr.contact_info_provided,
-                cr.thanked_customer, cr.confirmed_satisfaction,
-
-                rec.process_improvements, rec.employee_strengths,
-                rec.employee_improvements, rec.suggested_phrases,
-                rec.follow_up_actions, rec.knowledge_base_updates,
-                rec.escalation_required as rec_escalation_required,
-                rec.risk_level, rec.efficiency_score, rec.training_priority
-
-            FROM transcripts t
-            INNER JOIN insights i ON t.recording_id = i.recording_id
-            INNER JOIN call_resolutions cr ON t.recording_id = cr.recording_id
-            INNER JOIN call_recommendations rec ON t.recording_id = rec.recording_id
-            WHERE t.recording_id = %s
-        """
-
         with self.tracker.get_connection() as conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute(query, (recording_id,))
-                row = cur.fetchone()
-                return dict(row) if row else None
-
-    def _import_to_vertex(self, gcs_uris: List[str]) -> bool:
-        """Import GCS files to Vertex AI RAG corpus."""
+            return self._get_full_call_data_bulk([recording_id], conn).get(recording_id)
+
+    def _get_full_call_data_bulk(self, recording_ids: List[str], conn) -> Dict[str, Dict[str, Any]]:
+        """Full call data with all 5 layers for many calls, in one query."""
+        if not recording_ids:
+            return {}
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(self.FULL_CALL_QUERY, (list(recording_ids),))
+            return {row['recording_id']: dict(row) for row in cur.fetchall()}
+
+    def _import_to_vertex(self, gcs_uris: List[str]) -> List[str]:
+        """Import GCS files to Vertex AI RAG corpus; returns the URIs imported."""
         if not gcs_uris or self.skip_vertex:
-            return False
+            return []
 
         try:
             logger.info(f"Importing {len(gcs_uris)} files to Vertex AI RAG...")
@@ -584,21 +912,25 @@ class RAGSyncJob:
             # Initialize corpus if needed
             self.vertex.initialize_corpus()
 
+            imported = []
             for gcs_uri in gcs_uris:
                 result = self.vertex.import_from_gcs(gcs_uri)
                 if result.get('error'):
-                    logger.warning(f"Vertex import warning for {gcs_uri}: {result['error']}")
+                    logger.warning(f"Vertex import failed for {gcs_uri}: {result['error']}")
+                else:
+                    imported.append(gcs_uri)
 
-            logger.info("Vertex AI RAG import complete")
+            logger.info(f"Vertex AI RAG import complete: {len(imported)}/{len(gcs_uris)} files")
 
             # Update tracker to mark vertex_imported = True
-            self._update_vertex_imported(gcs_uris)
+            if imported:
+                self._update_vertex_imported(imported)
 
-            return True
+            return imported
 
         except Exception as e:
             logger.error(f"Vertex AI RAG import failed: {e}")
-            return False
+            return []
 
     def _import_to_gemini(self, jsonl_files: List[str]) -> bool:
         """Import JSONL files to Gemini."""
@@ -624,6 +956,78 @@ class RAGSyncJob:
             logger.error(f"Gemini import failed: {e}")
             return False
 
+    def _retire_superseded_files(
+        self,
+        replaced: Dict[str, List[Tuple[str, str]]],
+        vertex_uris: set,
+        gemini_files: set
+    ) -> List[str]:
+        """
+        Delete the old files of this run's refreshed calls that no longer
+        hold any current document.
+
+        Once every call in an earlier sync file has been re-exported, the
+        file only holds superseded copies; it is removed from the Vertex
+        corpus, Gemini and the bucket so searches stop returning them. A
+        backend only loses an old file once every replacement of its calls
+        was imported there, and the bucket keeps it until every enabled
+        backend has them.
+
+        Args:
+            replaced: Old GCS URI -> [(new GCS URI, new JSONL file)] of the
+                calls refreshed in this run
+            vertex_uris: New GCS URIs imported to the Vertex corpus
+            gemini_files: New JSONL files uploaded to Gemini
+
+        Returns:
+            Names of the files retired
+        """
+        live_files, active_batches = self.tracker.get_live_files()
+
+        from_vertex, from_gemini, from_gcs = set(), set(), set()
+        for old_uri, new_files in replaced.items():
+            name = Path(old_uri).name
+            if (not name.startswith('rag_sync_') or name in live_files
+                    or any(batch_id in name for batch_id in active_batches)):
+                continue
+            in_vertex = all(new_uri in vertex_uris for new_uri, _ in new_files)
+            in_gemini = all(new_file in gemini_files for _, new_file in new_files)
+            if in_vertex:
+                from_vertex.add(name)
+            if in_gemini:
+                from_gemini.add(name)
+            if (self.skip_vertex or in_vertex) and (self.skip_gemini or in_gemini):
+                from_gcs.add(name)
+
+        if not (from_vertex or from_gemini or from_gcs):
+            return []
+
+        retired = set()
+        try:
+            if from_vertex:
+                for rag_file in self.vertex.list_files_in_corpus():
+                    name = Path(rag_file['display_name'] or '').name
+                    if name in from_vertex and self.vertex.delete_file(rag_file['name']):
+                        retired.add(name)
+
+            if from_gemini:
+                for gemini_file in self.gemini.list_files():
+                    name = Path(gemini_file['display_name'] or '').name
+                    if name in from_gemini and self.gemini.delete_file(gemini_file['name']):
+                        retired.add(name)
+
+            if from_gcs:
+                for uri in self.gcs.list_files():
+                    name = Path(uri).name
+                    if name in from_gcs and self.gcs.delete_file(uri):
+                        retired.add(name)
+        except Exception as e:
+            logger.warning(f"Failed to retire superseded files: {e}")
+
+        if retired:
+            logger.info(f"Retired {len(retired)} superseded files")
+        return sorted(retired)
+
     def _update_vertex_imported(self, gcs_uris: List[str]):
         """Update tracker to mark calls as imported to Vertex."""
         query = """
@@ -697,7 +1101,8 @@ class RAGSyncJob:
                 "batch_size": self.batch_size,
                 "max_batches": self.max_batches,
                 "skip_vertex": self.skip_vertex,
-                "skip_gemini": self.skip_gemini
+                "skip_gemini": self.skip_gemini,
+                "refresh_changed": self.refresh_changed
             },
             "timestamp": datetime.now().isoformat()
         }
@@ -713,6 +1118,10 @@ def main():
     parser.add_argument('--force-reexport', action='store_true', help='Retry failed exports')
     parser.add_argument('--skip-vertex', action='store_true', help='Skip Vertex AI import')
     parser.add_argument('--skip-gemini', action='store_true', help='Skip Gemini import')
+    parser.add_argument('--no-refresh', action='store_true',
+                        help='Only export new calls, not exported calls whose content changed')
+    parser.add_argument('--record-fingerprints', action='store_true',
+                        help='Record fingerprints for calls exported without one (treat the corpus as current) and exit')
     parser.add_argument('--json', action='store_true', help='Output results as JSON')
 
     args = parser.parse_args()
@@ -721,9 +1130,15 @@ def main():
         batch_size=args.batch_size,
         max_batches=args.max_batches,
         skip_vertex=args.skip_vertex,
-        skip_gemini=args.skip_gemini
+        skip_gemini=args.skip_gemini,
+        refresh_changed=not args.no_refresh
     )
 
+    if args.record_fingerprints:
+        updated = job.tracker.record_fingerprints()
+        print(f"Recorded fingerprints for {updated} exported calls")
+        return
+
     if args.status:
         status = job.get_status()
         if args.json:
@@ -735,6 +1150,7 @@ def main():
             print(f"  Exported: {status['database']['exported']}")
             print(f"  Failed: {status['database']['failed']}")
             print(f"  Ready for export: {status['database']['ready_for_export']}")
+            print(f"  Changed since export: {status['database']['changed_since_export']}")
             print(f"  Vertex imported: {status['database']['vertex_imported']}")
             print(f"  Gemini imported: {status['database']['gemini_imported']}")
             print(f"\nGCS Bucket: {status['gcs']['bucket']}")
@@ -752,13 +1168,14 @@ def main():
         print(f"Batch ID: {result.batch_id}")
         print(f"Status: {result.status}")
         print(f"Calls found: {result.calls_found}")
-        print(f"Exported: {result.calls_exported}")
+        print(f"Exported: {result.calls_exported} ({result.calls_refreshed} refreshed)")
         print(f"Failed: {result.calls_failed}")
         print(f"Skipped: {result.calls_skipped}")
         print(f"JSONL files: {len(result.jsonl_files)}")
         print(f"GCS uploads: {len(result.gcs_uris)}")
         print(f"Vertex imported: {result.vertex_imported}")
         print(f"Gemini imported: {result.gemini_imported}")
+        print(f"Files retired: {len(result.files_retired)}")
         if result.errors:
             print(f"\nErrors ({len(result.errors)}):")
             for err in result.errors[:5]:
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Refresh Report Rollups Job
+
+Recomputes report_daily_rollups for every call_date queued in
+report_rollup_dirty_days (filled by triggers as layers land).
+Called by cron every 5 minutes and at the end of the layer pipelines.
+
+Usage:
+    python -m rag_integration.jobs.refresh_report_rollups [--rebuild] [--since YYYY-MM-DD]
+"""
+
+import os
+import sys
+import argparse
+import logging
+from datetime import date
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from rag_integration.services.report_rollups import ReportRollupService
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Refresh per-day report rollups'
+    )
+    parser.add_argument(
+        '--rebuild', action='store_true',
+        help='Mark all days (or --since onwards) dirty before refreshing'
+    )
+    parser.add_argument(
+        '--since', type=str, default=None,
+        help='With --rebuild, only rebuild days on/after this date (YYYY-MM-DD)'
+    )
+    parser.add_argument(
+        '--batch-days', type=int, default=31,
+        help='Days recomputed per transaction (default: 31)'
+    )
+
+    args = parser.parse_args()
+    service = ReportRollupService()
+
+    try:
+        if args.rebuild:
+            since = date.fromisoformat(args.since) if args.since else None
+            marked = service.mark_dirty(since=since)
+            logger.info(f"Marked {marked} days for rebuild")
+
+        days = service.refresh(batch_days=args.batch_days)
+        status = service.get_status()
+    except Exception as e:
+        logger.error(f"Rollup refresh failed: {e}")
+        sys.exit(1)
+
+    print("\n" + "="*50)
+    print("ROLLUP REFRESH COMPLETE")
+    print("="*50)
+    print(f"Days refreshed: {days}")
+    print(f"Days rolled up: {status['rolled_up_days']}")
+    print(f"Dirty days remaining: {status['dirty_days']}")
+    print(f"Last refreshed: {status['last_refreshed_at']}")
+
+
+if __name__ == '__main__':
+    main()
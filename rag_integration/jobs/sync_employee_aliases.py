@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Sync Employee Aliases Job
+
+Maps raw employee names that appeared since the last run to their
+canonical form in employee_name_aliases. Called by cron every 15
+minutes; aggregate_daily_metrics also syncs before aggregating.
+
+Usage:
+    python -m rag_integration.jobs.sync_employee_aliases [--refresh]
+"""
+
+import os
+import sys
+import argparse
+import logging
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from rag_integration.services.employee_aliases import sync_employee_aliases
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Sync canonical employee name aliases'
+    )
+    parser.add_argument(
+        '--refresh', action='store_true',
+        help='Re-canonicalize all known names (after editing employee_names.py)'
+    )
+
+    args = parser.parse_args()
+
+    try:
+        changed = sync_employee_aliases(refresh=args.refresh)
+    except Exception as e:
+        logger.error(f"Employee alias sync failed: {e}")
+        sys.exit(1)
+
+    print(f"Employee aliases inserted or changed: {changed}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Sync Search Documents Job
+
+Indexes every fully analyzed call in rag_search_documents (migration 012)
+for local hybrid retrieval: new calls, and calls whose analysis changed
+since they were indexed. Run after the RAG sync, or on its own schedule.
+
+Usage:
+    python -m rag_integration.jobs.sync_search_documents [--refresh] [--limit N]
+"""
+
+import os
+import sys
+import time
+import argparse
+import logging
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from rag_integration.services.hybrid_retriever import (
+    RAG_SEARCH_SYNC_BATCH_SIZE,
+    sync_search_documents
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Index analyzed calls for local hybrid retrieval'
+    )
+    parser.add_argument(
+        '--refresh', action='store_true',
+        help='Re-index calls that are already up to date (after changing the formatter)'
+    )
+    parser.add_argument(
+        '--batch-size', type=int, default=RAG_SEARCH_SYNC_BATCH_SIZE,
+        help=f'Calls per read/write batch (default: {RAG_SEARCH_SYNC_BATCH_SIZE})'
+    )
+    parser.add_argument(
+        '--limit', type=int,
+        help='Stop after this many calls'
+    )
+
+    args = parser.parse_args()
+
+    started = time.time()
+    try:
+        stats = sync_search_documents(
+            refresh=args.refresh, batch_size=args.batch_size, limit=args.limit
+        )
+    except Exception as e:
+        logger.error(f"Search document sync failed: {e}")
+        sys.exit(1)
+
+    elapsed = time.time() - started
+    print(f"Search documents indexed: {stats['indexed']} in {elapsed:.1f}s")
+    print(f"  Failed to format: {stats['failed']}")
+    print(f"  Removed (no longer exportable): {stats['removed']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -36,7 +36,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from rag_integration.config.settings import get_config
-from rag_integration.services.gcs_uploader import GCSUploader
+from rag_integration.services.gcs_uploader import get_uploader
 from rag_integration.services.vertex_rag import VertexRAGService
 from rag_integration.jobs.rag_sync_job import RAGExportTracker
 
@@ -61,7 +61,7 @@ class ExportVerifier:
     @property
     def gcs(self):
         if self._gcs is None:
-            self._gcs = GCSUploader(self.config.gcs_bucket)
+            self._gcs = get_uploader(self.config.gcs_bucket)
         return self._gcs
 
     @property
@@ -0,0 +1,144 @@
+-- =====================================================
+-- REPORT ROLLUPS - DATABASE MIGRATION
+-- Migration: 008_report_rollups.sql
+-- Date: 2026-10-16
+-- Description: Per-day rollups (day x employee x customer company x call_type)
+--              powering the churn, sentiment, quality and customer reports.
+--              Triggers on transcripts / insights / call_resolutions mark
+--              the affected call_date dirty; the refresh job
+--              (rag_integration.jobs.refresh_report_rollups) recomputes
+--              only dirty days.
+-- =====================================================
+
+-- =====================================================
+-- 1. DAILY ROLLUPS
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS report_daily_rollups (
+    call_date DATE NOT NULL,
+    employee_name TEXT NOT NULL DEFAULT '',       -- '' when transcript has no employee
+    customer_company TEXT NOT NULL DEFAULT '',    -- '' when transcript has no company
+    call_type TEXT NOT NULL DEFAULT '',           -- '' when no Layer 2 insights / call_type
+
+    -- Volume
+    transcript_count INTEGER NOT NULL DEFAULT 0,  -- all transcripts
+    analyzed_count INTEGER NOT NULL DEFAULT 0,    -- transcripts with insights (Layer 2)
+
+    -- Quality (insights.call_quality_score)
+    quality_count INTEGER NOT NULL DEFAULT 0,
+    quality_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    quality_excellent_count INTEGER NOT NULL DEFAULT 0,  -- >= 8
+    quality_good_count INTEGER NOT NULL DEFAULT 0,       -- 6-7
+    quality_fair_count INTEGER NOT NULL DEFAULT 0,       -- 4-5
+    quality_poor_count INTEGER NOT NULL DEFAULT 0,       -- < 4
+    low_quality_count INTEGER NOT NULL DEFAULT 0,        -- < 5
+    high_quality_count INTEGER NOT NULL DEFAULT 0,       -- >= 8
+
+    -- Satisfaction (insights.customer_satisfaction_score)
+    satisfaction_count INTEGER NOT NULL DEFAULT 0,
+    satisfaction_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+
+    -- Sentiment (insights.customer_sentiment)
+    negative_count INTEGER NOT NULL DEFAULT 0,    -- negative/frustrated/angry
+    positive_count INTEGER NOT NULL DEFAULT 0,    -- positive/satisfied/happy
+    neutral_count INTEGER NOT NULL DEFAULT 0,
+    sentiment_counts JSONB NOT NULL DEFAULT '{}', -- raw value -> count
+
+    -- Churn (call_resolutions.churn_risk, Layer 3)
+    churn_high_count INTEGER NOT NULL DEFAULT 0,
+    churn_medium_count INTEGER NOT NULL DEFAULT 0,
+    churn_risk_counts JSONB NOT NULL DEFAULT '{}', -- raw value -> count
+
+    -- Contacts (transcripts.customer_name -> count)
+    contact_counts JSONB NOT NULL DEFAULT '{}',
+
+    refreshed_at TIMESTAMPTZ DEFAULT NOW(),
+
+    PRIMARY KEY (call_date, employee_name, customer_company, call_type)
+);
+
+CREATE INDEX IF NOT EXISTS idx_rdr_employee ON report_daily_rollups(LOWER(employee_name), call_date);
+CREATE INDEX IF NOT EXISTS idx_rdr_company ON report_daily_rollups(LOWER(customer_company), call_date);
+
+-- =====================================================
+-- 2. DIRTY DAY QUEUE
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS report_rollup_dirty_days (
+    call_date DATE PRIMARY KEY,
+    marked_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION mark_report_rollup_dirty() RETURNS trigger AS $$
+DECLARE
+    affected_recording TEXT;
+BEGIN
+    IF TG_TABLE_NAME = 'transcripts' THEN
+        -- A transcript can move between days, so mark both old and new dates
+        IF TG_OP <> 'DELETE' THEN
+            IF NEW.call_date IS NOT NULL THEN
+                INSERT INTO report_rollup_dirty_days (call_date)
+                VALUES (NEW.call_date)
+                ON CONFLICT (call_date) DO NOTHING;
+            END IF;
+        END IF;
+        IF TG_OP <> 'INSERT' THEN
+            IF OLD.call_date IS NOT NULL THEN
+                INSERT INTO report_rollup_dirty_days (call_date)
+                VALUES (OLD.call_date)
+                ON CONFLICT (call_date) DO NOTHING;
+            END IF;
+        END IF;
+    ELSE
+        -- Layer tables: look up the call date of the affected recording
+        IF TG_OP = 'DELETE' THEN
+            affected_recording := OLD.recording_id;
+        ELSE
+            affected_recording := NEW.recording_id;
+        END IF;
+
+        INSERT INTO report_rollup_dirty_days (call_date)
+        SELECT t.call_date
+        FROM transcripts t
+        WHERE t.recording_id = affected_recording
+          AND t.call_date IS NOT NULL
+        ON CONFLICT (call_date) DO NOTHING;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Only columns that feed the rollups mark a day dirty
+DROP TRIGGER IF EXISTS trg_transcripts_rollup_dirty ON transcripts;
+CREATE TRIGGER trg_transcripts_rollup_dirty
+    AFTER INSERT OR DELETE OR UPDATE OF call_date, employee_name, customer_company, customer_name
+    ON transcripts
+    FOR EACH ROW EXECUTE FUNCTION mark_report_rollup_dirty();
+
+DROP TRIGGER IF EXISTS trg_insights_rollup_dirty ON insights;
+CREATE TRIGGER trg_insights_rollup_dirty
+    AFTER INSERT OR DELETE OR UPDATE OF call_type, call_quality_score, customer_satisfaction_score, customer_sentiment
+    ON insights
+    FOR EACH ROW EXECUTE FUNCTION mark_report_rollup_dirty();
+
+DROP TRIGGER IF EXISTS trg_call_resolutions_rollup_dirty ON call_resolutions;
+CREATE TRIGGER trg_call_resolutions_rollup_dirty
+    AFTER INSERT OR DELETE OR UPDATE OF churn_risk
+    ON call_resolutions
+    FOR EACH ROW EXECUTE FUNCTION mark_report_rollup_dirty();
+
+-- Initial backfill: every existing day starts dirty. Reports fall back to the
+-- raw tables until the refresh job has built the rollups.
+INSERT INTO report_rollup_dirty_days (call_date)
+SELECT DISTINCT call_date FROM transcripts WHERE call_date IS NOT NULL
+ON CONFLICT (call_date) DO NOTHING;
+
+-- =====================================================
+-- GRANT PERMISSIONS
+-- =====================================================
+
+GRANT SELECT, INSERT, UPDATE, DELETE ON report_daily_rollups TO call_insights_user;
+GRANT SELECT, INSERT, UPDATE, DELETE ON report_rollup_dirty_days TO call_insights_user;
+
+-- Done
+SELECT 'Migration 008_report_rollups.sql completed successfully' AS status;
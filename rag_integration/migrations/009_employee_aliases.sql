@@ -0,0 +1,28 @@
+-- =====================================================
+-- EMPLOYEE NAME ALIASES - DATABASE MIGRATION
+-- Migration: 009_employee_aliases.sql
+-- Date: 2026-10-16
+-- Description: Precomputed canonical employee name for every raw name seen
+--              in transcripts.employee_name, kb_freshdesk_qa.agent_name and
+--              video_meetings.host_name, so queries can facet and group by
+--              canonical employee in SQL instead of canonicalizing rows in
+--              Python. Populated from rag_integration.config.employee_names
+--              by rag_integration.jobs.sync_employee_aliases.
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS employee_name_aliases (
+    raw_name TEXT PRIMARY KEY,
+    canonical_name TEXT,              -- NULL for excluded names ("Unknown", "Customer", ...)
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_employee_aliases_canonical ON employee_name_aliases(canonical_name);
+
+-- =====================================================
+-- GRANT PERMISSIONS
+-- =====================================================
+
+GRANT SELECT, INSERT, UPDATE, DELETE ON employee_name_aliases TO call_insights_user;
+
+-- Done
+SELECT 'Migration 009_employee_aliases.sql completed successfully' AS status;
@@ -0,0 +1,38 @@
+-- =====================================================
+-- CONVERSATION DYNAMICS - DATABASE MIGRATION
+-- Migration: 010_conversation_dynamics.sql
+-- Date: 2026-10-16
+-- Description: Talk/listen time, silence, hold, interruptions and
+--              monologues per call, computed from the diarized segments in
+--              transcripts.transcript_segments (no LLM). Populated by
+--              rag_integration.jobs.compute_conversation_dynamics and read
+--              by the dashboard call metrics (employee_talk_pct etc.).
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS call_conversation_dynamics (
+    recording_id TEXT PRIMARY KEY,
+    diarized BOOLEAN NOT NULL,            -- FALSE when segments have no speaker labels
+    agent_speaker TEXT,                   -- Diarization label taken to be the employee
+    speaker_count INTEGER,
+    agent_talk_seconds REAL,
+    customer_talk_seconds REAL,           -- = agent listen time
+    agent_talk_pct REAL,
+    silence_seconds REAL,
+    hold_seconds REAL,                    -- Silences of DYNAMICS_HOLD_GAP_SECONDS or more
+    interruption_count INTEGER,
+    longest_monologue_seconds REAL,
+    turn_count INTEGER,
+    metrics JSONB,                        -- Full analyze_conversation() output
+    computed_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+COMMENT ON TABLE call_conversation_dynamics IS 'Per-call conversation dynamics from diarized transcript segments';
+
+-- =====================================================
+-- GRANT PERMISSIONS
+-- =====================================================
+
+GRANT SELECT, INSERT, UPDATE, DELETE ON call_conversation_dynamics TO call_insights_user;
+
+-- Done
+SELECT 'Migration 010_conversation_dynamics.sql completed successfully' AS status;
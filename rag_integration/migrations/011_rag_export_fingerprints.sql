@@ -0,0 +1,27 @@
+-- =====================================================
+-- RAG EXPORT FINGERPRINTS - DATABASE MIGRATION
+-- Migration: 011_rag_export_fingerprints.sql
+-- Date: 2026-10-16
+-- Description: Content fingerprint of each exported call, so the RAG sync
+--              job can re-export calls whose analysis changed after export
+--              (re-runs of layers 2-5) and retire the corpus files holding
+--              their superseded documents. The fingerprint is md5 of the
+--              row db_reader.FULL_CALL_SELECT returns for the call: the
+--              layer 1-5 columns the JSONL formatter builds the document
+--              from (layer 5 via a LEFT JOIN on call_advanced_metrics).
+--
+--              Calls exported before this migration have no fingerprint and
+--              are all re-exported by the next sync. To keep the current
+--              corpus instead, record fingerprints once with:
+--                  python -m rag_integration.jobs.rag_sync_job --record-fingerprints
+-- =====================================================
+
+ALTER TABLE rag_exports ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+COMMENT ON COLUMN rag_exports.content_hash IS 'md5 of the exported call data (NULL = exported before fingerprints)';
+
+-- Finding the other calls in a superseded file
+CREATE INDEX IF NOT EXISTS idx_rag_exports_gcs_uri ON rag_exports(gcs_uri);
+
+-- Done
+SELECT 'Migration 011_rag_export_fingerprints.sql completed successfully' AS status;
@@ -0,0 +1,41 @@
+-- =====================================================
+-- LOCAL HYBRID SEARCH - DATABASE MIGRATION
+-- Migration: 012_hybrid_search.sql
+-- Date: 2026-10-16
+-- Description: The RAG documents (JSONLFormatter content.text and
+--              struct_data, as exported to Vertex AI / Gemini) indexed in
+--              PostgreSQL, so rag_integration.services.hybrid_retriever can
+--              retrieve locally: full-text ranking over search_tsv fused
+--              with pgvector similarity over transcript_embeddings, with
+--              struct_data filters applied before ranking. Populated by
+--              rag_integration.jobs.sync_search_documents.
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS rag_search_documents (
+    recording_id TEXT PRIMARY KEY,
+    content_text TEXT NOT NULL,           -- JSONLFormatter content.text
+    struct_data JSONB NOT NULL,           -- JSONLFormatter struct_data (filter fields)
+    call_date DATE,                       -- struct_data call_date, for range filters
+    -- Layer headers and analysis rank above the raw transcript
+    search_tsv TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', split_part(content_text, E'\n[TRANSCRIPT]\n', 1)), 'A') ||
+        setweight(to_tsvector('english', split_part(content_text, E'\n[TRANSCRIPT]\n', 2)), 'D')
+    ) STORED,
+    content_hash TEXT,                    -- db_reader.CONTENT_HASH_SQL of the source row
+    indexed_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_rag_search_documents_tsv ON rag_search_documents USING GIN (search_tsv);
+CREATE INDEX IF NOT EXISTS idx_rag_search_documents_struct ON rag_search_documents USING GIN (struct_data jsonb_path_ops);
+CREATE INDEX IF NOT EXISTS idx_rag_search_documents_call_date ON rag_search_documents(call_date);
+
+COMMENT ON TABLE rag_search_documents IS 'RAG documents indexed for local hybrid (full-text + vector) retrieval';
+
+-- =====================================================
+-- GRANT PERMISSIONS
+-- =====================================================
+
+GRANT SELECT, INSERT, UPDATE, DELETE ON rag_search_documents TO call_insights_user;
+
+-- Done
+SELECT 'Migration 012_hybrid_search.sql completed successfully' AS status;
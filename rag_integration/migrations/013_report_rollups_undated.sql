@@ -0,0 +1,54 @@
+-- =====================================================
+-- REPORT ROLLUPS: UNDATED CALLS - DATABASE MIGRATION
+-- Migration: 013_report_rollups_undated.sql
+-- Date: 2026-10-16
+-- Description: Transcripts with no call_date were left out of the
+--              per-day rollups (migration 008), while the raw all-time
+--              report queries count them. They are now rolled up under
+--              the sentinel day 0001-01-01 (report_rollups.UNDATED_CALL_DATE),
+--              which every date-range filter excludes, as the raw queries
+--              exclude NULL call_dates, and all-time reads include.
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION mark_report_rollup_dirty() RETURNS trigger AS $$
+DECLARE
+    affected_recording TEXT;
+BEGIN
+    IF TG_TABLE_NAME = 'transcripts' THEN
+        -- A transcript can move between days, so mark both old and new dates
+        IF TG_OP <> 'DELETE' THEN
+            INSERT INTO report_rollup_dirty_days (call_date)
+            VALUES (COALESCE(NEW.call_date, DATE '0001-01-01'))
+            ON CONFLICT (call_date) DO NOTHING;
+        END IF;
+        IF TG_OP <> 'INSERT' THEN
+            INSERT INTO report_rollup_dirty_days (call_date)
+            VALUES (COALESCE(OLD.call_date, DATE '0001-01-01'))
+            ON CONFLICT (call_date) DO NOTHING;
+        END IF;
+    ELSE
+        -- Layer tables: look up the call date of the affected recording
+        IF TG_OP = 'DELETE' THEN
+            affected_recording := OLD.recording_id;
+        ELSE
+            affected_recording := NEW.recording_id;
+        END IF;
+
+        INSERT INTO report_rollup_dirty_days (call_date)
+        SELECT COALESCE(t.call_date, DATE '0001-01-01')
+        FROM transcripts t
+        WHERE t.recording_id = affected_recording
+        ON CONFLICT (call_date) DO NOTHING;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Build the undated bucket on the next refresh
+INSERT INTO report_rollup_dirty_days (call_date)
+SELECT DATE '0001-01-01'
+WHERE EXISTS (SELECT 1 FROM transcripts WHERE call_date IS NULL)
+ON CONFLICT (call_date) DO NOTHING;
+
+-- Done
+SELECT 'Migration 013_report_rollups_undated.sql completed successfully' AS status;
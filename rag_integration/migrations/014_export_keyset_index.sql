@@ -0,0 +1,25 @@
+-- =====================================================
+-- EXPORT KEYSET INDEX - DATABASE MIGRATION
+-- Migration: 014_export_keyset_index.sql
+-- Date: 2026-10-16
+-- Description: Index matching the export keyset (db_reader.EXPORT_SORT_COLUMNS),
+--              so each ExportPipeline page is a backward range scan from the
+--              previous page's last key instead of a join and sort over
+--              every exportable call. The predicate is the export query's
+--              base filter, which keeps short and unnamed transcripts out of
+--              the index.
+-- =====================================================
+
+CREATE INDEX IF NOT EXISTS idx_transcripts_export_keyset ON transcripts (
+    COALESCE(call_date, DATE '0001-01-01'),
+    COALESCE(call_time, TIME '00:00:00'),
+    recording_id
+)
+WHERE transcript_text IS NOT NULL
+  AND LENGTH(transcript_text) > 100
+  AND (employee_name IS NOT NULL OR customer_name IS NOT NULL);
+
+ANALYZE transcripts;
+
+-- Done
+SELECT 'Migration 014_export_keyset_index.sql completed successfully' AS status;
@@ -0,0 +1,227 @@
+"""
+Answer Cache - TTL + LRU cache for UnifiedQueryService answers.
+
+Answers are keyed on the normalized question plus the routed RAG system and
+the extracted filters, so "What are customers complaining about this week?"
+and "what are customers complaining about this week" share one Gemini call.
+Relative dates are resolved into the filters before keying, which means
+"this week" rolls over to a new key on its own.
+
+An optional similarity tier (RAG_ANSWER_CACHE_SEMANTIC) embeds the question
+on an exact miss and reuses a cached answer for the same system and filters
+when the cosine similarity clears RAG_ANSWER_CACHE_SIMILARITY.
+
+The corpora only change when an export is imported, so the sync jobs call
+invalidate_answer_cache() after importing; AnswerCache extends the report
+ResponseCache, so that touches a stamp file the same way and every API
+process drops its answers.
+"""
+
+import os
+import re
+import json
+import math
+import time
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from .response_cache import ResponseCache, touch_invalidation_file
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Seconds a cached answer stays valid (imports invalidate earlier)
+ANSWER_CACHE_TTL = float(os.getenv("RAG_ANSWER_CACHE_TTL", "3600"))
+# Maximum cached answers (least recently used are evicted first)
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("RAG_ANSWER_CACHE_MAX_ENTRIES", "512"))
+# Enable the embedding-similarity tier for paraphrased questions
+ANSWER_CACHE_SEMANTIC = os.getenv("RAG_ANSWER_CACHE_SEMANTIC", "false").lower() == "true"
+# Minimum cosine similarity for a paraphrase to reuse an answer
+ANSWER_CACHE_SIMILARITY = float(os.getenv("RAG_ANSWER_CACHE_SIMILARITY", "0.95"))
+# Touched by invalidate_answer_cache() so other processes drop their answers
+ANSWER_CACHE_INVALIDATION_FILE = os.getenv(
+    "RAG_ANSWER_CACHE_INVALIDATION_FILE", "/tmp/cows_answer_cache.stamp"
+)
+
+AnswerKey = Tuple[str, str, str]
+
+_PUNCTUATION = re.compile(r"[^\w\s<>=!.-]+")
+_TRAILING_PUNCTUATION = re.compile(r"[.!\-\s]+$")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, drop punctuation that doesn't change meaning, collapse whitespace."""
+    text = _PUNCTUATION.sub(" ", (query or "").lower())
+    text = _WHITESPACE.sub(" ", text).strip()
+    return _TRAILING_PUNCTUATION.sub("", text)
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def _default_embedder() -> Optional[Callable[[str], Optional[List[float]]]]:
+    """Embedding function for the similarity tier, or None if unavailable."""
+    try:
+        from src.insights.embeddings_manager import get_embeddings_manager
+        return get_embeddings_manager().generate_embedding
+    except Exception as e:
+        logger.warning(f"Answer cache similarity tier disabled, no embedder: {e}")
+        return None
+
+
+class AnswerCache(ResponseCache):
+    """
+    Exact + optional similarity cache for RAG answers.
+
+    Expiry, LRU eviction, the stamp file and the counters come from
+    ResponseCache; each value is stored as (question embedding or None, answer).
+    Answers go through make_answer_key/lookup/store/invalidate_system, so
+    the inherited get/set/get_or_compute keep ResponseCache's signatures.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+        ttl: float = ANSWER_CACHE_TTL,
+        embed_fn: Optional[Callable[[str], Optional[List[float]]]] = None,
+        similarity_threshold: float = ANSWER_CACHE_SIMILARITY,
+        invalidation_file: Optional[str] = ANSWER_CACHE_INVALIDATION_FILE
+    ):
+        super().__init__(max_entries=max_entries, ttl=ttl, invalidation_file=invalidation_file)
+        self.embed_fn = embed_fn
+        self.similarity_threshold = similarity_threshold
+        self._stats.update({'semantic_hits': 0, 'embedding_failures': 0})
+
+    @staticmethod
+    def make_answer_key(query: str, system: str, filters: Optional[Dict[str, Any]]) -> AnswerKey:
+        """Build a key from the normalized query, routed system and filters."""
+        filters_key = json.dumps(filters or {}, sort_keys=True, default=str)
+        return (normalize_query(query), system, filters_key)
+
+    def _embed(self, query: str) -> Optional[List[float]]:
+        if self.embed_fn is None:
+            return None
+        try:
+            embedding = self.embed_fn(normalize_query(query))
+        except Exception as e:
+            logger.warning(f"Answer cache embedding failed: {e}")
+            embedding = None
+        if not embedding:
+            with self._lock:
+                self._stats['embedding_failures'] += 1
+            return None
+        return embedding
+
+    def lookup(self, key: AnswerKey,
+               semantic: bool = True) -> Tuple[Optional[str], Any, Optional[List[float]]]:
+        """
+        Look up an answer.
+
+        Args:
+            key: Key from make_answer_key
+            semantic: Fall back to the similarity tier on an exact miss
+
+        Returns:
+            Tuple of (hit type "exact"/"semantic" or None, answer, query
+            embedding computed for the lookup so store() can reuse it)
+        """
+        self._check_external_invalidation()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._fresh_entry(key, now)
+            if entry is not None:
+                self._stats['hits'] += 1
+                embedding, answer = entry[1]
+                return "exact", answer, embedding
+
+            candidates = [
+                (k, e[1][0]) for k, e in self._entries.items()
+                if k[1:] == key[1:] and e[1][0] is not None and now < e[0]
+            ]
+
+        if not semantic or self.embed_fn is None or not candidates:
+            with self._lock:
+                self._stats['misses'] += 1
+            return None, None, None
+
+        embedding = self._embed(key[0])
+        if embedding is not None:
+            best_key, best_score = None, self.similarity_threshold
+            for k, candidate in candidates:
+                score = _cosine(embedding, candidate)
+                if score >= best_score:
+                    best_key, best_score = k, score
+
+            if best_key is not None:
+                with self._lock:
+                    entry = self._entries.get(best_key)
+                    if entry is not None:
+                        self._entries.move_to_end(best_key)
+                        self._stats['hits'] += 1
+                        self._stats['semantic_hits'] += 1
+                        logger.info(f"Answer cache paraphrase hit ({best_score:.3f}): {best_key[0][:60]}")
+                        return "semantic", entry[1][1], embedding
+
+        with self._lock:
+            self._stats['misses'] += 1
+        return None, None, embedding
+
+    def store(
+        self,
+        key: AnswerKey,
+        answer: Dict[str, Any],
+        embedding: Optional[List[float]] = None,
+        ttl: Optional[float] = None
+    ):
+        """Store an answer, embedding it first when the similarity tier is on."""
+        if embedding is None and self.embed_fn is not None:
+            embedding = self._embed(key[0])
+        super().set(key, (embedding, answer), ttl)
+
+    def invalidate_system(self, system: Optional[str] = None) -> int:
+        """Drop answers from one RAG system (everything if none is given)."""
+        return self._drop(lambda k: system is None or k[1] == system)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        stats = super().get_stats()
+        stats['semantic_enabled'] = self.embed_fn is not None
+        return stats
+
+
+# Singleton instance
+_answer_cache = None
+
+
+def get_answer_cache() -> AnswerCache:
+    """Get or create the answer cache singleton."""
+    global _answer_cache
+    if _answer_cache is None:
+        embed_fn = _default_embedder() if ANSWER_CACHE_SEMANTIC else None
+        _answer_cache = AnswerCache(embed_fn=embed_fn)
+    return _answer_cache
+
+
+def invalidate_answer_cache(system: Optional[str] = None) -> int:
+    """
+    Invalidate cached RAG answers.
+
+    Call after new exports are imported into Gemini or Vertex. A full
+    invalidation also touches the stamp file so API processes drop theirs.
+
+    Returns:
+        Number of answers dropped in this process
+    """
+    dropped = _answer_cache.invalidate_system(system) if _answer_cache is not None else 0
+
+    if system is None:
+        touch_invalidation_file(ANSWER_CACHE_INVALIDATION_FILE)
+
+    return dropped
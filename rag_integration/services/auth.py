@@ -9,10 +9,11 @@ import hashlib
 import logging
 from datetime import datetime
 from typing import Dict, Optional
-import psycopg2
 from psycopg2.extras import RealDictCursor
 from contextlib import contextmanager
 
+from .db_pool import pooled_connection
+
 logger = logging.getLogger(__name__)
 
 
@@ -49,16 +50,14 @@ class AuthService:
 
     @contextmanager
     def get_connection(self):
-        """Get database connection."""
-        conn = psycopg2.connect(self.connection_string)
-        try:
-            yield conn
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            conn.close()
+        """Get a pooled database connection."""
+        with pooled_connection(self.connection_string) as conn:
+            try:
+                yield conn
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                raise e
 
     def authenticate(self, username: str, password: str) -> Optional[Dict]:
         """
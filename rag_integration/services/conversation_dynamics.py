@@ -0,0 +1,286 @@
+"""
+Conversation Dynamics - talk/listen, interruptions, monologues and silence
+computed from diarized transcript segments (migration 010).
+
+Salad diarization stores sentence segments with speaker labels and
+start/end times in transcripts.transcript_segments. Instead of asking an
+LLM to estimate talk percentages from text, every metric here is computed
+directly from those timestamps with numpy, one vector pass per call.
+compute_conversation_dynamics() runs the whole backlog in keyset-paged
+batches and upserts call_conversation_dynamics, which the dashboard
+metrics read.
+"""
+
+import os
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from psycopg2.extras import Json, execute_values
+from dotenv import load_dotenv
+
+from .db_pool import pooled_connection
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Gaps between speech at least this long count as silence / dead air
+SILENCE_GAP_SECONDS = float(os.getenv("DYNAMICS_SILENCE_GAP_SECONDS", "2"))
+# Silences at least this long are treated as hold time
+HOLD_GAP_SECONDS = float(os.getenv("DYNAMICS_HOLD_GAP_SECONDS", "30"))
+# A speaker change counts as an interruption when the new speaker starts
+# at least this long before the previous segment ended
+INTERRUPTION_OVERLAP_SECONDS = float(os.getenv("DYNAMICS_INTERRUPTION_OVERLAP_SECONDS", "0.3"))
+# Turns (one speaker, no silence) at least this long are monologues
+MONOLOGUE_SECONDS = float(os.getenv("DYNAMICS_MONOLOGUE_SECONDS", "60"))
+
+DYNAMICS_BATCH_SIZE = int(os.getenv("DYNAMICS_BATCH_SIZE", "500"))
+
+
+def parse_segments(segments: Any) -> List[Dict[str, Any]]:
+    """transcript_segments as a list of dicts (JSON columns arrive as strings)."""
+    if isinstance(segments, str):
+        try:
+            segments = json.loads(segments)
+        except ValueError:
+            return []
+    if isinstance(segments, dict):
+        segments = segments.get('segments', [])
+    return [s for s in segments if isinstance(s, dict)] if isinstance(segments, list) else []
+
+
+def identify_agent_speaker(speakers_in_order: List[str], direction: Optional[str] = None) -> str:
+    """
+    Guess which diarized speaker is the employee.
+
+    On inbound calls the agent answers, so speaks first; on outbound
+    calls the customer answers and the agent is the second voice.
+    """
+    if (direction or '').lower() == 'outbound' and len(speakers_in_order) > 1:
+        return speakers_in_order[1]
+    return speakers_in_order[0]
+
+
+def analyze_conversation(segments: Any, direction: Optional[str] = None,
+                         agent_speaker: Optional[str] = None,
+                         duration: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """
+    Conversation dynamics for one call.
+
+    Args:
+        segments: Diarized segments ({'start', 'end', 'speaker', 'text'})
+        direction: 'Inbound' / 'Outbound', used to pick the agent speaker
+        agent_speaker: Agent's speaker label, if known
+        duration: Call length in seconds (default: end of the last segment)
+
+    Returns:
+        Metrics dict, or None if the segments carry no speaker labels
+    """
+    rows = [
+        (float(s.get('start') or 0), float(s.get('end') or 0), str(s['speaker']),
+         len((s.get('text') or '').split()))
+        for s in parse_segments(segments)
+        if s.get('speaker') is not None
+    ]
+    if not rows:
+        return None
+
+    starts, ends, speakers, words = zip(*rows)
+    start = np.asarray(starts, dtype=float)
+    order = np.argsort(start, kind='stable')
+    start = start[order]
+    end = np.maximum(np.asarray(ends, dtype=float)[order], start)
+    words = np.asarray(words, dtype=float)[order]
+    labels, codes = np.unique(np.asarray(speakers)[order], return_inverse=True)
+    n, k = len(start), len(labels)
+
+    first_seen = np.full(k, n)
+    np.minimum.at(first_seen, codes, np.arange(n))
+    speakers_in_order = [str(label) for label in labels[np.argsort(first_seen)]]
+    if agent_speaker not in speakers_in_order:
+        agent_speaker = identify_agent_speaker(speakers_in_order, direction)
+    agent = int(np.flatnonzero(labels == agent_speaker)[0])
+
+    talk = np.bincount(codes, weights=end - start, minlength=k)
+    word_counts = np.bincount(codes, weights=words, minlength=k)
+
+    # Silence: gap between the furthest speech so far and the next segment
+    running_end = np.maximum.accumulate(end)
+    gaps = start[1:] - running_end[:-1]
+    silences = gaps[gaps >= SILENCE_GAP_SECONDS]
+    speech_seconds = float(running_end[-1] - start[0] - gaps[gaps > 0].sum())
+
+    # Interruptions: a new speaker starting before the previous segment ends
+    change = codes[1:] != codes[:-1]
+    interrupted = change & (end[:-1] - start[1:] >= INTERRUPTION_OVERLAP_SECONDS)
+    interruptions = np.bincount(codes[1:][interrupted], minlength=k)
+
+    # Turns: runs of consecutive segments by one speaker, split at silences
+    turn_starts = np.flatnonzero(np.concatenate(([True], change | (gaps >= SILENCE_GAP_SECONDS))))
+    turn_seconds = np.maximum.reduceat(end, turn_starts) - start[turn_starts]
+    turn_speaker = codes[turn_starts]
+    longest_turn = np.zeros(k)
+    np.maximum.at(longest_turn, turn_speaker, turn_seconds)
+
+    customer = np.arange(k) != agent
+    agent_talk = float(talk[agent])
+    customer_talk = float(talk[customer].sum())
+    total_talk = agent_talk + customer_talk
+
+    return {
+        'method': 'diarization',
+        'speaker_count': k,
+        'agent_speaker': agent_speaker,
+        'duration_seconds': round(float(duration or running_end[-1]), 1),
+        'speech_seconds': round(speech_seconds, 1),
+        'talk_seconds': {str(labels[i]): round(float(talk[i]), 1) for i in range(k)},
+        'word_counts': {str(labels[i]): int(word_counts[i]) for i in range(k)},
+        'agent_talk_seconds': round(agent_talk, 1),
+        # The agent is listening while anyone else talks
+        'customer_talk_seconds': round(customer_talk, 1),
+        'agent_talk_pct': round(agent_talk / total_talk * 100, 1) if total_talk else None,
+        'customer_talk_pct': round(customer_talk / total_talk * 100, 1) if total_talk else None,
+        'talk_listen_ratio': round(agent_talk / customer_talk, 2) if customer_talk else None,
+        'silence_count': int(silences.size),
+        'silence_seconds': round(float(silences.sum()), 1),
+        'longest_silence_seconds': round(float(silences.max()), 1) if silences.size else 0.0,
+        'hold_seconds': round(float(silences[silences >= HOLD_GAP_SECONDS].sum()), 1),
+        'interruption_count': int(interruptions.sum()),
+        'agent_interruptions': int(interruptions[agent]),
+        'customer_interruptions': int(interruptions[customer].sum()),
+        'turn_count': int(turn_starts.size),
+        'avg_turn_seconds': round(float(turn_seconds.mean()), 1),
+        'monologue_count': int((turn_seconds >= MONOLOGUE_SECONDS).sum()),
+        'longest_monologue_seconds': round(float(turn_seconds.max()), 1),
+        'agent_longest_monologue_seconds': round(float(longest_turn[agent]), 1),
+        'customer_longest_monologue_seconds': round(float(longest_turn[customer].max()), 1) if customer.any() else 0.0,
+    }
+
+
+def to_talk_listen_ratio(dynamics: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Layer 5 talk_listen_ratio section from conversation dynamics.
+
+    Keeps the keys the LLM estimate used to produce, with measured values.
+    """
+    if not dynamics:
+        return {'method': 'unavailable', 'balance_score': None}
+
+    word_counts = dynamics['word_counts']
+    total_words = sum(word_counts.values())
+    agent_pct = dynamics['agent_talk_pct']
+    return {
+        'method': 'diarization',
+        'speaker_word_counts': word_counts,
+        'speaker_percentages': {
+            speaker: round(count / total_words * 100, 1) if total_words else 0.0
+            for speaker, count in word_counts.items()
+        },
+        'total_words': total_words,
+        'dominant_speaker': max(dynamics['talk_seconds'], key=dynamics['talk_seconds'].get),
+        'agent_talk_percentage': agent_pct,
+        'customer_talk_percentage': dynamics['customer_talk_pct'],
+        'interruptions_detected': dynamics['interruption_count'] > 0,
+        'interruption_count_estimate': dynamics['interruption_count'],
+        'monologue_detected': dynamics['monologue_count'] > 0,
+        # 10 for an even split, 0 when one side does all the talking
+        'balance_score': round(max(0.0, 10 - abs(50 - agent_pct) / 5), 1) if agent_pct is not None else None,
+        'dynamics': dynamics,
+    }
+
+
+def compute_conversation_dynamics(database_url: Optional[str] = None, refresh: bool = False,
+                                  batch_size: int = DYNAMICS_BATCH_SIZE,
+                                  limit: Optional[int] = None) -> Dict[str, int]:
+    """
+    Analyze every transcript not yet in call_conversation_dynamics.
+
+    Transcripts are read in recording_id order, batch_size at a time, and
+    each batch is upserted with one statement and committed. Transcripts
+    without speaker labels get a row with diarized = FALSE so later runs
+    skip them.
+
+    Args:
+        database_url: Database (default RAG_DATABASE_URL)
+        refresh: Re-analyze transcripts that already have a row
+        batch_size: Transcripts per read / write
+        limit: Stop after this many transcripts
+
+    Returns:
+        {'scanned', 'diarized', 'not_diarized'}
+    """
+    database_url = database_url or os.getenv("RAG_DATABASE_URL") or os.getenv("DATABASE_URL", "")
+    stats = {'scanned': 0, 'diarized': 0, 'not_diarized': 0}
+    pending = "" if refresh else (
+        "AND NOT EXISTS (SELECT 1 FROM call_conversation_dynamics d WHERE d.recording_id = t.recording_id)"
+    )
+
+    with pooled_connection(database_url) as conn:
+        try:
+            with conn.cursor() as cur:
+                after = ''
+                while limit is None or stats['scanned'] < limit:
+                    page = batch_size if limit is None else min(batch_size, limit - stats['scanned'])
+                    cur.execute(f"""
+                        SELECT t.recording_id, t.transcript_segments, t.direction, t.duration_seconds
+                        FROM transcripts t
+                        WHERE t.recording_id > %(after)s
+                            AND t.transcript_segments IS NOT NULL
+                            {pending}
+                        ORDER BY t.recording_id
+                        LIMIT %(page)s
+                    """, {'after': after, 'page': page})
+                    batch = cur.fetchall()
+                    if not batch:
+                        break
+                    after = batch[-1][0]
+
+                    rows = []
+                    for recording_id, segments, direction, duration in batch:
+                        d = analyze_conversation(segments, direction, duration=duration)
+                        if d is None:
+                            stats['not_diarized'] += 1
+                            rows.append((recording_id, False) + (None,) * 11)
+                            continue
+                        stats['diarized'] += 1
+                        rows.append((
+                            recording_id, True, d['agent_speaker'], d['speaker_count'],
+                            d['agent_talk_seconds'], d['customer_talk_seconds'], d['agent_talk_pct'],
+                            d['silence_seconds'], d['hold_seconds'], d['interruption_count'],
+                            d['longest_monologue_seconds'], d['turn_count'], Json(d)
+                        ))
+                    stats['scanned'] += len(batch)
+
+                    execute_values(cur, """
+                        INSERT INTO call_conversation_dynamics (
+                            recording_id, diarized, agent_speaker, speaker_count,
+                            agent_talk_seconds, customer_talk_seconds, agent_talk_pct,
+                            silence_seconds, hold_seconds, interruption_count,
+                            longest_monologue_seconds, turn_count, metrics
+                        )
+                        VALUES %s
+                        ON CONFLICT (recording_id) DO UPDATE SET
+                            diarized = EXCLUDED.diarized,
+                            agent_speaker = EXCLUDED.agent_speaker,
+                            speaker_count = EXCLUDED.speaker_count,
+                            agent_talk_seconds = EXCLUDED.agent_talk_seconds,
+                            customer_talk_seconds = EXCLUDED.customer_talk_seconds,
+                            agent_talk_pct = EXCLUDED.agent_talk_pct,
+                            silence_seconds = EXCLUDED.silence_seconds,
+                            hold_seconds = EXCLUDED.hold_seconds,
+                            interruption_count = EXCLUDED.interruption_count,
+                            longest_monologue_seconds = EXCLUDED.longest_monologue_seconds,
+                            turn_count = EXCLUDED.turn_count,
+                            metrics = EXCLUDED.metrics,
+                            computed_at = NOW()
+                    """, rows, page_size=batch_size)
+                    conn.commit()
+                    logger.info(f"Conversation dynamics: {stats['scanned']} scanned, "
+                                f"{stats['diarized']} diarized")
+        except Exception:
+            conn.rollback()
+            raise
+
+    return stats
@@ -7,16 +7,17 @@ transcripts, insights, and kb_freshdesk_qa tables.
 
 import os
 import logging
+from contextlib import contextmanager
 from datetime import datetime, date, timedelta
 from typing import Dict, List, Optional, Tuple
 from decimal import Decimal
 import psycopg2
 from psycopg2.extras import RealDictCursor
 
+from rag_integration.services.db_pool import pooled_connection
 from rag_integration.config.employee_names import (
     canonicalize_employee_name,
     get_canonical_employee_list,
-    get_employee_name_variations,
     is_employee
 )
 
@@ -62,9 +63,16 @@ class DashboardMetricsService:
     def __init__(self, db_url: str = None):
         self.db_url = db_url or get_db_url()
 
+    @contextmanager
     def get_connection(self):
-        """Get database connection."""
-        return psycopg2.connect(self.db_url)
+        """Get a pooled database connection (commits on success)."""
+        with pooled_connection(self.db_url) as conn:
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
 
     # =========================================================================
     # PERIOD HELPERS
@@ -217,6 +225,151 @@ class DashboardMetricsService:
     # CALL METRICS
     # =========================================================================
 
+    # Calls in the period with every name column that can identify the
+    # employee on them (extension mapping, call_log names, transcripts), each
+    # resolved to a canonical employee through employee_name_aliases. A call
+    # counts once per employee however many of its names match. Names not yet
+    # synced into the alias table still match on their exact canonical form.
+    _EMPLOYEE_CALLS_CTE = """
+        WITH period_calls AS (
+            SELECT c.id, c.ringcentral_id as recording_id,
+                c.start_time, c.call_result, c.direction, c.duration_seconds,
+                -- Calculate wait time from call_legs (difference between first and last leg startTime)
+                CASE
+                    WHEN c.call_legs IS NOT NULL
+                         AND jsonb_array_length(c.call_legs) >= 2
+                         AND c.call_result IN ('Accepted', 'Call connected')
+                    THEN EXTRACT(EPOCH FROM (
+                        (c.call_legs->-1->>'startTime')::timestamp -
+                        (c.call_legs->0->>'startTime')::timestamp
+                    ))
+                    ELSE NULL
+                END as wait_seconds,
+                e_to.employee_name as to_employee,
+                e_from.employee_name as from_employee,
+                c.to_name, c.from_name,
+                t.employee_name as transcript_employee
+            FROM call_log c
+            LEFT JOIN extension_employee_map e_to
+                ON c.to_extension_number = e_to.extension_number
+            LEFT JOIN extension_employee_map e_from
+                ON c.from_extension_number = e_from.extension_number
+            LEFT JOIN transcripts t
+                ON c.ringcentral_id = t.recording_id
+            WHERE c.start_time::date BETWEEN %(period_start)s AND %(period_end)s
+        ),
+        employee_calls AS (
+            SELECT DISTINCT
+                COALESCE(a.canonical_name, n.raw_name) as employee_name,
+                pc.id, pc.recording_id, pc.start_time, pc.call_result, pc.direction,
+                pc.duration_seconds, pc.wait_seconds
+            FROM period_calls pc
+            CROSS JOIN LATERAL (VALUES
+                (pc.to_employee), (pc.from_employee),
+                (pc.to_name), (pc.from_name),
+                (pc.transcript_employee)
+            ) AS n(raw_name)
+            LEFT JOIN employee_name_aliases a ON a.raw_name = n.raw_name
+            WHERE n.raw_name IS NOT NULL
+              AND COALESCE(a.canonical_name, n.raw_name) = ANY(%(employees)s)
+        )
+    """
+
+    @staticmethod
+    def _empty_call_metrics() -> Dict:
+        """Call metrics for an employee with no calls in the period."""
+        return {
+            'total_calls': 0,
+            'answered_calls': 0,
+            'missed_calls': 0,
+            'voicemail_calls': 0,
+            'inbound_calls': 0,
+            'outbound_calls': 0,
+            'avg_duration_seconds': 0,
+            'total_duration_seconds': 0,
+            'avg_wait_time_seconds': 0,
+            'calls_over_1_min_wait': 0,
+            'voicemail_business_hours': 0,
+            'voicemail_after_hours': 0,
+            'answer_rate': 0,
+            'hourly_volume': {}
+        }
+
+    def _get_call_metrics_by_employee(self, cur, employees: List[str],
+                                      period_start: date, period_end: date) -> Dict[str, Dict]:
+        """
+        Call metrics for every employee in `employees` with two GROUP BY
+        queries. Employees without calls are left out of the result.
+        """
+        params = {
+            'period_start': period_start,
+            'period_end': period_end,
+            'employees': list(employees)
+        }
+
+        cur.execute(self._EMPLOYEE_CALLS_CTE + """
+            SELECT
+                employee_name,
+                COUNT(*) as total_calls,
+                COUNT(*) FILTER (WHERE call_result IN ('Accepted', 'Call connected')) as answered_calls,
+                COUNT(*) FILTER (WHERE call_result = 'Missed') as missed_calls,
+                COUNT(*) FILTER (WHERE call_result = 'Voicemail') as voicemail_calls,
+                COUNT(*) FILTER (WHERE direction = 'Inbound') as inbound_calls,
+                COUNT(*) FILTER (WHERE direction = 'Outbound') as outbound_calls,
+                COALESCE(AVG(duration_seconds), 0) as avg_duration_seconds,
+                COALESCE(SUM(duration_seconds), 0) as total_duration_seconds,
+                -- New metrics: wait time
+                COALESCE(AVG(wait_seconds) FILTER (WHERE wait_seconds >= 0), 0) as avg_wait_time_seconds,
+                COUNT(*) FILTER (WHERE wait_seconds > 60) as calls_over_1_min_wait,
+                -- Voicemail by business hours (8am-5pm local time)
+                COUNT(*) FILTER (
+                    WHERE call_result = 'Voicemail'
+                    AND EXTRACT(HOUR FROM start_time AT TIME ZONE 'America/New_York') BETWEEN 8 AND 16
+                ) as voicemail_business_hours,
+                COUNT(*) FILTER (
+                    WHERE call_result = 'Voicemail'
+                    AND (EXTRACT(HOUR FROM start_time AT TIME ZONE 'America/New_York') < 8
+                         OR EXTRACT(HOUR FROM start_time AT TIME ZONE 'America/New_York') >= 17)
+                ) as voicemail_after_hours
+            FROM employee_calls
+            GROUP BY employee_name
+        """, params)
+
+        by_employee = {}
+        for row in cur.fetchall():
+            metrics = dict(row)
+            employee = metrics.pop('employee_name')
+
+            # Calculate answer rate
+            total = metrics['total_calls'] or 0
+            answered = metrics['answered_calls'] or 0
+            metrics['answer_rate'] = round((answered / total * 100), 1) if total > 0 else 0
+            metrics['hourly_volume'] = {}
+            by_employee[employee] = metrics
+
+        # Hourly volume (include both inbound and outbound)
+        cur.execute(self._EMPLOYEE_CALLS_CTE + """
+            SELECT
+                employee_name,
+                EXTRACT(HOUR FROM start_time) as hour,
+                COUNT(*) as count,
+                COUNT(*) FILTER (WHERE direction = 'Inbound') as inbound,
+                COUNT(*) FILTER (WHERE direction = 'Outbound') as outbound
+            FROM employee_calls
+            GROUP BY employee_name, EXTRACT(HOUR FROM start_time)
+            ORDER BY employee_name, hour
+        """, params)
+
+        for row in cur.fetchall():
+            if row['employee_name'] in by_employee:
+                by_employee[row['employee_name']]['hourly_volume'][int(row['hour'])] = {
+                    'total': row['count'],
+                    'inbound': row['inbound'],
+                    'outbound': row['outbound']
+                }
+
+        return by_employee
+
     def get_call_metrics(self, employee_name: str, period: str,
                          start_date: str = None,
                          end_date: str = None) -> Dict:
@@ -231,143 +384,27 @@ class DashboardMetricsService:
             calls_over_1_min_wait
         """
         period_start, period_end = self.get_period_dates(period, start_date, end_date)
-
-        # Get all name variations for this employee
-        name_variations = get_employee_name_variations(employee_name)
-        # Create ILIKE patterns for each variation
-        name_patterns = [f'%{v}%' for v in name_variations]
+        canonical = canonicalize_employee_name(employee_name) or employee_name
 
         with self.get_connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                # Get call metrics from call_log
-                # Match employee by extension mapping, call_log names, OR transcripts employee_name
-                # Also calculate wait time from call_legs (time between first and last leg)
-                cur.execute("""
-                    WITH employee_calls AS (
-                        SELECT c.*,
-                            -- Calculate wait time from call_legs (difference between first and last leg startTime)
-                            CASE
-                                WHEN c.call_legs IS NOT NULL
-                                     AND jsonb_array_length(c.call_legs) >= 2
-                                     AND c.call_result IN ('Accepted', 'Call connected')
-                                THEN EXTRACT(EPOCH FROM (
-                                    (c.call_legs->-1->>'startTime')::timestamp -
-                                    (c.call_legs->0->>'startTime')::timestamp
-                                ))
-                                ELSE NULL
-                            END as wait_seconds
-                        FROM call_log c
-                        LEFT JOIN extension_employee_map e_to
-                            ON c.to_extension_number = e_to.extension_number
-                        LEFT JOIN extension_employee_map e_from
-                            ON c.from_extension_number = e_from.extension_number
-                        LEFT JOIN transcripts t
-                            ON c.ringcentral_id = t.recording_id
-                        WHERE c.start_time::date BETWEEN %s AND %s
-                          AND (
-                              -- Match via extension mapping
-                              e_to.employee_name ILIKE ANY(%s)
-                              OR e_from.employee_name ILIKE ANY(%s)
-                              -- Match via call_log names
-                              OR c.to_name ILIKE ANY(%s)
-                              OR c.from_name ILIKE ANY(%s)
-                              -- Match via transcripts employee_name (historical data)
-                              OR t.employee_name ILIKE ANY(%s)
-                          )
-                    )
-                    SELECT
-                        COUNT(*) as total_calls,
-                        COUNT(*) FILTER (WHERE call_result IN ('Accepted', 'Call connected')) as answered_calls,
-                        COUNT(*) FILTER (WHERE call_result = 'Missed') as missed_calls,
-                        COUNT(*) FILTER (WHERE call_result = 'Voicemail') as voicemail_calls,
-                        COUNT(*) FILTER (WHERE direction = 'Inbound') as inbound_calls,
-                        COUNT(*) FILTER (WHERE direction = 'Outbound') as outbound_calls,
-                        COALESCE(AVG(duration_seconds), 0) as avg_duration_seconds,
-                        COALESCE(SUM(duration_seconds), 0) as total_duration_seconds,
-                        -- New metrics: wait time
-                        COALESCE(AVG(wait_seconds) FILTER (WHERE wait_seconds >= 0), 0) as avg_wait_time_seconds,
-                        COUNT(*) FILTER (WHERE wait_seconds > 60) as calls_over_1_min_wait,
-                        -- Voicemail by business hours (8am-5pm local time)
-                        COUNT(*) FILTER (
-                            WHERE call_result = 'Voicemail'
-                            AND EXTRACT(HOUR FROM start_time AT TIME ZONE 'America/New_York') BETWEEN 8 AND 16
-                        ) as voicemail_business_hours,
-                        COUNT(*) FILTER (
-                            WHERE call_result = 'Voicemail'
-                            AND (EXTRACT(HOUR FROM start_time AT TIME ZONE 'America/New_York') < 8
-                                 OR EXTRACT(HOUR FROM start_time AT TIME ZONE 'America/New_York') >= 17)
-                        ) as voicemail_after_hours
-                    FROM employee_calls
-                """, (period_start, period_end, name_patterns, name_patterns, name_patterns, name_patterns, name_patterns))
-
-                metrics = dict(cur.fetchone())
-
-                # Debug logging
-                logger.info(f"get_call_metrics: employee={employee_name}, period={period}, "
-                           f"dates={period_start} to {period_end}, "
-                           f"total={metrics.get('total_calls')}, "
-                           f"inbound={metrics.get('inbound_calls')}, outbound={metrics.get('outbound_calls')}")
-
-                # Calculate answer rate
-                total = metrics['total_calls'] or 0
-                answered = metrics['answered_calls'] or 0
-                metrics['answer_rate'] = round((answered / total * 100), 1) if total > 0 else 0
-
-                # Get hourly volume (include both inbound and outbound)
-                cur.execute("""
-                    WITH employee_calls AS (
-                        SELECT c.*
-                        FROM call_log c
-                        LEFT JOIN extension_employee_map e_to
-                            ON c.to_extension_number = e_to.extension_number
-                        LEFT JOIN extension_employee_map e_from
-                            ON c.from_extension_number = e_from.extension_number
-                        LEFT JOIN transcripts t
-                            ON c.ringcentral_id = t.recording_id
-                        WHERE c.start_time::date BETWEEN %s AND %s
-                          AND (
-                              e_to.employee_name ILIKE ANY(%s)
-                              OR e_from.employee_name ILIKE ANY(%s)
-                              OR c.to_name ILIKE ANY(%s)
-                              OR c.from_name ILIKE ANY(%s)
-                              OR t.employee_name ILIKE ANY(%s)
-                          )
-                    )
-                    SELECT
-                        EXTRACT(HOUR FROM start_time) as hour,
-                        COUNT(*) as count,
-                        COUNT(*) FILTER (WHERE direction = 'Inbound') as inbound,
-                        COUNT(*) FILTER (WHERE direction = 'Outbound') as outbound
-                    FROM employee_calls
-                    GROUP BY EXTRACT(HOUR FROM start_time)
-                    ORDER BY hour
-                """, (period_start, period_end, name_patterns, name_patterns, name_patterns, name_patterns, name_patterns))
-
-                hourly = {int(row['hour']): {
-                    'total': row['count'],
-                    'inbound': row['inbound'],
-                    'outbound': row['outbound']
-                } for row in cur.fetchall()}
-
-                metrics['hourly_volume'] = hourly
-
-                # Try to get talk time from transcripts (with diarization)
-                talk_metrics = self._get_talk_time_metrics(
-                    cur, employee_name, period_start, period_end
-                )
-                metrics.update(talk_metrics)
-
+                metrics = self._get_call_metrics_by_employee(
+                    cur, [canonical], period_start, period_end
+                ).get(canonical) or self._empty_call_metrics()
+
+                # Talk time from diarized transcripts (call_conversation_dynamics)
+                metrics.update(self._get_talk_time_metrics_by_employee(
+                    cur, [canonical], period_start, period_end
+                ).get(canonical) or self._empty_talk_time_metrics())
+
+        logger.debug(f"get_call_metrics: employee={employee_name}, period={period}, "
+                     f"dates={period_start} to {period_end}, "
+                     f"total={metrics.get('total_calls')}")
         return metrics
 
-    def _get_talk_time_metrics(self, cur, employee_name: str,
-                               period_start: date, period_end: date) -> Dict:
-        """
-        Get talk time metrics from transcripts with diarization data.
-        Returns avg_talk_time_seconds, avg_hold_time_seconds, employee_talk_pct
-        """
-        # For now, we don't have reliable talk time extraction
-        # This would need to parse transcript_segments JSONB
-        # Return placeholders that indicate data is not available
+    @staticmethod
+    def _empty_talk_time_metrics() -> Dict:
+        """Talk time metrics for an employee with no diarized calls."""
         return {
             'avg_talk_time_seconds': None,
             'avg_hold_time_seconds': None,
@@ -375,10 +412,144 @@ class DashboardMetricsService:
             'employee_talk_pct': None
         }
 
+    def _get_talk_time_metrics_by_employee(self, cur, employees: List[str],
+                                           period_start: date, period_end: date) -> Dict[str, Dict]:
+        """
+        Talk time metrics from call_conversation_dynamics (diarized calls only).
+
+        Talk time is the call duration less hold (long silences); the
+        employee's talk share is the diarized agent speaker's. Ring time
+        isn't in the diarization and stays None. Employees without
+        diarized calls are left out of the result.
+        """
+        cur.execute("SELECT to_regclass('call_conversation_dynamics') IS NOT NULL AS present")
+        if not cur.fetchone()['present']:
+            return {}
+
+        cur.execute(self._EMPLOYEE_CALLS_CTE + """
+            SELECT
+                ec.employee_name,
+                ROUND(AVG(GREATEST(ec.duration_seconds - d.hold_seconds, 0))::numeric, 1)::float
+                    as avg_talk_time_seconds,
+                ROUND(AVG(d.hold_seconds)::numeric, 1)::float as avg_hold_time_seconds,
+                ROUND(AVG(d.agent_talk_pct)::numeric, 1)::float as employee_talk_pct
+            FROM employee_calls ec
+            JOIN call_conversation_dynamics d
+                ON d.recording_id = ec.recording_id AND d.diarized
+            GROUP BY ec.employee_name
+        """, {
+            'period_start': period_start,
+            'period_end': period_end,
+            'employees': list(employees)
+        })
+
+        by_employee = {}
+        for row in cur.fetchall():
+            metrics = dict(row)
+            employee = metrics.pop('employee_name')
+            metrics['avg_ring_time_seconds'] = None
+            by_employee[employee] = metrics
+        return by_employee
+
     # =========================================================================
     # TICKET METRICS
     # =========================================================================
 
+    @staticmethod
+    def _empty_ticket_metrics() -> Dict:
+        """Ticket metrics for an employee with no mapped Freshdesk agent."""
+        return {
+            'tickets_opened': 0,
+            'tickets_closed': 0,
+            'tickets_open_total': 0,
+            'tickets_over_1_day': 0,
+            'tickets_over_3_days': 0,
+            'tickets_over_5_days': 0,
+            'tickets_over_7_days': 0,
+            'avg_first_response_minutes': None,
+            'first_contact_resolution_rate': 0,
+            'aging_distribution': {
+                '0-1 days': 0,
+                '1-3 days': 0,
+                '3-5 days': 0,
+                '5-7 days': 0,
+                '7+ days': 0
+            }
+        }
+
+    def _get_ticket_metrics_by_employee(self, cur, employees: List[str],
+                                        period_start: date, period_end: date) -> Dict[str, Dict]:
+        """
+        Ticket counts and open-ticket aging for every employee in `employees`
+        (via Freshdesk agent mapping) with one GROUP BY query. Each ticket
+        row counts once per employee, however many agent map rows resolve
+        to them.
+        """
+        cur.execute("""
+            SELECT
+                q.employee_name,
+                COUNT(*) FILTER (WHERE q.created_at::date BETWEEN %(period_start)s AND %(period_end)s)
+                    as tickets_opened,
+                COUNT(*) FILTER (WHERE q.resolved_at::date BETWEEN %(period_start)s AND %(period_end)s)
+                    as tickets_closed,
+                COUNT(*) FILTER (WHERE q.resolved_at IS NULL)
+                    as tickets_open_total,
+                -- Aging breakdown (for open tickets)
+                COUNT(*) FILTER (WHERE q.resolved_at IS NULL
+                                   AND NOW() - q.created_at < INTERVAL '1 day') as d0_1,
+                COUNT(*) FILTER (WHERE q.resolved_at IS NULL
+                                   AND NOW() - q.created_at >= INTERVAL '1 day'
+                                   AND NOW() - q.created_at < INTERVAL '3 days') as d1_3,
+                COUNT(*) FILTER (WHERE q.resolved_at IS NULL
+                                   AND NOW() - q.created_at >= INTERVAL '3 days'
+                                   AND NOW() - q.created_at < INTERVAL '5 days') as d3_5,
+                COUNT(*) FILTER (WHERE q.resolved_at IS NULL
+                                   AND NOW() - q.created_at >= INTERVAL '5 days'
+                                   AND NOW() - q.created_at < INTERVAL '7 days') as d5_7,
+                COUNT(*) FILTER (WHERE q.resolved_at IS NULL
+                                   AND NOW() - q.created_at >= INTERVAL '7 days') as d7_plus,
+                COUNT(*) FILTER (WHERE q.resolved_at IS NULL
+                                   AND NOW() - q.created_at >= INTERVAL '1 day') as over_1,
+                COUNT(*) FILTER (WHERE q.resolved_at IS NULL
+                                   AND NOW() - q.created_at >= INTERVAL '3 days') as over_3,
+                COUNT(*) FILTER (WHERE q.resolved_at IS NULL
+                                   AND NOW() - q.created_at >= INTERVAL '5 days') as over_5,
+                COUNT(*) FILTER (WHERE q.resolved_at IS NULL
+                                   AND NOW() - q.created_at >= INTERVAL '7 days') as over_7
+            FROM (
+                SELECT DISTINCT q.id, q.created_at, q.resolved_at,
+                       COALESCE(a.canonical_name, f.pcr_employee_name) as employee_name
+                FROM kb_freshdesk_qa q
+                JOIN freshdesk_agent_map f ON q.agent_name = f.freshdesk_agent_name
+                LEFT JOIN employee_name_aliases a ON a.raw_name = f.pcr_employee_name
+                WHERE f.pcr_employee_name IS NOT NULL
+                  AND COALESCE(a.canonical_name, f.pcr_employee_name) = ANY(%(employees)s)
+            ) q
+            GROUP BY q.employee_name
+        """, {'period_start': period_start, 'period_end': period_end, 'employees': list(employees)})
+
+        by_employee = {}
+        for row in cur.fetchall():
+            by_employee[row['employee_name']] = {
+                'tickets_opened': row['tickets_opened'] or 0,
+                'tickets_closed': row['tickets_closed'] or 0,
+                'tickets_open_total': row['tickets_open_total'] or 0,
+                'tickets_over_1_day': row['over_1'] or 0,
+                'tickets_over_3_days': row['over_3'] or 0,
+                'tickets_over_5_days': row['over_5'] or 0,
+                'tickets_over_7_days': row['over_7'] or 0,
+                'avg_first_response_minutes': None,  # Not tracked in current schema
+                'first_contact_resolution_rate': 0,   # Would need more data
+                'aging_distribution': {
+                    '0-1 days': row['d0_1'] or 0,
+                    '1-3 days': row['d1_3'] or 0,
+                    '3-5 days': row['d3_5'] or 0,
+                    '5-7 days': row['d5_7'] or 0,
+                    '7+ days': row['d7_plus'] or 0
+                }
+            }
+        return by_employee
+
     def get_ticket_metrics(self, employee_name: str, period: str,
                            start_date: str = None,
                            end_date: str = None) -> Dict:
@@ -390,151 +561,91 @@ class DashboardMetricsService:
             tickets_over_5_days, aging_distribution
         """
         period_start, period_end = self.get_period_dates(period, start_date, end_date)
+        canonical = canonicalize_employee_name(employee_name) or employee_name
 
         with self.get_connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                # Get Freshdesk agent names for this employee
-                cur.execute("""
-                    SELECT freshdesk_agent_name FROM freshdesk_agent_map
-                    WHERE pcr_employee_name = %s
-                """, (employee_name,))
-                agent_names = [row['freshdesk_agent_name'] for row in cur.fetchall()]
-
-                if not agent_names:
-                    # No mapping - return zeros
-                    return {
-                        'tickets_opened': 0,
-                        'tickets_closed': 0,
-                        'tickets_open_total': 0,
-                        'tickets_over_1_day': 0,
-                        'tickets_over_3_days': 0,
-                        'tickets_over_5_days': 0,
-                        'tickets_over_7_days': 0,
-                        'avg_first_response_minutes': None,
-                        'first_contact_resolution_rate': 0,
-                        'aging_distribution': {
-                            '0-1 days': 0,
-                            '1-3 days': 0,
-                            '3-5 days': 0,
-                            '5-7 days': 0,
-                            '7+ days': 0
-                        }
-                    }
-
-                # Get ticket counts
-                cur.execute("""
-                    SELECT
-                        COUNT(*) FILTER (WHERE created_at::date BETWEEN %s AND %s)
-                            as tickets_opened,
-                        COUNT(*) FILTER (WHERE resolved_at::date BETWEEN %s AND %s)
-                            as tickets_closed,
-                        COUNT(*) FILTER (WHERE resolved_at IS NULL)
-                            as tickets_open_total
-                    FROM kb_freshdesk_qa
-                    WHERE agent_name = ANY(%s)
-                """, (period_start, period_end, period_start, period_end, agent_names))
-                counts = dict(cur.fetchone())
-
-                # Get aging breakdown (for open tickets)
-                cur.execute("""
-                    SELECT
-                        COUNT(*) FILTER (WHERE NOW() - created_at < INTERVAL '1 day') as d0_1,
-                        COUNT(*) FILTER (WHERE NOW() - created_at >= INTERVAL '1 day'
-                                           AND NOW() - created_at < INTERVAL '3 days') as d1_3,
-                        COUNT(*) FILTER (WHERE NOW() - created_at >= INTERVAL '3 days'
-                                           AND NOW() - created_at < INTERVAL '5 days') as d3_5,
-                        COUNT(*) FILTER (WHERE NOW() - created_at >= INTERVAL '5 days'
-                                           AND NOW() - created_at < INTERVAL '7 days') as d5_7,
-                        COUNT(*) FILTER (WHERE NOW() - created_at >= INTERVAL '7 days') as d7_plus,
-                        COUNT(*) FILTER (WHERE NOW() - created_at >= INTERVAL '1 day') as over_1,
-                        COUNT(*) FILTER (WHERE NOW() - created_at >= INTERVAL '3 days') as over_3,
-                        COUNT(*) FILTER (WHERE NOW() - created_at >= INTERVAL '5 days') as over_5,
-                        COUNT(*) FILTER (WHERE NOW() - created_at >= INTERVAL '7 days') as over_7
-                    FROM kb_freshdesk_qa
-                    WHERE agent_name = ANY(%s)
-                      AND resolved_at IS NULL
-                """, (agent_names,))
-                aging = dict(cur.fetchone())
-
-                return {
-                    'tickets_opened': counts['tickets_opened'] or 0,
-                    'tickets_closed': counts['tickets_closed'] or 0,
-                    'tickets_open_total': counts['tickets_open_total'] or 0,
-                    'tickets_over_1_day': aging['over_1'] or 0,
-                    'tickets_over_3_days': aging['over_3'] or 0,
-                    'tickets_over_5_days': aging['over_5'] or 0,
-                    'tickets_over_7_days': aging['over_7'] or 0,
-                    'avg_first_response_minutes': None,  # Not tracked in current schema
-                    'first_contact_resolution_rate': 0,   # Would need more data
-                    'aging_distribution': {
-                        '0-1 days': aging['d0_1'] or 0,
-                        '1-3 days': aging['d1_3'] or 0,
-                        '3-5 days': aging['d3_5'] or 0,
-                        '5-7 days': aging['d5_7'] or 0,
-                        '7+ days': aging['d7_plus'] or 0
-                    }
-                }
+                return self._get_ticket_metrics_by_employee(
+                    cur, [canonical], period_start, period_end
+                ).get(canonical) or self._empty_ticket_metrics()
 
     # =========================================================================
     # QUALITY METRICS
     # =========================================================================
 
-    def get_quality_metrics(self, employee_name: str, period: str,
-                            start_date: str = None,
-                            end_date: str = None) -> Dict:
-        """
-        Get call quality metrics from insights table.
+    @staticmethod
+    def _empty_quality_metrics() -> Dict:
+        """Quality metrics for an employee with no analyzed calls."""
+        return {
+            'avg_quality_score': 0.0,
+            'sentiment_distribution': {
+                'positive': 0,
+                'negative': 0,
+                'neutral': 0
+            },
+            'positive_sentiment_rate': 0,
+            'escalation_count': 0,
+            'first_contact_resolution_count': 0,
+            'churn_risk_high_count': 0
+        }
 
-        Returns dict with:
-            avg_quality_score, sentiment_distribution,
-            escalation_count, first_contact_resolution_count, churn_risk_high_count
+    def _get_quality_metrics_by_employee(self, cur, employees: List[str],
+                                         period_start: date, period_end: date) -> Dict[str, Dict]:
         """
-        period_start, period_end = self.get_period_dates(period, start_date, end_date)
-
-        # Get all name variations for this employee
-        name_variations = get_employee_name_variations(employee_name)
-        name_patterns = [f'%{v}%' for v in name_variations]
-
-        with self.get_connection() as conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                # Get quality metrics from insights joined with transcripts
-                cur.execute("""
-                    SELECT
-                        AVG(i.call_quality_score) as avg_quality_score,
-                        COUNT(*) FILTER (WHERE i.customer_sentiment = 'positive') as positive_count,
-                        COUNT(*) FILTER (WHERE i.customer_sentiment = 'negative') as negative_count,
-                        COUNT(*) FILTER (WHERE i.customer_sentiment = 'neutral') as neutral_count,
-                        COUNT(*) FILTER (WHERE i.escalation_required = true) as escalation_count,
-                        COUNT(*) FILTER (WHERE i.first_call_resolution = true)
-                            as first_contact_resolution
-                    FROM insights i
-                    JOIN transcripts t ON i.recording_id = t.recording_id
-                    WHERE t.call_date BETWEEN %s AND %s
-                      AND t.employee_name ILIKE ANY(%s)
-                """, (period_start, period_end, name_patterns))
-
-                quality = dict(cur.fetchone())
-
-                # Get churn risk from call_resolutions
-                cur.execute("""
-                    SELECT COUNT(*) as high_churn_count
-                    FROM call_resolutions r
-                    JOIN transcripts t ON r.recording_id = t.recording_id
-                    WHERE t.call_date BETWEEN %s AND %s
-                      AND t.employee_name ILIKE ANY(%s)
-                      AND r.churn_risk = 'high'
-                """, (period_start, period_end, name_patterns))
-
-                churn = cur.fetchone()
-
+        Insight and churn metrics for every employee in `employees` with two
+        GROUP BY queries over transcripts resolved through employee_name_aliases.
+        """
+        params = {'period_start': period_start, 'period_end': period_end, 'employees': list(employees)}
+
+        # Get quality metrics from insights joined with transcripts
+        cur.execute("""
+            SELECT
+                COALESCE(a.canonical_name, t.employee_name) as employee_name,
+                AVG(i.call_quality_score) as avg_quality_score,
+                COUNT(*) FILTER (WHERE i.customer_sentiment = 'positive') as positive_count,
+                COUNT(*) FILTER (WHERE i.customer_sentiment = 'negative') as negative_count,
+                COUNT(*) FILTER (WHERE i.customer_sentiment = 'neutral') as neutral_count,
+                COUNT(*) FILTER (WHERE i.escalation_required = true) as escalation_count,
+                COUNT(*) FILTER (WHERE i.first_call_resolution = true)
+                    as first_contact_resolution
+            FROM insights i
+            JOIN transcripts t ON i.recording_id = t.recording_id
+            LEFT JOIN employee_name_aliases a ON a.raw_name = t.employee_name
+            WHERE t.call_date BETWEEN %(period_start)s AND %(period_end)s
+              AND COALESCE(a.canonical_name, t.employee_name) = ANY(%(employees)s)
+            GROUP BY COALESCE(a.canonical_name, t.employee_name)
+        """, params)
+        quality_rows = {row['employee_name']: row for row in cur.fetchall()}
+
+        # Get churn risk from call_resolutions
+        cur.execute("""
+            SELECT
+                COALESCE(a.canonical_name, t.employee_name) as employee_name,
+                COUNT(*) as high_churn_count
+            FROM call_resolutions r
+            JOIN transcripts t ON r.recording_id = t.recording_id
+            LEFT JOIN employee_name_aliases a ON a.raw_name = t.employee_name
+            WHERE t.call_date BETWEEN %(period_start)s AND %(period_end)s
+              AND COALESCE(a.canonical_name, t.employee_name) = ANY(%(employees)s)
+              AND r.churn_risk = 'high'
+            GROUP BY COALESCE(a.canonical_name, t.employee_name)
+        """, params)
+        churn_counts = {row['employee_name']: row['high_churn_count'] for row in cur.fetchall()}
+
+        by_employee = {}
+        for employee in set(quality_rows) | set(churn_counts):
+            metrics = self._empty_quality_metrics()
+            metrics['churn_risk_high_count'] = churn_counts.get(employee, 0)
+
+            quality = quality_rows.get(employee)
+            if quality:
                 # Calculate sentiment distribution
                 total_sentiment = (
                     (quality['positive_count'] or 0) +
                     (quality['negative_count'] or 0) +
                     (quality['neutral_count'] or 0)
                 )
-
-                return {
+                metrics.update({
                     'avg_quality_score': round(float(quality['avg_quality_score'] or 0), 1),
                     'sentiment_distribution': {
                         'positive': quality['positive_count'] or 0,
@@ -546,8 +657,28 @@ class DashboardMetricsService:
                     ) if total_sentiment > 0 else 0,
                     'escalation_count': quality['escalation_count'] or 0,
                     'first_contact_resolution_count': quality['first_contact_resolution'] or 0,
-                    'churn_risk_high_count': churn['high_churn_count'] if churn else 0
-                }
+                })
+            by_employee[employee] = metrics
+        return by_employee
+
+    def get_quality_metrics(self, employee_name: str, period: str,
+                            start_date: str = None,
+                            end_date: str = None) -> Dict:
+        """
+        Get call quality metrics from insights table.
+
+        Returns dict with:
+            avg_quality_score, sentiment_distribution,
+            escalation_count, first_contact_resolution_count, churn_risk_high_count
+        """
+        period_start, period_end = self.get_period_dates(period, start_date, end_date)
+        canonical = canonicalize_employee_name(employee_name) or employee_name
+
+        with self.get_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                return self._get_quality_metrics_by_employee(
+                    cur, [canonical], period_start, period_end
+                ).get(canonical) or self._empty_quality_metrics()
 
     # =========================================================================
     # PRODUCTIVITY SCORE
@@ -639,32 +770,74 @@ class DashboardMetricsService:
     # COMBINED METRICS
     # =========================================================================
 
+    def get_metrics_by_employee(self, period: str,
+                                start_date: str = None,
+                                end_date: str = None,
+                                employees: List[str] = None) -> Dict[str, Dict]:
+        """
+        Get combined metrics for many employees at once.
+
+        Runs a fixed handful of GROUP BY queries over call_log, transcripts,
+        call_conversation_dynamics, insights and kb_freshdesk_qa, however
+        many employees are requested.
+
+        Args:
+            period: Time period
+            start_date: For custom period (YYYY-MM-DD)
+            end_date: For custom period (YYYY-MM-DD)
+            employees: Canonical employee names (default: all canonical employees)
+
+        Returns:
+            Dict of employee name -> combined metrics (see get_combined_metrics)
+        """
+        period_start, period_end = self.get_period_dates(period, start_date, end_date)
+        if employees is None:
+            employees = get_canonical_employee_list()
+        employees = list(employees)
+
+        with self.get_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                calls = self._get_call_metrics_by_employee(cur, employees, period_start, period_end)
+                tickets = self._get_ticket_metrics_by_employee(cur, employees, period_start, period_end)
+                quality = self._get_quality_metrics_by_employee(cur, employees, period_start, period_end)
+                talk_time = self._get_talk_time_metrics_by_employee(cur, employees, period_start, period_end)
+
+                generated_at = datetime.now().isoformat()
+                by_employee = {}
+                for emp in employees:
+                    call_metrics = calls.get(emp) or self._empty_call_metrics()
+                    call_metrics.update(talk_time.get(emp) or self._empty_talk_time_metrics())
+                    ticket_metrics = tickets.get(emp) or self._empty_ticket_metrics()
+                    quality_metrics = quality.get(emp) or self._empty_quality_metrics()
+
+                    by_employee[emp] = {
+                        'employee_name': emp,
+                        'period': period,
+                        'period_dates': {
+                            'start': period_start.isoformat(),
+                            'end': period_end.isoformat()
+                        },
+                        'calls': call_metrics,
+                        'tickets': ticket_metrics,
+                        'quality': quality_metrics,
+                        'productivity': self.calculate_productivity_score(
+                            call_metrics, ticket_metrics, quality_metrics
+                        ),
+                        'generated_at': generated_at
+                    }
+
+        return by_employee
+
     def get_combined_metrics(self, employee_name: str, period: str,
                              start_date: str = None,
                              end_date: str = None) -> Dict:
         """Get all metrics combined for dashboard display."""
-        period_start, period_end = self.get_period_dates(period, start_date, end_date)
-
-        call_metrics = self.get_call_metrics(employee_name, period, start_date, end_date)
-        ticket_metrics = self.get_ticket_metrics(employee_name, period, start_date, end_date)
-        quality_metrics = self.get_quality_metrics(employee_name, period, start_date, end_date)
-        productivity = self.calculate_productivity_score(
-            call_metrics, ticket_metrics, quality_metrics
-        )
-
-        return {
-            'employee_name': employee_name,
-            'period': period,
-            'period_dates': {
-                'start': period_start.isoformat(),
-                'end': period_end.isoformat()
-            },
-            'calls': call_metrics,
-            'tickets': ticket_metrics,
-            'quality': quality_metrics,
-            'productivity': productivity,
-            'generated_at': datetime.now().isoformat()
-        }
+        canonical = canonicalize_employee_name(employee_name) or employee_name
+        metrics = self.get_metrics_by_employee(
+            period, start_date, end_date, employees=[canonical]
+        )[canonical]
+        metrics['employee_name'] = employee_name
+        return metrics
 
     # =========================================================================
     # TEAM METRICS (for Admin Dashboard)
@@ -683,20 +856,13 @@ class DashboardMetricsService:
             List of employee metrics, sorted by productivity score
         """
         # Use canonical employee list to ensure consistent names
-        canonical_employees = get_canonical_employee_list()
-
-        team = []
-        for emp in canonical_employees:
-            try:
-                metrics = self.get_combined_metrics(emp, period)
-                # Only include if they have activity
-                if (metrics['calls']['total_calls'] >= min_activity or
-                    metrics['tickets']['tickets_opened'] >= min_activity or
-                    metrics['tickets']['tickets_closed'] >= min_activity):
-                    team.append(metrics)
-            except Exception as e:
-                logger.warning(f"Error getting metrics for {emp}: {e}")
-                continue
+        team = [
+            metrics for metrics in self.get_metrics_by_employee(period).values()
+            # Only include if they have activity
+            if (metrics['calls']['total_calls'] >= min_activity or
+                metrics['tickets']['tickets_opened'] >= min_activity or
+                metrics['tickets']['tickets_closed'] >= min_activity)
+        ]
 
         # Sort by productivity score descending
         team.sort(key=lambda x: x['productivity']['score'], reverse=True)
@@ -719,27 +885,23 @@ class DashboardMetricsService:
         logger.info(f"Aggregating daily metrics for {metric_date}")
 
         # Use canonical employee list - only these 22 employees
-        canonical_employees = get_canonical_employee_list()
+        team = self.get_metrics_by_employee(
+            'custom',
+            start_date=metric_date.isoformat(),
+            end_date=metric_date.isoformat()
+        )
 
         count = 0
-        for emp in canonical_employees:
-            try:
-                # Get metrics using canonical name (get_combined_metrics handles variations)
-                metrics = self.get_combined_metrics(
-                    emp, 'custom',
-                    start_date=metric_date.isoformat(),
-                    end_date=metric_date.isoformat()
-                )
-
-                # Only save if there's activity
-                if (metrics['calls']['total_calls'] > 0 or
-                    metrics['tickets']['tickets_opened'] > 0 or
-                    metrics['tickets']['tickets_closed'] > 0):
+        for emp, metrics in team.items():
+            # Only save if there's activity
+            if (metrics['calls']['total_calls'] > 0 or
+                metrics['tickets']['tickets_opened'] > 0 or
+                metrics['tickets']['tickets_closed'] > 0):
+                try:
                     self._save_daily_metrics(emp, metric_date, metrics)
                     count += 1
-
-            except Exception as e:
-                logger.error(f"Error aggregating metrics for {emp}: {e}")
+                except Exception as e:
+                    logger.error(f"Error saving metrics for {emp}: {e}")
 
         logger.info(f"Aggregated metrics for {count} employees")
         return count
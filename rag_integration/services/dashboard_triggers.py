@@ -8,14 +8,17 @@ import os
 import logging
 import smtplib
 import ssl
+import operator
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime, date, timedelta
 from typing import Optional, List, Dict, Any
 import json
+from contextlib import contextmanager
 
-import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
+
+from rag_integration.services.db_pool import pooled_connection
 
 logger = logging.getLogger(__name__)
 
@@ -38,9 +41,11 @@ class DashboardTriggerService:
         self.default_from = self.smtp_user
         self.default_to = os.getenv('ALERT_EMAIL_TO', 'sabbey@mainsequence.net')
 
+    @contextmanager
     def _get_connection(self):
-        """Get a database connection."""
-        return psycopg2.connect(self.db_url)
+        """Get a pooled database connection (uncommitted work is rolled back on exit)."""
+        with pooled_connection(self.db_url) as conn:
+            yield conn
 
     # =========================================
     # CRUD Operations
@@ -71,8 +76,7 @@ class DashboardTriggerService:
         Returns:
             The new trigger ID
         """
-        conn = self._get_connection()
-        try:
+        with self._get_connection() as conn:
             with conn.cursor() as cur:
                 cur.execute("""
                     INSERT INTO dashboard_email_triggers (
@@ -116,13 +120,10 @@ class DashboardTriggerService:
                 conn.commit()
                 logger.info(f"Created trigger {trigger_id}: {config.get('name')}")
                 return trigger_id
-        finally:
-            conn.close()
 
     def update_trigger(self, trigger_id: int, updates: dict) -> bool:
         """Update an existing trigger."""
-        conn = self._get_connection()
-        try:
+        with self._get_connection() as conn:
             # Build dynamic update query
             set_clauses = []
             values = []
@@ -158,13 +159,10 @@ class DashboardTriggerService:
                 """, values)
                 conn.commit()
                 return cur.rowcount > 0
-        finally:
-            conn.close()
 
     def delete_trigger(self, trigger_id: int) -> bool:
         """Delete a trigger."""
-        conn = self._get_connection()
-        try:
+        with self._get_connection() as conn:
             with conn.cursor() as cur:
                 cur.execute(
                     "DELETE FROM dashboard_email_triggers WHERE id = %s",
@@ -172,26 +170,20 @@ class DashboardTriggerService:
                 )
                 conn.commit()
                 return cur.rowcount > 0
-        finally:
-            conn.close()
 
     def get_trigger(self, trigger_id: int) -> Optional[dict]:
         """Get a single trigger by ID."""
-        conn = self._get_connection()
-        try:
+        with self._get_connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 cur.execute("""
                     SELECT * FROM dashboard_email_triggers WHERE id = %s
                 """, (trigger_id,))
                 row = cur.fetchone()
                 return dict(row) if row else None
-        finally:
-            conn.close()
 
     def list_triggers(self, active_only: bool = False) -> List[dict]:
         """List all triggers."""
-        conn = self._get_connection()
-        try:
+        with self._get_connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 query = "SELECT * FROM dashboard_email_triggers"
                 if active_only:
@@ -199,13 +191,48 @@ class DashboardTriggerService:
                 query += " ORDER BY name"
                 cur.execute(query)
                 return [dict(row) for row in cur.fetchall()]
-        finally:
-            conn.close()
 
     # =========================================
     # Trigger Evaluation
     # =========================================
 
+    # Map metric names to locations in the metrics dict
+    METRIC_PATHS = {
+        'answer_rate': ('calls', 'answer_rate'),
+        'total_calls': ('calls', 'total_calls'),
+        'avg_duration': ('calls', 'avg_duration_seconds'),
+        'missed_calls': ('calls', 'missed_calls'),
+        'tickets_open_total': ('tickets', 'tickets_open_total'),
+        'tickets_over_5_days': ('tickets', 'tickets_over_5_days'),
+        'tickets_closed': ('tickets', 'tickets_closed'),
+        'avg_quality_score': ('quality', 'avg_quality_score'),
+        'escalation_count': ('quality', 'escalation_count'),
+        'churn_risk_high_count': ('quality', 'churn_risk_high_count'),
+        'productivity_score': ('productivity', 'score'),
+    }
+
+    OPERATORS = {
+        'less_than': operator.lt,
+        'less_than_or_equal': operator.le,
+        'greater_than': operator.gt,
+        'greater_than_or_equal': operator.ge,
+        'equals': operator.eq,
+        'not_equals': operator.ne,
+    }
+
+    def _get_metric_value(self, metric_name: str, metrics: dict) -> Any:
+        """Get a metric value from the nested metrics dict (None if absent)."""
+        if metric_name in self.METRIC_PATHS:
+            path = self.METRIC_PATHS[metric_name]
+            section = metrics.get(path[0], {})
+            return section.get(path[1], 0)
+
+        # Try to find it directly
+        for section in ['calls', 'tickets', 'quality', 'productivity']:
+            if metric_name in metrics.get(section, {}):
+                return metrics[section][metric_name]
+        return None
+
     def evaluate_condition(self, condition: dict, metrics: dict) -> bool:
         """
         Evaluate a single condition against metrics.
@@ -217,78 +244,40 @@ class DashboardTriggerService:
         Returns:
             True if condition is met (trigger should fire)
         """
-        metric_name = condition.get('metric')
-        operator = condition.get('operator', 'less_than')
-        threshold = condition.get('value', 0)
+        return self.evaluate_condition_batch(condition, [metrics])[0]
 
-        # Get the metric value from the nested structure
-        actual_value = None
-
-        # Map metric names to locations in the metrics dict
-        metric_paths = {
-            'answer_rate': ('calls', 'answer_rate'),
-            'total_calls': ('calls', 'total_calls'),
-            'avg_duration': ('calls', 'avg_duration_seconds'),
-            'missed_calls': ('calls', 'missed_calls'),
-            'tickets_open_total': ('tickets', 'tickets_open_total'),
-            'tickets_over_5_days': ('tickets', 'tickets_over_5_days'),
-            'tickets_closed': ('tickets', 'tickets_closed'),
-            'avg_quality_score': ('quality', 'avg_quality_score'),
-            'escalation_count': ('quality', 'escalation_count'),
-            'churn_risk_high_count': ('quality', 'churn_risk_high_count'),
-            'productivity_score': ('productivity', 'score'),
-        }
+    def evaluate_condition_batch(self, condition: dict, metrics_list: List[dict]) -> List[bool]:
+        """
+        Evaluate a single condition against many employees' metrics.
 
-        if metric_name in metric_paths:
-            path = metric_paths[metric_name]
-            section = metrics.get(path[0], {})
-            actual_value = section.get(path[1], 0)
-        else:
-            # Try to find it directly
-            for section in ['calls', 'tickets', 'quality', 'productivity']:
-                if metric_name in metrics.get(section, {}):
-                    actual_value = metrics[section][metric_name]
-                    break
+        Args:
+            condition: Dict with 'metric', 'operator', 'value'
+            metrics_list: Metrics for each employee
 
-        if actual_value is None:
-            logger.warning(f"Metric '{metric_name}' not found in metrics")
-            return False
+        Returns:
+            List of booleans, one per entry in metrics_list
+        """
+        metric_name = condition.get('metric')
+        op_name = condition.get('operator', 'less_than')
+        threshold = condition.get('value', 0)
 
-        # Compare based on operator
-        if operator == 'less_than':
-            return actual_value < threshold
-        elif operator == 'less_than_or_equal':
-            return actual_value <= threshold
-        elif operator == 'greater_than':
-            return actual_value > threshold
-        elif operator == 'greater_than_or_equal':
-            return actual_value >= threshold
-        elif operator == 'equals':
-            return actual_value == threshold
-        elif operator == 'not_equals':
-            return actual_value != threshold
-        else:
-            logger.warning(f"Unknown operator: {operator}")
-            return False
+        compare = self.OPERATORS.get(op_name)
+        if compare is None:
+            logger.warning(f"Unknown operator: {op_name}")
+            return [False] * len(metrics_list)
 
-    def evaluate_trigger(self, trigger: dict, employee_name: str,
-                         metrics: dict) -> dict:
-        """
-        Evaluate a trigger for a specific employee.
+        values = [self._get_metric_value(metric_name, m) for m in metrics_list]
+        if any(v is None for v in values):
+            logger.warning(f"Metric '{metric_name}' not found in metrics")
 
-        Returns:
-            dict with 'should_fire', 'reason', 'metric_values'
-        """
-        result = {
-            'should_fire': False,
-            'reason': '',
-            'metric_values': {},
-            'conditions_met': []
-        }
+        return [v is not None and compare(v, threshold) for v in values]
 
+    @staticmethod
+    def _get_conditions(trigger: dict) -> List[dict]:
+        """Normalize a trigger's conditions to a list of condition dicts."""
         conditions = trigger.get('conditions', {})
         if not conditions:
-            return result
+            return []
 
         # Handle both single condition dict and list of conditions
         if isinstance(conditions, dict) and 'metric' in conditions:
@@ -299,39 +288,95 @@ class DashboardTriggerService:
         if not isinstance(conditions, list):
             conditions = [conditions]
 
+        return conditions
+
+    def evaluate_trigger(self, trigger: dict, employee_name: str,
+                         metrics: dict) -> dict:
+        """
+        Evaluate a trigger for a specific employee.
+
+        Returns:
+            dict with 'should_fire', 'reason', 'metric_values'
+        """
+        return self.evaluate_trigger_batch(trigger, {employee_name: metrics})[employee_name]
+
+    def evaluate_trigger_batch(self, trigger: dict,
+                               team_metrics: Dict[str, dict]) -> Dict[str, dict]:
+        """
+        Evaluate a trigger for many employees at once.
+
+        Each condition is evaluated across all employees in one pass, so
+        the cost is one comparison per condition per employee.
+
+        Args:
+            trigger: Trigger configuration
+            team_metrics: Employee name -> metrics (from get_metrics_by_employee)
+
+        Returns:
+            Employee name -> dict with 'should_fire', 'reason', 'metric_values'
+        """
+        employees = list(team_metrics)
+        metrics_list = [team_metrics[emp] for emp in employees]
+
+        results = {
+            emp: {
+                'should_fire': False,
+                'reason': '',
+                'metric_values': {},
+                'conditions_met': []
+            }
+            for emp in employees
+        }
+
+        conditions = self._get_conditions(trigger)
+        if not conditions:
+            return results
+
         logic = trigger.get('condition_logic', 'AND')
-        met_conditions = []
 
         for cond in conditions:
             if not isinstance(cond, dict):
                 continue
 
-            is_met = self.evaluate_condition(cond, metrics)
+            for emp, is_met in zip(employees, self.evaluate_condition_batch(cond, metrics_list)):
+                if is_met:
+                    result = results[emp]
+                    result['conditions_met'].append(cond)
+                    result['metric_values'][cond.get('metric')] = {
+                        'threshold': cond.get('value'),
+                        'operator': cond.get('operator'),
+                    }
+
+        for result in results.values():
+            met_conditions = result['conditions_met']
+
+            # Determine if trigger fires based on logic
+            if logic == 'AND':
+                result['should_fire'] = len(met_conditions) == len(conditions)
+            else:  # OR
+                result['should_fire'] = len(met_conditions) > 0
+
+            if result['should_fire']:
+                reasons = []
+                for cond in met_conditions:
+                    reasons.append(
+                        f"{cond.get('metric')} {cond.get('operator')} {cond.get('value')}"
+                    )
+                result['reason'] = ', '.join(reasons)
 
-            if is_met:
-                met_conditions.append(cond)
-                result['metric_values'][cond.get('metric')] = {
-                    'threshold': cond.get('value'),
-                    'operator': cond.get('operator'),
-                }
+        return results
 
-        result['conditions_met'] = met_conditions
+    @staticmethod
+    def _cooldown_elapsed(last_triggered_at: Optional[datetime],
+                          cooldown_minutes: Optional[int]) -> bool:
+        """True if a trigger last fired at last_triggered_at may fire again."""
+        if not last_triggered_at:
+            return True
 
-        # Determine if trigger fires based on logic
-        if logic == 'AND':
-            result['should_fire'] = len(met_conditions) == len(conditions)
-        else:  # OR
-            result['should_fire'] = len(met_conditions) > 0
+        cooldown = cooldown_minutes or 60
+        cutoff = datetime.now() - timedelta(minutes=cooldown)
 
-        if result['should_fire']:
-            reasons = []
-            for cond in met_conditions:
-                reasons.append(
-                    f"{cond.get('metric')} {cond.get('operator')} {cond.get('value')}"
-                )
-            result['reason'] = ', '.join(reasons)
-
-        return result
+        return last_triggered_at < cutoff
 
     def check_cooldown(self, trigger_id: int) -> bool:
         """
@@ -340,26 +385,30 @@ class DashboardTriggerService:
         Returns:
             True if trigger can fire (not in cooldown)
         """
-        conn = self._get_connection()
-        try:
+        return self.get_cooldown_status([trigger_id]).get(trigger_id, True)
+
+    def get_cooldown_status(self, trigger_ids: List[int]) -> Dict[int, bool]:
+        """
+        Check the cooldown of many triggers with one query.
+
+        Returns:
+            Trigger id -> True if the trigger can fire (not in cooldown)
+        """
+        if not trigger_ids:
+            return {}
+
+        with self._get_connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 cur.execute("""
-                    SELECT last_triggered_at, cooldown_minutes
+                    SELECT id, last_triggered_at, cooldown_minutes
                     FROM dashboard_email_triggers
-                    WHERE id = %s
-                """, (trigger_id,))
-                row = cur.fetchone()
+                    WHERE id = ANY(%s)
+                """, (list(trigger_ids),))
 
-                if not row or not row['last_triggered_at']:
-                    return True
-
-                cooldown = row['cooldown_minutes'] or 60
-                last_triggered = row['last_triggered_at']
-                cutoff = datetime.now() - timedelta(minutes=cooldown)
-
-                return last_triggered < cutoff
-        finally:
-            conn.close()
+                return {
+                    row['id']: self._cooldown_elapsed(row['last_triggered_at'], row['cooldown_minutes'])
+                    for row in cur.fetchall()
+                }
 
     # =========================================
     # Email Sending
@@ -381,8 +430,7 @@ class DashboardTriggerService:
         # Get user's email if notify_user
         if trigger.get('notify_user') and employee_name:
             # Look up user's email
-            conn = self._get_connection()
-            try:
+            with self._get_connection() as conn:
                 with conn.cursor() as cur:
                     cur.execute("""
                         SELECT email FROM users
@@ -392,13 +440,10 @@ class DashboardTriggerService:
                     row = cur.fetchone()
                     if row and row[0] and row[0] not in recipients:
                         recipients.append(row[0])
-            finally:
-                conn.close()
 
         # Get all admin emails if notify_all_admins
         if trigger.get('notify_all_admins'):
-            conn = self._get_connection()
-            try:
+            with self._get_connection() as conn:
                 with conn.cursor() as cur:
                     cur.execute("""
                         SELECT email FROM users
@@ -407,8 +452,6 @@ class DashboardTriggerService:
                     for row in cur.fetchall():
                         if row[0] and row[0] not in recipients:
                             recipients.append(row[0])
-            finally:
-                conn.close()
 
         return recipients
 
@@ -553,18 +596,27 @@ To modify this trigger, visit the <a href="http://31.97.102.13:8081/admin/trigge
     # =========================================
 
     def fire_trigger(self, trigger: dict, employee_name: str,
-                     evaluation: dict, metrics: dict) -> dict:
+                     evaluation: dict, metrics: dict,
+                     record: bool = True) -> dict:
         """
         Fire a trigger - send notifications and log the event.
 
+        The trigger's last_triggered_at is saved as soon as it fires, on
+        its own, so a failed log write never loses the cooldown.
+
+        Args:
+            record: Write the log row now. Batch callers pass False and
+                hand result['log_entry'] to record_trigger_executions().
+
         Returns:
-            dict with 'success', 'email_sent', 'recipients', 'error'
+            dict with 'success', 'email_sent', 'recipients', 'error', 'log_entry'
         """
         result = {
             'success': False,
             'email_sent': False,
             'recipients': [],
-            'error': None
+            'error': None,
+            'log_entry': None
         }
 
         try:
@@ -581,14 +633,17 @@ To modify this trigger, visit the <a href="http://31.97.102.13:8081/admin/trigge
             if recipients:
                 result['email_sent'] = self.send_email(recipients, subject, body)
 
-            # Log the trigger execution
-            self._log_trigger_execution(
+            # Update trigger's last_triggered_at
+            self._update_trigger_timestamp(trigger['id'])
+
+            result['log_entry'] = self._build_log_entry(
                 trigger, employee_name, evaluation, metrics,
                 recipients, result['email_sent'], subject
             )
 
-            # Update trigger's last_triggered_at
-            self._update_trigger_timestamp(trigger['id'])
+            if record:
+                # Log the trigger execution
+                self.record_trigger_executions([result['log_entry']])
 
             result['success'] = True
 
@@ -598,55 +653,34 @@ To modify this trigger, visit the <a href="http://31.97.102.13:8081/admin/trigge
 
         return result
 
-    def _log_trigger_execution(self, trigger: dict, employee_name: str,
-                                evaluation: dict, metrics: dict,
-                                recipients: List[str], email_sent: bool,
-                                subject: str):
-        """Log a trigger execution to the dashboard_trigger_log table."""
-        conn = self._get_connection()
-        try:
-            with conn.cursor() as cur:
-                # Get first condition for logging
-                cond = evaluation.get('conditions_met', [{}])[0] if evaluation.get('conditions_met') else {}
-
-                cur.execute("""
-                    INSERT INTO dashboard_trigger_log (
-                        trigger_id, trigger_name, employee_name, period,
-                        metric_name, metric_value, threshold_value,
-                        metrics_snapshot, evaluation_result, trigger_reason,
-                        recipients, email_sent, email_subject, action_taken
-                    ) VALUES (
-                        %s, %s, %s, %s,
-                        %s, %s, %s,
-                        %s, %s, %s,
-                        %s, %s, %s, %s
-                    )
-                """, (
-                    trigger.get('id'),
-                    trigger.get('name'),
-                    employee_name,
-                    'today',  # TODO: get from context
-                    cond.get('metric'),
-                    evaluation.get('metric_values', {}).get(cond.get('metric'), {}).get('actual'),
-                    cond.get('value'),
-                    json.dumps(metrics),
-                    'triggered',
-                    evaluation.get('reason'),
-                    recipients,
-                    email_sent,
-                    subject,
-                    'email_sent' if email_sent else 'email_failed'
-                ))
-                conn.commit()
-        except Exception as e:
-            logger.error(f"Log trigger execution error: {e}")
-        finally:
-            conn.close()
+    def _build_log_entry(self, trigger: dict, employee_name: str,
+                         evaluation: dict, metrics: dict,
+                         recipients: List[str], email_sent: bool,
+                         subject: str) -> tuple:
+        """Build a dashboard_trigger_log row for a trigger execution."""
+        # Get first condition for logging
+        cond = evaluation.get('conditions_met', [{}])[0] if evaluation.get('conditions_met') else {}
+
+        return (
+            trigger.get('id'),
+            trigger.get('name'),
+            employee_name,
+            'today',  # TODO: get from context
+            cond.get('metric'),
+            evaluation.get('metric_values', {}).get(cond.get('metric'), {}).get('actual'),
+            cond.get('value'),
+            json.dumps(metrics, default=str),
+            'triggered',
+            evaluation.get('reason'),
+            recipients,
+            email_sent,
+            subject,
+            'email_sent' if email_sent else 'email_failed'
+        )
 
     def _update_trigger_timestamp(self, trigger_id: int):
         """Update the last_triggered_at timestamp."""
-        conn = self._get_connection()
-        try:
+        with self._get_connection() as conn:
             with conn.cursor() as cur:
                 cur.execute("""
                     UPDATE dashboard_email_triggers
@@ -655,15 +689,38 @@ To modify this trigger, visit the <a href="http://31.97.102.13:8081/admin/trigge
                     WHERE id = %s
                 """, (trigger_id,))
                 conn.commit()
-        finally:
-            conn.close()
+
+    def record_trigger_executions(self, log_entries: List[tuple]) -> int:
+        """
+        Insert trigger log rows in one statement.
+
+        Trigger timestamps are saved by fire_trigger, not here.
+
+        Returns:
+            Number of log rows written
+        """
+        if not log_entries:
+            return 0
+
+        with self._get_connection() as conn:
+            with conn.cursor() as cur:
+                execute_values(cur, """
+                    INSERT INTO dashboard_trigger_log (
+                        trigger_id, trigger_name, employee_name, period,
+                        metric_name, metric_value, threshold_value,
+                        metrics_snapshot, evaluation_result, trigger_reason,
+                        recipients, email_sent, email_subject, action_taken
+                    ) VALUES %s
+                """, log_entries)
+                conn.commit()
+
+        return len(log_entries)
 
     def get_trigger_history(self, trigger_id: int = None,
                             employee_name: str = None,
                             limit: int = 50) -> List[dict]:
         """Get trigger execution history."""
-        conn = self._get_connection()
-        try:
+        with self._get_connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 query = """
                     SELECT * FROM dashboard_trigger_log
@@ -684,8 +741,6 @@ To modify this trigger, visit the <a href="http://31.97.102.13:8081/admin/trigge
 
                 cur.execute(query, params)
                 return [dict(row) for row in cur.fetchall()]
-        finally:
-            conn.close()
 
 
 # Singleton instance
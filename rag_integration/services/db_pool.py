@@ -0,0 +1,311 @@
+"""
+Database Connection Pool - shared, bounded psycopg2 pools for the RAG services.
+
+Every service used to call psycopg2.connect() per method call, paying
+TCP + auth + SSL setup on each dashboard request. Services now borrow
+connections from a process-wide pool keyed by (dsn, readonly).
+"""
+
+import os
+import time
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.pool import ThreadedConnectionPool, PoolError
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Pool sizing (per dsn/readonly pair)
+POOL_MIN_CONN = int(os.getenv("RAG_DB_POOL_MIN", "1"))
+POOL_MAX_CONN = int(os.getenv("RAG_DB_POOL_MAX", "10"))
+# Seconds to wait for a free connection before raising PoolError
+POOL_ACQUIRE_TIMEOUT = float(os.getenv("RAG_DB_POOL_TIMEOUT", "30"))
+# Connections idle longer than this are pinged before being handed out
+POOL_HEALTH_CHECK_INTERVAL = float(os.getenv("RAG_DB_HEALTH_CHECK_INTERVAL", "30"))
+# Worker threads for running blocking report methods off the event loop
+BLOCKING_WORKERS = int(os.getenv("RAG_BLOCKING_WORKERS", str(POOL_MAX_CONN)))
+# Worker threads for LLM calls, kept apart so slow generations don't starve DB reads
+LLM_WORKERS = int(os.getenv("RAG_LLM_WORKERS", "8"))
+
+
+class ConnectionPool:
+    """Bounded, health-checked psycopg2 connection pool with saturation metrics."""
+
+    def __init__(
+        self,
+        dsn: str,
+        readonly: bool = False,
+        minconn: int = POOL_MIN_CONN,
+        maxconn: int = POOL_MAX_CONN,
+        acquire_timeout: float = POOL_ACQUIRE_TIMEOUT,
+        health_check_interval: float = POOL_HEALTH_CHECK_INTERVAL
+    ):
+        self.dsn = dsn
+        self.readonly = readonly
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.acquire_timeout = acquire_timeout
+        self.health_check_interval = health_check_interval
+
+        self._pool: Optional[ThreadedConnectionPool] = None
+        self._pool_lock = threading.Lock()
+        # ThreadedConnectionPool raises when exhausted; the semaphore makes callers wait instead
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._stats_lock = threading.Lock()
+        self._last_used: Dict[int, float] = {}
+        self._session_configured: set = set()
+
+        self._stats = {
+            'checkouts': 0,
+            'waits': 0,
+            'wait_time_ms': 0.0,
+            'timeouts': 0,
+            'health_checks': 0,
+            'discarded': 0,
+            'in_use': 0,
+            'peak_in_use': 0,
+        }
+
+    def _get_pool(self) -> ThreadedConnectionPool:
+        """Create the underlying pool on first use."""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadedConnectionPool(self.minconn, self.maxconn, self.dsn)
+        return self._pool
+
+    def _acquire_slot(self):
+        """Reserve a pool slot, waiting up to acquire_timeout."""
+        if self._slots.acquire(blocking=False):
+            return
+
+        start = time.monotonic()
+        acquired = self._slots.acquire(timeout=self.acquire_timeout)
+        waited_ms = (time.monotonic() - start) * 1000
+
+        with self._stats_lock:
+            self._stats['waits'] += 1
+            self._stats['wait_time_ms'] += waited_ms
+            if not acquired:
+                self._stats['timeouts'] += 1
+
+        if not acquired:
+            raise PoolError(
+                f"Timed out after {self.acquire_timeout}s waiting for a database connection "
+                f"({self.maxconn} in use)"
+            )
+
+    def _is_healthy(self, conn) -> bool:
+        """Check a pooled connection before handing it out."""
+        if conn.closed:
+            return False
+
+        # Freshly opened connections have no last-used time and skip the ping
+        last_used = self._last_used.get(id(conn))
+        if last_used is None or time.monotonic() - last_used < self.health_check_interval:
+            return True
+
+        with self._stats_lock:
+            self._stats['health_checks'] += 1
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _discard(self, pool: ThreadedConnectionPool, conn):
+        """Close a broken connection and drop it from the pool."""
+        self._last_used.pop(id(conn), None)
+        self._session_configured.discard(id(conn))
+        with self._stats_lock:
+            self._stats['discarded'] += 1
+        try:
+            pool.putconn(conn, close=True)
+        except PoolError:
+            pass
+
+    def _checkout(self):
+        """Get a healthy connection from the underlying pool."""
+        pool = self._get_pool()
+        conn = pool.getconn()
+        if not self._is_healthy(conn):
+            self._discard(pool, conn)
+            conn = pool.getconn()
+
+        if self.readonly and id(conn) not in self._session_configured:
+            conn.set_session(readonly=True)  # ENFORCE READ-ONLY
+            self._session_configured.add(id(conn))
+        return conn
+
+    def _checkin(self, conn):
+        """Return a connection to the pool with no open transaction."""
+        pool = self._get_pool()
+        if conn.closed:
+            self._discard(pool, conn)
+            return
+
+        try:
+            if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+        except psycopg2.Error:
+            self._discard(pool, conn)
+            return
+
+        self._last_used[id(conn)] = time.monotonic()
+        pool.putconn(conn)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of the with-block."""
+        self._acquire_slot()
+        try:
+            conn = self._checkout()
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._stats_lock:
+            self._stats['checkouts'] += 1
+            self._stats['in_use'] += 1
+            self._stats['peak_in_use'] = max(self._stats['peak_in_use'], self._stats['in_use'])
+
+        try:
+            yield conn
+        finally:
+            try:
+                self._checkin(conn)
+            finally:
+                with self._stats_lock:
+                    self._stats['in_use'] -= 1
+                self._slots.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return pool usage and saturation metrics."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+
+        idle = len(self._pool._pool) if self._pool is not None else 0
+        stats['wait_time_ms'] = round(stats['wait_time_ms'], 1)
+        stats['avg_wait_ms'] = round(stats['wait_time_ms'] / stats['waits'], 1) if stats['waits'] else 0.0
+        stats.update({
+            'readonly': self.readonly,
+            'max_size': self.maxconn,
+            'idle': idle,
+            'open': stats['in_use'] + idle,
+            'saturation': round(stats['in_use'] / self.maxconn, 2) if self.maxconn else 0.0,
+        })
+        return stats
+
+    def close(self):
+        """Close every connection held by the pool."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+        self._last_used.clear()
+        self._session_configured.clear()
+
+
+# Process-wide pools keyed by (dsn, readonly)
+_pools: Dict[Tuple[str, bool], ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+_executor: Optional[ThreadPoolExecutor] = None
+_llm_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_pool(dsn: str, readonly: bool = False) -> ConnectionPool:
+    """Get or create the shared pool for a connection string."""
+    key = (dsn, readonly)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = ConnectionPool(dsn, readonly=readonly)
+                _pools[key] = pool
+    return pool
+
+
+@contextmanager
+def pooled_connection(dsn: str, readonly: bool = False):
+    """
+    Borrow a connection from the shared pool.
+
+    The caller owns commit/rollback; any transaction still open when the
+    block exits is rolled back before the connection goes back to the pool.
+    """
+    with get_pool(dsn, readonly).connection() as conn:
+        yield conn
+
+
+def get_pool_stats() -> List[Dict[str, Any]]:
+    """Metrics for every pool in this process (dsn omitted to avoid leaking credentials)."""
+    return [pool.get_stats() for pool in list(_pools.values())]
+
+
+def close_all_pools():
+    """Close all shared pools (call on application shutdown)."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=BLOCKING_WORKERS,
+                    thread_name_prefix="rag-blocking"
+                )
+    return _executor
+
+
+def _get_llm_executor() -> ThreadPoolExecutor:
+    global _llm_executor
+    if _llm_executor is None:
+        with _executor_lock:
+            if _llm_executor is None:
+                _llm_executor = ThreadPoolExecutor(
+                    max_workers=LLM_WORKERS,
+                    thread_name_prefix="rag-llm"
+                )
+    return _llm_executor
+
+
+async def run_blocking(func: Callable, *args, **kwargs) -> Any:
+    """
+    Run a synchronous DB call on the bounded worker pool.
+
+    Keeps slow report queries from blocking the event loop, so /health and
+    other requests are served while a report is being computed.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
+
+
+async def run_llm(func: Callable, *args, **kwargs) -> Any:
+    """
+    Run a synchronous LLM/RAG call on its own bounded worker pool.
+
+    Report generations take seconds to minutes; on the DB pool a few of
+    them would leave every database endpoint waiting for a worker.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_llm_executor(), functools.partial(func, *args, **kwargs))
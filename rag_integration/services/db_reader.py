@@ -3,19 +3,188 @@ Database Reader Service - READ-ONLY access to existing PostgreSQL database.
 """
 
 import os
-from typing import Generator, Dict, Any, Optional, List
-from datetime import datetime
+import time
+import uuid
+from typing import Generator, Dict, Any, Optional, List, Tuple
+from datetime import datetime, date, time as dt_time
 from contextlib import contextmanager
 import logging
 
-import psycopg2
 from psycopg2.extras import RealDictCursor
 from dotenv import load_dotenv
 
+from .db_pool import pooled_connection
+from .report_rollups import UNDATED_CALL_DATE
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Read report aggregates from report_daily_rollups (migration 008) when fresh
+USE_REPORT_ROLLUPS = os.getenv("RAG_REPORT_ROLLUPS", "1") not in ("0", "false", "no")
+# Seconds between checks for whether the rollup tables exist
+ROLLUP_TABLE_CHECK_INTERVAL = 300
+
+# Rollup-side date presets (call_date is a DATE, so every preset is whole days)
+ROLLUP_DATE_PRESETS = {
+    'last_30': "CURRENT_DATE - INTERVAL '30 days'",
+    'mtd': "DATE_TRUNC('month', CURRENT_DATE)",
+    'qtd': "DATE_TRUNC('quarter', CURRENT_DATE)",
+    'ytd': "DATE_TRUNC('year', CURRENT_DATE)",
+}
+
+
+# Export column name -> SQL expression for get_calls_for_export()
+EXPORT_COLUMNS = {
+    'recording_id': "t.recording_id",
+    'call_date': "t.call_date",
+    'call_time': "t.call_time",
+    'duration_seconds': "t.duration_seconds",
+    'direction': "t.direction",
+    'from_number': "t.from_number",
+    'to_number': "t.to_number",
+    'customer_name': "t.customer_name",
+    'customer_company': "t.customer_company",
+    'customer_phone': "t.customer_phone",
+    'employee_name': "t.employee_name",
+    'employee_department': "t.employee_department",
+    'transcript_text': "t.transcript_text",
+    'word_count': "t.word_count",
+    'transcript_confidence': "t.confidence_score",
+
+    # Insights (Layer 2)
+    'customer_sentiment': "i.customer_sentiment",
+    'call_quality_score': "i.call_quality_score",
+    'customer_satisfaction_score': "i.customer_satisfaction_score",
+    'call_type': "i.call_type",
+    'issue_category': "i.issue_category",
+    'summary': "i.summary",
+    'key_topics': "i.key_topics",
+    'churn_risk_score': "i.churn_risk_score",
+    'coaching_notes': "i.coaching_notes",
+    'follow_up_needed': "i.follow_up_needed",
+    'escalation_required': "i.escalation_required",
+    'first_call_resolution': "i.first_call_resolution",
+    'sentiment_reasoning': "i.sentiment_reasoning",
+    'quality_reasoning': "i.quality_reasoning",
+    'overall_call_rating': "i.overall_call_rating",
+
+    # Call Resolutions (Layer 3)
+    'problem_complexity': "cr.problem_complexity",
+    'resolution_status': "cr.resolution_status",
+    'resolution_details': "cr.resolution_details",
+    'resolution_effectiveness': "cr.resolution_effectiveness",
+    'empathy_score': "cr.empathy_score",
+    'empathy_demonstrated': "cr.empathy_demonstrated",
+    'active_listening_score': "cr.active_listening_score",
+    'employee_knowledge_level': "cr.employee_knowledge_level",
+    'confidence_in_solution': "cr.confidence_in_solution",
+    'training_needed': "cr.training_needed",
+    'resolution_churn_risk': "cr.churn_risk",
+    'revenue_impact': "cr.revenue_impact",
+    'customer_effort_score': "cr.customer_effort_score",
+    'first_contact_resolution': "cr.first_contact_resolution",
+    'closure_score': "cr.closure_score",
+    'solution_summarized': "cr.solution_summarized",
+    'understanding_confirmed': "cr.understanding_confirmed",
+    'asked_if_anything_else': "cr.asked_if_anything_else",
+    'next_steps_provided': "cr.next_steps_provided",
+    'timeline_given': "cr.timeline_given",
+    'contact_info_provided': "cr.contact_info_provided",
+    'thanked_customer': "cr.thanked_customer",
+    'confirmed_satisfaction': "cr.confirmed_satisfaction",
+
+    # Call Recommendations (Layer 4)
+    'process_improvements': "rec.process_improvements",
+    'employee_strengths': "rec.employee_strengths",
+    'employee_improvements': "rec.employee_improvements",
+    'suggested_phrases': "rec.suggested_phrases",
+    'follow_up_actions': "rec.follow_up_actions",
+    'knowledge_base_updates': "rec.knowledge_base_updates",
+    'rec_escalation_required': "rec.escalation_required",
+    'risk_level': "rec.risk_level",
+    'efficiency_score': "rec.efficiency_score",
+    'training_priority': "rec.training_priority",
+
+    # Advanced Metrics (Layer 5)
+    'has_layer5': "cam.recording_id",
+    'buying_signals': "cam.buying_signals",
+    'competitor_intelligence': "cam.competitor_intelligence",
+    'talk_listen_ratio': "cam.talk_listen_ratio",
+    'compliance': "cam.compliance",
+    'key_quotes': "cam.key_quotes",
+    'qa_pairs': "cam.qa_pairs",
+    'urgency': "cam.urgency",
+    'sales_opportunity_score': "cam.sales_opportunity_score",
+    'compliance_score': "cam.compliance_score",
+    'urgency_score': "cam.urgency_score",
+}
+
+# Keyset for export pagination; NULL dates/times sort as the oldest rows.
+# Backed by idx_transcripts_export_keyset (migration 014), whose expressions
+# and predicate must stay in step with these and the export base filter.
+EXPORT_KEYSET_MIN_DATE = date.min
+EXPORT_KEYSET_MIN_TIME = dt_time.min
+EXPORT_SORT_COLUMNS = (
+    "COALESCE(t.call_date, DATE '0001-01-01')",
+    "COALESCE(t.call_time, TIME '00:00:00')",
+    "t.recording_id",
+)
+# Rows per round trip when streaming exports through a server-side cursor
+EXPORT_ITERSIZE = int(os.getenv("RAG_EXPORT_ITERSIZE", "500"))
+
+# All 5 layers of analysis for every exportable call: the row
+# JSONLFormatter.format_call receives (RAG sync and the local search index).
+# Layer 5 is optional, so calls without advanced metrics still export.
+FULL_CALL_SELECT = """
+    SELECT
+        t.recording_id, t.call_date, t.call_time, t.duration_seconds,
+        t.direction, t.from_number, t.to_number,
+        t.customer_name, t.customer_company, t.customer_phone,
+        t.employee_name, t.employee_department, t.transcript_text,
+        t.word_count, t.confidence_score as transcript_confidence,
+
+        i.customer_sentiment, i.call_quality_score, i.customer_satisfaction_score,
+        i.call_type, i.issue_category, i.summary, i.key_topics,
+        i.churn_risk_score, i.coaching_notes, i.follow_up_needed,
+        i.escalation_required, i.first_call_resolution,
+        i.sentiment_reasoning, i.quality_reasoning, i.overall_call_rating,
+
+        cr.problem_complexity, cr.resolution_status, cr.resolution_details,
+        cr.resolution_effectiveness, cr.empathy_score, cr.empathy_demonstrated,
+        cr.active_listening_score, cr.employee_knowledge_level,
+        cr.confidence_in_solution, cr.training_needed,
+        cr.churn_risk as resolution_churn_risk, cr.revenue_impact,
+        cr.customer_effort_score, cr.first_contact_resolution, cr.closure_score,
+        cr.solution_summarized, cr.understanding_confirmed,
+        cr.asked_if_anything_else, cr.next_steps_provided,
+        cr.timeline_given, cr.contact_info_provided,
+        cr.thanked_customer, cr.confirmed_satisfaction,
+
+        rec.process_improvements, rec.employee_strengths,
+        rec.employee_improvements, rec.suggested_phrases,
+        rec.follow_up_actions, rec.knowledge_base_updates,
+        rec.escalation_required as rec_escalation_required,
+        rec.risk_level, rec.efficiency_score, rec.training_priority,
+
+        cam.recording_id as has_layer5,
+        cam.buying_signals, cam.sales_opportunity_score,
+        cam.competitor_intelligence, cam.talk_listen_ratio,
+        cam.compliance_score, cam.urgency, cam.urgency_score,
+        cam.key_quotes, cam.qa_pairs
+
+    FROM transcripts t
+    INNER JOIN insights i ON t.recording_id = i.recording_id
+    INNER JOIN call_resolutions cr ON t.recording_id = cr.recording_id
+    INNER JOIN call_recommendations rec ON t.recording_id = rec.recording_id
+    LEFT JOIN call_advanced_metrics cam ON t.recording_id = cam.recording_id
+"""
+
+# Fingerprint of a call's exported content: md5 of its FULL_CALL_SELECT
+# row (as text), so it changes whenever a layer 1-5 column the exported
+# document is built from does
+CONTENT_HASH_SQL = "md5(c::text)"
+
 
 def get_employee_search_patterns(employee_name: str) -> List[str]:
     """
@@ -62,16 +231,14 @@ class DatabaseReader:
             "RAG_DATABASE_URL",
             
         )
+        self._rollups_exist = False
+        self._rollups_checked_at = 0.0
 
     @contextmanager
     def get_connection(self):
-        """Get a read-only database connection."""
-        conn = psycopg2.connect(self.database_url)
-        conn.set_session(readonly=True)  # ENFORCE READ-ONLY
-        try:
+        """Get a read-only database connection from the shared pool."""
+        with pooled_connection(self.database_url, readonly=True) as conn:
             yield conn
-        finally:
-            conn.close()
 
     def _build_date_filter(
         self,
@@ -105,6 +272,70 @@ class DatabaseReader:
 
         return ""
 
+    # ==========================================
+    # REPORT ROLLUPS (report_daily_rollups)
+    # ==========================================
+
+    def _rollup_date_filter(
+        self,
+        date_range: str = None,
+        start_date: str = None,
+        end_date: str = None,
+        table_alias: str = "r"
+    ) -> Optional[str]:
+        """Build a call_date filter for rollup reads.
+
+        Every range excludes the undated bucket (UNDATED_CALL_DATE), as the
+        raw queries' call_date filters exclude NULL call_dates.
+
+        Returns:
+            SQL fragment ("" for all time), or None when the range can't be
+            answered from whole-day rollups and the raw tables must be used.
+        """
+        if start_date and end_date:
+            try:
+                start = date.fromisoformat(start_date)
+                end = date.fromisoformat(end_date)
+            except ValueError:
+                return None
+            return f"AND {table_alias}.call_date >= '{start}'::date AND {table_alias}.call_date <= '{end}'::date"
+
+        if date_range in ROLLUP_DATE_PRESETS:
+            return f"AND {table_alias}.call_date >= {ROLLUP_DATE_PRESETS[date_range]}"
+
+        return ""
+
+    def _rollups_fresh(self, cur, *date_filters: Optional[str]) -> bool:
+        """Check the rollups exist and have no dirty days in the requested ranges.
+
+        Args:
+            cur: Open cursor
+            date_filters: Filters from _rollup_date_filter() with table alias 'd'
+        """
+        if not USE_REPORT_ROLLUPS or any(f is None for f in date_filters):
+            return False
+
+        if not self._rollups_exist:
+            if time.monotonic() - self._rollups_checked_at < ROLLUP_TABLE_CHECK_INTERVAL:
+                return False
+            self._rollups_checked_at = time.monotonic()
+            cur.execute("""
+                SELECT to_regclass('report_daily_rollups') IS NOT NULL
+                   AND to_regclass('report_rollup_dirty_days') IS NOT NULL as ready
+            """)
+            self._rollups_exist = bool(cur.fetchone()['ready'])
+            if not self._rollups_exist:
+                return False
+
+        checks = " AND ".join(
+            f"NOT EXISTS (SELECT 1 FROM report_rollup_dirty_days d WHERE TRUE {f})"
+            for f in date_filters
+        ) or "TRUE"
+        cur.execute(f"""
+            SELECT EXISTS (SELECT 1 FROM report_daily_rollups) AND {checks} as fresh
+        """)
+        return bool(cur.fetchone()['fresh'])
+
     def get_calls_for_export(
         self,
         since: Optional[datetime] = None,
@@ -112,20 +343,36 @@ class DatabaseReader:
         limit: Optional[int] = None,
         offset: int = 0,
         require_all_layers: bool = True,
-        min_layers: int = 4
+        min_layers: int = 4,
+        after: Optional[Tuple] = None,
+        columns: Optional[List[str]] = None,
+        stream: bool = False,
+        itersize: int = EXPORT_ITERSIZE,
+        page_size: Optional[int] = None
     ) -> Generator[Dict[str, Any], None, None]:
         """
         Fetch calls with transcripts and all metadata for RAG export.
 
+        Rows come newest first, ordered by (call_date, call_time, recording_id).
+
         Args:
             since: Start date filter
             until: End date filter
             limit: Maximum records to return
-            offset: Skip first N records
+            offset: Skip first N records (prefer `after`; OFFSET rescans skipped rows)
             require_all_layers: If True, require min_layers to be complete
             min_layers: Minimum layers required (4 or 5). Default 4.
                 - 4 = Layers 1-4 (names, insights, resolutions, recommendations)
                 - 5 = All layers including advanced metrics
+            after: Keyset from export_keyset() of the last row already seen;
+                only rows after it are returned
+            columns: Names from EXPORT_COLUMNS to select (default: all).
+                recording_id, call_date and call_time are always included.
+            stream: Use a named server-side cursor so rows are fetched
+                itersize at a time instead of buffering the whole result
+            itersize: Rows per round trip in stream mode
+            page_size: If set, run one keyset-paginated query per page_size
+                rows, so no single transaction stays open for the whole export
 
         Layers:
         - Layer 1: Name extraction (employee_name, customer_name)
@@ -134,6 +381,70 @@ class DatabaseReader:
         - Layer 4: Recommendations (call_recommendations table)
         - Layer 5: Advanced metrics (call_advanced_metrics table)
         """
+        if page_size and offset:
+            raise ValueError("page_size uses keyset pagination; pass `after` instead of `offset`")
+
+        if not page_size:
+            query, params = self._build_export_query(
+                since, until, limit, offset, require_all_layers, min_layers, after, columns
+            )
+            yield from self._fetch_export_rows(query, params, stream, itersize)
+            return
+
+        remaining = limit
+        while remaining is None or remaining > 0:
+            page_limit = page_size if remaining is None else min(page_size, remaining)
+            query, params = self._build_export_query(
+                since, until, page_limit, 0, require_all_layers, min_layers, after, columns
+            )
+
+            fetched = 0
+            last_row = None
+            for row in self._fetch_export_rows(query, params, stream, itersize):
+                fetched += 1
+                last_row = row
+                yield row
+
+            if fetched < page_limit:
+                return
+            after = self.export_keyset(last_row)
+            if remaining is not None:
+                remaining -= fetched
+
+    @staticmethod
+    def export_keyset(row: Dict[str, Any]) -> Tuple:
+        """Keyset of an export row, for resuming get_calls_for_export(after=...)."""
+        return (
+            row['call_date'] or EXPORT_KEYSET_MIN_DATE,
+            row['call_time'] or EXPORT_KEYSET_MIN_TIME,
+            row['recording_id']
+        )
+
+    def _build_export_query(
+        self,
+        since: Optional[datetime],
+        until: Optional[datetime],
+        limit: Optional[int],
+        offset: int,
+        require_all_layers: bool,
+        min_layers: int,
+        after: Optional[Tuple],
+        columns: Optional[List[str]]
+    ) -> Tuple[str, List[Any]]:
+        """Build the export query and its parameters."""
+        if columns:
+            unknown = [c for c in columns if c not in EXPORT_COLUMNS]
+            if unknown:
+                raise ValueError(f"Unknown export columns: {', '.join(unknown)}")
+            selected = ['recording_id', 'call_date', 'call_time']
+            selected += [c for c in columns if c not in selected]
+        else:
+            selected = list(EXPORT_COLUMNS)
+
+        select_list = ",\n            ".join(
+            f"{EXPORT_COLUMNS[name]} as {name}" for name in selected
+        )
+
         # Use INNER JOIN for required layers, LEFT JOIN for optional
         join_type = "INNER JOIN" if require_all_layers else "LEFT JOIN"
         # Layer 5 is optional if min_layers < 5
@@ -141,89 +452,7 @@ class DatabaseReader:
 
         query = f"""
         SELECT
-            t.recording_id,
-            t.call_date,
-            t.call_time,
-            t.duration_seconds,
-            t.direction,
-            t.from_number,
-            t.to_number,
-            t.customer_name,
-            t.customer_company,
-            t.customer_phone,
-            t.employee_name,
-            t.employee_department,
-            t.transcript_text,
-            t.word_count,
-            t.confidence_score as transcript_confidence,
-
-            -- Insights (Layer 2)
-            i.customer_sentiment,
-            i.call_quality_score,
-            i.customer_satisfaction_score,
-            i.call_type,
-            i.issue_category,
-            i.summary,
-            i.key_topics,
-            i.churn_risk_score,
-            i.coaching_notes,
-            i.follow_up_needed,
-            i.escalation_required,
-            i.first_call_resolution,
-            i.sentiment_reasoning,
-            i.quality_reasoning,
-            i.overall_call_rating,
-
-            -- Call Resolutions (Layer 3)
-            cr.problem_complexity,
-            cr.resolution_status,
-            cr.resolution_details,
-            cr.resolution_effectiveness,
-            cr.empathy_score,
-            cr.empathy_demonstrated,
-            cr.active_listening_score,
-            cr.employee_knowledge_level,
-            cr.confidence_in_solution,
-            cr.training_needed,
-            cr.churn_risk as resolution_churn_risk,
-            cr.revenue_impact,
-            cr.customer_effort_score,
-            cr.first_contact_resolution,
-            cr.closure_score,
-            cr.solution_summarized,
-            cr.understanding_confirmed,
-            cr.asked_if_anything_else,
-            cr.next_steps_provided,
-            cr.timeline_given,
-            cr.contact_info_provided,
-            cr.thanked_customer,
-            cr.confirmed_satisfaction,
-
-            -- Call Recommendations (Layer 4)
-            rec.process_improvements,
-            rec.employee_strengths,
-            rec.employee_improvements,
-            rec.suggested_phrases,
-            rec.follow_up_actions,
-            rec.knowledge_base_updates,
-            rec.escalation_required as rec_escalation_required,
-            rec.risk_level,
-            rec.efficiency_score,
-            rec.training_priority,
-
-            -- Advanced Metrics (Layer 5)
-            cam.recording_id as has_layer5,
-            cam.buying_signals,
-            cam.competitor_intelligence,
-            cam.talk_listen_ratio,
-            cam.compliance,
-            cam.key_quotes,
-            cam.qa_pairs,
-            cam.urgency,
-            cam.sales_opportunity_score,
-            cam.compliance_score,
-            cam.urgency_score
-
+            {select_list}
         FROM transcripts t
         {join_type} insights i ON t.recording_id = i.recording_id
         {join_type} call_resolutions cr ON t.recording_id = cr.recording_id
@@ -237,15 +466,23 @@ class DatabaseReader:
 
         params: List[Any] = []
 
+        # Date bounds are repeated on the keyset expression so they bound the
+        # index scan (migration 014) rather than filter it
         if since:
-            query += " AND t.call_date >= %s"
-            params.append(since.date() if isinstance(since, datetime) else since)
+            since_date = since.date() if isinstance(since, datetime) else since
+            query += f" AND t.call_date >= %s AND {EXPORT_SORT_COLUMNS[0]} >= %s"
+            params.extend([since_date, since_date])
 
         if until:
-            query += " AND t.call_date <= %s"
-            params.append(until.date() if isinstance(until, datetime) else until)
+            until_date = until.date() if isinstance(until, datetime) else until
+            query += f" AND t.call_date <= %s AND {EXPORT_SORT_COLUMNS[0]} <= %s"
+            params.extend([until_date, until_date])
 
-        query += " ORDER BY t.call_date DESC, t.call_time DESC"
+        if after:
+            query += f" AND ({', '.join(EXPORT_SORT_COLUMNS)}) < (%s, %s, %s)"
+            params.extend(after)
+
+        query += " ORDER BY " + ", ".join(f"{c} DESC" for c in EXPORT_SORT_COLUMNS)
 
         if limit:
             query += " LIMIT %s"
@@ -255,8 +492,24 @@ class DatabaseReader:
             query += " OFFSET %s"
             params.append(offset)
 
+        return query, params
+
+    def _fetch_export_rows(
+        self,
+        query: str,
+        params: List[Any],
+        stream: bool,
+        itersize: int
+    ) -> Generator[Dict[str, Any], None, None]:
+        """Run an export query, optionally through a named server-side cursor."""
         with self.get_connection() as conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            if stream:
+                cursor = conn.cursor(name=f"rag_export_{uuid.uuid4().hex}", cursor_factory=RealDictCursor)
+                cursor.itersize = itersize
+            else:
+                cursor = conn.cursor(cursor_factory=RealDictCursor)
+
+            with cursor as cur:
                 cur.execute(query, params)
                 for row in cur:
                     yield dict(row)
@@ -468,249 +721,260 @@ class DatabaseReader:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 result = {}
 
-                # Total calls handled
-                cur.execute(f"""
-                    SELECT COUNT(*) as total_calls
-                    FROM transcripts t
-                    WHERE (LOWER(t.employee_name) LIKE ANY(%s))
-                    {date_filter}
-                """, (name_patterns,))
-                row = cur.fetchone()
-                result['total_calls'] = row['total_calls'] if row else 0
-
-                # Average quality score
-                cur.execute(f"""
-                    SELECT
-                        ROUND(AVG(i.call_quality_score)::numeric, 1) as avg_quality,
-                        ROUND(AVG(i.overall_call_rating)::numeric, 1) as avg_rating,
-                        ROUND(AVG(i.customer_satisfaction_score)::numeric, 1) as avg_satisfaction
-                    FROM transcripts t
-                    JOIN insights i ON t.recording_id = i.recording_id
-                    WHERE (LOWER(t.employee_name) LIKE ANY(%s))
-                    {date_filter}
-                """, (name_patterns,))
-                row = cur.fetchone()
-                result['avg_quality_score'] = float(row['avg_quality']) if row and row['avg_quality'] else 0
-                result['avg_overall_rating'] = float(row['avg_rating']) if row and row['avg_rating'] else 0
-                result['avg_satisfaction'] = float(row['avg_satisfaction']) if row and row['avg_satisfaction'] else 0
-
-                # Sentiment distribution
-                cur.execute(f"""
-                    SELECT
-                        i.customer_sentiment,
-                        COUNT(*) as count
-                    FROM transcripts t
-                    JOIN insights i ON t.recording_id = i.recording_id
-                    WHERE (LOWER(t.employee_name) LIKE ANY(%s))
-                      AND i.customer_sentiment IS NOT NULL
-                    {date_filter}
-                    GROUP BY i.customer_sentiment
-                """, (name_patterns,))
-                result['sentiment_distribution'] = {row['customer_sentiment']: row['count'] for row in cur.fetchall()}
-
-                # Call types
-                cur.execute(f"""
-                    SELECT
-                        i.call_type,
-                        COUNT(*) as count
-                    FROM transcripts t
-                    JOIN insights i ON t.recording_id = i.recording_id
-                    WHERE (LOWER(t.employee_name) LIKE ANY(%s))
-                      AND i.call_type IS NOT NULL
-                    {date_filter}
-                    GROUP BY i.call_type
-                    ORDER BY count DESC
-                """, (name_patterns,))
-                result['call_types'] = {row['call_type']: row['count'] for row in cur.fetchall()}
-
-                # Resolution metrics
+                # All call metrics in one round trip: the agent's calls are matched once
+                # (LIKE ANY over transcripts) and every aggregate reads the materialized CTEs
                 cur.execute(f"""
+                    WITH agent_calls AS MATERIALIZED (
+                        SELECT
+                            t.recording_id,
+                            t.call_date,
+                            t.from_number,
+                            t.to_number,
+                            t.customer_name,
+                            t.customer_company
+                        FROM transcripts t
+                        WHERE (LOWER(t.employee_name) LIKE ANY(%s))
+                        {date_filter}
+                    ),
+                    agent_insights AS MATERIALIZED (
+                        SELECT
+                            ac.*,
+                            i.call_quality_score,
+                            i.overall_call_rating,
+                            i.customer_satisfaction_score,
+                            i.customer_sentiment,
+                            i.call_type,
+                            i.summary
+                        FROM agent_calls ac
+                        JOIN insights i ON ac.recording_id = i.recording_id
+                    ),
+                    agent_resolutions AS MATERIALIZED (
+                        SELECT
+                            cr.empathy_score,
+                            cr.active_listening_score,
+                            cr.closure_score,
+                            cr.resolution_effectiveness,
+                            cr.first_contact_resolution,
+                            cr.churn_risk
+                        FROM agent_calls ac
+                        JOIN call_resolutions cr ON ac.recording_id = cr.recording_id
+                    )
                     SELECT
-                        ROUND(AVG(cr.empathy_score)::numeric, 1) as avg_empathy,
-                        ROUND(AVG(cr.active_listening_score)::numeric, 1) as avg_listening,
-                        ROUND(AVG(cr.closure_score)::numeric, 1) as avg_closure,
-                        ROUND(AVG(cr.resolution_effectiveness)::numeric, 1) as avg_resolution,
-                        SUM(CASE WHEN cr.first_contact_resolution THEN 1 ELSE 0 END) as first_contact_resolved
-                    FROM transcripts t
-                    JOIN call_resolutions cr ON t.recording_id = cr.recording_id
-                    WHERE (LOWER(t.employee_name) LIKE ANY(%s))
-                    {date_filter}
+                        (SELECT COUNT(*) FROM agent_calls) as total_calls,
+
+                        -- Quality averages
+                        q.avg_quality,
+                        q.avg_rating,
+                        q.avg_satisfaction,
+
+                        -- Resolution metrics
+                        r.avg_empathy,
+                        r.avg_listening,
+                        r.avg_closure,
+                        r.avg_resolution,
+                        r.first_contact_resolved,
+
+                        (SELECT json_object_agg(customer_sentiment, count)
+                         FROM (
+                            SELECT customer_sentiment, COUNT(*) as count
+                            FROM agent_insights
+                            WHERE customer_sentiment IS NOT NULL
+                            GROUP BY customer_sentiment
+                         ) s) as sentiment_distribution,
+
+                        (SELECT json_object_agg(call_type, count ORDER BY count DESC)
+                         FROM (
+                            SELECT call_type, COUNT(*) as count
+                            FROM agent_insights
+                            WHERE call_type IS NOT NULL
+                            GROUP BY call_type
+                         ) ct) as call_types,
+
+                        (SELECT json_object_agg(churn_risk, count)
+                         FROM (
+                            SELECT churn_risk, COUNT(*) as count
+                            FROM agent_resolutions
+                            WHERE churn_risk IS NOT NULL
+                            GROUP BY churn_risk
+                         ) ch) as churn_risk_distribution,
+
+                        -- Top strengths and improvements (from recommendations)
+                        (SELECT json_agg(recs)
+                         FROM (
+                            SELECT rec.employee_strengths, rec.employee_improvements
+                            FROM agent_calls ac
+                            JOIN call_recommendations rec ON ac.recording_id = rec.recording_id
+                            WHERE rec.employee_strengths IS NOT NULL
+                            LIMIT 20
+                         ) recs) as recommendations,
+
+                        -- Sample call summaries for context
+                        (SELECT json_agg(rs)
+                         FROM (
+                            SELECT summary, call_quality_score, customer_sentiment
+                            FROM agent_insights
+                            WHERE summary IS NOT NULL
+                            ORDER BY call_date DESC
+                            LIMIT 5
+                         ) rs) as recent_call_summaries,
+
+                        -- Recent calls with details (including phone numbers and call IDs)
+                        (SELECT json_agg(rc)
+                         FROM (
+                            SELECT
+                                recording_id, call_date, from_number, to_number,
+                                customer_name, customer_company, summary,
+                                call_quality_score, customer_sentiment, call_type
+                            FROM agent_insights
+                            ORDER BY call_date DESC
+                            LIMIT 10
+                         ) rc) as recent_calls
+                    FROM (
+                        SELECT
+                            ROUND(AVG(call_quality_score)::numeric, 1) as avg_quality,
+                            ROUND(AVG(overall_call_rating)::numeric, 1) as avg_rating,
+                            ROUND(AVG(customer_satisfaction_score)::numeric, 1) as avg_satisfaction
+                        FROM agent_insights
+                    ) q
+                    CROSS JOIN (
+                        SELECT
+                            ROUND(AVG(empathy_score)::numeric, 1) as avg_empathy,
+                            ROUND(AVG(active_listening_score)::numeric, 1) as avg_listening,
+                            ROUND(AVG(closure_score)::numeric, 1) as avg_closure,
+                            ROUND(AVG(resolution_effectiveness)::numeric, 1) as avg_resolution,
+                            COUNT(*) FILTER (WHERE first_contact_resolution) as first_contact_resolved
+                        FROM agent_resolutions
+                    ) r
                 """, (name_patterns,))
                 row = cur.fetchone()
-                result['avg_empathy_score'] = float(row['avg_empathy']) if row and row['avg_empathy'] else 0
-                result['avg_listening_score'] = float(row['avg_listening']) if row and row['avg_listening'] else 0
-                result['avg_closure_score'] = float(row['avg_closure']) if row and row['avg_closure'] else 0
-                result['avg_resolution_effectiveness'] = float(row['avg_resolution']) if row and row['avg_resolution'] else 0
-                result['first_contact_resolution_count'] = row['first_contact_resolved'] if row and row['first_contact_resolved'] else 0
 
-                # Churn risk counts
-                cur.execute(f"""
-                    SELECT
-                        cr.churn_risk,
-                        COUNT(*) as count
-                    FROM transcripts t
-                    JOIN call_resolutions cr ON t.recording_id = cr.recording_id
-                    WHERE (LOWER(t.employee_name) LIKE ANY(%s))
-                      AND cr.churn_risk IS NOT NULL
-                    {date_filter}
-                    GROUP BY cr.churn_risk
-                """, (name_patterns,))
-                result['churn_risk_distribution'] = {row['churn_risk']: row['count'] for row in cur.fetchall()}
+                result['total_calls'] = row['total_calls'] or 0
+                result['avg_quality_score'] = float(row['avg_quality']) if row['avg_quality'] else 0
+                result['avg_overall_rating'] = float(row['avg_rating']) if row['avg_rating'] else 0
+                result['avg_satisfaction'] = float(row['avg_satisfaction']) if row['avg_satisfaction'] else 0
+                result['sentiment_distribution'] = row['sentiment_distribution'] or {}
+                result['call_types'] = row['call_types'] or {}
 
-                # Top strengths and improvements (from recommendations)
-                cur.execute(f"""
-                    SELECT
-                        rec.employee_strengths,
-                        rec.employee_improvements
-                    FROM transcripts t
-                    JOIN call_recommendations rec ON t.recording_id = rec.recording_id
-                    WHERE (LOWER(t.employee_name) LIKE ANY(%s))
-                      AND rec.employee_strengths IS NOT NULL
-                    {date_filter}
-                    LIMIT 20
-                """, (name_patterns,))
+                result['avg_empathy_score'] = float(row['avg_empathy']) if row['avg_empathy'] else 0
+                result['avg_listening_score'] = float(row['avg_listening']) if row['avg_listening'] else 0
+                result['avg_closure_score'] = float(row['avg_closure']) if row['avg_closure'] else 0
+                result['avg_resolution_effectiveness'] = float(row['avg_resolution']) if row['avg_resolution'] else 0
+                result['first_contact_resolution_count'] = row['first_contact_resolved'] or 0
+                result['churn_risk_distribution'] = row['churn_risk_distribution'] or {}
 
                 all_strengths = []
                 all_improvements = []
-                for row in cur.fetchall():
-                    if row['employee_strengths']:
-                        if isinstance(row['employee_strengths'], list):
-                            all_strengths.extend(row['employee_strengths'])
+                for rec in row['recommendations'] or []:
+                    if rec['employee_strengths']:
+                        if isinstance(rec['employee_strengths'], list):
+                            all_strengths.extend(rec['employee_strengths'])
                         else:
-                            all_strengths.append(row['employee_strengths'])
-                    if row['employee_improvements']:
-                        if isinstance(row['employee_improvements'], list):
-                            all_improvements.extend(row['employee_improvements'])
+                            all_strengths.append(rec['employee_strengths'])
+                    if rec['employee_improvements']:
+                        if isinstance(rec['employee_improvements'], list):
+                            all_improvements.extend(rec['employee_improvements'])
                         else:
-                            all_improvements.append(row['employee_improvements'])
+                            all_improvements.append(rec['employee_improvements'])
 
                 result['common_strengths'] = list(set(all_strengths))[:5]
                 result['common_improvements'] = list(set(all_improvements))[:5]
 
-                # Sample call summaries for context
-                cur.execute(f"""
-                    SELECT
-                        i.summary,
-                        i.call_quality_score,
-                        i.customer_sentiment
-                    FROM transcripts t
-                    JOIN insights i ON t.recording_id = i.recording_id
-                    WHERE (LOWER(t.employee_name) LIKE ANY(%s))
-                      AND i.summary IS NOT NULL
-                    {date_filter}
-                    ORDER BY t.call_date DESC
-                    LIMIT 5
-                """, (name_patterns,))
                 result['recent_call_summaries'] = [
                     {
-                        'summary': row['summary'],
-                        'quality': row['call_quality_score'],
-                        'sentiment': row['customer_sentiment']
+                        'summary': rs['summary'],
+                        'quality': rs['call_quality_score'],
+                        'sentiment': rs['customer_sentiment']
                     }
-                    for row in cur.fetchall()
+                    for rs in row['recent_call_summaries'] or []
                 ]
 
-                # Recent calls with details (including phone numbers and call IDs)
-                cur.execute(f"""
-                    SELECT
-                        t.recording_id,
-                        t.call_date,
-                        t.from_number,
-                        t.to_number,
-                        t.customer_name,
-                        t.customer_company,
-                        i.summary,
-                        i.call_quality_score,
-                        i.customer_sentiment,
-                        i.call_type
-                    FROM transcripts t
-                    JOIN insights i ON t.recording_id = i.recording_id
-                    WHERE (LOWER(t.employee_name) LIKE ANY(%s))
-                    {date_filter}
-                    ORDER BY t.call_date DESC
-                    LIMIT 10
-                """, (name_patterns,))
                 recent_calls = [
                     {
-                        'call_id': row['recording_id'],
-                        'date': str(row['call_date']),
-                        'from_number': row['from_number'] or 'N/A',
-                        'to_number': row['to_number'] or 'N/A',
-                        'customer_name': row['customer_name'] or 'Unknown',
-                        'company': row['customer_company'] or 'Unknown',
-                        'summary': row['summary'] or 'No summary',
-                        'quality': row['call_quality_score'],
-                        'sentiment': row['customer_sentiment'],
-                        'call_type': row['call_type'],
+                        'call_id': rc['recording_id'],
+                        'date': str(rc['call_date']),
+                        'from_number': rc['from_number'] or 'N/A',
+                        'to_number': rc['to_number'] or 'N/A',
+                        'customer_name': rc['customer_name'] or 'Unknown',
+                        'company': rc['customer_company'] or 'Unknown',
+                        'summary': rc['summary'] or 'No summary',
+                        'quality': rc['call_quality_score'],
+                        'sentiment': rc['customer_sentiment'],
+                        'call_type': rc['call_type'],
                         'source_type': 'call',
                         'source_label': 'Call Recording'
                     }
-                    for row in cur.fetchall()
+                    for rc in row['recent_calls'] or []
                 ]
 
-                # Also get video meetings hosted by this agent
+                # Video meetings hosted by this agent: stats, learning states and
+                # recent sessions in a second round trip
                 video_date_filter = date_filter.replace('t.call_date', 'vm.start_time')
                 try:
                     cur.execute(f"""
+                        WITH agent_videos AS MATERIALIZED (
+                            SELECT
+                                vm.id as video_id,
+                                vm.title,
+                                vm.start_time,
+                                vm.participant_count,
+                                vm.overall_sentiment,
+                                vm.meeting_quality_score,
+                                vm.learning_score,
+                                vm.learning_state,
+                                vm.churn_risk_level
+                            FROM video_meetings vm
+                            WHERE (LOWER(vm.host_name) LIKE ANY(%s))
+                              AND vm.layer1_complete = TRUE
+                            {video_date_filter}
+                        )
                         SELECT
-                            vm.id as video_id,
-                            vm.title,
-                            vm.start_time,
-                            vm.participant_count,
-                            vm.overall_sentiment,
-                            vm.meeting_quality_score,
-                            vm.learning_score,
-                            vm.learning_state,
-                            vm.churn_risk_level
-                        FROM video_meetings vm
-                        WHERE (LOWER(vm.host_name) LIKE ANY(%s))
-                          AND vm.layer1_complete = TRUE
-                        {video_date_filter}
-                        ORDER BY vm.start_time DESC
-                        LIMIT 10
+                            COUNT(*) as total_video_meetings,
+                            AVG(meeting_quality_score) as avg_video_quality,
+                            AVG(learning_score) as avg_learning_score,
+                            COUNT(*) FILTER (WHERE learning_state = 'aha_zone') as aha_moments,
+                            COUNT(*) FILTER (WHERE learning_state = 'struggling') as struggling_sessions,
+                            COUNT(*) FILTER (WHERE churn_risk_level = 'high') as high_risk_sessions,
+                            (SELECT json_object_agg(learning_state, count)
+                             FROM (
+                                SELECT learning_state, COUNT(*) as count
+                                FROM agent_videos
+                                WHERE learning_state IS NOT NULL
+                                GROUP BY learning_state
+                             ) ls) as learning_state_distribution,
+                            (SELECT json_agg(rv)
+                             FROM (
+                                SELECT
+                                    video_id, title, start_time::date as start_date,
+                                    participant_count, overall_sentiment, meeting_quality_score,
+                                    learning_score, learning_state, churn_risk_level
+                                FROM agent_videos
+                                ORDER BY start_time DESC
+                                LIMIT 10
+                             ) rv) as recent_videos
+                        FROM agent_videos
                     """, (name_patterns,))
-                    for row in cur.fetchall():
+                    video_stats = cur.fetchone()
+
+                    for video in video_stats['recent_videos'] or []:
                         recent_calls.append({
-                            'call_id': f"video_{row['video_id']}",
-                            'video_id': row['video_id'],
-                            'date': str(row['start_time'].date()) if row['start_time'] else 'Unknown',
+                            'call_id': f"video_{video['video_id']}",
+                            'video_id': video['video_id'],
+                            'date': video['start_date'] or 'Unknown',
                             'from_number': 'N/A',
                             'to_number': 'N/A',
-                            'customer_name': f"{row['participant_count'] or 0} participants",
-                            'company': row['title'] or 'Video Meeting',
-                            'summary': f"Learning: {row['learning_state'] or 'N/A'}, Score: {row['learning_score'] or 'N/A'}",
-                            'quality': row['meeting_quality_score'],
-                            'sentiment': row['overall_sentiment'],
+                            'customer_name': f"{video['participant_count'] or 0} participants",
+                            'company': video['title'] or 'Video Meeting',
+                            'summary': f"Learning: {video['learning_state'] or 'N/A'}, Score: {video['learning_score'] or 'N/A'}",
+                            'quality': video['meeting_quality_score'],
+                            'sentiment': video['overall_sentiment'],
                             'call_type': 'training',
                             'source_type': 'video',
                             'source_label': 'Video Meeting',
-                            'learning_score': row['learning_score'],
-                            'learning_state': row['learning_state'],
-                            'churn_risk': row['churn_risk_level']
+                            'learning_score': video['learning_score'],
+                            'learning_state': video['learning_state'],
+                            'churn_risk': video['churn_risk_level']
                         })
-                except Exception as e:
-                    logger.warning(f"Video meeting agent query failed: {e}")
 
-                # Sort by date descending
-                recent_calls.sort(key=lambda x: x['date'], reverse=True)
-                result['recent_calls'] = recent_calls[:15]
-
-                # Get video meeting stats for this agent
-                try:
-                    cur.execute(f"""
-                        SELECT
-                            COUNT(*) as total_video_meetings,
-                            AVG(vm.meeting_quality_score) as avg_video_quality,
-                            AVG(vm.learning_score) as avg_learning_score,
-                            COUNT(*) FILTER (WHERE vm.learning_state = 'aha_zone') as aha_moments,
-                            COUNT(*) FILTER (WHERE vm.learning_state = 'struggling') as struggling_sessions,
-                            COUNT(*) FILTER (WHERE vm.churn_risk_level = 'high') as high_risk_sessions
-                        FROM video_meetings vm
-                        WHERE (LOWER(vm.host_name) LIKE ANY(%s))
-                          AND vm.layer1_complete = TRUE
-                        {video_date_filter}
-                    """, (name_patterns,))
-                    video_stats = cur.fetchone()
                     result['video_meetings'] = {
                         'total': video_stats['total_video_meetings'] or 0,
                         'avg_quality': float(video_stats['avg_video_quality']) if video_stats['avg_video_quality'] else 0,
@@ -719,23 +983,16 @@ class DatabaseReader:
                         'struggling_sessions': video_stats['struggling_sessions'] or 0,
                         'high_risk_sessions': video_stats['high_risk_sessions'] or 0
                     }
-
-                    # Learning state distribution for video meetings
-                    cur.execute(f"""
-                        SELECT vm.learning_state, COUNT(*) as count
-                        FROM video_meetings vm
-                        WHERE (LOWER(vm.host_name) LIKE ANY(%s))
-                          AND vm.learning_state IS NOT NULL
-                          AND vm.layer1_complete = TRUE
-                        {video_date_filter}
-                        GROUP BY vm.learning_state
-                    """, (name_patterns,))
-                    result['learning_state_distribution'] = {row['learning_state']: row['count'] for row in cur.fetchall()}
+                    result['learning_state_distribution'] = video_stats['learning_state_distribution'] or {}
                 except Exception as e:
-                    logger.warning(f"Video meeting stats query failed: {e}")
+                    logger.warning(f"Video meeting agent query failed: {e}")
                     result['video_meetings'] = {'total': 0}
                     result['learning_state_distribution'] = {}
 
+                # Sort by date descending
+                recent_calls.sort(key=lambda x: x['date'], reverse=True)
+                result['recent_calls'] = recent_calls[:15]
+
                 # Update total calls to include video meetings
                 result['total_calls'] = result['total_calls'] + result['video_meetings'].get('total', 0)
 
@@ -915,52 +1172,101 @@ class DatabaseReader:
                 result['high_risk_calls'] = high_risk_calls[:50]  # Limit total
                 result['total_high_risk'] = len(high_risk_calls)
 
-                # Risk distribution
-                cur.execute("""
-                    SELECT
-                        cr.churn_risk as risk_category,
-                        COUNT(*) as count
-                    FROM call_resolutions cr
-                    WHERE cr.churn_risk IS NOT NULL
-                    GROUP BY cr.churn_risk
-                    ORDER BY
-                        CASE cr.churn_risk
+                # Aggregates are all-time: read them from the rollups when no day is dirty
+                if self._rollups_fresh(cur, ""):
+                    result.update(self._churn_rollup_aggregates(cur))
+                else:
+                    # Risk distribution
+                    cur.execute("""
+                        SELECT
+                            cr.churn_risk as risk_category,
+                            COUNT(*) as count
+                        FROM call_resolutions cr
+                        WHERE cr.churn_risk IS NOT NULL
+                        GROUP BY cr.churn_risk
+                        ORDER BY
+                            CASE cr.churn_risk
+                                WHEN 'high' THEN 1
+                                WHEN 'medium' THEN 2
+                                WHEN 'low' THEN 3
+                                ELSE 4
+                            END
+                    """)
+                    result['risk_distribution'] = {row['risk_category']: row['count'] for row in cur.fetchall()}
+
+                    # Companies with multiple high/medium-risk calls
+                    cur.execute("""
+                        SELECT
+                            t.customer_company,
+                            COUNT(*) as risk_count,
+                            SUM(CASE WHEN cr.churn_risk = 'high' THEN 1 ELSE 0 END) as high_count
+                        FROM transcripts t
+                        JOIN call_resolutions cr ON t.recording_id = cr.recording_id
+                        WHERE cr.churn_risk IN ('high', 'medium')
+                          AND t.customer_company IS NOT NULL
+                          AND t.customer_company != ''
+                        GROUP BY t.customer_company
+                        HAVING COUNT(*) > 1
+                        ORDER BY
+                            SUM(CASE WHEN cr.churn_risk = 'high' THEN 1 ELSE 0 END) DESC,
+                            risk_count DESC
+                        LIMIT 10
+                    """)
+                    result['repeat_risk_companies'] = [
+                        {
+                            'company': row['customer_company'],
+                            'risk_count': row['risk_count'],
+                            'high_count': row['high_count']
+                        }
+                        for row in cur.fetchall()
+                    ]
+
+                return result
+
+
+    def _churn_rollup_aggregates(self, cur) -> Dict[str, Any]:
+        """Risk distribution and repeat-risk companies from report_daily_rollups."""
+        cur.execute("""
+            SELECT
+                (SELECT json_object_agg(risk_category, count ORDER BY
+                        CASE risk_category
                             WHEN 'high' THEN 1
                             WHEN 'medium' THEN 2
                             WHEN 'low' THEN 3
                             ELSE 4
-                        END
-                """)
-                result['risk_distribution'] = {row['risk_category']: row['count'] for row in cur.fetchall()}
-
-                # Companies with multiple high/medium-risk calls
-                cur.execute("""
+                        END)
+                 FROM (
+                    SELECT rc.key as risk_category, SUM(rc.value::int) as count
+                    FROM report_daily_rollups r, jsonb_each_text(r.churn_risk_counts) rc
+                    GROUP BY rc.key
+                 ) d) as risk_distribution,
+
+                (SELECT json_agg(c)
+                 FROM (
                     SELECT
-                        t.customer_company,
-                        COUNT(*) as risk_count,
-                        SUM(CASE WHEN cr.churn_risk = 'high' THEN 1 ELSE 0 END) as high_count
-                    FROM transcripts t
-                    JOIN call_resolutions cr ON t.recording_id = cr.recording_id
-                    WHERE cr.churn_risk IN ('high', 'medium')
-                      AND t.customer_company IS NOT NULL
-                      AND t.customer_company != ''
-                    GROUP BY t.customer_company
-                    HAVING COUNT(*) > 1
-                    ORDER BY
-                        SUM(CASE WHEN cr.churn_risk = 'high' THEN 1 ELSE 0 END) DESC,
-                        risk_count DESC
+                        r.customer_company,
+                        SUM(r.churn_high_count + r.churn_medium_count) as risk_count,
+                        SUM(r.churn_high_count) as high_count
+                    FROM report_daily_rollups r
+                    WHERE r.customer_company != ''
+                    GROUP BY r.customer_company
+                    HAVING SUM(r.churn_high_count + r.churn_medium_count) > 1
+                    ORDER BY SUM(r.churn_high_count) DESC, risk_count DESC
                     LIMIT 10
-                """)
-                result['repeat_risk_companies'] = [
-                    {
-                        'company': row['customer_company'],
-                        'risk_count': row['risk_count'],
-                        'high_count': row['high_count']
-                    }
-                    for row in cur.fetchall()
-                ]
-
-                return result
+                 ) c) as repeat_risk_companies
+        """)
+        row = cur.fetchone()
+        return {
+            'risk_distribution': row['risk_distribution'] or {},
+            'repeat_risk_companies': [
+                {
+                    'company': c['customer_company'],
+                    'risk_count': c['risk_count'],
+                    'high_count': c['high_count']
+                }
+                for c in row['repeat_risk_companies'] or []
+            ]
+        }
 
 
     def get_customer_companies(self, limit: int = 50) -> List[Dict[str, Any]]:
@@ -1043,129 +1349,136 @@ class DatabaseReader:
                 # Date filter with t. prefix for joined queries
                 date_filter_t = date_filter.replace("AND call_date", "AND t.call_date") if date_filter else ""
 
-                # Total calls and contacts
-                if employee_patterns:
-                    cur.execute(f"""
-                        SELECT
-                            COUNT(*) as total_calls,
-                            COUNT(DISTINCT customer_name) as unique_contacts,
-                            MIN(call_date) as first_call,
-                            MAX(call_date) as last_call
-                        FROM transcripts
-                        WHERE LOWER(customer_company) LIKE ANY(%s)
-                        {date_filter}
-                        {employee_filter_clause}
-                    """, (patterns, employee_patterns))
+                # Aggregates come from the rollups when no day in range is dirty
+                rollup_filter = self._rollup_date_filter(date_range, start_date, end_date)
+                if self._rollups_fresh(cur, self._rollup_date_filter(date_range, start_date, end_date, table_alias="d")):
+                    result.update(self._customer_rollup_aggregates(cur, patterns, employee_patterns, rollup_filter))
+                    if result['total_calls'] == 0:
+                        return result
                 else:
+                    # Total calls and contacts
+                    if employee_patterns:
+                        cur.execute(f"""
+                            SELECT
+                                COUNT(*) as total_calls,
+                                COUNT(DISTINCT customer_name) as unique_contacts,
+                                MIN(call_date) as first_call,
+                                MAX(call_date) as last_call
+                            FROM transcripts
+                            WHERE LOWER(customer_company) LIKE ANY(%s)
+                            {date_filter}
+                            {employee_filter_clause}
+                        """, (patterns, employee_patterns))
+                    else:
+                        cur.execute(f"""
+                            SELECT
+                                COUNT(*) as total_calls,
+                                COUNT(DISTINCT customer_name) as unique_contacts,
+                                MIN(call_date) as first_call,
+                                MAX(call_date) as last_call
+                            FROM transcripts
+                            WHERE LOWER(customer_company) LIKE ANY(%s)
+                            {date_filter}
+                        """, (patterns,))
+                    row = cur.fetchone()
+                    result['total_calls'] = row['total_calls'] if row else 0
+                    result['unique_contacts'] = row['unique_contacts'] if row else 0
+                    result['first_call'] = str(row['first_call']) if row and row['first_call'] else None
+                    result['last_call'] = str(row['last_call']) if row and row['last_call'] else None
+
+                    if result['total_calls'] == 0:
+                        return result
+
+                    # Contact list
                     cur.execute(f"""
                         SELECT
-                            COUNT(*) as total_calls,
-                            COUNT(DISTINCT customer_name) as unique_contacts,
-                            MIN(call_date) as first_call,
+                            customer_name,
+                            COUNT(*) as call_count,
                             MAX(call_date) as last_call
                         FROM transcripts
                         WHERE LOWER(customer_company) LIKE ANY(%s)
-                        {date_filter}
+                          AND customer_name IS NOT NULL
+                          AND customer_name != ''
+                          {date_filter}
+                        GROUP BY customer_name
+                        ORDER BY call_count DESC
+                        LIMIT 10
                     """, (patterns,))
-                row = cur.fetchone()
-                result['total_calls'] = row['total_calls'] if row else 0
-                result['unique_contacts'] = row['unique_contacts'] if row else 0
-                result['first_call'] = str(row['first_call']) if row and row['first_call'] else None
-                result['last_call'] = str(row['last_call']) if row and row['last_call'] else None
-
-                if result['total_calls'] == 0:
-                    return result
+                    result['contacts'] = [dict(row) for row in cur.fetchall()]
 
-                # Contact list
-                cur.execute(f"""
-                    SELECT
-                        customer_name,
-                        COUNT(*) as call_count,
-                        MAX(call_date) as last_call
-                    FROM transcripts
-                    WHERE LOWER(customer_company) LIKE ANY(%s)
-                      AND customer_name IS NOT NULL
-                      AND customer_name != ''
-                      {date_filter}
-                    GROUP BY customer_name
-                    ORDER BY call_count DESC
-                    LIMIT 10
-                """, (patterns,))
-                result['contacts'] = [dict(row) for row in cur.fetchall()]
-
-                # Sentiment distribution
-                cur.execute(f"""
-                    SELECT
-                        i.customer_sentiment,
-                        COUNT(*) as count
-                    FROM transcripts t
-                    JOIN insights i ON t.recording_id = i.recording_id
-                    WHERE LOWER(t.customer_company) LIKE ANY(%s)
-                      AND i.customer_sentiment IS NOT NULL
-                      {date_filter_t}
-                    GROUP BY i.customer_sentiment
-                """, (patterns,))
-                result['sentiment_distribution'] = {row['customer_sentiment']: row['count'] for row in cur.fetchall()}
+                    # Sentiment distribution
+                    cur.execute(f"""
+                        SELECT
+                            i.customer_sentiment,
+                            COUNT(*) as count
+                        FROM transcripts t
+                        JOIN insights i ON t.recording_id = i.recording_id
+                        WHERE LOWER(t.customer_company) LIKE ANY(%s)
+                          AND i.customer_sentiment IS NOT NULL
+                          {date_filter_t}
+                        GROUP BY i.customer_sentiment
+                    """, (patterns,))
+                    result['sentiment_distribution'] = {row['customer_sentiment']: row['count'] for row in cur.fetchall()}
 
-                # Quality metrics
-                cur.execute(f"""
-                    SELECT
-                        ROUND(AVG(i.call_quality_score)::numeric, 1) as avg_quality,
-                        ROUND(AVG(i.customer_satisfaction_score)::numeric, 1) as avg_satisfaction
-                    FROM transcripts t
-                    JOIN insights i ON t.recording_id = i.recording_id
-                    WHERE LOWER(t.customer_company) LIKE ANY(%s)
-                    {date_filter_t}
-                """, (patterns,))
-                row = cur.fetchone()
-                result['avg_quality'] = float(row['avg_quality']) if row and row['avg_quality'] else 0
-                result['avg_satisfaction'] = float(row['avg_satisfaction']) if row and row['avg_satisfaction'] else 0
+                    # Quality metrics
+                    cur.execute(f"""
+                        SELECT
+                            ROUND(AVG(i.call_quality_score)::numeric, 1) as avg_quality,
+                            ROUND(AVG(i.customer_satisfaction_score)::numeric, 1) as avg_satisfaction
+                        FROM transcripts t
+                        JOIN insights i ON t.recording_id = i.recording_id
+                        WHERE LOWER(t.customer_company) LIKE ANY(%s)
+                        {date_filter_t}
+                    """, (patterns,))
+                    row = cur.fetchone()
+                    result['avg_quality'] = float(row['avg_quality']) if row and row['avg_quality'] else 0
+                    result['avg_satisfaction'] = float(row['avg_satisfaction']) if row and row['avg_satisfaction'] else 0
 
-                # Churn risk
-                cur.execute(f"""
-                    SELECT
-                        cr.churn_risk,
-                        COUNT(*) as count
-                    FROM transcripts t
-                    JOIN call_resolutions cr ON t.recording_id = cr.recording_id
-                    WHERE LOWER(t.customer_company) LIKE ANY(%s)
-                      AND cr.churn_risk IS NOT NULL
-                      {date_filter_t}
-                    GROUP BY cr.churn_risk
-                """, (patterns,))
-                result['churn_risk_distribution'] = {row['churn_risk']: row['count'] for row in cur.fetchall()}
+                    # Churn risk
+                    cur.execute(f"""
+                        SELECT
+                            cr.churn_risk,
+                            COUNT(*) as count
+                        FROM transcripts t
+                        JOIN call_resolutions cr ON t.recording_id = cr.recording_id
+                        WHERE LOWER(t.customer_company) LIKE ANY(%s)
+                          AND cr.churn_risk IS NOT NULL
+                          {date_filter_t}
+                        GROUP BY cr.churn_risk
+                    """, (patterns,))
+                    result['churn_risk_distribution'] = {row['churn_risk']: row['count'] for row in cur.fetchall()}
 
-                # Call types
-                cur.execute(f"""
-                    SELECT
-                        i.call_type,
-                        COUNT(*) as count
-                    FROM transcripts t
-                    JOIN insights i ON t.recording_id = i.recording_id
-                    WHERE LOWER(t.customer_company) LIKE ANY(%s)
-                      AND i.call_type IS NOT NULL
-                      {date_filter_t}
-                    GROUP BY i.call_type
-                    ORDER BY count DESC
-                """, (patterns,))
-                result['call_types'] = {row['call_type']: row['count'] for row in cur.fetchall()}
+                    # Call types
+                    cur.execute(f"""
+                        SELECT
+                            i.call_type,
+                            COUNT(*) as count
+                        FROM transcripts t
+                        JOIN insights i ON t.recording_id = i.recording_id
+                        WHERE LOWER(t.customer_company) LIKE ANY(%s)
+                          AND i.call_type IS NOT NULL
+                          {date_filter_t}
+                        GROUP BY i.call_type
+                        ORDER BY count DESC
+                    """, (patterns,))
+                    result['call_types'] = {row['call_type']: row['count'] for row in cur.fetchall()}
 
-                # Agents who handled their calls
-                cur.execute(f"""
-                    SELECT
-                        COALESCE(NULLIF(t.employee_name, ''), 'Unknown Agent') as employee_name,
-                        COUNT(*) as call_count
-                    FROM transcripts t
-                    WHERE LOWER(t.customer_company) LIKE ANY(%s)
-                      {date_filter_t}
-                    GROUP BY COALESCE(NULLIF(t.employee_name, ''), 'Unknown Agent')
-                    ORDER BY call_count DESC
-                    LIMIT 5
-                """, (patterns,))
-                result['agents'] = [
-                    {'name': row['employee_name'], 'calls': row['call_count']}
-                    for row in cur.fetchall()
-                ]
+                    # Agents who handled their calls
+                    cur.execute(f"""
+                        SELECT
+                            COALESCE(NULLIF(t.employee_name, ''), 'Unknown Agent') as employee_name,
+                            COUNT(*) as call_count
+                        FROM transcripts t
+                        WHERE LOWER(t.customer_company) LIKE ANY(%s)
+                          {date_filter_t}
+                        GROUP BY COALESCE(NULLIF(t.employee_name, ''), 'Unknown Agent')
+                        ORDER BY call_count DESC
+                        LIMIT 5
+                    """, (patterns,))
+                    result['agents'] = [
+                        {'name': row['employee_name'], 'calls': row['call_count']}
+                        for row in cur.fetchall()
+                    ]
 
                 # Recent calls with summaries
                 cur.execute(f"""
@@ -1224,6 +1537,102 @@ class DatabaseReader:
                 return result
 
 
+    def _customer_rollup_aggregates(
+        self,
+        cur,
+        patterns: List[str],
+        employee_patterns: Optional[List[str]],
+        date_filter: str
+    ) -> Dict[str, Any]:
+        """Customer report aggregates from report_daily_rollups in one statement.
+
+        As in the raw queries, the employee filter only applies to the
+        call totals, not the breakdowns.
+        """
+        employee_clause = "AND LOWER(c.employee_name) LIKE ANY(%(employee_patterns)s)" if employee_patterns else ""
+        cur.execute(f"""
+            WITH company AS MATERIALIZED (
+                SELECT r.*
+                FROM report_daily_rollups r
+                WHERE LOWER(r.customer_company) LIKE ANY(%(patterns)s)
+                {date_filter}
+            )
+            SELECT
+                (SELECT COALESCE(SUM(c.transcript_count), 0) FROM company c
+                 WHERE TRUE {employee_clause}) as total_calls,
+                (SELECT COUNT(DISTINCT k) FROM company c, jsonb_object_keys(c.contact_counts) k
+                 WHERE TRUE {employee_clause}) as unique_contacts,
+                (SELECT MIN(NULLIF(c.call_date, %(undated)s)) FROM company c
+                 WHERE TRUE {employee_clause}) as first_call,
+                (SELECT MAX(NULLIF(c.call_date, %(undated)s)) FROM company c
+                 WHERE TRUE {employee_clause}) as last_call,
+
+                (SELECT json_agg(ct ORDER BY ct.call_count DESC)
+                 FROM (
+                    SELECT k.key as customer_name, SUM(k.value::int) as call_count,
+                           MAX(NULLIF(c.call_date, %(undated)s)) as last_call
+                    FROM company c, jsonb_each_text(c.contact_counts) k
+                    WHERE k.key != ''
+                    GROUP BY k.key
+                    ORDER BY call_count DESC
+                    LIMIT 10
+                 ) ct) as contacts,
+
+                (SELECT json_object_agg(s.sentiment, s.count)
+                 FROM (
+                    SELECT k.key as sentiment, SUM(k.value::int) as count
+                    FROM company c, jsonb_each_text(c.sentiment_counts) k
+                    GROUP BY k.key
+                 ) s) as sentiment_distribution,
+
+                (SELECT ROUND((SUM(c.quality_sum) / NULLIF(SUM(c.quality_count), 0))::numeric, 1)
+                 FROM company c) as avg_quality,
+                (SELECT ROUND((SUM(c.satisfaction_sum) / NULLIF(SUM(c.satisfaction_count), 0))::numeric, 1)
+                 FROM company c) as avg_satisfaction,
+
+                (SELECT json_object_agg(cr.churn_risk, cr.count)
+                 FROM (
+                    SELECT k.key as churn_risk, SUM(k.value::int) as count
+                    FROM company c, jsonb_each_text(c.churn_risk_counts) k
+                    GROUP BY k.key
+                 ) cr) as churn_risk_distribution,
+
+                (SELECT json_object_agg(ct.call_type, ct.count ORDER BY ct.count DESC)
+                 FROM (
+                    SELECT c.call_type, SUM(c.analyzed_count) as count
+                    FROM company c
+                    WHERE c.call_type != ''
+                    GROUP BY c.call_type
+                 ) ct) as call_types,
+
+                (SELECT json_agg(a ORDER BY a.calls DESC)
+                 FROM (
+                    SELECT
+                        COALESCE(NULLIF(c.employee_name, ''), 'Unknown Agent') as name,
+                        SUM(c.transcript_count) as calls
+                    FROM company c
+                    GROUP BY COALESCE(NULLIF(c.employee_name, ''), 'Unknown Agent')
+                    ORDER BY calls DESC
+                    LIMIT 5
+                 ) a) as agents
+        """, {'patterns': patterns, 'employee_patterns': employee_patterns, 'undated': UNDATED_CALL_DATE})
+        row = cur.fetchone()
+
+        return {
+            'total_calls': row['total_calls'],
+            'unique_contacts': row['unique_contacts'],
+            'first_call': str(row['first_call']) if row['first_call'] else None,
+            'last_call': str(row['last_call']) if row['last_call'] else None,
+            'contacts': row['contacts'] or [],
+            'sentiment_distribution': row['sentiment_distribution'] or {},
+            'avg_quality': float(row['avg_quality']) if row['avg_quality'] else 0,
+            'avg_satisfaction': float(row['avg_satisfaction']) if row['avg_satisfaction'] else 0,
+            'churn_risk_distribution': row['churn_risk_distribution'] or {},
+            'call_types': row['call_types'] or {},
+            'agents': row['agents'] or [],
+        }
+
+
     def get_sentiment_report_data(self, sentiment_filter: str = 'negative', date_range: str = None, start_date: str = None, end_date: str = None, employee_filter: str = None) -> Dict[str, Any]:
         """
         Get actual sentiment data from the database for reporting.
@@ -1240,31 +1649,32 @@ class DatabaseReader:
                 result = {}
 
                 # Build date filter based on date_range or custom dates
-                date_filter = ""
                 date_filter_with_t = ""
                 if start_date and end_date:
-                    date_filter = f"AND i.created_at >= '{start_date}'::date AND i.created_at < '{end_date}'::date + INTERVAL '1 day'"
                     date_filter_with_t = f"AND t.call_date >= '{start_date}'::date AND t.call_date < '{end_date}'::date + INTERVAL '1 day'"
                     result['date_range'] = f"{start_date} to {end_date}"
                 elif date_range == 'last_30':
-                    date_filter = "AND i.created_at >= CURRENT_DATE - INTERVAL '30 days'"
                     date_filter_with_t = "AND t.call_date >= CURRENT_DATE - INTERVAL '30 days'"
                     result['date_range'] = 'last_30'
                 elif date_range == 'mtd':
-                    date_filter = "AND i.created_at >= DATE_TRUNC('month', CURRENT_DATE)"
                     date_filter_with_t = "AND t.call_date >= DATE_TRUNC('month', CURRENT_DATE)"
                     result['date_range'] = 'mtd'
                 elif date_range == 'qtd':
-                    date_filter = "AND i.created_at >= DATE_TRUNC('quarter', CURRENT_DATE)"
                     date_filter_with_t = "AND t.call_date >= DATE_TRUNC('quarter', CURRENT_DATE)"
                     result['date_range'] = 'qtd'
                 elif date_range == 'ytd':
-                    date_filter = "AND i.created_at >= DATE_TRUNC('year', CURRENT_DATE)"
                     date_filter_with_t = "AND t.call_date >= DATE_TRUNC('year', CURRENT_DATE)"
                     result['date_range'] = 'ytd'
                 else:
                     result['date_range'] = 'all_time'
 
+                # Insights-only queries filter on the call date as well, so the
+                # raw path counts the same calls as the call_date rollups
+                date_filter = (
+                    f"AND i.recording_id IN (SELECT t.recording_id FROM transcripts t WHERE 1=1 {date_filter_with_t})"
+                    if date_filter_with_t else ""
+                )
+
                 # Build employee filter using all name variations
                 employee_filter_clause = ""
                 employee_patterns = None
@@ -1281,18 +1691,30 @@ class DatabaseReader:
                 else:
                     sentiment_clause = "i.customer_sentiment IS NOT NULL"
 
-                # Overall sentiment distribution
-                cur.execute(f"""
-                    SELECT
-                        i.customer_sentiment,
-                        COUNT(*) as count
-                    FROM insights i
-                    WHERE i.customer_sentiment IS NOT NULL
-                    {date_filter}
-                    GROUP BY i.customer_sentiment
-                    ORDER BY count DESC
-                """)
-                result['sentiment_distribution'] = {row['customer_sentiment']: row['count'] for row in cur.fetchall()}
+                # Aggregates come from the rollups when no day in range is dirty
+                rollup_filter = self._rollup_date_filter(date_range, start_date, end_date)
+                rollup_trend_filter = rollup_filter if date_range else "AND r.call_date >= CURRENT_DATE - INTERVAL '90 days'"
+                use_rollups = self._rollups_fresh(
+                    cur,
+                    self._rollup_date_filter(date_range, start_date, end_date, table_alias="d"),
+                    rollup_trend_filter and rollup_trend_filter.replace("r.call_date", "d.call_date")
+                )
+                if use_rollups:
+                    result.update(self._sentiment_rollup_aggregates(cur, rollup_filter, rollup_trend_filter))
+
+                if not use_rollups:
+                    # Overall sentiment distribution
+                    cur.execute(f"""
+                        SELECT
+                            i.customer_sentiment,
+                            COUNT(*) as count
+                        FROM insights i
+                        WHERE i.customer_sentiment IS NOT NULL
+                        {date_filter}
+                        GROUP BY i.customer_sentiment
+                        ORDER BY count DESC
+                    """)
+                    result['sentiment_distribution'] = {row['customer_sentiment']: row['count'] for row in cur.fetchall()}
 
                 # Calls matching the filter with full details
                 query = f"""
@@ -1419,64 +1841,65 @@ class DatabaseReader:
                 result['calls'] = calls[:50]
                 result['total_matching'] = len(calls)
 
-                # Sentiment by agent
-                cur.execute(f"""
-                    SELECT
-                        COALESCE(NULLIF(t.employee_name, ''), 'Unknown Agent') as employee_name,
-                        COUNT(*) as call_count,
-                        SUM(CASE WHEN LOWER(i.customer_sentiment) IN ('negative', 'frustrated', 'angry') THEN 1 ELSE 0 END) as negative_count,
-                        SUM(CASE WHEN LOWER(i.customer_sentiment) IN ('positive', 'satisfied', 'happy') THEN 1 ELSE 0 END) as positive_count,
-                        ROUND(AVG(i.call_quality_score)::numeric, 1) as avg_quality
-                    FROM transcripts t
-                    JOIN insights i ON t.recording_id = i.recording_id
-                    WHERE 1=1 {date_filter_with_t}
-                    GROUP BY COALESCE(NULLIF(t.employee_name, ''), 'Unknown Agent')
-                    HAVING COUNT(*) >= 3
-                    ORDER BY
-                        SUM(CASE WHEN LOWER(i.customer_sentiment) IN ('negative', 'frustrated', 'angry') THEN 1 ELSE 0 END) DESC
-                    LIMIT 15
-                """)
-                result['sentiment_by_agent'] = [
-                    {
-                        'agent': row['employee_name'],
-                        'total_calls': row['call_count'],
-                        'negative_calls': row['negative_count'],
-                        'positive_calls': row['positive_count'],
-                        'avg_quality': float(row['avg_quality']) if row['avg_quality'] else 0
-                    }
-                    for row in cur.fetchall()
-                ]
-
-                # Sentiment by company (customers)
-                cur.execute(f"""
-                    SELECT
-                        t.customer_company,
-                        COUNT(*) as call_count,
-                        SUM(CASE WHEN LOWER(i.customer_sentiment) IN ('negative', 'frustrated', 'angry') THEN 1 ELSE 0 END) as negative_count,
-                        SUM(CASE WHEN LOWER(i.customer_sentiment) IN ('positive', 'satisfied', 'happy') THEN 1 ELSE 0 END) as positive_count
-                    FROM transcripts t
-                    JOIN insights i ON t.recording_id = i.recording_id
-                    WHERE t.customer_company IS NOT NULL
-                      AND t.customer_company != ''
-                      AND t.customer_company != 'Unknown'
-                      AND LOWER(t.customer_company) NOT LIKE '%%pc recruiter%%'
-                      AND LOWER(t.customer_company) NOT LIKE '%%main sequence%%'
-                      {date_filter_with_t}
-                    GROUP BY t.customer_company
-                    HAVING SUM(CASE WHEN LOWER(i.customer_sentiment) IN ('negative', 'frustrated', 'angry') THEN 1 ELSE 0 END) > 0
-                    ORDER BY
-                        SUM(CASE WHEN LOWER(i.customer_sentiment) IN ('negative', 'frustrated', 'angry') THEN 1 ELSE 0 END) DESC
-                    LIMIT 10
-                """)
-                result['sentiment_by_customer'] = [
-                    {
-                        'company': row['customer_company'],
-                        'total_calls': row['call_count'],
-                        'negative_calls': row['negative_count'],
-                        'positive_calls': row['positive_count']
-                    }
-                    for row in cur.fetchall()
-                ]
+                if not use_rollups:
+                    # Sentiment by agent
+                    cur.execute(f"""
+                        SELECT
+                            COALESCE(NULLIF(t.employee_name, ''), 'Unknown Agent') as employee_name,
+                            COUNT(*) as call_count,
+                            SUM(CASE WHEN LOWER(i.customer_sentiment) IN ('negative', 'frustrated', 'angry') THEN 1 ELSE 0 END) as negative_count,
+                            SUM(CASE WHEN LOWER(i.customer_sentiment) IN ('positive', 'satisfied', 'happy') THEN 1 ELSE 0 END) as positive_count,
+                            ROUND(AVG(i.call_quality_score)::numeric, 1) as avg_quality
+                        FROM transcripts t
+                        JOIN insights i ON t.recording_id = i.recording_id
+                        WHERE 1=1 {date_filter_with_t}
+                        GROUP BY COALESCE(NULLIF(t.employee_name, ''), 'Unknown Agent')
+                        HAVING COUNT(*) >= 3
+                        ORDER BY
+                            SUM(CASE WHEN LOWER(i.customer_sentiment) IN ('negative', 'frustrated', 'angry') THEN 1 ELSE 0 END) DESC
+                        LIMIT 15
+                    """)
+                    result['sentiment_by_agent'] = [
+                        {
+                            'agent': row['employee_name'],
+                            'total_calls': row['call_count'],
+                            'negative_calls': row['negative_count'],
+                            'positive_calls': row['positive_count'],
+                            'avg_quality': float(row['avg_quality']) if row['avg_quality'] else 0
+                        }
+                        for row in cur.fetchall()
+                    ]
+
+                    # Sentiment by company (customers)
+                    cur.execute(f"""
+                        SELECT
+                            t.customer_company,
+                            COUNT(*) as call_count,
+                            SUM(CASE WHEN LOWER(i.customer_sentiment) IN ('negative', 'frustrated', 'angry') THEN 1 ELSE 0 END) as negative_count,
+                            SUM(CASE WHEN LOWER(i.customer_sentiment) IN ('positive', 'satisfied', 'happy') THEN 1 ELSE 0 END) as positive_count
+                        FROM transcripts t
+                        JOIN insights i ON t.recording_id = i.recording_id
+                        WHERE t.customer_company IS NOT NULL
+                          AND t.customer_company != ''
+                          AND t.customer_company != 'Unknown'
+                          AND LOWER(t.customer_company) NOT LIKE '%%pc recruiter%%'
+                          AND LOWER(t.customer_company) NOT LIKE '%%main sequence%%'
+                          {date_filter_with_t}
+                        GROUP BY t.customer_company
+                        HAVING SUM(CASE WHEN LOWER(i.customer_sentiment) IN ('negative', 'frustrated', 'angry') THEN 1 ELSE 0 END) > 0
+                        ORDER BY
+                            SUM(CASE WHEN LOWER(i.customer_sentiment) IN ('negative', 'frustrated', 'angry') THEN 1 ELSE 0 END) DESC
+                        LIMIT 10
+                    """)
+                    result['sentiment_by_customer'] = [
+                        {
+                            'company': row['customer_company'],
+                            'total_calls': row['call_count'],
+                            'negative_calls': row['negative_count'],
+                            'positive_calls': row['positive_count']
+                        }
+                        for row in cur.fetchall()
+                    ]
 
                 # Common topics in negative calls
                 cur.execute(f"""
@@ -1497,49 +1920,140 @@ class DatabaseReader:
                 topic_counts = Counter(all_topics)
                 result['negative_sentiment_topics'] = [{'topic': t, 'count': c} for t, c in topic_counts.most_common(15)]
 
-                # Common call types in negative calls
-                cur.execute(f"""
+                if not use_rollups:
+                    # Common call types in negative calls
+                    cur.execute(f"""
+                        SELECT
+                            i.call_type,
+                            COUNT(*) as count
+                        FROM insights i
+                        WHERE LOWER(i.customer_sentiment) IN ('negative', 'frustrated', 'angry')
+                          AND i.call_type IS NOT NULL
+                          {date_filter}
+                        GROUP BY i.call_type
+                        ORDER BY count DESC
+                        LIMIT 10
+                    """)
+                    result['negative_call_types'] = {row['call_type']: row['count'] for row in cur.fetchall()}
+
+                    # Trend data (by week) - adjust based on date range
+                    trend_date_filter = date_filter_with_t if date_range else "AND t.call_date >= CURRENT_DATE - INTERVAL '90 days'"
+                    cur.execute(f"""
+                        SELECT
+                            DATE_TRUNC('week', t.call_date) as week,
+                            COUNT(*) as total_calls,
+                            SUM(CASE WHEN LOWER(i.customer_sentiment) IN ('negative', 'frustrated', 'angry') THEN 1 ELSE 0 END) as negative,
+                            SUM(CASE WHEN LOWER(i.customer_sentiment) IN ('positive', 'satisfied', 'happy') THEN 1 ELSE 0 END) as positive,
+                            SUM(CASE WHEN LOWER(i.customer_sentiment) = 'neutral' THEN 1 ELSE 0 END) as neutral
+                        FROM transcripts t
+                        JOIN insights i ON t.recording_id = i.recording_id
+                        WHERE 1=1 {trend_date_filter}
+                        GROUP BY DATE_TRUNC('week', t.call_date)
+                        ORDER BY week DESC
+                        LIMIT 12
+                    """)
+                    result['weekly_trends'] = [
+                        {
+                            'week': str(row['week'].date()) if row['week'] else 'Unknown',
+                            'total': row['total_calls'],
+                            'negative': row['negative'],
+                            'positive': row['positive'],
+                            'neutral': row['neutral']
+                        }
+                        for row in cur.fetchall()
+                    ]
+
+                return result
+
+
+    def _sentiment_rollup_aggregates(self, cur, date_filter: str, trend_date_filter: str) -> Dict[str, Any]:
+        """Sentiment report aggregates from report_daily_rollups in one statement."""
+        cur.execute(f"""
+            WITH ranged AS MATERIALIZED (
+                SELECT r.*
+                FROM report_daily_rollups r
+                WHERE r.analyzed_count > 0
+                {date_filter}
+            )
+            SELECT
+                (SELECT json_object_agg(s.sentiment, s.count ORDER BY s.count DESC)
+                 FROM (
+                    SELECT k.key as sentiment, SUM(k.value::int) as count
+                    FROM ranged r, jsonb_each_text(r.sentiment_counts) k
+                    GROUP BY k.key
+                 ) s) as sentiment_distribution,
+
+                (SELECT json_agg(a ORDER BY a.negative_calls DESC)
+                 FROM (
                     SELECT
-                        i.call_type,
-                        COUNT(*) as count
-                    FROM insights i
-                    WHERE LOWER(i.customer_sentiment) IN ('negative', 'frustrated', 'angry')
-                      AND i.call_type IS NOT NULL
-                      {date_filter}
-                    GROUP BY i.call_type
+                        COALESCE(NULLIF(r.employee_name, ''), 'Unknown Agent') as agent,
+                        SUM(r.analyzed_count) as total_calls,
+                        SUM(r.negative_count) as negative_calls,
+                        SUM(r.positive_count) as positive_calls,
+                        COALESCE(ROUND((SUM(r.quality_sum) / NULLIF(SUM(r.quality_count), 0))::numeric, 1), 0) as avg_quality
+                    FROM ranged r
+                    GROUP BY COALESCE(NULLIF(r.employee_name, ''), 'Unknown Agent')
+                    HAVING SUM(r.analyzed_count) >= 3
+                    ORDER BY SUM(r.negative_count) DESC
+                    LIMIT 15
+                 ) a) as sentiment_by_agent,
+
+                (SELECT json_agg(c ORDER BY c.negative_calls DESC)
+                 FROM (
+                    SELECT
+                        r.customer_company as company,
+                        SUM(r.analyzed_count) as total_calls,
+                        SUM(r.negative_count) as negative_calls,
+                        SUM(r.positive_count) as positive_calls
+                    FROM ranged r
+                    WHERE r.customer_company != ''
+                      AND r.customer_company != 'Unknown'
+                      AND LOWER(r.customer_company) NOT LIKE '%%pc recruiter%%'
+                      AND LOWER(r.customer_company) NOT LIKE '%%main sequence%%'
+                    GROUP BY r.customer_company
+                    HAVING SUM(r.negative_count) > 0
+                    ORDER BY SUM(r.negative_count) DESC
+                    LIMIT 10
+                 ) c) as sentiment_by_customer,
+
+                (SELECT json_object_agg(ct.call_type, ct.count ORDER BY ct.count DESC)
+                 FROM (
+                    SELECT r.call_type, SUM(r.negative_count) as count
+                    FROM ranged r
+                    WHERE r.call_type != ''
+                    GROUP BY r.call_type
+                    HAVING SUM(r.negative_count) > 0
                     ORDER BY count DESC
                     LIMIT 10
-                """)
-                result['negative_call_types'] = {row['call_type']: row['count'] for row in cur.fetchall()}
+                 ) ct) as negative_call_types,
 
-                # Trend data (by week) - adjust based on date range
-                trend_date_filter = date_filter_with_t if date_range else "AND t.call_date >= CURRENT_DATE - INTERVAL '90 days'"
-                cur.execute(f"""
+                (SELECT json_agg(w ORDER BY w.week DESC)
+                 FROM (
                     SELECT
-                        DATE_TRUNC('week', t.call_date) as week,
-                        COUNT(*) as total_calls,
-                        SUM(CASE WHEN LOWER(i.customer_sentiment) IN ('negative', 'frustrated', 'angry') THEN 1 ELSE 0 END) as negative,
-                        SUM(CASE WHEN LOWER(i.customer_sentiment) IN ('positive', 'satisfied', 'happy') THEN 1 ELSE 0 END) as positive,
-                        SUM(CASE WHEN LOWER(i.customer_sentiment) = 'neutral' THEN 1 ELSE 0 END) as neutral
-                    FROM transcripts t
-                    JOIN insights i ON t.recording_id = i.recording_id
-                    WHERE 1=1 {trend_date_filter}
-                    GROUP BY DATE_TRUNC('week', t.call_date)
+                        DATE_TRUNC('week', r.call_date)::date as week,
+                        SUM(r.analyzed_count) as total,
+                        SUM(r.negative_count) as negative,
+                        SUM(r.positive_count) as positive,
+                        SUM(r.neutral_count) as neutral
+                    FROM report_daily_rollups r
+                    WHERE r.analyzed_count > 0
+                    {trend_date_filter}
+                    GROUP BY DATE_TRUNC('week', r.call_date)::date
                     ORDER BY week DESC
                     LIMIT 12
-                """)
-                result['weekly_trends'] = [
-                    {
-                        'week': str(row['week'].date()) if row['week'] else 'Unknown',
-                        'total': row['total_calls'],
-                        'negative': row['negative'],
-                        'positive': row['positive'],
-                        'neutral': row['neutral']
-                    }
-                    for row in cur.fetchall()
-                ]
-
-                return result
+                 ) w) as weekly_trends
+        """)
+        row = cur.fetchone()
+
+        return {
+            'sentiment_distribution': row['sentiment_distribution'] or {},
+            'sentiment_by_agent': [
+                dict(a, avg_quality=float(a['avg_quality'])) for a in row['sentiment_by_agent'] or []
+            ],
+            'sentiment_by_customer': row['sentiment_by_customer'] or [],
+            'negative_call_types': row['negative_call_types'] or {},
+            'weekly_trends': row['weekly_trends'] or [],
+        }
 
 
     def get_quality_report_data(self, focus: str = 'low_quality', date_range: str = None, start_date: str = None, end_date: str = None, employee_filter: str = None) -> Dict[str, Any]:
@@ -1558,31 +2072,32 @@ class DatabaseReader:
                 result = {}
 
                 # Build date filter based on date_range or custom dates
-                date_filter = ""
                 date_filter_with_t = ""
                 if start_date and end_date:
-                    date_filter = f"AND i.created_at >= '{start_date}'::date AND i.created_at < '{end_date}'::date + INTERVAL '1 day'"
                     date_filter_with_t = f"AND t.call_date >= '{start_date}'::date AND t.call_date < '{end_date}'::date + INTERVAL '1 day'"
                     result['date_range'] = f"{start_date} to {end_date}"
                 elif date_range == 'last_30':
-                    date_filter = "AND i.created_at >= CURRENT_DATE - INTERVAL '30 days'"
                     date_filter_with_t = "AND t.call_date >= CURRENT_DATE - INTERVAL '30 days'"
                     result['date_range'] = 'last_30'
                 elif date_range == 'mtd':
-                    date_filter = "AND i.created_at >= DATE_TRUNC('month', CURRENT_DATE)"
                     date_filter_with_t = "AND t.call_date >= DATE_TRUNC('month', CURRENT_DATE)"
                     result['date_range'] = 'mtd'
                 elif date_range == 'qtd':
-                    date_filter = "AND i.created_at >= DATE_TRUNC('quarter', CURRENT_DATE)"
                     date_filter_with_t = "AND t.call_date >= DATE_TRUNC('quarter', CURRENT_DATE)"
                     result['date_range'] = 'qtd'
                 elif date_range == 'ytd':
-                    date_filter = "AND i.created_at >= DATE_TRUNC('year', CURRENT_DATE)"
                     date_filter_with_t = "AND t.call_date >= DATE_TRUNC('year', CURRENT_DATE)"
                     result['date_range'] = 'ytd'
                 else:
                     result['date_range'] = 'all_time'
 
+                # Insights-only queries filter on the call date as well, so the
+                # raw path counts the same calls as the call_date rollups
+                date_filter = (
+                    f"AND i.recording_id IN (SELECT t.recording_id FROM transcripts t WHERE 1=1 {date_filter_with_t})"
+                    if date_filter_with_t else ""
+                )
+
                 # Build employee filter using all name variations
                 employee_filter_clause = ""
                 employee_patterns = None
@@ -1591,43 +2106,55 @@ class DatabaseReader:
                     employee_filter_clause = "AND (LOWER(t.employee_name) LIKE ANY(%s))"
                     result['filtered_by'] = employee_filter
 
-                # Overall quality distribution
-                cur.execute(f"""
-                    SELECT
-                        CASE
-                            WHEN call_quality_score >= 8 THEN 'Excellent (8-10)'
-                            WHEN call_quality_score >= 6 THEN 'Good (6-7)'
-                            WHEN call_quality_score >= 4 THEN 'Fair (4-5)'
-                            ELSE 'Poor (1-3)'
-                        END as quality_tier,
-                        COUNT(*) as count,
-                        MIN(call_quality_score) as min_score
-                    FROM insights i
-                    WHERE call_quality_score IS NOT NULL
-                    {date_filter}
-                    GROUP BY
-                        CASE
-                            WHEN call_quality_score >= 8 THEN 'Excellent (8-10)'
-                            WHEN call_quality_score >= 6 THEN 'Good (6-7)'
-                            WHEN call_quality_score >= 4 THEN 'Fair (4-5)'
-                            ELSE 'Poor (1-3)'
-                        END
-                    ORDER BY min_score DESC
-                """)
-                result['quality_distribution'] = {row['quality_tier']: row['count'] for row in cur.fetchall()}
-
-                # Average quality score
-                cur.execute(f"""
-                    SELECT
-                        ROUND(AVG(call_quality_score)::numeric, 2) as avg_quality,
-                        COUNT(*) as total_calls
-                    FROM insights i
-                    WHERE call_quality_score IS NOT NULL
-                    {date_filter}
-                """)
-                row = cur.fetchone()
-                result['avg_quality'] = float(row['avg_quality']) if row and row['avg_quality'] else 0
-                result['total_calls_with_quality'] = row['total_calls'] if row else 0
+                # Aggregates come from the rollups when no day in range is dirty
+                rollup_filter = self._rollup_date_filter(date_range, start_date, end_date)
+                rollup_trend_filter = rollup_filter if date_range else "AND r.call_date >= CURRENT_DATE - INTERVAL '90 days'"
+                use_rollups = self._rollups_fresh(
+                    cur,
+                    self._rollup_date_filter(date_range, start_date, end_date, table_alias="d"),
+                    rollup_trend_filter and rollup_trend_filter.replace("r.call_date", "d.call_date")
+                )
+                if use_rollups:
+                    result.update(self._quality_rollup_aggregates(cur, rollup_filter, rollup_trend_filter))
+
+                if not use_rollups:
+                    # Overall quality distribution
+                    cur.execute(f"""
+                        SELECT
+                            CASE
+                                WHEN call_quality_score >= 8 THEN 'Excellent (8-10)'
+                                WHEN call_quality_score >= 6 THEN 'Good (6-7)'
+                                WHEN call_quality_score >= 4 THEN 'Fair (4-5)'
+                                ELSE 'Poor (1-3)'
+                            END as quality_tier,
+                            COUNT(*) as count,
+                            MIN(call_quality_score) as min_score
+                        FROM insights i
+                        WHERE call_quality_score IS NOT NULL
+                        {date_filter}
+                        GROUP BY
+                            CASE
+                                WHEN call_quality_score >= 8 THEN 'Excellent (8-10)'
+                                WHEN call_quality_score >= 6 THEN 'Good (6-7)'
+                                WHEN call_quality_score >= 4 THEN 'Fair (4-5)'
+                                ELSE 'Poor (1-3)'
+                            END
+                        ORDER BY min_score DESC
+                    """)
+                    result['quality_distribution'] = {row['quality_tier']: row['count'] for row in cur.fetchall()}
+
+                    # Average quality score
+                    cur.execute(f"""
+                        SELECT
+                            ROUND(AVG(call_quality_score)::numeric, 2) as avg_quality,
+                            COUNT(*) as total_calls
+                        FROM insights i
+                        WHERE call_quality_score IS NOT NULL
+                        {date_filter}
+                    """)
+                    row = cur.fetchone()
+                    result['avg_quality'] = float(row['avg_quality']) if row and row['avg_quality'] else 0
+                    result['total_calls_with_quality'] = row['total_calls'] if row else 0
 
                 # Low quality calls (score < 5) with full details
                 query = f"""
@@ -1749,86 +2276,87 @@ class DatabaseReader:
                 result['low_quality_calls'] = low_quality_calls[:40]
                 result['total_low_quality'] = len(low_quality_calls)
 
-                # Quality by agent
-                cur.execute(f"""
-                    SELECT
-                        COALESCE(NULLIF(t.employee_name, ''), 'Unknown Agent') as employee_name,
-                        COUNT(*) as total_calls,
-                        ROUND(AVG(i.call_quality_score)::numeric, 1) as avg_quality,
-                        SUM(CASE WHEN i.call_quality_score < 5 THEN 1 ELSE 0 END) as low_quality_count,
-                        SUM(CASE WHEN i.call_quality_score >= 8 THEN 1 ELSE 0 END) as high_quality_count
-                    FROM transcripts t
-                    JOIN insights i ON t.recording_id = i.recording_id
-                    WHERE i.call_quality_score IS NOT NULL
-                    {date_filter_with_t}
-                    GROUP BY COALESCE(NULLIF(t.employee_name, ''), 'Unknown Agent')
-                    HAVING COUNT(*) >= 3
-                    ORDER BY AVG(i.call_quality_score) ASC
-                    LIMIT 15
-                """)
-                result['quality_by_agent'] = [
-                    {
-                        'agent': row['employee_name'],
-                        'total_calls': row['total_calls'],
-                        'avg_quality': float(row['avg_quality']) if row['avg_quality'] else 0,
-                        'low_quality_count': row['low_quality_count'],
-                        'high_quality_count': row['high_quality_count']
-                    }
-                    for row in cur.fetchall()
-                ]
-
-                # Quality by call type
-                cur.execute(f"""
-                    SELECT
-                        i.call_type,
-                        COUNT(*) as total_calls,
-                        ROUND(AVG(i.call_quality_score)::numeric, 1) as avg_quality,
-                        SUM(CASE WHEN i.call_quality_score < 5 THEN 1 ELSE 0 END) as low_quality_count
-                    FROM insights i
-                    WHERE i.call_type IS NOT NULL
-                      AND i.call_quality_score IS NOT NULL
-                      {date_filter}
-                    GROUP BY i.call_type
-                    ORDER BY AVG(i.call_quality_score) ASC
-                    LIMIT 10
-                """)
-                result['quality_by_call_type'] = [
-                    {
-                        'call_type': row['call_type'],
-                        'total_calls': row['total_calls'],
-                        'avg_quality': float(row['avg_quality']) if row['avg_quality'] else 0,
-                        'low_quality_count': row['low_quality_count']
-                    }
-                    for row in cur.fetchall()
-                ]
-
-                # Weekly quality trends - adjust based on date range
-                trend_date_filter = date_filter_with_t if date_range else "AND t.call_date >= CURRENT_DATE - INTERVAL '90 days'"
-                cur.execute(f"""
-                    SELECT
-                        DATE_TRUNC('week', t.call_date) as week,
-                        COUNT(*) as total_calls,
-                        ROUND(AVG(i.call_quality_score)::numeric, 2) as avg_quality,
-                        SUM(CASE WHEN i.call_quality_score < 5 THEN 1 ELSE 0 END) as low_quality,
-                        SUM(CASE WHEN i.call_quality_score >= 8 THEN 1 ELSE 0 END) as high_quality
-                    FROM transcripts t
-                    JOIN insights i ON t.recording_id = i.recording_id
-                    WHERE i.call_quality_score IS NOT NULL
-                      {trend_date_filter}
-                    GROUP BY DATE_TRUNC('week', t.call_date)
-                    ORDER BY week DESC
-                    LIMIT 12
-                """)
-                result['weekly_trends'] = [
-                    {
-                        'week': str(row['week'].date()) if row['week'] else 'Unknown',
-                        'total': row['total_calls'],
-                        'avg_quality': float(row['avg_quality']) if row['avg_quality'] else 0,
-                        'low_quality': row['low_quality'],
-                        'high_quality': row['high_quality']
-                    }
-                    for row in cur.fetchall()
-                ]
+                if not use_rollups:
+                    # Quality by agent
+                    cur.execute(f"""
+                        SELECT
+                            COALESCE(NULLIF(t.employee_name, ''), 'Unknown Agent') as employee_name,
+                            COUNT(*) as total_calls,
+                            ROUND(AVG(i.call_quality_score)::numeric, 1) as avg_quality,
+                            SUM(CASE WHEN i.call_quality_score < 5 THEN 1 ELSE 0 END) as low_quality_count,
+                            SUM(CASE WHEN i.call_quality_score >= 8 THEN 1 ELSE 0 END) as high_quality_count
+                        FROM transcripts t
+                        JOIN insights i ON t.recording_id = i.recording_id
+                        WHERE i.call_quality_score IS NOT NULL
+                        {date_filter_with_t}
+                        GROUP BY COALESCE(NULLIF(t.employee_name, ''), 'Unknown Agent')
+                        HAVING COUNT(*) >= 3
+                        ORDER BY AVG(i.call_quality_score) ASC
+                        LIMIT 15
+                    """)
+                    result['quality_by_agent'] = [
+                        {
+                            'agent': row['employee_name'],
+                            'total_calls': row['total_calls'],
+                            'avg_quality': float(row['avg_quality']) if row['avg_quality'] else 0,
+                            'low_quality_count': row['low_quality_count'],
+                            'high_quality_count': row['high_quality_count']
+                        }
+                        for row in cur.fetchall()
+                    ]
+
+                    # Quality by call type
+                    cur.execute(f"""
+                        SELECT
+                            i.call_type,
+                            COUNT(*) as total_calls,
+                            ROUND(AVG(i.call_quality_score)::numeric, 1) as avg_quality,
+                            SUM(CASE WHEN i.call_quality_score < 5 THEN 1 ELSE 0 END) as low_quality_count
+                        FROM insights i
+                        WHERE i.call_type IS NOT NULL
+                          AND i.call_quality_score IS NOT NULL
+                          {date_filter}
+                        GROUP BY i.call_type
+                        ORDER BY AVG(i.call_quality_score) ASC
+                        LIMIT 10
+                    """)
+                    result['quality_by_call_type'] = [
+                        {
+                            'call_type': row['call_type'],
+                            'total_calls': row['total_calls'],
+                            'avg_quality': float(row['avg_quality']) if row['avg_quality'] else 0,
+                            'low_quality_count': row['low_quality_count']
+                        }
+                        for row in cur.fetchall()
+                    ]
+
+                    # Weekly quality trends - adjust based on date range
+                    trend_date_filter = date_filter_with_t if date_range else "AND t.call_date >= CURRENT_DATE - INTERVAL '90 days'"
+                    cur.execute(f"""
+                        SELECT
+                            DATE_TRUNC('week', t.call_date) as week,
+                            COUNT(*) as total_calls,
+                            ROUND(AVG(i.call_quality_score)::numeric, 2) as avg_quality,
+                            SUM(CASE WHEN i.call_quality_score < 5 THEN 1 ELSE 0 END) as low_quality,
+                            SUM(CASE WHEN i.call_quality_score >= 8 THEN 1 ELSE 0 END) as high_quality
+                        FROM transcripts t
+                        JOIN insights i ON t.recording_id = i.recording_id
+                        WHERE i.call_quality_score IS NOT NULL
+                          {trend_date_filter}
+                        GROUP BY DATE_TRUNC('week', t.call_date)
+                        ORDER BY week DESC
+                        LIMIT 12
+                    """)
+                    result['weekly_trends'] = [
+                        {
+                            'week': str(row['week'].date()) if row['week'] else 'Unknown',
+                            'total': row['total_calls'],
+                            'avg_quality': float(row['avg_quality']) if row['avg_quality'] else 0,
+                            'low_quality': row['low_quality'],
+                            'high_quality': row['high_quality']
+                        }
+                        for row in cur.fetchall()
+                    ]
 
                 # Common issues in low quality calls
                 cur.execute(f"""
@@ -1852,6 +2380,90 @@ class DatabaseReader:
 
                 return result
 
+
+    def _quality_rollup_aggregates(self, cur, date_filter: str, trend_date_filter: str) -> Dict[str, Any]:
+        """Quality report aggregates from report_daily_rollups in one statement."""
+        cur.execute(f"""
+            WITH ranged AS MATERIALIZED (
+                SELECT r.*
+                FROM report_daily_rollups r
+                WHERE r.quality_count > 0
+                {date_filter}
+            )
+            SELECT
+                (SELECT json_build_array(
+                        SUM(r.quality_excellent_count), SUM(r.quality_good_count),
+                        SUM(r.quality_fair_count), SUM(r.quality_poor_count))
+                 FROM ranged r) as quality_tiers,
+                (SELECT ROUND((SUM(r.quality_sum) / NULLIF(SUM(r.quality_count), 0))::numeric, 2)
+                 FROM ranged r) as avg_quality,
+                (SELECT COALESCE(SUM(r.quality_count), 0) FROM ranged r) as total_calls_with_quality,
+
+                (SELECT json_agg(a ORDER BY a.avg_quality ASC)
+                 FROM (
+                    SELECT
+                        COALESCE(NULLIF(r.employee_name, ''), 'Unknown Agent') as agent,
+                        SUM(r.quality_count) as total_calls,
+                        ROUND((SUM(r.quality_sum) / SUM(r.quality_count))::numeric, 1) as avg_quality,
+                        SUM(r.low_quality_count) as low_quality_count,
+                        SUM(r.high_quality_count) as high_quality_count
+                    FROM ranged r
+                    GROUP BY COALESCE(NULLIF(r.employee_name, ''), 'Unknown Agent')
+                    HAVING SUM(r.quality_count) >= 3
+                    ORDER BY SUM(r.quality_sum) / SUM(r.quality_count) ASC
+                    LIMIT 15
+                 ) a) as quality_by_agent,
+
+                (SELECT json_agg(ct ORDER BY ct.avg_quality ASC)
+                 FROM (
+                    SELECT
+                        r.call_type,
+                        SUM(r.quality_count) as total_calls,
+                        ROUND((SUM(r.quality_sum) / SUM(r.quality_count))::numeric, 1) as avg_quality,
+                        SUM(r.low_quality_count) as low_quality_count
+                    FROM ranged r
+                    WHERE r.call_type != ''
+                    GROUP BY r.call_type
+                    ORDER BY SUM(r.quality_sum) / SUM(r.quality_count) ASC
+                    LIMIT 10
+                 ) ct) as quality_by_call_type,
+
+                (SELECT json_agg(w ORDER BY w.week DESC)
+                 FROM (
+                    SELECT
+                        DATE_TRUNC('week', r.call_date)::date as week,
+                        SUM(r.quality_count) as total,
+                        ROUND((SUM(r.quality_sum) / SUM(r.quality_count))::numeric, 2) as avg_quality,
+                        SUM(r.low_quality_count) as low_quality,
+                        SUM(r.high_quality_count) as high_quality
+                    FROM report_daily_rollups r
+                    WHERE r.quality_count > 0
+                    {trend_date_filter}
+                    GROUP BY DATE_TRUNC('week', r.call_date)::date
+                    ORDER BY week DESC
+                    LIMIT 12
+                 ) w) as weekly_trends
+        """)
+        row = cur.fetchone()
+
+        tiers = ['Excellent (8-10)', 'Good (6-7)', 'Fair (4-5)', 'Poor (1-3)']
+        return {
+            'quality_distribution': {
+                tier: count for tier, count in zip(tiers, row['quality_tiers'] or []) if count
+            },
+            'avg_quality': float(row['avg_quality']) if row['avg_quality'] else 0,
+            'total_calls_with_quality': row['total_calls_with_quality'],
+            'quality_by_agent': [
+                dict(a, avg_quality=float(a['avg_quality'])) for a in row['quality_by_agent'] or []
+            ],
+            'quality_by_call_type': [
+                dict(ct, avg_quality=float(ct['avg_quality'])) for ct in row['quality_by_call_type'] or []
+            ],
+            'weekly_trends': [
+                dict(w, avg_quality=float(w['avg_quality'])) for w in row['weekly_trends'] or []
+            ],
+        }
+
     # ==========================================
     # SALES INTELLIGENCE REPORTS (Layer 5 Data)
     # ==========================================
@@ -0,0 +1,96 @@
+"""
+Employee Alias Service - maintains employee_name_aliases (migration 009).
+
+Maps every raw employee name in the database to its canonical form using
+rag_integration.config.employee_names, so SQL can group and facet by
+canonical employee with a join instead of canonicalizing rows in Python.
+"""
+
+import os
+import logging
+from typing import Dict, List, Optional
+
+from psycopg2.extras import execute_values
+from dotenv import load_dotenv
+
+from .db_pool import pooled_connection
+from rag_integration.config.employee_names import canonicalize_employee_name
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Columns holding raw employee names as (table, column)
+EMPLOYEE_NAME_SOURCES = [
+    ('transcripts', 'employee_name'),
+    ('kb_freshdesk_qa', 'agent_name'),
+    ('video_meetings', 'host_name'),
+    ('call_log', 'to_name'),
+    ('call_log', 'from_name'),
+    ('extension_employee_map', 'employee_name'),
+    ('freshdesk_agent_map', 'pcr_employee_name'),
+]
+
+
+def sync_employee_aliases(database_url: Optional[str] = None, refresh: bool = False) -> int:
+    """
+    Add alias rows for raw employee names that aren't mapped yet.
+
+    Args:
+        database_url: Database to sync (default RAG_DATABASE_URL)
+        refresh: Re-canonicalize every known name too (after editing
+            employee_names.py)
+
+    Returns:
+        Number of alias rows inserted or changed
+    """
+    database_url = database_url or os.getenv("RAG_DATABASE_URL") or os.getenv("DATABASE_URL", "")
+
+    with pooled_connection(database_url) as conn:
+        try:
+            with conn.cursor() as cur:
+                tables = sorted({table for table, _ in EMPLOYEE_NAME_SOURCES})
+                cur.execute("SELECT " + ", ".join(
+                    f"to_regclass('{table}') IS NOT NULL" for table in tables
+                ))
+                present = {table for table, exists in zip(tables, cur.fetchone()) if exists}
+                sources = [
+                    f"SELECT {column} FROM {table} WHERE {column} IS NOT NULL"
+                    for table, column in EMPLOYEE_NAME_SOURCES
+                    if table in present
+                ]
+                if not sources:
+                    return 0
+
+                unmapped = "" if refresh else (
+                    "WHERE NOT EXISTS (SELECT 1 FROM employee_name_aliases a WHERE a.raw_name = n.raw_name)"
+                )
+                cur.execute(f"""
+                    SELECT DISTINCT n.raw_name
+                    FROM ({' UNION '.join(sources)}) AS n(raw_name)
+                    {unmapped}
+                """)
+                names: List[str] = [row[0] for row in cur.fetchall()]
+                if not names:
+                    return 0
+
+                aliases: Dict[str, Optional[str]] = {
+                    name: canonicalize_employee_name(name) for name in names
+                }
+                # RETURNING rows from every page (rowcount only covers the last)
+                changed = len(execute_values(cur, """
+                    INSERT INTO employee_name_aliases (raw_name, canonical_name)
+                    VALUES %s
+                    ON CONFLICT (raw_name) DO UPDATE
+                    SET canonical_name = EXCLUDED.canonical_name,
+                        updated_at = NOW()
+                    WHERE employee_name_aliases.canonical_name IS DISTINCT FROM EXCLUDED.canonical_name
+                    RETURNING 1
+                """, list(aliases.items()), page_size=500, fetch=True))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    logger.info(f"Synced employee aliases: {changed} of {len(names)} names inserted or changed")
+    return changed
@@ -1,18 +1,26 @@
 """GCS Uploader - Uploads JSONL files to Google Cloud Storage."""
 
 import os
+import shutil
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Tuple
 import logging
 
-from google.cloud import storage
-from google.oauth2 import service_account
 from dotenv import load_dotenv
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# 'gcs', or 'local' to write "uploads" under RAG_LOCAL_STORAGE_DIR (offline runs and tests)
+RAG_STORAGE_BACKEND = os.getenv("RAG_STORAGE_BACKEND", "gcs").lower()
+RAG_LOCAL_STORAGE_DIR = os.getenv("RAG_LOCAL_STORAGE_DIR", "/tmp/rag_storage")
+# Concurrent shard uploads during exports
+RAG_UPLOAD_WORKERS = int(os.getenv("RAG_UPLOAD_WORKERS", "4"))
+
 
 class GCSUploader:
     """Uploads JSONL files to Google Cloud Storage for RAG ingestion."""
@@ -23,6 +31,9 @@ class GCSUploader:
         prefix: str = "transcripts/",
         credentials_path: Optional[str] = None
     ):
+        from google.cloud import storage
+        from google.oauth2 import service_account
+
         self.bucket_name = bucket_name or os.getenv("GCS_RAG_BUCKET", "call-recording-rag-data")
         self.prefix = prefix
 
@@ -59,7 +70,12 @@ class GCSUploader:
         blob_path = f"{self.prefix}{remote_name}"
 
         blob = self.bucket.blob(blob_path)
-        blob.upload_from_filename(str(local_path))
+        if local_path.suffix == ".gz":
+            # Stored compressed; GCS serves it decompressed to clients that need it
+            blob.content_encoding = "gzip"
+            blob.upload_from_filename(str(local_path), content_type="application/jsonl")
+        else:
+            blob.upload_from_filename(str(local_path))
 
         gcs_uri = f"gs://{self.bucket_name}/{blob_path}"
         logger.info(f"Uploaded {local_path} to {gcs_uri}")
@@ -175,12 +191,164 @@ class GCSUploader:
             return False
 
 
+class LocalStorageUploader:
+    """
+    Filesystem stand-in for GCSUploader (same methods, file:// URIs).
+
+    Objects are copied to {root}/{bucket}/{prefix}{name}, so exports can be
+    run and checked without Google credentials.
+    """
+
+    def __init__(
+        self,
+        bucket_name: Optional[str] = None,
+        prefix: str = "transcripts/",
+        root: Optional[str] = None
+    ):
+        self.bucket_name = bucket_name or os.getenv("GCS_RAG_BUCKET", "call-recording-rag-data")
+        self.prefix = prefix
+        self.root = Path(root or RAG_LOCAL_STORAGE_DIR) / self.bucket_name
+
+    def _path(self, remote_name: str) -> Path:
+        return self.root / f"{self.prefix}{remote_name}"
+
+    def _uri(self, path: Path) -> str:
+        return path.resolve().as_uri()
+
+    def upload_file(self, local_path: Path, remote_name: Optional[str] = None) -> str:
+        """Copy a file into the local bucket directory."""
+        local_path = Path(local_path)
+        target = self._path(remote_name or local_path.name)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        partial = target.with_name(target.name + ".part")
+        shutil.copyfile(local_path, partial)
+        partial.replace(target)
+
+        uri = self._uri(target)
+        logger.info(f"Uploaded {local_path} to {uri}")
+        return uri
+
+    def upload_directory(self, local_dir: Path, pattern: str = "*.jsonl") -> List[str]:
+        """Copy all matching files from a directory."""
+        uploaded = []
+        for filepath in Path(local_dir).glob(pattern):
+            try:
+                uploaded.append(self.upload_file(filepath))
+            except Exception as e:
+                logger.error(f"Failed to upload {filepath}: {e}")
+        return uploaded
+
+    def upload_content(self, content: str, remote_name: str) -> str:
+        """Write string content to the local bucket directory."""
+        target = self._path(remote_name)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(content)
+        return self._uri(target)
+
+    def list_files(self, prefix: Optional[str] = None) -> List[str]:
+        """List all files under the prefix."""
+        base = self.root / (prefix or self.prefix)
+        if not base.exists():
+            return []
+        return sorted(self._uri(p) for p in base.rglob("*") if p.is_file() and p.suffix != ".part")
+
+    def delete_file(self, uri: str) -> bool:
+        """Delete a file by its file:// URI."""
+        try:
+            path = Path(uri[len("file://"):]) if uri.startswith("file://") else self._path(uri)
+            path.unlink()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to delete {uri}: {e}")
+            return False
+
+    def file_exists(self, remote_name: str) -> bool:
+        return self._path(remote_name).exists()
+
+    def get_file_info(self, remote_name: str) -> Optional[dict]:
+        path = self._path(remote_name)
+        if not path.exists():
+            return None
+        stat = path.stat()
+        modified = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+        return {
+            "name": f"{self.prefix}{remote_name}",
+            "size": stat.st_size,
+            "created": modified,
+            "updated": modified,
+            "content_type": "application/jsonl",
+            "uri": self._uri(path)
+        }
+
+    def test_connection(self) -> bool:
+        return self.ensure_bucket_exists()
+
+    def ensure_bucket_exists(self) -> bool:
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to create local bucket {self.root}: {e}")
+            return False
+
+
+def get_uploader(bucket_name: Optional[str] = None, prefix: str = "transcripts/"):
+    """GCSUploader, or LocalStorageUploader when RAG_STORAGE_BACKEND=local."""
+    if RAG_STORAGE_BACKEND == "local":
+        return LocalStorageUploader(bucket_name, prefix)
+    return GCSUploader(bucket_name, prefix)
+
+
+class ParallelUploader:
+    """
+    Uploads files on a small thread pool while the caller keeps working.
+
+    Usage:
+        uploads = ParallelUploader(get_uploader())
+        writer = JSONLShardWriter(..., on_shard=lambda path, n: uploads.submit(path))
+        ...
+        uris, errors = uploads.wait()
+    """
+
+    def __init__(self, uploader, max_workers: int = RAG_UPLOAD_WORKERS):
+        self.uploader = uploader
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="upload")
+        self._futures: List[Tuple[Path, Future]] = []
+        self._lock = threading.Lock()
+
+    def submit(self, local_path: Path, remote_name: Optional[str] = None) -> Future:
+        future = self._pool.submit(self.uploader.upload_file, Path(local_path), remote_name)
+        with self._lock:
+            self._futures.append((Path(local_path), future))
+        return future
+
+    def wait(self) -> Tuple[List[str], List[str]]:
+        """
+        Wait for every submitted upload and shut the pool down.
+
+        Returns:
+            (URIs in submission order, error messages)
+        """
+        uris, errors = [], []
+        with self._lock:
+            futures = list(self._futures)
+        for local_path, future in futures:
+            try:
+                uris.append(future.result())
+            except Exception as e:
+                error_msg = f"Upload error for {local_path}: {e}"
+                logger.error(error_msg)
+                errors.append(error_msg)
+        self._pool.shutdown(wait=True)
+        return uris, errors
+
+
 if __name__ == "__main__":
     import sys
 
     logging.basicConfig(level=logging.INFO)
 
-    uploader = GCSUploader()
+    uploader = get_uploader()
 
     print(f"Testing connection to bucket: {uploader.bucket_name}")
 
@@ -8,6 +8,8 @@ from google import genai
 from google.genai import types
 from dotenv import load_dotenv
 
+from .hybrid_retriever import get_hybrid_retriever, RAG_RETRIEVAL_MODE
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
@@ -122,13 +124,17 @@ Focus areas:
             logger.error(f"Failed to delete file: {e}")
             return False
 
-    def query(self, query: str, context_files: Optional[List[str]] = None) -> Dict[str, Any]:
+    def query(self, query: str, context_files: Optional[List[str]] = None,
+              ground: bool = False) -> Dict[str, Any]:
         """
         Query Gemini with semantic understanding.
 
         Args:
             query: The question to ask
             context_files: Optional list of file names to include as context
+            ground: Prepend the top calls from the local hybrid index (only
+                for user questions; ignored with context_files or when
+                RAG_RETRIEVAL_MODE is remote)
 
         Returns:
             Response dict with answer and citations
@@ -158,6 +164,23 @@ Focus areas:
                     except Exception as e:
                         logger.warning(f"Could not get file {file_name}: {e}")
 
+            # Ground the question with locally retrieved calls
+            citations = []
+            if ground and not context_files and RAG_RETRIEVAL_MODE != "remote":
+                try:
+                    contexts = get_hybrid_retriever().retrieve_contexts(query, top_k=10)
+                except Exception as e:
+                    logger.warning(f"Local retrieval failed, querying without context: {e}")
+                    contexts = []
+                if contexts:
+                    contents.append("Relevant calls from our call database:\n\n" + "\n\n".join(
+                        f"[Context {i+1}]:\n{ctx['text'][:1500]}" for i, ctx in enumerate(contexts)
+                    ))
+                    citations = [
+                        {"recording_id": ctx['recording_id'], "source_uri": ctx['source_uri'], "score": ctx['score']}
+                        for ctx in contexts
+                    ]
+
             # Add the query
             contents.append(query)
 
@@ -174,7 +197,7 @@ Focus areas:
 
             return {
                 "response": response.text,
-                "citations": [],
+                "citations": citations,
                 "system": "gemini",
                 "model": self.model_id
             }
@@ -0,0 +1,604 @@
+"""
+Hybrid Retriever - local full-text + vector retrieval over the RAG documents.
+
+Vertex AI RAG and Gemini answer from remotely retrieved context, and the
+remote retrieval only filters after top-k (VertexSearchClient drops the
+results that don't match). This module retrieves the same documents from
+PostgreSQL (rag_search_documents, migration 012):
+
+    text leg    ts_rank over search_tsv (length-normalized, saturating -
+                the BM25-style ranking PostgreSQL offers), any query term
+    vector leg  cosine similarity over transcript_embeddings through
+                src.insights.vector_index (exact or ANN by filter selectivity)
+
+Both legs apply the struct_data filters before ranking, and their top
+candidates are fused with reciprocal-rank fusion (score = sum of
+weight / (k + rank)). VertexRAGService and GeminiFileSearchService use it
+for their retrieval step according to RAG_RETRIEVAL_MODE:
+
+    remote      remote retrieval only (Gemini: no retrieval)
+    fallback    remote retrieval, answered locally if it fails, returns
+                nothing or takes longer than RAG_REMOTE_RETRIEVAL_TIMEOUT;
+                Gemini prompts are grounded with local results
+    local       local retrieval only
+
+sync_search_documents() (rag_integration.jobs.sync_search_documents) keeps
+the table in step with the analysis tables.
+"""
+
+import os
+import time
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from psycopg2.extras import Json, RealDictCursor, execute_values
+from dotenv import load_dotenv
+
+from .db_pool import pooled_connection
+from .db_reader import FULL_CALL_SELECT, CONTENT_HASH_SQL
+from .jsonl_formatter import JSONLFormatter
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# remote, fallback or local (see module docstring)
+RAG_RETRIEVAL_MODE = os.getenv("RAG_RETRIEVAL_MODE", "fallback").lower()
+# Seconds remote retrieval gets before local results are used (fallback mode)
+RAG_REMOTE_RETRIEVAL_TIMEOUT = float(os.getenv("RAG_REMOTE_RETRIEVAL_TIMEOUT", "5"))
+# Reciprocal-rank fusion constant and per-leg weights
+RAG_HYBRID_RRF_K = int(os.getenv("RAG_HYBRID_RRF_K", "60"))
+RAG_HYBRID_TEXT_WEIGHT = float(os.getenv("RAG_HYBRID_TEXT_WEIGHT", "1.0"))
+RAG_HYBRID_VECTOR_WEIGHT = float(os.getenv("RAG_HYBRID_VECTOR_WEIGHT", "1.0"))
+# Candidates each leg contributes to the fusion
+RAG_HYBRID_CANDIDATES = int(os.getenv("RAG_HYBRID_CANDIDATES", "50"))
+# Embedding provider for query vectors: must be the one transcript_embeddings
+# was built with (default EMBEDDING_PROVIDER)
+RAG_HYBRID_EMBEDDING_PROVIDER = os.getenv("RAG_HYBRID_EMBEDDING_PROVIDER") or None
+# Concurrent remote/local retrievals, and query embeddings (a separate pool:
+# local searches wait on their embedding, so they can't share workers)
+RAG_RETRIEVAL_WORKERS = int(os.getenv("RAG_RETRIEVAL_WORKERS", "8"))
+RAG_EMBEDDING_WORKERS = int(os.getenv("RAG_EMBEDDING_WORKERS", "4"))
+# Start the local search alongside every remote retrieval in fallback mode
+# (hedged), instead of only once the remote one has fallen through; costs a
+# query embedding and a database search per question
+RAG_RETRIEVAL_HEDGE = os.getenv("RAG_RETRIEVAL_HEDGE", "false").lower() == "true"
+# Seconds a hedged local search gets once the remote retrieval has fallen through
+RAG_LOCAL_RETRIEVAL_TIMEOUT = float(os.getenv("RAG_LOCAL_RETRIEVAL_TIMEOUT", "30"))
+RAG_SEARCH_SYNC_BATCH_SIZE = int(os.getenv("RAG_SEARCH_SYNC_BATCH_SIZE", "500"))
+
+RETRIEVAL_MODES = ('remote', 'fallback', 'local')
+
+# ts_rank normalization: 1 divides by 1 + log(document length), 32 maps
+# the rank to rank / (rank + 1) so repeated terms saturate
+TEXT_RANK_NORMALIZATION = 1 | 32
+
+# struct_data filter fields (JSONLFormatter._build_struct_data) by kind
+NUMERIC_FIELDS = {
+    'duration_seconds', 'duration_minutes', 'word_count',
+    'call_quality_score', 'customer_satisfaction_score', 'overall_call_rating',
+    'resolution_effectiveness', 'empathy_score', 'communication_clarity',
+    'active_listening_score', 'employee_knowledge_level', 'customer_effort_score',
+    'churn_risk_score', 'sales_opportunity_score', 'compliance_score',
+    'urgency_score', 'qa_pairs_count',
+}
+BOOLEAN_FIELDS = {
+    'first_call_resolution', 'follow_up_needed', 'escalation_required',
+    'solution_summarized', 'understanding_confirmed', 'next_steps_provided',
+    'has_layer5', 'buying_signals_detected', 'competitor_mentioned', 'has_qa_pairs',
+    'is_high_risk', 'is_low_quality', 'is_negative_sentiment', 'has_sales_opportunity',
+}
+# Partial, case-insensitive matches (names are spelled many ways)
+PARTIAL_MATCH_FIELDS = {
+    'employee_name', 'employee_department', 'customer_name', 'customer_company',
+    'customer_phone', 'call_type', 'issue_category',
+}
+# Exact, case-insensitive matches
+EXACT_MATCH_FIELDS = {
+    'call_id', 'direction', 'customer_sentiment', 'problem_complexity',
+    'risk_level', 'training_priority',
+}
+ARRAY_FIELDS = {'topics', 'competitor_names'}
+
+# QueryRouter / VertexSearchClient filter names -> struct_data fields
+FILTER_ALIASES = {
+    'employee': 'employee_name',
+    'customer': 'customer_name',
+    'company': 'customer_company',
+    'sentiment': 'customer_sentiment',
+    'escalation_needed': 'escalation_required',
+    'follow_up_required': 'follow_up_needed',
+}
+# Filters that are a comparison on another field
+FILTER_RANGES = {
+    'date_from': ('call_date', '>='),
+    'date_to': ('call_date', '<='),
+    'min_quality': ('call_quality_score', '>='),
+}
+# QueryRouter churn levels as churn_risk_score ranges ("medium" = medium or higher)
+CHURN_LEVELS = {'high': ('>=', 7), 'medium': ('>=', 5), 'low': ('<', 5)}
+COMPARISON_OPS = {'=', '!=', '<>', '<', '<=', '>', '>='}
+
+_retriever = None
+_retriever_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+_embedding_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=RAG_RETRIEVAL_WORKERS,
+                                               thread_name_prefix="retrieval")
+    return _executor
+
+
+def _get_embedding_executor() -> ThreadPoolExecutor:
+    global _embedding_executor
+    if _embedding_executor is None:
+        with _executor_lock:
+            if _embedding_executor is None:
+                _embedding_executor = ThreadPoolExecutor(max_workers=RAG_EMBEDDING_WORKERS,
+                                                         thread_name_prefix="retrieval-embed")
+    return _embedding_executor
+
+
+def build_filter_conditions(filters: Optional[Dict[str, Any]],
+                            alias: str = 'd') -> Tuple[List[str], Dict[str, Any], List[str]]:
+    """
+    SQL conditions on rag_search_documents for struct_data filters.
+
+    Accepts QueryRouter filters (field: value, {'op', 'value'}, BETWEEN,
+    churn levels) and VertexSearchClient ones (employee, customer,
+    sentiment, date_from, date_to, min_quality).
+
+    Returns:
+        (conditions with %(f_N)s placeholders, params, ignored filter names)
+    """
+    conditions: List[str] = []
+    params: Dict[str, Any] = {}
+    ignored: List[str] = []
+
+    def param(value) -> str:
+        name = f"f_{len(params)}"
+        params[name] = value
+        return f"%({name})s"
+
+    for name, condition in (filters or {}).items():
+        if condition is None or condition == '':
+            continue
+        field = FILTER_ALIASES.get(name, name)
+        op, value = '=', condition
+        if name in FILTER_RANGES:
+            field, op = FILTER_RANGES[name]
+            if isinstance(condition, dict):
+                value = condition.get('value')
+        elif isinstance(condition, dict):
+            op, value = str(condition.get('op', '=')).upper(), condition.get('value')
+        if field in ('churn_risk', 'churn_risk_score') and isinstance(value, str) and value.lower() in CHURN_LEVELS:
+            field, (op, value) = 'churn_risk_score', CHURN_LEVELS[value.lower()]
+
+        if op != 'BETWEEN' and op not in COMPARISON_OPS:
+            ignored.append(name)
+            continue
+        if op == 'BETWEEN':
+            if not (isinstance(value, (list, tuple)) and len(value) == 2):
+                ignored.append(name)
+                continue
+            operand = f"{param(value[0])} AND {param(value[1])}"
+        else:
+            operand = None
+
+        if field == 'call_date':
+            conditions.append(f"{alias}.call_date {op} {operand or param(value)}")
+        elif field in NUMERIC_FIELDS:
+            conditions.append(f"({alias}.struct_data->>'{field}')::numeric {op} {operand or param(value)}")
+        elif field in BOOLEAN_FIELDS and op in ('=', '!=', '<>'):
+            wanted = value if isinstance(value, bool) else str(value).lower() in ('true', 'yes', '1')
+            if op != '=':
+                wanted = not wanted
+            # Containment uses the GIN index on struct_data
+            conditions.append(f"{alias}.struct_data @> {param(Json({field: wanted}))}::jsonb")
+        elif field in PARTIAL_MATCH_FIELDS and op == '=':
+            conditions.append(f"{alias}.struct_data->>'{field}' ILIKE {param(f'%{value}%')}")
+        elif field in EXACT_MATCH_FIELDS and op in ('=', '!=', '<>'):
+            conditions.append(f"lower({alias}.struct_data->>'{field}') {op} lower({param(str(value))})")
+        elif field in ARRAY_FIELDS and op == '=':
+            values = value if isinstance(value, (list, tuple)) else [value]
+            conditions.append(f"{alias}.struct_data @> {param(Json({field: list(values)}))}::jsonb")
+        else:
+            ignored.append(name)
+
+    return conditions, params, ignored
+
+
+def reciprocal_rank_fusion(rankings: List[Tuple[List[str], float]],
+                           k: int = RAG_HYBRID_RRF_K) -> List[Tuple[str, float]]:
+    """
+    Fuse ranked ID lists: score(id) = sum of weight / (k + rank), rank from 1.
+
+    Args:
+        rankings: (ids best first, weight) per ranker
+
+    Returns:
+        (id, score) best first; ties keep first-seen order
+    """
+    scores: Dict[str, float] = {}
+    for ids, weight in rankings:
+        for rank, doc_id in enumerate(ids, 1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class HybridRetriever:
+    """Full-text + vector retrieval over rag_search_documents, fused with RRF."""
+
+    def __init__(
+        self,
+        database_url: Optional[str] = None,
+        embedding_provider: Optional[str] = RAG_HYBRID_EMBEDDING_PROVIDER,
+        rrf_k: int = RAG_HYBRID_RRF_K,
+        candidates: int = RAG_HYBRID_CANDIDATES,
+        text_weight: float = RAG_HYBRID_TEXT_WEIGHT,
+        vector_weight: float = RAG_HYBRID_VECTOR_WEIGHT,
+        documents_table: str = "rag_search_documents",
+        embeddings_table: str = "transcript_embeddings"
+    ):
+        self.database_url = database_url or os.getenv("RAG_DATABASE_URL") or os.getenv("DATABASE_URL", "")
+        self.embedding_provider = embedding_provider
+        self.rrf_k = rrf_k
+        self.candidates = candidates
+        self.text_weight = text_weight
+        self.vector_weight = vector_weight
+        self.documents_table = documents_table
+        self.embeddings_table = embeddings_table
+        self._embeddings = None
+
+    @property
+    def embeddings(self):
+        """EmbeddingsManager for query vectors (imported on first use)."""
+        if self._embeddings is None:
+            from src.insights.embeddings_manager import get_embeddings_manager
+            self._embeddings = get_embeddings_manager(self.embedding_provider)
+        return self._embeddings
+
+    def _embed_query(self, query: str) -> Optional[str]:
+        """pgvector literal for the query, None if it can't be embedded."""
+        embedding = self.embeddings.generate_embedding(query)
+        return self.embeddings.to_storage_vector(embedding) if embedding else None
+
+    def search(
+        self,
+        query: str,
+        filters: Optional[Dict[str, Any]] = None,
+        limit: int = 10,
+        legs: Tuple[str, ...] = ('text', 'vector')
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Top documents for a query among those matching the filters.
+
+        The query embedding is computed while the text leg runs. If either
+        leg fails the other one's ranking is returned.
+
+        Args:
+            query: Search text
+            filters: struct_data filters (see build_filter_conditions)
+            limit: Documents to return
+            legs: Rankers to fuse ('text', 'vector'); one for comparisons
+
+        Returns:
+            (documents with recording_id, content_text, struct_data, score,
+            relevance (score / best possible score), text_rank, vector_rank,
+            similarity; plan with per-leg timings and the vector strategy)
+        """
+        started = time.perf_counter()
+        conditions, params, ignored = build_filter_conditions(filters)
+        candidates = max(self.candidates, limit)
+        plan: Dict[str, Any] = {
+            'legs': {}, 'filters': len(conditions), 'ignored_filters': ignored,
+        }
+
+        embedding_future = None
+        if 'vector' in legs:
+            embedding_future = _get_embedding_executor().submit(self._embed_query, query)
+
+        rankings: Dict[str, List[str]] = {}
+        similarities: Dict[str, float] = {}
+
+        with pooled_connection(self.database_url) as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                if 'text' in legs:
+                    leg_started = time.perf_counter()
+                    rankings['text'] = self._text_leg(cur, query, conditions, params, candidates)
+                    plan['legs']['text'] = {
+                        'candidates': len(rankings['text']),
+                        'ms': round((time.perf_counter() - leg_started) * 1000, 1),
+                    }
+
+                if embedding_future is not None:
+                    leg_started = time.perf_counter()
+                    try:
+                        query_vector = embedding_future.result()
+                        if query_vector is None:
+                            raise ValueError("query could not be embedded")
+                        ids, similarities, vector_plan = self._vector_leg(
+                            cur, query_vector, conditions, params, candidates
+                        )
+                        rankings['vector'] = ids
+                        plan['legs']['vector'] = {
+                            'candidates': len(ids),
+                            'strategy': vector_plan['strategy'],
+                            'ms': round((time.perf_counter() - leg_started) * 1000, 1),
+                        }
+                    except Exception as e:
+                        conn.rollback()
+                        logger.warning(f"Hybrid retrieval vector leg skipped: {e}")
+                        plan['legs']['vector'] = {'error': str(e)}
+
+                weights = {'text': self.text_weight, 'vector': self.vector_weight}
+                fused = reciprocal_rank_fusion(
+                    [(ids, weights[leg]) for leg, ids in rankings.items()], k=self.rrf_k
+                )[:limit]
+                documents = self._fetch_documents(cur, [doc_id for doc_id, _ in fused])
+
+        best_possible = sum(weights[leg] for leg in rankings) / (self.rrf_k + 1)
+        positions = {leg: {doc_id: rank for rank, doc_id in enumerate(ids, 1)}
+                     for leg, ids in rankings.items()}
+        results = []
+        for doc_id, score in fused:
+            document = documents.get(doc_id)
+            if document is None:
+                continue
+            results.append({
+                **document,
+                'score': round(score, 6),
+                'relevance': round(score / best_possible, 4) if best_possible else 0.0,
+                'text_rank': positions.get('text', {}).get(doc_id),
+                'vector_rank': positions.get('vector', {}).get(doc_id),
+                'similarity': similarities.get(doc_id),
+            })
+
+        plan['total_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        logger.info(f"Hybrid retrieval: {len(results)} results in {plan['total_ms']}ms "
+                    f"({', '.join(f'{leg}={len(ids)}' for leg, ids in rankings.items())})")
+        return results, plan
+
+    def _text_leg(self, cur, query: str, conditions: List[str], params: Dict[str, Any],
+                  candidates: int) -> List[str]:
+        """Recording IDs ranked by full-text match of any query term."""
+        where = " AND ".join(["d.search_tsv @@ q.tsq"] + conditions)
+        # plainto_tsquery ANDs the terms; OR them so partial matches rank too
+        cur.execute(f"""
+            SELECT d.recording_id
+            FROM {self.documents_table} d,
+                 (SELECT NULLIF(replace(plainto_tsquery('english', %(query)s)::text, '&', '|'), '')::tsquery
+                  AS tsq) q
+            WHERE {where}
+            ORDER BY ts_rank(d.search_tsv, q.tsq, %(normalization)s) DESC, d.recording_id
+            LIMIT %(candidates)s
+        """, {**params, 'query': query, 'normalization': TEXT_RANK_NORMALIZATION,
+              'candidates': candidates})
+        return [row['recording_id'] for row in cur.fetchall()]
+
+    def _vector_leg(self, cur, query_vector: str, conditions: List[str], params: Dict[str, Any],
+                    candidates: int) -> Tuple[List[str], Dict[str, float], Dict[str, Any]]:
+        """Recording IDs ranked by embedding similarity, with the filters applied first."""
+        from src.insights.vector_index import nearest_neighbors
+
+        vector_conditions = []
+        if conditions:
+            vector_conditions.append(
+                f"recording_id IN (SELECT d.recording_id FROM {self.documents_table} d "
+                f"WHERE {' AND '.join(conditions)})"
+            )
+        # Only compare vectors from the query's embedding model
+        scope = ["COALESCE(embedding_model, 'openai/text-embedding-ada-002') = ANY(%(models)s)"]
+        rows, vector_plan = nearest_neighbors(
+            cur, self.embeddings_table, 'embedding', ['recording_id'], query_vector, candidates,
+            conditions=vector_conditions,
+            params={**params, 'models': list(self.embeddings.provider.storage_models)},
+            scope_conditions=scope
+        )
+        ids = [row['recording_id'] for row in rows]
+        return ids, {row['recording_id']: round(float(row['similarity']), 4) for row in rows}, vector_plan
+
+    def _fetch_documents(self, cur, recording_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        if not recording_ids:
+            return {}
+        cur.execute(f"""
+            SELECT recording_id, content_text, struct_data
+            FROM {self.documents_table}
+            WHERE recording_id = ANY(%s)
+        """, (recording_ids,))
+        return {row['recording_id']: dict(row) for row in cur.fetchall()}
+
+    def retrieve_contexts(self, query: str, top_k: int = 10,
+                          filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Results in VertexRAGService.retrieve_contexts form (text, source_uri, score)."""
+        results, _ = self.search(query, filters=filters, limit=top_k)
+        return [
+            {
+                "text": result['content_text'],
+                "source_uri": f"local://{self.documents_table}/{result['recording_id']}",
+                "score": result['relevance'],
+                "recording_id": result['recording_id'],
+            }
+            for result in results
+        ]
+
+
+def get_hybrid_retriever() -> HybridRetriever:
+    """Shared HybridRetriever for the RAG services."""
+    global _retriever
+    if _retriever is None:
+        with _retriever_lock:
+            if _retriever is None:
+                _retriever = HybridRetriever()
+    return _retriever
+
+
+def retrieve_with_fallback(
+    remote: Callable[[], List[Dict[str, Any]]],
+    query: str,
+    top_k: int = 10,
+    filters: Optional[Dict[str, Any]] = None,
+    mode: str = RAG_RETRIEVAL_MODE,
+    timeout: float = RAG_REMOTE_RETRIEVAL_TIMEOUT,
+    local_timeout: float = RAG_LOCAL_RETRIEVAL_TIMEOUT,
+    hedge: bool = RAG_RETRIEVAL_HEDGE
+) -> Tuple[List[Dict[str, Any]], str]:
+    """
+    Retrieval step for the RAG services, according to the retrieval mode.
+
+    In fallback mode the local search runs in the calling thread once the
+    remote retrieval fails, returns nothing or times out, so it never waits
+    behind remote calls still holding retrieval workers. With hedge it
+    starts alongside the remote one instead, and its results are already
+    there when the remote one falls through.
+
+    Args:
+        remote: Remote retrieval (returns contexts, [] on failure)
+        query, top_k, filters: Passed to the local retriever
+        mode: remote, fallback or local
+        timeout: Seconds to wait for the remote retrieval in fallback mode
+        local_timeout: Seconds to then wait for a hedged local retrieval
+        hedge: Start the local retrieval alongside the remote one
+
+    Returns:
+        (contexts, 'remote' or 'local')
+    """
+    if mode not in RETRIEVAL_MODES:
+        logger.warning(f"Unknown RAG_RETRIEVAL_MODE '{mode}', using remote retrieval")
+        mode = 'remote'
+    if mode == 'remote':
+        return remote(), 'remote'
+    if mode == 'local':
+        return get_hybrid_retriever().retrieve_contexts(query, top_k, filters), 'local'
+
+    executor = _get_executor()
+    remote_future = executor.submit(remote)
+    local_future = None
+    if hedge:
+        local_future = executor.submit(get_hybrid_retriever().retrieve_contexts, query, top_k, filters)
+    try:
+        contexts = remote_future.result(timeout=timeout)
+        if contexts:
+            return contexts, 'remote'
+        reason = "returned no contexts"
+    except FutureTimeoutError:
+        reason = f"took over {timeout:g}s"
+    except Exception as e:
+        reason = f"failed ({e})"
+
+    try:
+        if local_future is None:
+            contexts = get_hybrid_retriever().retrieve_contexts(query, top_k, filters)
+        else:
+            contexts = local_future.result(timeout=local_timeout)
+    except FutureTimeoutError:
+        logger.warning(f"Remote retrieval {reason} and local retrieval took over {local_timeout:g}s")
+        return [], 'remote'
+    except Exception as e:
+        logger.warning(f"Remote retrieval {reason} and local retrieval failed: {e}")
+        return [], 'remote'
+    logger.info(f"Remote retrieval {reason}, using {len(contexts)} local results")
+    return contexts, 'local'
+
+
+def sync_search_documents(database_url: Optional[str] = None, refresh: bool = False,
+                          batch_size: int = RAG_SEARCH_SYNC_BATCH_SIZE,
+                          limit: Optional[int] = None) -> Dict[str, int]:
+    """
+    Index every fully analyzed call whose document is missing or outdated.
+
+    Calls are read in recording_id order, batch_size at a time, formatted
+    with JSONLFormatter and upserted with one statement per batch. A call
+    is outdated when its content fingerprint (as in the RAG sync) changed.
+    Calls that fail to format are logged and skipped, as in the RAG sync.
+
+    Args:
+        database_url: Database (default RAG_DATABASE_URL)
+        refresh: Re-index every call
+        batch_size: Calls per read / write
+        limit: Stop after this many calls
+
+    Returns:
+        {'indexed', 'failed', 'removed'}
+    """
+    database_url = database_url or os.getenv("RAG_DATABASE_URL") or os.getenv("DATABASE_URL", "")
+    formatter = JSONLFormatter()
+    stats = {'indexed': 0, 'failed': 0, 'removed': 0}
+    outdated = "" if refresh else f"AND d.content_hash IS DISTINCT FROM {CONTENT_HASH_SQL}"
+
+    with pooled_connection(database_url) as conn:
+        try:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                after = ''
+                processed = 0
+                while limit is None or processed < limit:
+                    page = batch_size if limit is None else min(batch_size, limit - processed)
+                    cur.execute(f"""
+                        SELECT c.*, {CONTENT_HASH_SQL} AS content_hash
+                        FROM ({FULL_CALL_SELECT}
+                            WHERE t.recording_id > %(after)s) c
+                        LEFT JOIN rag_search_documents d ON d.recording_id = c.recording_id
+                        WHERE TRUE {outdated}
+                        ORDER BY c.recording_id
+                        LIMIT %(page)s
+                    """, {'after': after, 'page': page})
+                    batch = cur.fetchall()
+                    if not batch:
+                        break
+                    after = batch[-1]['recording_id']
+                    processed += len(batch)
+
+                    rows = []
+                    for call in batch:
+                        try:
+                            document = formatter.format_call(call)
+                        except Exception as e:
+                            logger.error(f"Error formatting {call['recording_id']} for search: {e}")
+                            stats['failed'] += 1
+                            continue
+                        rows.append((
+                            call['recording_id'], document['content']['text'],
+                            Json(document['struct_data']), document['struct_data']['call_date'],
+                            call['content_hash']
+                        ))
+                    if not rows:
+                        continue
+                    execute_values(cur, """
+                        INSERT INTO rag_search_documents (
+                            recording_id, content_text, struct_data, call_date, content_hash
+                        )
+                        VALUES %s
+                        ON CONFLICT (recording_id) DO UPDATE SET
+                            content_text = EXCLUDED.content_text,
+                            struct_data = EXCLUDED.struct_data,
+                            call_date = EXCLUDED.call_date,
+                            content_hash = EXCLUDED.content_hash,
+                            indexed_at = NOW()
+                    """, rows, template="(%s, %s, %s, %s::date, %s)", page_size=len(rows))
+                    conn.commit()
+                    stats['indexed'] += len(rows)
+                    logger.info(f"Search documents: {stats['indexed']} indexed")
+
+                # Calls that lost a layer (or were deleted) are no longer exportable
+                cur.execute(f"""
+                    DELETE FROM rag_search_documents d
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM ({FULL_CALL_SELECT}) c WHERE c.recording_id = d.recording_id
+                    )
+                """)
+                stats['removed'] = cur.rowcount
+                conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    return stats
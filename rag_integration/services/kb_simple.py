@@ -3,16 +3,85 @@ Simple Knowledge Base Service
 Searches RAG for Q&A pairs from Layer 5 data, logs searches, collects feedback
 """
 
+import os
 import json
+import math
+import time
 import logging
-from datetime import datetime
-from typing import Dict, List, Optional
-import psycopg2
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import datetime, date
+from typing import Dict, List, Optional, Tuple
 from psycopg2.extras import RealDictCursor
 from contextlib import contextmanager
 
+from .db_pool import pooled_connection
+
 logger = logging.getLogger(__name__)
 
+# Tables _search_database uses only when present
+OPTIONAL_KB_TABLES = ('kb_freshdesk_qa', 'video_meeting_qa_pairs', 'employee_name_aliases')
+# Seconds between re-checks while an optional table is missing
+OPTIONAL_TABLE_CHECK_INTERVAL = 300
+
+_optional_tables = None
+_optional_tables_checked_at = 0.0
+
+# Seconds search() waits for the Gemini summary (from the start of the
+# search) before returning the database results without it
+KB_SUMMARY_DEADLINE = float(os.getenv("RAG_KB_SUMMARY_DEADLINE", "4"))
+# Gemini summaries running at once across all requests
+KB_SUMMARY_WORKERS = int(os.getenv("RAG_KB_SUMMARY_WORKERS", "4"))
+# Seconds an unfinished summary stays tracked for get_summary()
+KB_SUMMARY_RETENTION = 300
+
+# Blend embedding similarity into the full-text rank of search results
+KB_SEMANTIC_RERANK = os.getenv("RAG_KB_SEMANTIC_RERANK", "false").lower() == "true"
+# Share of the final rank taken by similarity (0 = full-text only)
+KB_SEMANTIC_WEIGHT = float(os.getenv("RAG_KB_SEMANTIC_WEIGHT", "0.5"))
+# Embedding provider for the rerank: openai, local or hash (default EMBEDDING_PROVIDER)
+KB_EMBEDDING_PROVIDER = os.getenv("RAG_KB_EMBEDDING_PROVIDER") or None
+
+# Gemini clients are reused across requests, keyed by (api_key, store)
+_gemini_services: Dict[Tuple[str, str], object] = {}
+_gemini_lock = threading.Lock()
+
+_summary_executor: Optional[ThreadPoolExecutor] = None
+_summary_lock = threading.Lock()
+# search_id -> (future, started_at) for summaries still in flight
+_pending_summaries: Dict[int, Tuple[Future, float]] = {}
+
+
+def _get_gemini_service():
+    """Shared GeminiFileSearchService, or None when GEMINI_API_KEY isn't set."""
+    api_key = os.getenv('GEMINI_API_KEY')
+    if not api_key:
+        return None
+    store = os.getenv('GEMINI_FILE_SEARCH_STORE', 'mst_call_intelligence')
+
+    key = (api_key, store)
+    service = _gemini_services.get(key)
+    if service is None:
+        with _gemini_lock:
+            service = _gemini_services.get(key)
+            if service is None:
+                from .gemini_file_search import GeminiFileSearchService
+                service = GeminiFileSearchService(api_key, store)
+                _gemini_services[key] = service
+    return service
+
+
+def _get_summary_executor() -> ThreadPoolExecutor:
+    global _summary_executor
+    if _summary_executor is None:
+        with _summary_lock:
+            if _summary_executor is None:
+                _summary_executor = ThreadPoolExecutor(
+                    max_workers=KB_SUMMARY_WORKERS,
+                    thread_name_prefix="kb-summary"
+                )
+    return _summary_executor
+
 
 class SimpleKBService:
     """Simple Knowledge Base - searches RAG, logs everything, collects feedback."""
@@ -27,22 +96,35 @@ class SimpleKBService:
 
     @contextmanager
     def get_connection(self):
-        """Get database connection"""
-        conn = psycopg2.connect(self.connection_string)
-        try:
-            yield conn
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            conn.close()
+        """Get a pooled database connection"""
+        with pooled_connection(self.connection_string) as conn:
+            try:
+                yield conn
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                raise e
 
-    def search(self, query: str, agent_id: str = None, filters: Dict = None, limit: int = 50, offset: int = 0, sort: str = None) -> Dict:
+    def search(
+        self,
+        query: str,
+        agent_id: str = None,
+        filters: Dict = None,
+        limit: int = 50,
+        offset: int = 0,
+        sort: str = None,
+        summary: str = 'inline',
+        summary_deadline: float = None
+    ) -> Dict:
         """
         Search RAG for Q&A matches from Layer 5 data.
         Logs the search and returns results with source info.
 
+        The Gemini summary starts before the database search and runs
+        concurrently with it. If it isn't ready when the results are,
+        'rag_summary_pending' is set and the UI fetches it with
+        get_summary(search_id).
+
         Args:
             query: Search query string
             agent_id: Optional agent identifier
@@ -53,12 +135,14 @@ class SimpleKBService:
             limit: Maximum results to return (default 50)
             offset: Number of results to skip for pagination
             sort: Sort order - 'recent' (by date), 'rating' (by avg_rating), or None (by relevance)
+            summary: 'inline' waits up to summary_deadline for the Gemini summary,
+                'deferred' returns without waiting, 'none' skips Gemini (e.g. pagination)
+            summary_deadline: Seconds from the start of the search to wait in
+                'inline' mode (default RAG_KB_SUMMARY_DEADLINE)
         """
-        import os
-        from .gemini_file_search import GeminiFileSearchService
-
-        gemini_api_key = os.getenv('GEMINI_API_KEY')
-        gemini_store = os.getenv('GEMINI_FILE_SEARCH_STORE', 'mst_call_intelligence')
+        started = time.monotonic()
+        if summary_deadline is None:
+            summary_deadline = KB_SUMMARY_DEADLINE
 
         # Build a Q&A-focused RAG query
         rag_query = f"""
@@ -76,23 +160,24 @@ Return the most relevant solutions with specific details.
 Format each result clearly with Problem, Solution, Resolved By, Customer, and Date.
 """
 
-        try:
-            # Use Gemini for semantic search
-            gemini = GeminiFileSearchService(
-                gemini_api_key,
-                gemini_store
-            ) if gemini_api_key else None
+        # Start the Gemini summary first so it overlaps the database search
+        summary_future = self._start_summary(rag_query) if summary != 'none' else None
 
-            # Also search the database directly for structured Q&A
+        try:
+            # Search the database directly for structured Q&A
             # Get extra results to allow for dedup and pagination
             db_results, total_counts, facets = self._search_database(query, limit=limit + offset + 50, filters=filters, sort=sort)
 
-            # Query RAG if available
+            # Wait for the summary only for what's left of the deadline
             rag_response = ''
-            if gemini:
+            summary_timed_out = False
+            if summary_future is not None and summary == 'inline':
+                remaining = summary_deadline - (time.monotonic() - started)
                 try:
-                    rag_result = gemini.query(rag_query)
-                    rag_response = rag_result.get('response', '')
+                    rag_response = summary_future.result(timeout=max(remaining, 0)) or ''
+                except FutureTimeoutError:
+                    summary_timed_out = True
+                    logger.info(f"Gemini summary not ready after {summary_deadline}s; deferring")
                 except Exception as e:
                     logger.warning(f"Gemini query failed: {e}")
 
@@ -169,6 +254,18 @@ Format each result clearly with Problem, Solution, Resolved By, Customer, and Da
             # Apply pagination - skip offset and take limit
             results = all_results[offset:offset + limit]
 
+            # An inline summary that missed the deadline may have finished
+            # since; check done() first so a late result is never dropped
+            rag_summary_pending = summary == 'deferred' and summary_future is not None
+            if summary_timed_out:
+                if summary_future.done():
+                    try:
+                        rag_response = summary_future.result() or ''
+                    except Exception as e:
+                        logger.warning(f"Gemini query failed: {e}")
+                else:
+                    rag_summary_pending = True
+
             # If we got RAG results, add summary
             rag_summary = None
             if rag_response:
@@ -177,6 +274,10 @@ Format each result clearly with Problem, Solution, Resolved By, Customer, and Da
             # Log the search
             search_id = self._log_search(query, agent_id, results, rag_summary)
 
+            # Summary still running (or deferred): track it so the UI can fetch it
+            if rag_summary_pending:
+                self._track_summary(search_id, summary_future)
+
             # Calculate total across all sources
             total_matches = sum(total_counts.values())
 
@@ -230,6 +331,7 @@ Format each result clearly with Problem, Solution, Resolved By, Customer, and Da
                 'query': query,
                 'results': results,
                 'rag_summary': rag_summary,
+                'rag_summary_pending': rag_summary_pending,
                 'result_count': len(results),
                 'total_matches': total_matches,
                 'total_by_source': total_counts,
@@ -282,6 +384,98 @@ Format each result clearly with Problem, Solution, Resolved By, Customer, and Da
                 'error': str(e)
             }
 
+    def _start_summary(self, rag_query: str) -> Optional[Future]:
+        """Submit the Gemini summary to the shared executor (None if Gemini isn't configured)."""
+        try:
+            gemini = _get_gemini_service()
+        except Exception as e:
+            logger.warning(f"Gemini unavailable: {e}")
+            return None
+        if gemini is None:
+            return None
+
+        def run():
+            result = gemini.query(rag_query)
+            if result.get('error'):
+                raise RuntimeError(result['error'])
+            return result.get('response', '')
+
+        return _get_summary_executor().submit(run)
+
+    def _track_summary(self, search_id: int, future: Future):
+        """Keep a running summary fetchable and store it on the search log when done."""
+        now = time.monotonic()
+        with _summary_lock:
+            for sid, (_, started_at) in list(_pending_summaries.items()):
+                if now - started_at > KB_SUMMARY_RETENTION:
+                    del _pending_summaries[sid]
+            _pending_summaries[search_id] = (future, now)
+
+        def store(f: Future):
+            try:
+                rag_summary = f.result()
+            except Exception as e:
+                logger.warning(f"Gemini query failed: {e}")
+                return
+            if not rag_summary:
+                return
+            try:
+                with self.get_connection() as conn:
+                    with conn.cursor() as cur:
+                        cur.execute(
+                            "UPDATE kb_searches SET rag_summary = %s WHERE id = %s",
+                            (rag_summary, search_id)
+                        )
+            except Exception as e:
+                logger.warning(f"Could not store summary for search {search_id}: {e}")
+
+        future.add_done_callback(store)
+
+    def pending_summary(self, search_id: int) -> Optional[Future]:
+        """The running summary future for a search in this process, if any."""
+        entry = _pending_summaries.get(search_id)
+        return entry[0] if entry is not None else None
+
+    def get_summary(self, search_id: int, wait: float = 0.0) -> Dict:
+        """
+        Get the Gemini summary for a search that returned rag_summary_pending.
+
+        Args:
+            search_id: Search id returned by search()
+            wait: Seconds to wait if the summary is still running
+
+        Returns:
+            Dict with status ('ready', 'pending' or 'failed') and rag_summary
+        """
+        entry = _pending_summaries.get(search_id)
+        if entry is not None:
+            future = entry[0]
+            try:
+                rag_summary = future.result(timeout=wait) if wait else (
+                    future.result() if future.done() else None
+                )
+            except FutureTimeoutError:
+                rag_summary = None
+            except Exception as e:
+                return {'search_id': search_id, 'status': 'failed', 'rag_summary': None, 'error': str(e)}
+
+            if future.done():
+                with _summary_lock:
+                    _pending_summaries.pop(search_id, None)
+                if rag_summary:
+                    return {'search_id': search_id, 'status': 'ready', 'rag_summary': rag_summary}
+                return {'search_id': search_id, 'status': 'failed', 'rag_summary': None}
+            return {'search_id': search_id, 'status': 'pending', 'rag_summary': None}
+
+        # Started by another worker process (or already finished): read the log
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT rag_summary FROM kb_searches WHERE id = %s", (search_id,))
+                row = cur.fetchone()
+        if row and row[0]:
+            return {'search_id': search_id, 'status': 'ready', 'rag_summary': row[0]}
+        return {'search_id': search_id, 'status': 'pending', 'rag_summary': None}
+
     def _extract_keyword_suggestions(self, results: list, query: str) -> list:
         """Extract service-related keyword suggestions from Q&A pairs."""
         import re
@@ -358,6 +552,32 @@ Format each result clearly with Problem, Solution, Resolved By, Customer, and Da
 
         return suggestions
 
+    def _get_optional_tables(self, cur) -> Dict[str, bool]:
+        """Which optional KB tables exist (cached; rechecked while any are missing)."""
+        global _optional_tables, _optional_tables_checked_at
+        if _optional_tables is None or (
+            not all(_optional_tables.values())
+            and time.monotonic() - _optional_tables_checked_at > OPTIONAL_TABLE_CHECK_INTERVAL
+        ):
+            cur.execute("SELECT " + ", ".join(
+                f"to_regclass('{table}') IS NOT NULL as {table}" for table in OPTIONAL_KB_TABLES
+            ))
+            _optional_tables = dict(cur.fetchone())
+            _optional_tables_checked_at = time.monotonic()
+        return _optional_tables
+
+    @staticmethod
+    def _parse_result_dates(results: Optional[list]) -> list:
+        """Restore call_date values that came back as JSON strings."""
+        for r in results or []:
+            value = r.get('call_date')
+            if isinstance(value, str):
+                try:
+                    r['call_date'] = date.fromisoformat(value) if len(value) == 10 else datetime.fromisoformat(value)
+                except ValueError:
+                    pass
+        return results or []
+
     def _search_database(self, query: str, limit: int = 50, filters: Dict = None, sort: str = None):
         """Search the database directly using full-text search - includes call resolutions AND Freshdesk Q&A.
         Results are ranked by a combination of text relevance and user ratings.
@@ -378,267 +598,261 @@ Format each result clearly with Problem, Solution, Resolved By, Customer, and Da
 
         with self.get_connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                # Get total counts per source for faceting
-                total_counts = {}
-                facets = {'employees': [], 'categories': []}
-
-                # Count call resolutions (with filters applied)
-                call_count_sql = """
-                    SELECT COUNT(*) as cnt
-                    FROM call_resolutions cr
-                    JOIN transcripts t ON cr.recording_id = t.recording_id
-                    WHERE cr.search_vector @@ plainto_tsquery('english', %s)
-                      AND cr.problem_statement IS NOT NULL
-                      AND cr.problem_statement != 'Unable to determine'
-                      AND LENGTH(cr.resolution_details) >= 30
-                """
-                call_count_params = [query]
-                if employee_filter:
-                    call_count_sql += " AND t.employee_name ILIKE %s"
-                    call_count_params.append(f'%{employee_filter}%')
-                if source_filter and source_filter != 'call':
-                    total_counts['call'] = 0
+                tables = self._get_optional_tables(cur)
+                include_calls = not source_filter or source_filter == 'call'
+                include_freshdesk = tables['kb_freshdesk_qa'] and (not source_filter or source_filter == 'freshdesk')
+                include_video = tables['video_meeting_qa_pairs'] and (not source_filter or source_filter == 'video')
+
+                params = {
+                    'query': query,
+                    'pattern': f'%{query}%',
+                    'employee': f'%{employee_filter}%' if employee_filter else None,
+                    'category': f'%{category_filter}%' if category_filter else None,
+                    'limit': limit,
+                }
+
+                # Counts, facets and ranked results for every source in one
+                # statement; the tsquery is parsed once in the q CTE
+                ctes = ["""
+                    q AS MATERIALIZED (
+                        SELECT plainto_tsquery('english', %(query)s) as tsq
+                    )""", f"""
+                    call_base AS MATERIALIZED (
+                        SELECT
+                            cr.recording_id,
+                            cr.problem_statement,
+                            cr.resolution_details,
+                            cr.resolution_status,
+                            t.employee_name,
+                            t.customer_name,
+                            t.customer_company,
+                            t.call_date,
+                            cr.search_vector @@ q.tsq as fts_match,
+                            ts_rank(cr.search_vector, q.tsq) as rank,
+                            (cr.problem_statement IS NOT NULL
+                             AND cr.problem_statement != 'Unable to determine'
+                             AND LENGTH(cr.resolution_details) >= 30) as answerable,
+                            {"t.employee_name ILIKE %(employee)s" if employee_filter else "TRUE"} as filter_match
+                        FROM q
+                        CROSS JOIN call_resolutions cr
+                        JOIN transcripts t ON cr.recording_id = t.recording_id
+                        WHERE cr.search_vector @@ q.tsq
+                           OR cr.problem_statement ILIKE %(pattern)s
+                           OR cr.resolution_details ILIKE %(pattern)s
+                    )""", """
+                    call_results AS (
+                        SELECT
+                            c.recording_id,
+                            c.problem_statement,
+                            c.resolution_details,
+                            c.resolution_status,
+                            c.employee_name,
+                            c.customer_name,
+                            c.customer_company,
+                            c.call_date,
+                            i.call_quality_score,
+                            'call' as source_type,
+                            c.rank,
+                            COALESCE(r.avg_rating, 0) as avg_rating,
+                            COALESCE(r.rating_count, 0) as rating_count
+                        FROM (
+                            SELECT * FROM call_base
+                            WHERE answerable
+                              AND resolution_details != ''
+                              AND filter_match
+                            ORDER BY rank DESC, call_date DESC
+                            LIMIT %(limit)s
+                        ) c
+                        LEFT JOIN insights i ON c.recording_id = i.recording_id
+                        LEFT JOIN LATERAL (
+                            SELECT AVG(rating)::DECIMAL(3,2) as avg_rating, COUNT(*) as rating_count
+                            FROM kb_ratings
+                            WHERE source_type = 'call'
+                              AND qa_id = 'call_' || c.recording_id
+                        ) r ON TRUE
+                    )"""]
+
+                # call_base always feeds the employee facets, even when filtered to another source
+                employee_sources = ["SELECT employee_name FROM call_base WHERE fts_match AND employee_name IS NOT NULL"]
+                selects = []
+                if include_calls:
+                    selects.append(
+                        "(SELECT COUNT(*) FROM call_base WHERE fts_match AND answerable AND filter_match) as call_count"
+                    )
+                    selects.append(
+                        "(SELECT json_agg(r ORDER BY r.rank DESC, r.call_date DESC) FROM call_results r) as call_results"
+                    )
+
+                if tables['kb_freshdesk_qa']:
+                    fd_filters = [
+                        "f.agent_name ILIKE %(employee)s" if employee_filter else "TRUE",
+                        "f.category ILIKE %(category)s" if category_filter else "TRUE",
+                    ]
+                    ctes.append(f"""
+                    fd_base AS MATERIALIZED (
+                        SELECT
+                            f.qa_id,
+                            f.question,
+                            f.answer,
+                            f.agent_name,
+                            f.requester_email,
+                            f.category,
+                            f.resolved_at,
+                            f.ticket_id,
+                            f.avg_rating,
+                            f.rating_count,
+                            f.search_vector @@ q.tsq as fts_match,
+                            ts_rank(f.search_vector, q.tsq) as rank,
+                            (LENGTH(f.answer) >= 50
+                             AND f.answer NOT ILIKE '%%shift+close%%'
+                             AND LENGTH(f.question) < 2000) as answerable,
+                            ({' AND '.join(fd_filters)}) as filter_match
+                        FROM q
+                        CROSS JOIN kb_freshdesk_qa f
+                        WHERE f.search_vector @@ q.tsq
+                           OR f.question ILIKE %(pattern)s
+                           OR f.answer ILIKE %(pattern)s
+                    )""")
+                    employee_sources.append("SELECT agent_name FROM fd_base WHERE fts_match AND agent_name IS NOT NULL")
+                    selects.append("""(
+                        SELECT json_agg(c ORDER BY c.cnt DESC)
+                        FROM (
+                            SELECT category, COUNT(*) as cnt
+                            FROM fd_base
+                            WHERE fts_match
+                              AND category IS NOT NULL
+                              AND category != ''
+                            GROUP BY category
+                            ORDER BY cnt DESC
+                            LIMIT 10
+                        ) c
+                    ) as category_facets""")
+                    if include_freshdesk:
+                        selects.append(
+                            "(SELECT COUNT(*) FROM fd_base WHERE fts_match AND answerable AND filter_match) as freshdesk_count"
+                        )
+                        selects.append("""(
+                        SELECT json_agg(r ORDER BY r.rank DESC, r.call_date DESC)
+                        FROM (
+                            SELECT
+                                qa_id as recording_id,
+                                question as problem_statement,
+                                answer as resolution_details,
+                                'resolved' as resolution_status,
+                                agent_name as employee_name,
+                                requester_email as customer_name,
+                                category as customer_company,
+                                resolved_at as call_date,
+                                NULL as call_quality_score,
+                                'freshdesk' as source_type,
+                                ticket_id,
+                                rank,
+                                COALESCE(avg_rating, 0) as avg_rating,
+                                COALESCE(rating_count, 0) as rating_count,
+                                LENGTH(answer) as answer_length
+                            FROM fd_base
+                            WHERE answerable AND filter_match
+                            ORDER BY rank DESC, resolved_at DESC
+                            LIMIT %(limit)s
+                        ) r
+                    ) as freshdesk_results""")
+
+                if include_video:
+                    ctes.append(f"""
+                    video_base AS MATERIALIZED (
+                        SELECT
+                            'video_' || vq.id as recording_id,
+                            vq.question as problem_statement,
+                            vq.answer as resolution_details,
+                            'complete' as resolution_status,
+                            vm.host_name as employee_name,
+                            NULL as customer_name,
+                            vq.category as customer_company,
+                            vm.start_time as call_date,
+                            vm.meeting_quality_score as call_quality_score,
+                            'video' as source_type,
+                            vm.id as video_meeting_id,
+                            vm.title as video_title,
+                            ts_rank(vq.search_vector, q.tsq) as rank,
+                            0 as avg_rating,
+                            0 as rating_count,
+                            vq.search_vector @@ q.tsq as fts_match
+                        FROM q
+                        CROSS JOIN video_meeting_qa_pairs vq
+                        JOIN video_meetings vm ON vq.video_meeting_id = vm.id
+                        WHERE (
+                            vq.search_vector @@ q.tsq
+                            OR vq.question ILIKE %(pattern)s
+                            OR vq.answer ILIKE %(pattern)s
+                        )
+                        AND LENGTH(vq.answer) >= 20
+                        AND vq.quality != 'incomplete'
+                        {"AND vm.host_name ILIKE %(employee)s" if employee_filter else ""}
+                    )""")
+                    selects.append("(SELECT COUNT(*) FROM video_base WHERE fts_match) as video_count")
+                    selects.append("""(
+                        SELECT json_agg(r ORDER BY r.rank DESC, r.call_date DESC)
+                        FROM (
+                            SELECT * FROM video_base
+                            ORDER BY rank DESC, call_date DESC
+                            LIMIT %(limit)s
+                        ) r
+                    ) as video_results""")
+
+                # Employee facets grouped by precomputed canonical name (migration 009)
+                if tables['employee_name_aliases']:
+                    employee_facet_sql = f"""(
+                        SELECT json_agg(e ORDER BY e.cnt DESC)
+                        FROM (
+                            SELECT COALESCE(a.canonical_name, n.employee_name) as employee_name, COUNT(*) as cnt
+                            FROM ({' UNION ALL '.join(employee_sources)}) AS n(employee_name)
+                            LEFT JOIN employee_name_aliases a ON a.raw_name = n.employee_name
+                            GROUP BY COALESCE(a.canonical_name, n.employee_name)
+                            ORDER BY cnt DESC
+                            LIMIT 10
+                        ) e
+                    ) as employee_facets"""
                 else:
-                    cur.execute(call_count_sql, tuple(call_count_params))
-                    total_counts['call'] = cur.fetchone()['cnt']
+                    employee_facet_sql = f"""(
+                        SELECT json_agg(e)
+                        FROM (
+                            SELECT employee_name, COUNT(*) as cnt
+                            FROM ({' UNION ALL '.join(employee_sources)}) AS n(employee_name)
+                            GROUP BY employee_name
+                        ) e
+                    ) as employee_facets"""
+                selects.append(employee_facet_sql)
+
+                cur.execute(
+                    "WITH " + ",".join(ctes) + "\nSELECT\n    " + ",\n    ".join(selects),
+                    params
+                )
+                row = cur.fetchone()
+
+                total_counts = {
+                    'call': row.get('call_count') or 0,
+                    'freshdesk': row.get('freshdesk_count') or 0,
+                    'video': row.get('video_count') or 0,
+                }
 
-                # Count Freshdesk (with filters applied)
-                try:
-                    if source_filter and source_filter != 'freshdesk':
-                        total_counts['freshdesk'] = 0
-                    else:
-                        fd_count_sql = """
-                            SELECT COUNT(*) as cnt
-                            FROM kb_freshdesk_qa f
-                            WHERE f.search_vector @@ plainto_tsquery('english', %s)
-                              AND LENGTH(f.answer) >= 50
-                              AND f.answer NOT ILIKE '%%shift+close%%'
-                              AND LENGTH(f.question) < 2000
-                        """
-                        fd_count_params = [query]
-                        if employee_filter:
-                            fd_count_sql += " AND f.agent_name ILIKE %s"
-                            fd_count_params.append(f'%{employee_filter}%')
-                        if category_filter:
-                            fd_count_sql += " AND f.category ILIKE %s"
-                            fd_count_params.append(f'%{category_filter}%')
-                        cur.execute(fd_count_sql, tuple(fd_count_params))
-                        total_counts['freshdesk'] = cur.fetchone()['cnt']
-                except:
-                    total_counts['freshdesk'] = 0
-
-                # Count Video (with filters applied)
-                try:
-                    if source_filter and source_filter != 'video':
-                        total_counts['video'] = 0
-                    else:
-                        video_count_sql = """
-                            SELECT COUNT(*) as cnt
-                            FROM video_meeting_qa_pairs vq
-                            JOIN video_meetings vm ON vq.video_meeting_id = vm.id
-                            WHERE vq.search_vector @@ plainto_tsquery('english', %s)
-                              AND LENGTH(vq.answer) >= 20
-                              AND vq.quality != 'incomplete'
-                        """
-                        video_count_params = [query]
-                        if employee_filter:
-                            video_count_sql += " AND vm.host_name ILIKE %s"
-                            video_count_params.append(f'%{employee_filter}%')
-                        cur.execute(video_count_sql, tuple(video_count_params))
-                        total_counts['video'] = cur.fetchone()['cnt']
-                except:
-                    total_counts['video'] = 0
-
-                # Get top employees across all sources for faceting
-                # Fetch raw names, then normalize and aggregate in Python
+                # Already canonical when the alias table exists; otherwise
+                # canonicalize the (grouped) raw names here
                 from rag_integration.config.employee_names import canonicalize_employee_name
 
-                cur.execute("""
-                    SELECT employee_name, COUNT(*) as cnt FROM (
-                        SELECT t.employee_name
-                        FROM call_resolutions cr
-                        JOIN transcripts t ON cr.recording_id = t.recording_id
-                        WHERE cr.search_vector @@ plainto_tsquery('english', %s)
-                          AND t.employee_name IS NOT NULL
-                        UNION ALL
-                        SELECT f.agent_name as employee_name
-                        FROM kb_freshdesk_qa f
-                        WHERE f.search_vector @@ plainto_tsquery('english', %s)
-                          AND f.agent_name IS NOT NULL
-                    ) combined
-                    GROUP BY employee_name
-                """, (query, query))
-
-                # Normalize employee names and aggregate counts
                 employee_counts = {}
-                for row in cur.fetchall():
-                    raw_name = row['employee_name']
+                for facet in row['employee_facets'] or []:
+                    raw_name = facet['employee_name']
                     canonical_name = canonicalize_employee_name(raw_name) or raw_name
-                    employee_counts[canonical_name] = employee_counts.get(canonical_name, 0) + row['cnt']
-
-                # Sort by count descending and take top 10
-                facets['employees'] = sorted(employee_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+                    employee_counts[canonical_name] = employee_counts.get(canonical_name, 0) + facet['cnt']
 
-                # Get top categories
-                try:
-                    cur.execute("""
-                        SELECT category, COUNT(*) as cnt
-                        FROM kb_freshdesk_qa f
-                        WHERE f.search_vector @@ plainto_tsquery('english', %s)
-                          AND f.category IS NOT NULL
-                          AND f.category != ''
-                        GROUP BY category
-                        ORDER BY cnt DESC
-                        LIMIT 10
-                    """, (query,))
-                    facets['categories'] = [(r['category'], r['cnt']) for r in cur.fetchall()]
-                except:
-                    facets['categories'] = []
-
-                # Now get the actual results with optional filters
-                # Search call resolutions using pre-built search_vector with weighted ranking
-                call_results = []
-                if not source_filter or source_filter == 'call':
-                    call_sql = """
-                    SELECT
-                        cr.recording_id,
-                        cr.problem_statement,
-                        cr.resolution_details,
-                        cr.resolution_status,
-                        t.employee_name,
-                        t.customer_name,
-                        t.customer_company,
-                        t.call_date,
-                        i.call_quality_score,
-                        'call' as source_type,
-                        ts_rank(cr.search_vector, plainto_tsquery('english', %s)) as rank,
-                        COALESCE(r.avg_rating, 0) as avg_rating,
-                        COALESCE(r.rating_count, 0) as rating_count
-                    FROM call_resolutions cr
-                    JOIN transcripts t ON cr.recording_id = t.recording_id
-                    LEFT JOIN insights i ON cr.recording_id = i.recording_id
-                    LEFT JOIN (
-                        SELECT qa_id, AVG(rating)::DECIMAL(3,2) as avg_rating, COUNT(*) as rating_count
-                        FROM kb_ratings
-                        WHERE source_type = 'call'
-                        GROUP BY qa_id
-                    ) r ON r.qa_id = 'call_' || cr.recording_id
-                    WHERE cr.problem_statement IS NOT NULL
-                      AND cr.problem_statement != 'Unable to determine'
-                      AND cr.resolution_details IS NOT NULL
-                      AND cr.resolution_details != ''
-                      AND LENGTH(cr.resolution_details) >= 30
-                      AND (
-                          cr.search_vector @@ plainto_tsquery('english', %s)
-                          OR cr.problem_statement ILIKE %s
-                          OR cr.resolution_details ILIKE %s
-                      )
-                    """
-                    call_params = [query, query, f'%{query}%', f'%{query}%']
-
-                    if employee_filter:
-                        call_sql += " AND t.employee_name ILIKE %s"
-                        call_params.append(f'%{employee_filter}%')
-
-                    # Always order by relevance to get best matches; display sort applied later
-                    call_sql += " ORDER BY rank DESC, t.call_date DESC LIMIT %s"
-                    call_params.append(limit)
-
-                    cur.execute(call_sql, tuple(call_params))
-                    call_results = [dict(row) for row in cur.fetchall()]
-
-                # Search Freshdesk Q&A with ratings and quality filtering
-                freshdesk_results = []
-                if not source_filter or source_filter == 'freshdesk':
-                    try:
-                        fd_sql = """
-                            SELECT
-                                f.qa_id as recording_id,
-                                f.question as problem_statement,
-                                f.answer as resolution_details,
-                                'resolved' as resolution_status,
-                                f.agent_name as employee_name,
-                                f.requester_email as customer_name,
-                                f.category as customer_company,
-                                f.resolved_at as call_date,
-                                NULL as call_quality_score,
-                                'freshdesk' as source_type,
-                                f.ticket_id,
-                                ts_rank(f.search_vector, plainto_tsquery('english', %s)) as rank,
-                                COALESCE(f.avg_rating, 0) as avg_rating,
-                                COALESCE(f.rating_count, 0) as rating_count,
-                                LENGTH(f.answer) as answer_length
-                            FROM kb_freshdesk_qa f
-                            WHERE (f.search_vector @@ plainto_tsquery('english', %s)
-                               OR f.question ILIKE %s
-                               OR f.answer ILIKE %s)
-                              AND LENGTH(f.answer) >= 50
-                              AND f.answer NOT ILIKE '%%shift+close%%'
-                              AND LENGTH(f.question) < 2000
-                        """
-                        fd_params = [query, query, f'%{query}%', f'%{query}%']
-
-                        if employee_filter:
-                            fd_sql += " AND f.agent_name ILIKE %s"
-                            fd_params.append(f'%{employee_filter}%')
-                        if category_filter:
-                            fd_sql += " AND f.category ILIKE %s"
-                            fd_params.append(f'%{category_filter}%')
-
-                        # Always order by relevance to get best matches; display sort applied later
-                        fd_sql += " ORDER BY rank DESC, f.resolved_at DESC LIMIT %s"
-                        fd_params.append(limit)
-
-                        cur.execute(fd_sql, tuple(fd_params))
-                        freshdesk_results = [dict(row) for row in cur.fetchall()]
-                    except Exception as e:
-                        logger.warning(f"Freshdesk search failed (table may not exist): {e}")
+                facets = {
+                    'employees': sorted(employee_counts.items(), key=lambda x: x[1], reverse=True)[:10],
+                    'categories': [(c['category'], c['cnt']) for c in row.get('category_facets') or []],
+                }
 
-                # Search Video Meeting Q&A pairs using pre-built search_vector
-                video_results = []
-                if not source_filter or source_filter == 'video':
-                    try:
-                        video_sql = """
-                            SELECT
-                                'video_' || vq.id as recording_id,
-                                vq.question as problem_statement,
-                                vq.answer as resolution_details,
-                                'complete' as resolution_status,
-                                vm.host_name as employee_name,
-                                NULL as customer_name,
-                                vq.category as customer_company,
-                                vm.start_time as call_date,
-                                vm.meeting_quality_score as call_quality_score,
-                                'video' as source_type,
-                                vm.id as video_meeting_id,
-                                vm.title as video_title,
-                                ts_rank(vq.search_vector, plainto_tsquery('english', %s)) as rank,
-                                0 as avg_rating,
-                                0 as rating_count
-                            FROM video_meeting_qa_pairs vq
-                            JOIN video_meetings vm ON vq.video_meeting_id = vm.id
-                            WHERE (
-                                vq.search_vector @@ plainto_tsquery('english', %s)
-                                OR vq.question ILIKE %s
-                                OR vq.answer ILIKE %s
-                            )
-                            AND LENGTH(vq.answer) >= 20
-                            AND vq.quality != 'incomplete'
-                        """
-                        video_params = [query, query, f'%{query}%', f'%{query}%']
-
-                        if employee_filter:
-                            video_sql += " AND vm.host_name ILIKE %s"
-                            video_params.append(f'%{employee_filter}%')
-
-                        # Always order by relevance to get best matches; display sort applied later
-                        video_sql += " ORDER BY rank DESC, vm.start_time DESC LIMIT %s"
-                        video_params.append(limit)
-
-                        cur.execute(video_sql, tuple(video_params))
-                        video_results = [dict(row) for row in cur.fetchall()]
-                    except Exception as e:
-                        logger.warning(f"Video Q&A search failed (table may not exist): {e}")
+                call_results = self._parse_result_dates(row.get('call_results'))
+                freshdesk_results = self._parse_result_dates(row.get('freshdesk_results'))
+                video_results = self._parse_result_dates(row.get('video_results'))
 
                 # Normalize ranks within each source to ensure fair comparison
                 # All sources now use pre-built search_vector columns with similar rank ranges
@@ -658,6 +872,9 @@ Format each result clearly with Problem, Solution, Resolved By, Customer, and Da
                 # Combine all results
                 all_results = call_results + freshdesk_results + video_results
 
+                if KB_SEMANTIC_RERANK and all_results:
+                    self._semantic_rerank(query, all_results)
+
                 def get_sort_key(result):
                     from datetime import datetime
                     
@@ -750,6 +967,42 @@ Format each result clearly with Problem, Solution, Resolved By, Customer, and Da
                 else:
                     return deduped[:limit], total_counts, facets
 
+    @staticmethod
+    def _semantic_rerank(query: str, results: list):
+        """
+        Blend query/answer embedding similarity into each result's
+        normalized_rank. Q&A texts go through the embedding cache, so each
+        pair is embedded once; with the local provider this runs on CPU.
+        Leaves the full-text ranks untouched if embedding fails.
+        """
+        try:
+            from src.insights.embeddings_manager import get_embeddings_manager
+            manager = get_embeddings_manager(KB_EMBEDDING_PROVIDER)
+            texts = [query] + [
+                f"{r.get('problem_statement') or ''}\n{r.get('resolution_details') or ''}"
+                for r in results
+            ]
+            vectors = manager.generate_embeddings(texts)
+        except Exception as e:
+            logger.warning(f"KB semantic rerank skipped: {e}")
+            return
+
+        query_vector = vectors[0]
+        if not query_vector:
+            return
+        query_norm = math.sqrt(sum(x * x for x in query_vector))
+
+        for result, vector in zip(results, vectors[1:]):
+            if not vector:
+                continue
+            norm = query_norm * math.sqrt(sum(x * x for x in vector))
+            similarity = sum(x * y for x, y in zip(query_vector, vector)) / norm if norm else 0.0
+            result['semantic_score'] = round(similarity, 4)
+            result['normalized_rank'] = (
+                (1 - KB_SEMANTIC_WEIGHT) * float(result.get('normalized_rank', 0) or 0)
+                + KB_SEMANTIC_WEIGHT * max(similarity, 0.0)
+            )
+
     def _log_search(
         self,
         query: str,
@@ -8,10 +8,11 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime, date
 import json
 import re
-import psycopg2
 from psycopg2.extras import RealDictCursor
 from contextlib import contextmanager
 
+from .db_pool import pooled_connection
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,16 +27,14 @@ class KnowledgeBaseService:
 
     @contextmanager
     def get_connection(self):
-        """Get database connection"""
-        conn = psycopg2.connect(self.connection_string)
-        try:
-            yield conn
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            conn.close()
+        """Get a pooled database connection"""
+        with pooled_connection(self.connection_string) as conn:
+            try:
+                yield conn
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                raise e
 
     # ==========================================
     # ARTICLE OPERATIONS
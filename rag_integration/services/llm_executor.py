@@ -0,0 +1,285 @@
+"""
+LLM Executor - concurrent, rate-aware OpenRouter chat completions.
+
+The layer pipelines used to send one request at a time, sleep a second
+between records and retry 429s recursively after a fixed 5s. The executor
+runs requests on a bounded thread pool behind a token bucket per model,
+retries 429 / 5xx / connection errors with exponential backoff (honoring
+Retry-After), and pauses every worker on a model when it is rate limited.
+"""
+
+import os
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+LLM_DEFAULT_MODEL = os.getenv("RAG_LLM_MODEL", "google/gemini-2.0-flash-001")
+
+# Concurrent requests across all models
+LLM_MAX_WORKERS = int(os.getenv("RAG_LLM_MAX_WORKERS", "8"))
+# Requests per minute allowed per model, with optional per-model overrides
+# as "model=rpm,model=rpm"
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("RAG_LLM_RPM", "240"))
+LLM_MODEL_RPM = os.getenv("RAG_LLM_MODEL_RPM", "")
+# Retries per model for 429 / 5xx / connection errors
+LLM_MAX_RETRIES = int(os.getenv("RAG_LLM_MAX_RETRIES", "5"))
+# Exponential backoff: base * 2^attempt seconds, capped
+LLM_BACKOFF_BASE = float(os.getenv("RAG_LLM_BACKOFF_BASE", "1"))
+LLM_BACKOFF_MAX = float(os.getenv("RAG_LLM_BACKOFF_MAX", "60"))
+LLM_TIMEOUT = float(os.getenv("RAG_LLM_TIMEOUT", "60"))
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+def _parse_model_rpm(spec: str) -> Dict[str, float]:
+    """Parse "model=rpm,model=rpm" into a dict, skipping malformed entries."""
+    limits = {}
+    for item in spec.split(","):
+        model, _, rpm = item.strip().rpartition("=")
+        try:
+            limits[model] = float(rpm)
+        except ValueError:
+            continue
+    limits.pop("", None)
+    return limits
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After as seconds (delta-seconds or HTTP date), None if absent/invalid."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilling at `rate` tokens per second."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Hold every caller for `seconds` (after a 429) and drain the burst."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+            self._updated = self._paused_until
+
+
+class LLMExecutor:
+    """Bounded-concurrency OpenRouter client with per-model rate limits and backoff."""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        url: str = OPENROUTER_URL,
+        max_workers: int = LLM_MAX_WORKERS,
+        requests_per_minute: float = LLM_REQUESTS_PER_MINUTE,
+        model_rpm: Optional[Dict[str, float]] = None,
+        max_retries: int = LLM_MAX_RETRIES,
+        timeout: float = LLM_TIMEOUT
+    ):
+        self.api_key = api_key or os.getenv("OPENROUTER_API_KEY", "")
+        self.url = url
+        self.max_workers = max_workers
+        self.requests_per_minute = requests_per_minute
+        self.model_rpm = model_rpm if model_rpm is not None else _parse_model_rpm(LLM_MODEL_RPM)
+        self.max_retries = max_retries
+        self.timeout = timeout
+
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm")
+
+        # One keep-alive connection per worker
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._stats = {
+            'requests': 0,
+            'succeeded': 0,
+            'failed': 0,
+            'retries': 0,
+            'rate_limited': 0,
+            'fallbacks': 0,
+        }
+
+    def _count(self, key: str, n: int = 1):
+        with self._lock:
+            self._stats[key] += n
+
+    def _bucket(self, model: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(model)
+            if bucket is None:
+                rpm = self.model_rpm.get(model, self.requests_per_minute)
+                bucket = self._buckets[model] = TokenBucket(rpm / 60.0)
+            return bucket
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * (2 ** attempt))
+        # Jitter keeps workers that failed together from retrying together
+        return random.uniform(delay / 2, delay)
+
+    def _call_model(self, prompt: str, max_tokens: int, model: str, temperature: float) -> Dict[str, Any]:
+        bucket = self._bucket(model)
+        error = None
+
+        for attempt in range(self.max_retries + 1):
+            bucket.acquire()
+            self._count('requests')
+            retry_after = None
+            try:
+                response = self.session.post(
+                    self.url,
+                    headers={
+                        "Authorization": f"Bearer {self.api_key}",
+                        "Content-Type": "application/json"
+                    },
+                    json={
+                        "model": model,
+                        "messages": [{"role": "user", "content": prompt}],
+                        "max_tokens": max_tokens,
+                        "temperature": temperature
+                    },
+                    timeout=self.timeout
+                )
+            except requests.RequestException as e:
+                error = str(e)
+            else:
+                if response.status_code == 200:
+                    try:
+                        content = response.json()['choices'][0]['message']['content']
+                    except (ValueError, KeyError, IndexError, TypeError) as e:
+                        return {"success": False, "error": f"Malformed response: {e}"}
+                    return {"success": True, "content": content}
+
+                error = f"HTTP {response.status_code}"
+                if response.status_code not in RETRYABLE_STATUS:
+                    return {"success": False, "error": error}
+                retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+
+            if attempt == self.max_retries:
+                break
+
+            delay = retry_after if retry_after is not None else self._backoff(attempt)
+            if error == "HTTP 429":
+                # Every worker on this model waits, not just this one
+                self._count('rate_limited')
+                bucket.pause(delay)
+            self._count('retries')
+            logger.warning(f"{model}: {error}, retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+            time.sleep(delay)
+
+        return {"success": False, "error": error}
+
+    def call(
+        self,
+        prompt: str,
+        max_tokens: int = 500,
+        model: Optional[str] = None,
+        fallback_model: Optional[str] = None,
+        temperature: float = 0.1
+    ) -> Dict[str, Any]:
+        """
+        Run one chat completion, blocking until it finishes.
+
+        Returns:
+            {"success": True, "content": ...} or {"success": False, "error": ...}
+        """
+        model = model or LLM_DEFAULT_MODEL
+        result = self._call_model(prompt, max_tokens, model, temperature)
+        if not result["success"] and fallback_model and fallback_model != model:
+            logger.warning(f"{model} failed ({result['error']}), trying {fallback_model}...")
+            self._count('fallbacks')
+            result = self._call_model(prompt, max_tokens, fallback_model, temperature)
+
+        self._count('succeeded' if result["success"] else 'failed')
+        return result
+
+    def map(self, jobs: Iterable[Tuple[Any, str]], **call_kwargs) -> Iterator[Tuple[Any, Dict[str, Any]]]:
+        """
+        Run (key, prompt) jobs concurrently.
+
+        Yields (key, result) in completion order, so callers can write
+        results from their own thread while requests are still in flight.
+        """
+        futures = {self._pool.submit(self.call, prompt, **call_kwargs): key for key, prompt in jobs}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"success": False, "error": str(e)}
+            yield futures[future], result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Request counters and limits."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update({
+            'max_workers': self.max_workers,
+            'requests_per_minute': self.requests_per_minute,
+            'model_rpm': dict(self.model_rpm),
+        })
+        return stats
+
+    def close(self):
+        """Wait for in-flight requests and release the pool."""
+        self._pool.shutdown(wait=True)
+        self.session.close()
+
+
+# Singleton instance
+_llm_executor = None
+_llm_executor_lock = threading.Lock()
+
+
+def get_llm_executor(**kwargs) -> LLMExecutor:
+    """Get or create the shared LLM executor; kwargs only apply on creation."""
+    global _llm_executor
+    with _llm_executor_lock:
+        if _llm_executor is None:
+            _llm_executor = LLMExecutor(**kwargs)
+        return _llm_executor
@@ -1,11 +1,14 @@
 """Query Router - Auto-routes queries to optimal RAG system."""
 
 import re
+import time
 from enum import Enum
 from typing import Tuple, Optional, Dict, Any, List
 from datetime import datetime, timedelta
 import logging
 
+from .answer_cache import AnswerCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -15,6 +18,11 @@ class RAGSystem(Enum):
     VERTEX = "vertex"
 
 
+def _compile_rules(patterns: List[str]) -> List[Tuple[str, "re.Pattern"]]:
+    """Precompile routing patterns, keeping the source text to report which rule fired."""
+    return [(pattern, re.compile(pattern)) for pattern in patterns]
+
+
 class QueryRouter:
     """Routes queries to the optimal RAG system based on query patterns."""
 
@@ -71,139 +79,195 @@ class QueryRouter:
         r'recommendations?\s+for',
     ]
 
-    def route(self, query: str) -> Tuple[RAGSystem, Optional[Dict]]:
+    # Numeric score filters: field -> pattern with op/value groups
+    SCORE_FILTER_PATTERNS = {
+        'call_quality_score': r'quality\s*score\s*(?P<op>[><=!]+)\s*(?P<value>\d+)',
+        'empathy_score': r'empathy\s*score\s*(?P<op>[><=!]+)\s*(?P<value>\d+)',
+        'customer_satisfaction_score': r'satisfaction\s*score?\s*(?P<op>[><=!]+)\s*(?P<value>\d+)',
+        'resolution_effectiveness': r'resolution.*score\s*(?P<op>[><=!]+)\s*(?P<value>\d+)',
+    }
+
+    # Churn risk - TEXT field ('none', 'low', 'medium', 'high'), first match wins
+    CHURN_FILTER_PATTERNS = [
+        (r'high[ -]churn', 'high'),
+        (r'medium churn', 'medium'),
+        (r'low churn', 'low'),
+        # "churn risk > 7" or "churn risk above 7" = high risk
+        (r'churn\s*risk\s*(?:score\s*)?(?:>|above|over)\s*7', 'high'),
+        # "churn risk > 5" = medium (the DB query matches medium AND high)
+        (r'churn\s*risk\s*(?:score\s*)?(?:>|above|over)\s*[4-6]', 'medium'),
+        # "at risk" customers = high churn risk
+        (r'at[\s-]?risk', 'high'),
+    ]
+
+    # Agent/Employee name
+    AGENT_FILTER_PATTERNS = [
+        r"agent\s+(?P<name>\w+)'?s?",
+        r"employee\s+(?P<name>\w+)'?s?",
+        r"(?P<name>\w+)'s\s+calls?",
+    ]
+    AGENT_STOPWORDS = {'the', 'all', 'any', 'some', 'this', 'last'}
+
+    CALL_TYPES = ['support', 'sales', 'onboarding', 'retention', 'billing', 'complaint', 'inquiry']
+    SENTIMENTS = ['positive', 'negative', 'neutral']
+
+    BOOLEAN_FILTER_PATTERNS = {
+        'competitor_mentioned': r'competitor.*mention',
+        'escalation_required': r'escalat',
+        'follow_up_needed': r'follow[\s-]?up\s+needed',
+        'first_call_resolution': r'first\s+call\s+resolution',
+    }
+
+    # Relative dates (first match wins); explicit dates and "last N days" override
+    RELATIVE_DATE_PHRASES = ['today', 'yesterday', 'this week', 'last week', 'this month', 'last month']
+    EXPLICIT_DATE_PATTERN = r'(?P<date>\d{4}-\d{2}-\d{2})'
+    LAST_N_DAYS_PATTERN = r'last\s+(?P<days>\d+)\s+days?'
+
+    # Compiled once per process instead of on every query
+    _VERTEX_RULES = _compile_rules(VERTEX_PATTERNS)
+    _GEMINI_RULES = _compile_rules(GEMINI_PATTERNS)
+    _SCORE_RULES = [(field, re.compile(p)) for field, p in SCORE_FILTER_PATTERNS.items()]
+    _CHURN_RULES = [(re.compile(p), level) for p, level in CHURN_FILTER_PATTERNS]
+    _AGENT_RULES = [re.compile(p) for p in AGENT_FILTER_PATTERNS]
+    _BOOLEAN_RULES = [(field, re.compile(p)) for field, p in BOOLEAN_FILTER_PATTERNS.items()]
+    _EXPLICIT_DATE_RULE = re.compile(EXPLICIT_DATE_PATTERN)
+    _LAST_N_DAYS_RULE = re.compile(LAST_N_DAYS_PATTERN)
+
+    def analyze(self, query: str, explain: bool = False) -> Dict[str, Any]:
         """
-        Determine the best RAG system for a query.
+        Route a query and extract its filters in a single pass over the rules.
 
         Args:
             query: The user's query
+            explain: Collect every matching pattern instead of stopping at
+                the rule that decides the route
 
         Returns:
-            Tuple of (RAGSystem, optional filters dict)
+            Dict with system (RAGSystem), rule (pattern that fired, None for
+            the default route), filters (Vertex routes only) and, with
+            explain, matched_vertex_patterns / matched_gemini_patterns
         """
+        result = {"system": RAGSystem.GEMINI, "rule": None, "filters": None}
+        if explain:
+            result.update({"matched_vertex_patterns": [], "matched_gemini_patterns": []})
+
         if not query or not isinstance(query, str):
             logger.warning("Empty or invalid query received, defaulting to Gemini")
-            return (RAGSystem.GEMINI, None)
+            return result
 
         query_lower = query.lower()
 
-        # First check for explicit Vertex patterns
-        for pattern in self.VERTEX_PATTERNS:
-            if re.search(pattern, query_lower):
-                filters = self._extract_filters(query)
-                logger.info(f"Routed to VERTEX (pattern match): {pattern[:30]}...")
-                return (RAGSystem.VERTEX, filters)
+        if explain:
+            matched_vertex = [p for p, rule in self._VERTEX_RULES if rule.search(query_lower)]
+            matched_gemini = [p for p, rule in self._GEMINI_RULES if rule.search(query_lower)]
+            result.update({
+                "matched_vertex_patterns": matched_vertex,
+                "matched_gemini_patterns": matched_gemini,
+            })
+            vertex_rule = matched_vertex[0] if matched_vertex else None
+        else:
+            vertex_rule = next((p for p, rule in self._VERTEX_RULES if rule.search(query_lower)), None)
+
+        # Any Vertex pattern wins; Gemini is also the default for open-ended questions
+        if vertex_rule:
+            result.update({
+                "system": RAGSystem.VERTEX,
+                "rule": vertex_rule,
+                "filters": self._filters_from_text(query_lower),
+            })
+        elif explain:
+            result["rule"] = matched_gemini[0] if matched_gemini else None
+        else:
+            result["rule"] = next((p for p, rule in self._GEMINI_RULES if rule.search(query_lower)), None)
+
+        return result
+
+    def route(self, query: str) -> Tuple[RAGSystem, Optional[Dict]]:
+        """
+        Determine the best RAG system for a query.
+
+        Args:
+            query: The user's query
+
+        Returns:
+            Tuple of (RAGSystem, optional filters dict)
+        """
+        result = self.analyze(query)
+        system, rule = result["system"], result["rule"]
 
-        # Check for Gemini patterns
-        for pattern in self.GEMINI_PATTERNS:
-            if re.search(pattern, query_lower):
-                logger.info(f"Routed to GEMINI (pattern match): {pattern[:30]}...")
-                return (RAGSystem.GEMINI, None)
+        if rule:
+            logger.info(f"Routed to {system.name} (pattern match): {rule[:30]}...")
+        elif query and isinstance(query, str):
+            logger.info("Routed to GEMINI (default)")
 
-        # Default to Gemini for open-ended questions
-        logger.info("Routed to GEMINI (default)")
-        return (RAGSystem.GEMINI, None)
+        return (system, result["filters"])
 
     def _extract_filters(self, query: str) -> Dict[str, Any]:
         """Extract structured filters from query text."""
-        filters = {}
-
         # Validate query
         if not query or not isinstance(query, str):
             logger.warning("Empty or invalid query in _extract_filters")
-            return filters
+            return {}
 
-        query_lower = query.lower()
+        return self._filters_from_text(query.lower())
+
+    def _filters_from_text(self, query_lower: str) -> Dict[str, Any]:
+        """Apply the precompiled filter rules to a lowercased query."""
+        filters = {}
 
         # Score patterns (numeric scores)
-        score_patterns = [
-            (r'quality\s*score\s*([><=!]+)\s*(\d+)', 'call_quality_score'),
-            (r'empathy\s*score\s*([><=!]+)\s*(\d+)', 'empathy_score'),
-            (r'satisfaction\s*score?\s*([><=!]+)\s*(\d+)', 'customer_satisfaction_score'),
-            (r'resolution.*score\s*([><=!]+)\s*(\d+)', 'resolution_effectiveness'),
-        ]
-
-        for pattern, field in score_patterns:
-            match = re.search(pattern, query_lower)
-            if match:
-                op = match.group(1).replace('==', '=')
-                filters[field] = {"op": op, "value": int(match.group(2))}
-
-        # Churn risk - TEXT field ('none', 'low', 'medium', 'high')
-        # Handle both text-based and numeric queries
-        if 'high churn' in query_lower or 'high-churn' in query_lower:
-            filters["churn_risk"] = "high"
-        elif 'medium churn' in query_lower:
-            filters["churn_risk"] = "medium"
-        elif 'low churn' in query_lower:
-            filters["churn_risk"] = "low"
-        elif re.search(r'churn\s*risk\s*(?:score\s*)?(?:>|above|over)\s*7', query_lower):
-            # "churn risk > 7" or "churn risk above 7" = high risk
-            filters["churn_risk"] = "high"
-        elif re.search(r'churn\s*risk\s*(?:score\s*)?(?:>|above|over)\s*[4-6]', query_lower):
-            # "churn risk > 5" = medium or high
-            filters["churn_risk"] = "medium"  # Will match medium AND high in DB query
-        elif re.search(r'at[\s-]?risk', query_lower):
-            # "at risk" customers = high churn risk
-            filters["churn_risk"] = "high"
-
-        # Agent/Employee name
-        agent_patterns = [
-            r"agent\s+(\w+)'?s?",
-            r"employee\s+(\w+)'?s?",
-            r"(\w+)'s\s+calls?",
-        ]
-        for pattern in agent_patterns:
-            match = re.search(pattern, query_lower)
+        for field, rule in self._SCORE_RULES:
+            match = rule.search(query_lower)
             if match:
-                name = match.group(1).capitalize()
-                # Avoid common words
-                if name.lower() not in ['the', 'all', 'any', 'some', 'this', 'last']:
-                    filters["employee_name"] = name
-                    break
+                op = match.group('op').replace('==', '=')
+                filters[field] = {"op": op, "value": int(match.group('value'))}
 
-        # Call type
-        call_types = ['support', 'sales', 'onboarding', 'retention', 'billing', 'complaint', 'inquiry']
-        for ct in call_types:
-            if ct in query_lower:
-                filters["call_type"] = ct.capitalize()
+        # Churn risk
+        for rule, level in self._CHURN_RULES:
+            if rule.search(query_lower):
+                filters["churn_risk"] = level
+                break
+
+        # Agent/Employee name (avoid common words)
+        for rule in self._AGENT_RULES:
+            match = rule.search(query_lower)
+            if match and match.group('name') not in self.AGENT_STOPWORDS:
+                filters["employee_name"] = match.group('name').capitalize()
                 break
 
+        # Call type
+        call_type = next((ct for ct in self.CALL_TYPES if ct in query_lower), None)
+        if call_type:
+            filters["call_type"] = call_type.capitalize()
+
         # Sentiment
-        if 'positive' in query_lower:
-            filters["customer_sentiment"] = "positive"
-        elif 'negative' in query_lower:
-            filters["customer_sentiment"] = "negative"
-        elif 'neutral' in query_lower:
-            filters["customer_sentiment"] = "neutral"
+        sentiment = next((s for s in self.SENTIMENTS if s in query_lower), None)
+        if sentiment:
+            filters["customer_sentiment"] = sentiment
 
         # Boolean filters
-        if re.search(r'competitor.*mention', query_lower):
-            filters["competitor_mentioned"] = True
-        if re.search(r'escalat', query_lower):
-            filters["escalation_required"] = True
-        if re.search(r'follow[\s-]?up\s+needed', query_lower):
-            filters["follow_up_needed"] = True
-        if re.search(r'first\s+call\s+resolution', query_lower):
-            filters["first_call_resolution"] = True
+        for field, rule in self._BOOLEAN_RULES:
+            if rule.search(query_lower):
+                filters[field] = True
 
         # Date filters
         today = datetime.now()
+        relative = next((d for d in self.RELATIVE_DATE_PHRASES if d in query_lower), None)
 
-        if 'today' in query_lower:
+        if relative == 'today':
             filters["call_date"] = today.strftime('%Y-%m-%d')
-        elif 'yesterday' in query_lower:
+        elif relative == 'yesterday':
             filters["call_date"] = (today - timedelta(days=1)).strftime('%Y-%m-%d')
-        elif 'this week' in query_lower:
+        elif relative == 'this week':
             start = today - timedelta(days=today.weekday())
             filters["call_date"] = {"op": ">=", "value": start.strftime('%Y-%m-%d')}
-        elif 'last week' in query_lower:
+        elif relative == 'last week':
             start = today - timedelta(days=today.weekday() + 7)
             end = today - timedelta(days=today.weekday() + 1)
             filters["call_date"] = {"op": "BETWEEN", "value": [start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')]}
-        elif 'this month' in query_lower:
+        elif relative == 'this month':
             filters["call_date"] = {"op": ">=", "value": f"{today.year}-{today.month:02d}-01"}
-        elif 'last month' in query_lower:
+        elif relative == 'last month':
             if today.month == 1:
                 last_month = datetime(today.year - 1, 12, 1)
             else:
@@ -211,14 +275,14 @@ class QueryRouter:
             filters["call_date"] = {"op": ">=", "value": last_month.strftime('%Y-%m-%d')}
 
         # Explicit date
-        date_match = re.search(r'(\d{4}-\d{2}-\d{2})', query)
+        date_match = self._EXPLICIT_DATE_RULE.search(query_lower)
         if date_match:
-            filters["call_date"] = date_match.group(1)
+            filters["call_date"] = date_match.group('date')
 
         # Last N days
-        days_match = re.search(r'last\s+(\d+)\s+days?', query_lower)
+        days_match = self._LAST_N_DAYS_RULE.search(query_lower)
         if days_match:
-            days = int(days_match.group(1))
+            days = int(days_match.group('days'))
             start = today - timedelta(days=days)
             filters["call_date"] = {"op": ">=", "value": start.strftime('%Y-%m-%d')}
 
@@ -228,22 +292,25 @@ class QueryRouter:
 class UnifiedQueryService:
     """Unified interface to hybrid RAG system."""
 
-    def __init__(self, gemini_service, vertex_service):
+    def __init__(self, gemini_service, vertex_service, answer_cache: Optional[AnswerCache] = None):
         """
         Initialize with both RAG services.
 
         Args:
             gemini_service: GeminiFileSearchService instance
             vertex_service: VertexRAGService instance
+            answer_cache: Optional AnswerCache for repeated questions
         """
         self.gemini = gemini_service
         self.vertex = vertex_service
         self.router = QueryRouter()
+        self.answer_cache = answer_cache
 
     def query(
         self,
         query: str,
-        force_system: Optional[str] = None
+        force_system: Optional[str] = None,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """
         Process a query, routing to the optimal system.
@@ -251,11 +318,13 @@ class UnifiedQueryService:
         Args:
             query: The user's question
             force_system: Optional system override ("gemini" or "vertex")
+            use_cache: Serve and store answers through the answer cache
 
         Returns:
-            Response dict with answer, citations, and metadata
+            Response dict with answer, citations, and metadata. On a cache
+            hit query_time_ms is the lookup time, cache_hit is "exact" or
+            "semantic" and cached_query_time_ms is the original time.
         """
-        import time
         start_time = time.time()
 
         # Determine which system to use
@@ -268,15 +337,33 @@ class UnifiedQueryService:
         else:
             system, filters = self.router.route(query)
 
+        cache = self.answer_cache if use_cache else None
+        cache_key = embedding = None
+        if cache is not None:
+            cache_key = cache.make_answer_key(query, system.value, filters)
+            # Forced prompts only reuse exact answers: near-identical report
+            # prompts can be built from different data
+            hit, cached, embedding = cache.lookup(cache_key, semantic=not force_system)
+            if hit:
+                return {
+                    **cached,
+                    "query": query,
+                    "query_time_ms": int((time.time() - start_time) * 1000),
+                    "cache_hit": hit,
+                    "cached_query_time_ms": cached["query_time_ms"],
+                }
+
         # Execute query on appropriate system
         if system == RAGSystem.GEMINI:
-            result = self.gemini.query(query)
+            # Routed questions are grounded with local calls; forced calls
+            # (report prompts) already carry their data
+            result = self.gemini.query(query, ground=not force_system)
         else:
             result = self.vertex.query(query, filters)
 
         elapsed_ms = int((time.time() - start_time) * 1000)
 
-        return {
+        response = {
             "query": query,
             "system": result.get("system", system.value),
             "response": result["response"],
@@ -286,30 +373,30 @@ class UnifiedQueryService:
             "error": result.get("error")
         }
 
-    def get_routing_explanation(self, query: str) -> Dict[str, Any]:
-        """Explain why a query would be routed to a particular system."""
-        query_lower = query.lower()
-
-        matched_vertex = []
-        matched_gemini = []
+        # Errors aren't cached so the next ask retries the RAG system
+        if cache is not None and not response["error"]:
+            cache.store(cache_key, response, embedding)
 
-        for pattern in self.router.VERTEX_PATTERNS:
-            if re.search(pattern, query_lower):
-                matched_vertex.append(pattern)
+        return {**response, "cache_hit": None}
 
-        for pattern in self.router.GEMINI_PATTERNS:
-            if re.search(pattern, query_lower):
-                matched_gemini.append(pattern)
+    def get_routing_explanation(self, query: str) -> Dict[str, Any]:
+        """Explain why a query would be routed to a particular system."""
+        result = self.router.analyze(query, explain=True)
+        system = result["system"]
 
-        system, filters = self.router.route(query)
+        if result["rule"]:
+            explanation = f"Query routed to {system.value} by pattern {result['rule']}"
+        else:
+            explanation = f"Query routed to {system.value} by default (no pattern matched)"
 
         return {
             "query": query,
             "routed_to": system.value,
-            "filters_extracted": filters,
-            "matched_vertex_patterns": matched_vertex,
-            "matched_gemini_patterns": matched_gemini,
-            "explanation": f"Query routed to {system.value} based on pattern matching"
+            "rule_fired": result["rule"],
+            "filters_extracted": result["filters"],
+            "matched_vertex_patterns": result["matched_vertex_patterns"],
+            "matched_gemini_patterns": result["matched_gemini_patterns"],
+            "explanation": explanation
         }
 
 
@@ -0,0 +1,263 @@
+"""
+Report Rollup Service - maintains report_daily_rollups (migration 008).
+
+Rollups are keyed by call_date x employee x customer company x call_type.
+Triggers queue every call_date touched by transcripts / insights /
+call_resolutions in report_rollup_dirty_days; refresh() recomputes just
+those days so the layer pipelines can call it after each commit.
+
+Transcripts without a call_date are rolled up under UNDATED_CALL_DATE
+(migration 013): all-time reads include them, as the raw report queries
+do, and every date-range filter excludes them.
+"""
+
+import os
+import logging
+from contextlib import contextmanager
+from datetime import date
+from typing import Dict, Any, Optional, List
+
+from psycopg2.extras import RealDictCursor
+from dotenv import load_dotenv
+
+from .db_pool import pooled_connection
+from .response_cache import invalidate_report_cache
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Sentiment buckets shared with the report queries in db_reader.py
+NEGATIVE_SENTIMENTS = ('negative', 'frustrated', 'angry')
+POSITIVE_SENTIMENTS = ('positive', 'satisfied', 'happy')
+
+# Rollup day for transcripts with no call_date
+UNDATED_CALL_DATE = date(1, 1, 1)
+
+# Recompute the given days from the raw tables. %(days)s is a DATE[].
+REFRESH_DAYS_SQL = """
+    WITH base AS MATERIALIZED (
+        SELECT
+            COALESCE(t.call_date, %(undated)s) as call_date,
+            COALESCE(t.employee_name, '') as employee_name,
+            COALESCE(t.customer_company, '') as customer_company,
+            COALESCE(i.call_type, '') as call_type,
+            t.customer_name,
+            i.recording_id as insight_id,
+            i.call_quality_score,
+            i.customer_satisfaction_score,
+            i.customer_sentiment,
+            LOWER(i.customer_sentiment) as sentiment_lower,
+            cr.churn_risk
+        FROM transcripts t
+        LEFT JOIN insights i ON t.recording_id = i.recording_id
+        LEFT JOIN call_resolutions cr ON t.recording_id = cr.recording_id
+        WHERE t.call_date = ANY(%(days)s)
+           OR (t.call_date IS NULL AND %(undated)s = ANY(%(days)s))
+    ),
+    sentiments AS (
+        SELECT call_date, employee_name, customer_company, call_type,
+               jsonb_object_agg(customer_sentiment, n) as counts
+        FROM (
+            SELECT call_date, employee_name, customer_company, call_type, customer_sentiment, COUNT(*) as n
+            FROM base
+            WHERE customer_sentiment IS NOT NULL
+            GROUP BY 1, 2, 3, 4, 5
+        ) s
+        GROUP BY 1, 2, 3, 4
+    ),
+    churn AS (
+        SELECT call_date, employee_name, customer_company, call_type,
+               jsonb_object_agg(churn_risk, n) as counts
+        FROM (
+            SELECT call_date, employee_name, customer_company, call_type, churn_risk, COUNT(*) as n
+            FROM base
+            WHERE churn_risk IS NOT NULL
+            GROUP BY 1, 2, 3, 4, 5
+        ) c
+        GROUP BY 1, 2, 3, 4
+    ),
+    contacts AS (
+        SELECT call_date, employee_name, customer_company, call_type,
+               jsonb_object_agg(customer_name, n) as counts
+        FROM (
+            SELECT call_date, employee_name, customer_company, call_type, customer_name, COUNT(*) as n
+            FROM base
+            WHERE customer_name IS NOT NULL
+            GROUP BY 1, 2, 3, 4, 5
+        ) ct
+        GROUP BY 1, 2, 3, 4
+    ),
+    totals AS (
+        SELECT
+            call_date, employee_name, customer_company, call_type,
+            COUNT(*) as transcript_count,
+            COUNT(insight_id) as analyzed_count,
+            COUNT(call_quality_score) as quality_count,
+            COALESCE(SUM(call_quality_score), 0) as quality_sum,
+            COUNT(*) FILTER (WHERE call_quality_score >= 8) as quality_excellent_count,
+            COUNT(*) FILTER (WHERE call_quality_score >= 6 AND call_quality_score < 8) as quality_good_count,
+            COUNT(*) FILTER (WHERE call_quality_score >= 4 AND call_quality_score < 6) as quality_fair_count,
+            COUNT(*) FILTER (WHERE call_quality_score < 4) as quality_poor_count,
+            COUNT(*) FILTER (WHERE call_quality_score < 5) as low_quality_count,
+            COUNT(*) FILTER (WHERE call_quality_score >= 8) as high_quality_count,
+            COUNT(customer_satisfaction_score) as satisfaction_count,
+            COALESCE(SUM(customer_satisfaction_score), 0) as satisfaction_sum,
+            COUNT(*) FILTER (WHERE sentiment_lower IN %(negative)s) as negative_count,
+            COUNT(*) FILTER (WHERE sentiment_lower IN %(positive)s) as positive_count,
+            COUNT(*) FILTER (WHERE sentiment_lower = 'neutral') as neutral_count,
+            COUNT(*) FILTER (WHERE churn_risk = 'high') as churn_high_count,
+            COUNT(*) FILTER (WHERE churn_risk = 'medium') as churn_medium_count
+        FROM base
+        GROUP BY 1, 2, 3, 4
+    )
+    INSERT INTO report_daily_rollups (
+        call_date, employee_name, customer_company, call_type,
+        transcript_count, analyzed_count,
+        quality_count, quality_sum,
+        quality_excellent_count, quality_good_count, quality_fair_count, quality_poor_count,
+        low_quality_count, high_quality_count,
+        satisfaction_count, satisfaction_sum,
+        negative_count, positive_count, neutral_count, sentiment_counts,
+        churn_high_count, churn_medium_count, churn_risk_counts,
+        contact_counts, refreshed_at
+    )
+    SELECT
+        tot.call_date, tot.employee_name, tot.customer_company, tot.call_type,
+        tot.transcript_count, tot.analyzed_count,
+        tot.quality_count, tot.quality_sum,
+        tot.quality_excellent_count, tot.quality_good_count, tot.quality_fair_count, tot.quality_poor_count,
+        tot.low_quality_count, tot.high_quality_count,
+        tot.satisfaction_count, tot.satisfaction_sum,
+        tot.negative_count, tot.positive_count, tot.neutral_count, COALESCE(s.counts, '{}'),
+        tot.churn_high_count, tot.churn_medium_count, COALESCE(c.counts, '{}'),
+        COALESCE(ct.counts, '{}'), NOW()
+    FROM totals tot
+    LEFT JOIN sentiments s USING (call_date, employee_name, customer_company, call_type)
+    LEFT JOIN churn c USING (call_date, employee_name, customer_company, call_type)
+    LEFT JOIN contacts ct USING (call_date, employee_name, customer_company, call_type)
+"""
+
+
+class ReportRollupService:
+    """Incrementally maintains the per-day report rollups."""
+
+    def __init__(self, database_url: Optional[str] = None):
+        self.database_url = database_url or os.getenv("RAG_DATABASE_URL") or os.getenv("DATABASE_URL", "")
+
+    @contextmanager
+    def get_connection(self):
+        """Get a pooled read-write connection (commits on success)."""
+        with pooled_connection(self.database_url) as conn:
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def refresh(self, batch_days: int = 31, max_batches: Optional[int] = None) -> int:
+        """
+        Recompute rollups for every dirty day.
+
+        Each batch claims up to batch_days dirty days (SKIP LOCKED, so
+        concurrent refreshers don't collide), rebuilds them and commits.
+        Changes that land while a batch runs re-mark their day dirty.
+
+        Returns:
+            Number of days refreshed
+        """
+        refreshed = 0
+        batches = 0
+
+        while max_batches is None or batches < max_batches:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        DELETE FROM report_rollup_dirty_days
+                        WHERE call_date IN (
+                            SELECT call_date FROM report_rollup_dirty_days
+                            ORDER BY call_date DESC
+                            LIMIT %s
+                            FOR UPDATE SKIP LOCKED
+                        )
+                        RETURNING call_date
+                    """, (batch_days,))
+                    days: List[date] = [row[0] for row in cur.fetchall()]
+                    if not days:
+                        break
+
+                    cur.execute(
+                        "DELETE FROM report_daily_rollups WHERE call_date = ANY(%s)",
+                        (days,)
+                    )
+                    cur.execute(REFRESH_DAYS_SQL, {
+                        'days': days,
+                        'undated': UNDATED_CALL_DATE,
+                        'negative': NEGATIVE_SENTIMENTS,
+                        'positive': POSITIVE_SENTIMENTS,
+                    })
+
+            refreshed += len(days)
+            batches += 1
+            logger.info(f"Refreshed report rollups for {len(days)} days ({min(days)} to {max(days)})")
+
+        if refreshed:
+            invalidate_report_cache()
+        return refreshed
+
+    def mark_dirty(self, since: Optional[date] = None, until: Optional[date] = None) -> int:
+        """Queue days for recomputation (all days with transcripts by default).
+
+        A date range skips undated transcripts; the default includes them.
+        """
+        conditions = ["TRUE"]
+        params = [UNDATED_CALL_DATE]
+        if since:
+            conditions.append("call_date >= %s")
+            params.append(since)
+        if until:
+            conditions.append("call_date <= %s")
+            params.append(until)
+
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"""
+                    INSERT INTO report_rollup_dirty_days (call_date)
+                    SELECT DISTINCT COALESCE(call_date, %s) FROM transcripts
+                    WHERE {' AND '.join(conditions)}
+                    ON CONFLICT (call_date) DO NOTHING
+                """, params)
+                return cur.rowcount
+
+    def rebuild(self, since: Optional[date] = None, until: Optional[date] = None) -> int:
+        """Mark a range dirty and refresh it."""
+        self.mark_dirty(since, until)
+        return self.refresh()
+
+    def get_status(self) -> Dict[str, Any]:
+        """Rollup coverage and backlog."""
+        with self.get_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute("""
+                    SELECT
+                        (SELECT COUNT(*) FROM report_rollup_dirty_days) as dirty_days,
+                        (SELECT MIN(call_date) FROM report_rollup_dirty_days
+                         WHERE call_date <> %(undated)s) as oldest_dirty_day,
+                        (SELECT COUNT(DISTINCT call_date) FROM report_daily_rollups) as rolled_up_days,
+                        (SELECT COUNT(*) FROM report_daily_rollups) as rollup_rows,
+                        (SELECT MAX(refreshed_at) FROM report_daily_rollups) as last_refreshed_at
+                """, {'undated': UNDATED_CALL_DATE})
+                row = dict(cur.fetchone())
+                row['oldest_dirty_day'] = str(row['oldest_dirty_day']) if row['oldest_dirty_day'] else None
+                row['last_refreshed_at'] = row['last_refreshed_at'].isoformat() if row['last_refreshed_at'] else None
+                return row
+
+
+def refresh_report_rollups() -> int:
+    """Refresh dirty rollup days; safe to call after any layer pipeline commit."""
+    try:
+        return ReportRollupService().refresh()
+    except Exception as e:
+        logger.warning(f"Report rollup refresh failed: {e}")
+        return 0
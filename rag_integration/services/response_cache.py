@@ -0,0 +1,230 @@
+"""
+Response Cache - TTL + LRU cache for report endpoint responses.
+
+Report data only changes when the layer pipelines commit, so responses are
+cached per (endpoint, params, scope) where scope separates admins from each
+employee's filtered view. Entries expire after a TTL and are dropped early
+by invalidate_report_cache(), which the layer jobs call after they commit.
+
+The jobs run in separate processes, so invalidation also touches a stamp
+file; every API process clears its cache when the stamp's mtime moves.
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Seconds a cached report stays valid
+CACHE_TTL = float(os.getenv("RAG_REPORT_CACHE_TTL", "600"))
+# Maximum cached responses (least recently used are evicted first)
+CACHE_MAX_ENTRIES = int(os.getenv("RAG_REPORT_CACHE_MAX_ENTRIES", "256"))
+# Touched by invalidate_report_cache() so other processes drop their entries
+CACHE_INVALIDATION_FILE = os.getenv(
+    "RAG_REPORT_CACHE_INVALIDATION_FILE", "/tmp/cows_report_cache.stamp"
+)
+
+CacheKey = Tuple[str, Tuple[Tuple[str, Hashable], ...], str]
+
+
+class ResponseCache:
+    """Thread-safe TTL + LRU cache with single-flight computation and hit/miss counters."""
+
+    def __init__(
+        self,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        ttl: float = CACHE_TTL,
+        invalidation_file: Optional[str] = CACHE_INVALIDATION_FILE
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.invalidation_file = Path(invalidation_file) if invalidation_file else None
+
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[CacheKey, asyncio.Future] = {}
+        self._stamp = self._read_stamp()
+
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'invalidations': 0,
+        }
+
+    @staticmethod
+    def make_key(endpoint: str, params: Dict[str, Any], scope: str) -> CacheKey:
+        """Build a cache key; params order doesn't matter, None values are dropped."""
+        items = tuple(sorted((k, v) for k, v in params.items() if v is not None))
+        return (endpoint, items, scope)
+
+    def _read_stamp(self) -> float:
+        if self.invalidation_file is None:
+            return 0.0
+        try:
+            return self.invalidation_file.stat().st_mtime
+        except OSError:
+            return 0.0
+
+    def _check_external_invalidation(self):
+        """Clear everything if another process touched the stamp file."""
+        stamp = self._read_stamp()
+        if stamp > self._stamp:
+            self._stamp = stamp
+            with self._lock:
+                if self._entries:
+                    self._stats['invalidations'] += len(self._entries)
+                    self._entries.clear()
+
+    def _fresh_entry(self, key: Hashable, now: float) -> Optional[Tuple[float, Any]]:
+        """The unexpired entry for a key, marked recently used (call with the lock held)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if now >= entry[0]:
+            del self._entries[key]
+            self._stats['expirations'] += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get(self, key: CacheKey) -> Tuple[bool, Any]:
+        """Return (hit, value) for a key."""
+        self._check_external_invalidation()
+        with self._lock:
+            entry = self._fresh_entry(key, time.monotonic())
+            if entry is None:
+                self._stats['misses'] += 1
+                return False, None
+            self._stats['hits'] += 1
+            return True, entry[1]
+
+    def set(self, key: CacheKey, value: Any, ttl: Optional[float] = None):
+        """Store a value, evicting the least recently used entries past max_entries."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + (ttl or self.ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    async def get_or_compute(
+        self,
+        endpoint: str,
+        params: Dict[str, Any],
+        scope: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None
+    ) -> Any:
+        """
+        Return the cached response or compute and store it.
+
+        Concurrent requests for the same key share one computation instead
+        of each hitting the database. Exceptions are not cached.
+        """
+        key = self.make_key(endpoint, params, scope)
+        hit, value = self.get(key)
+        if hit:
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            with self._lock:
+                self._stats['coalesced'] += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure isn't logged as never retrieved
+            future.exception()
+            raise
+        else:
+            self.set(key, value, ttl)
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def _drop(self, match: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key matches."""
+        with self._lock:
+            keys = [k for k in self._entries if match(k)]
+            for k in keys:
+                del self._entries[k]
+            self._stats['invalidations'] += len(keys)
+        return len(keys)
+
+    def invalidate(self, endpoint: Optional[str] = None, scope: Optional[str] = None) -> int:
+        """Drop entries for an endpoint and/or scope (everything if neither is given)."""
+        return self._drop(
+            lambda k: (endpoint is None or k[0] == endpoint) and (scope is None or k[2] == scope)
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats.update({
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl,
+            'hit_rate': round(stats['hits'] / lookups, 3) if lookups else 0.0,
+        })
+        return stats
+
+
+# Singleton instance
+_report_cache = None
+
+
+def get_report_cache() -> ResponseCache:
+    """Get or create the report response cache singleton."""
+    global _report_cache
+    if _report_cache is None:
+        _report_cache = ResponseCache()
+    return _report_cache
+
+
+def invalidate_report_cache(endpoint: Optional[str] = None, scope: Optional[str] = None) -> int:
+    """
+    Invalidate cached report responses.
+
+    Call after the layer pipelines commit. A full invalidation (no endpoint or
+    scope) also touches the stamp file so API processes drop their entries.
+
+    Returns:
+        Number of entries dropped in this process
+    """
+    dropped = _report_cache.invalidate(endpoint, scope) if _report_cache is not None else 0
+
+    if endpoint is None and scope is None:
+        touch_invalidation_file(CACHE_INVALIDATION_FILE)
+
+    return dropped
+
+
+def touch_invalidation_file(path: Optional[str]):
+    """Touch a cache's stamp file so every process using it clears its entries."""
+    if not path:
+        return
+    try:
+        Path(path).touch()
+    except OSError as e:
+        logger.warning(f"Could not touch cache stamp {path}: {e}")
@@ -1,7 +1,7 @@
 """Vertex AI RAG Service - Hybrid approach using database + vertexai.rag + google.genai."""
 
 import os
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 import logging
 import psycopg2
 from psycopg2.extras import RealDictCursor
@@ -13,6 +13,8 @@ from google.genai import types
 from google.oauth2 import service_account
 from dotenv import load_dotenv
 
+from .hybrid_retriever import retrieve_with_fallback, RAG_RETRIEVAL_MODE
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
@@ -233,6 +235,25 @@ When providing analysis:
             logger.error(f"Retrieval failed: {e}")
             return []
 
+    def retrieve(
+        self,
+        query: str,
+        top_k: int = 10,
+        filters: Optional[Dict] = None
+    ) -> Tuple[List[Dict[str, Any]], str]:
+        """
+        Retrieval step of query(): the RAG corpus and/or the local hybrid
+        index, according to RAG_RETRIEVAL_MODE (see hybrid_retriever).
+
+        Returns:
+            (contexts, 'rag_corpus' or 'local_index')
+        """
+        contexts, source = retrieve_with_fallback(
+            lambda: self.retrieve_contexts(query, top_k=top_k),
+            query, top_k=top_k, filters=filters
+        )
+        return contexts, "rag_corpus" if source == "remote" else "local_index"
+
     def query(
         self,
         query: str,
@@ -301,10 +322,7 @@ Be specific and reference the actual data provided."""
                 else:
                     # No database results - try RAG corpus as fallback
                     logger.info("No database results, falling back to RAG corpus")
-                    if not self.corpus_name:
-                        self.initialize_corpus()
-
-                    contexts = self.retrieve_contexts(query, top_k=top_k) if self.corpus_name else []
+                    contexts, data_source = self.retrieve(query, top_k=top_k, filters=filters)
 
                     if not contexts:
                         return {
@@ -318,7 +336,6 @@ Be specific and reference the actual data provided."""
                         f"[Context {i+1}]:\n{ctx['text'][:1500]}"
                         for i, ctx in enumerate(contexts)
                     ])
-                    data_source = "rag_corpus"
                     num_results = len(contexts)
 
                     prompt = f"""Based on the following relevant excerpts from our knowledge base, answer the question.
@@ -334,10 +351,11 @@ Provide the best answer you can based on the available context."""
 
             else:
                 # Step 1b: No filters - use RAG corpus for semantic search
-                if not self.corpus_name:
+                if not self.corpus_name and RAG_RETRIEVAL_MODE != "local":
                     self.initialize_corpus()
 
-                if not self.corpus_name:
+                # The local index can answer without a corpus
+                if not self.corpus_name and RAG_RETRIEVAL_MODE == "remote":
                     return {
                         "response": "Error: Could not initialize corpus",
                         "filters_applied": None,
@@ -345,8 +363,8 @@ Provide the best answer you can based on the available context."""
                         "error": "Corpus initialization failed"
                     }
 
-                logger.info(f"Using RAG CORPUS for semantic query: {query[:100]}...")
-                contexts = self.retrieve_contexts(query, top_k=top_k)
+                logger.info(f"Using RAG CORPUS ({RAG_RETRIEVAL_MODE} retrieval) for semantic query: {query[:100]}...")
+                contexts, data_source = self.retrieve(query, top_k=top_k)
 
                 if not contexts:
                     return {
@@ -361,7 +379,6 @@ Provide the best answer you can based on the available context."""
                     f"[Context {i+1}]:\n{ctx['text'][:1500]}"
                     for i, ctx in enumerate(contexts)
                 ])
-                data_source = "rag_corpus"
                 num_results = len(contexts)
 
                 prompt = f"""Based on the following relevant excerpts from our call transcripts and knowledge base, answer the question.
@@ -719,6 +736,16 @@ Provide a comprehensive answer based on the contexts above. Reference specific d
             logger.error(f"Failed to list files: {e}")
             return []
 
+    def delete_file(self, file_name: str) -> bool:
+        """Delete one file (and its chunks) from the corpus by resource name."""
+        try:
+            rag.delete_file(name=file_name)
+            logger.info(f"Deleted corpus file: {file_name}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to delete corpus file {file_name}: {e}")
+            return False
+
     def delete_corpus(self) -> bool:
         """Delete the corpus (use with caution!)."""
         if not self.corpus_name:
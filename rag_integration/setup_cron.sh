@@ -15,6 +15,15 @@ cat << 'EOF' | sudo tee /etc/cron.d/cows-rag
 # Weekly full export on Sunday at 3 AM
 0 3 * * 0 www-data cd /var/www/call-recording-system && /var/www/call-recording-system/venv/bin/python -m rag_integration.jobs.export_pipeline --full >> /var/log/cows/rag_export.log 2>&1
 
+# Refresh report rollups for days touched by the layer pipelines
+*/5 * * * * www-data cd /var/www/call-recording-system && /var/www/call-recording-system/venv/bin/python -m rag_integration.jobs.refresh_report_rollups >> /var/log/cows/report_rollups.log 2>&1
+
+# Map newly seen employee names to canonical names (KB facets, team metrics)
+*/15 * * * * www-data cd /var/www/call-recording-system && /var/www/call-recording-system/venv/bin/python -m rag_integration.jobs.sync_employee_aliases >> /var/log/cows/employee_aliases.log 2>&1
+
+# Index new and changed calls for local hybrid retrieval (RAG_RETRIEVAL_MODE=local/fallback)
+*/30 * * * * www-data cd /var/www/call-recording-system && /var/www/call-recording-system/venv/bin/python -m rag_integration.jobs.sync_search_documents >> /var/log/cows/search_documents.log 2>&1
+
 # Log rotation - keep last 30 days
 0 0 * * * root find /var/log/cows -name "*.log" -mtime +30 -delete
 EOF
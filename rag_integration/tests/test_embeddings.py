@@ -0,0 +1,125 @@
+"""Tests for batched embeddings and the KB semantic rerank, using the hash provider (no model or network)."""
+
+import pytest
+
+from rag_integration.services import kb_simple
+from src.insights.embedding_providers import EmbeddingProvider, HashEmbeddingProvider
+from src.insights.embeddings_manager import EmbeddingsManager, get_embeddings_manager
+
+
+class RecordingHashProvider(HashEmbeddingProvider):
+    """Hash provider that records each embed() call and rejects batches holding a 'poison' text."""
+
+    def __init__(self, max_batch_inputs=4096, max_batch_tokens=None):
+        super().__init__(dimensions=64)
+        self.max_batch_inputs = max_batch_inputs
+        self.max_batch_tokens = max_batch_tokens
+        self.calls = []
+
+    def embed(self, texts):
+        self.calls.append(list(texts))
+        if any("poison" in text for text in texts):
+            return None
+        return super().embed(texts)
+
+
+class MemoryCacheEmbeddingsManager(EmbeddingsManager):
+    """EmbeddingsManager with embedding_cache kept in a dict instead of PostgreSQL."""
+
+    def __init__(self, provider):
+        super().__init__(provider)
+        self.cache = {}
+
+    def _cache_get(self, hashes):
+        return {h: self.cache[h] for h in hashes if h in self.cache}
+
+    def _cache_put(self, embeddings):
+        self.cache.update(embeddings)
+
+
+def test_embedding_provider_is_abstract():
+    with pytest.raises(TypeError):
+        EmbeddingProvider()
+
+
+def test_batches_packed_by_input_count():
+    provider = RecordingHashProvider(max_batch_inputs=3)
+    manager = MemoryCacheEmbeddingsManager(provider)
+
+    texts = [f"text number {n}" for n in range(7)]
+    vectors = manager.generate_embeddings(texts, concurrency=1)
+
+    assert [len(call) for call in provider.calls] == [3, 3, 1]
+    assert vectors == HashEmbeddingProvider(dimensions=64).embed(texts)
+
+
+def test_batches_packed_by_token_limit():
+    provider = RecordingHashProvider(max_batch_tokens=100)
+    manager = MemoryCacheEmbeddingsManager(provider)
+
+    # ~67 estimated tokens each, so only one fits per request
+    manager.generate_embeddings(["a" * 200, "b" * 200, "c" * 200], concurrency=1)
+
+    assert [len(call) for call in provider.calls] == [1, 1, 1]
+
+
+def test_rejected_batch_is_split():
+    provider = RecordingHashProvider()
+    manager = MemoryCacheEmbeddingsManager(provider)
+
+    texts = ["billing question", "poison input", "login problem", "password reset"]
+    vectors = manager.generate_embeddings(texts, concurrency=1)
+
+    assert vectors[1] is None
+    assert all(vectors[n] is not None for n in (0, 2, 3))
+    # Whole batch, then halves, then the failing half's singles
+    assert [len(call) for call in provider.calls] == [4, 2, 1, 1, 2]
+    assert manager.get_stats()['failed'] == 1
+    assert manager.get_stats()['embedded'] == 3
+
+
+def test_cached_and_duplicate_texts_not_embedded():
+    provider = RecordingHashProvider()
+    manager = MemoryCacheEmbeddingsManager(provider)
+
+    first = manager.generate_embeddings(["calendar sync", "email import"])
+    provider.calls.clear()
+
+    again = manager.generate_embeddings(["email import", "invoice payment", "invoice payment"])
+
+    assert provider.calls == [["invoice payment"]]
+    assert again[0] == first[1]
+    assert again[1] == again[2]
+    stats = manager.get_stats()
+    assert stats['texts'] == 5
+    assert stats['cache_hits'] == 1
+    assert stats['embedded'] == 3
+
+
+def test_semantic_rerank_blends_similarity(monkeypatch):
+    monkeypatch.setattr(kb_simple, "KB_EMBEDDING_PROVIDER", "hash")
+    monkeypatch.setattr(kb_simple, "KB_SEMANTIC_WEIGHT", 0.5)
+    monkeypatch.setattr(get_embeddings_manager("hash"), "cache_enabled", False)
+
+    results = [
+        {"problem_statement": "Printer jammed", "resolution_details": "Cleared the tray",
+         "normalized_rank": 0.6},
+        {"problem_statement": "Calendar sync stopped", "resolution_details": "Reconnected the calendar sync",
+         "normalized_rank": 0.4},
+    ]
+    kb_simple.SimpleKBService._semantic_rerank("calendar sync stopped", results)
+
+    assert results[1]["semantic_score"] > results[0]["semantic_score"]
+    assert results[1]["normalized_rank"] > results[0]["normalized_rank"]
+    assert results[1]["normalized_rank"] == pytest.approx(
+        0.5 * 0.4 + 0.5 * results[1]["semantic_score"], abs=1e-3
+    )
+
+
+def test_semantic_rerank_keeps_ranks_when_embedding_fails(monkeypatch):
+    monkeypatch.setattr(kb_simple, "KB_EMBEDDING_PROVIDER", "no-such-provider")
+
+    results = [{"problem_statement": "Printer jammed", "normalized_rank": 0.6}]
+    kb_simple.SimpleKBService._semantic_rerank("printer", results)
+
+    assert results == [{"problem_statement": "Printer jammed", "normalized_rank": 0.6}]
@@ -0,0 +1,129 @@
+"""Tests for sharded JSONL exports with the local storage backend (no GCS needed)."""
+
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+
+from rag_integration.config import settings
+from rag_integration.services import gcs_uploader
+from rag_integration.services.gcs_uploader import LocalStorageUploader, ParallelUploader
+from rag_integration.services.jsonl_formatter import JSONLShardWriter, dumps_jsonl
+
+
+def make_document(n, text_size=100):
+    return {"id": f"call_{n}", "content": {"text": "x" * text_size}, "struct_data": {"n": n}}
+
+
+def read_lines(path):
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_shards_rotate_by_bytes(tmp_path):
+    shards = []
+    line_size = len(dumps_jsonl(make_document(0)))
+    with JSONLShardWriter(tmp_path, "calls", max_bytes=line_size * 3, max_documents=None,
+                          compress=False, on_shard=lambda path, n: shards.append((path.name, n))) as writer:
+        for n in range(7):
+            writer.write(make_document(n))
+
+    assert shards == [("calls_0001.jsonl", 3), ("calls_0002.jsonl", 3), ("calls_0003.jsonl", 1)]
+    assert writer.documents_written == 7
+    assert [doc["id"] for doc in read_lines(tmp_path / "calls_0002.jsonl")] == ["call_3", "call_4", "call_5"]
+
+
+def test_shards_rotate_by_document_count(tmp_path):
+    with JSONLShardWriter(tmp_path, "calls", max_bytes=10 * 1024 * 1024, max_documents=2,
+                          compress=False) as writer:
+        for n in range(5):
+            writer.write(make_document(n))
+
+    assert [path.name for path in writer.shards] == [
+        "calls_0001.jsonl", "calls_0002.jsonl", "calls_0003.jsonl"
+    ]
+    assert [len(read_lines(path)) for path in writer.shards] == [2, 2, 1]
+
+
+def test_compressed_shards(tmp_path):
+    with JSONLShardWriter(tmp_path, "calls", max_documents=10, compress=True) as writer:
+        for n in range(4):
+            writer.write(make_document(n, text_size=5000))
+
+    [shard] = writer.shards
+    assert shard.name == "calls_0001.jsonl.gz"
+    assert [doc["struct_data"]["n"] for doc in read_lines(shard)] == [0, 1, 2, 3]
+    # Repetitive text compresses well below its uncompressed size
+    assert shard.stat().st_size < writer.bytes_written / 10
+
+
+def test_part_file_removed_on_error(tmp_path):
+    with pytest.raises(RuntimeError):
+        with JSONLShardWriter(tmp_path, "calls", max_documents=2, compress=False) as writer:
+            for n in range(3):
+                writer.write(make_document(n))
+            raise RuntimeError("export failed")
+
+    # The finished shard stays; the half-written one is gone
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["calls_0001.jsonl"]
+
+
+def test_parallel_uploader_returns_uris_and_errors(tmp_path):
+    uploader = LocalStorageUploader("bucket", root=str(tmp_path / "storage"))
+    files = []
+    for name in ("a.jsonl", "b.jsonl"):
+        path = tmp_path / name
+        path.write_text('{"id": 1}\n')
+        files.append(path)
+
+    uploads = ParallelUploader(uploader, max_workers=2)
+    for path in files:
+        uploads.submit(path)
+    uploads.submit(tmp_path / "missing.jsonl")
+    uris, errors = uploads.wait()
+
+    assert len(uris) == 2
+    assert [Path(uri[len("file://"):]).name for uri in uris] == ["a.jsonl", "b.jsonl"]
+    assert all(Path(uri[len("file://"):]).read_text() == '{"id": 1}\n' for uri in uris)
+    assert len(errors) == 1 and "missing.jsonl" in errors[0]
+
+
+class FakeDatabaseReader:
+    """Yields prepared call rows instead of reading PostgreSQL."""
+
+    def __init__(self, calls):
+        self.calls = calls
+
+    def get_calls_for_export(self, since=None, until=None, stream=False, page_size=None):
+        return iter(self.calls)
+
+
+def test_run_full_export_local_backend(tmp_path, monkeypatch):
+    monkeypatch.setenv("RAG_EXPORT_DIR", str(tmp_path / "exports"))
+    monkeypatch.setattr(settings, "_config", None)
+    monkeypatch.setattr(gcs_uploader, "RAG_STORAGE_BACKEND", "local")
+    monkeypatch.setattr(gcs_uploader, "RAG_LOCAL_STORAGE_DIR", str(tmp_path / "storage"))
+
+    from rag_integration.jobs.export_pipeline import ExportPipeline
+
+    pipeline = ExportPipeline()
+    assert isinstance(pipeline.gcs, LocalStorageUploader)
+    pipeline.db_reader = FakeDatabaseReader([
+        {"recording_id": f"rec{n}", "call_date": "2025-12-01", "employee_name": "Sam Lee",
+         "customer_sentiment": "positive", "transcript_text": f"call number {n}"}
+        for n in range(5)
+    ])
+
+    results = pipeline.run_full_export(batch_size=2, skip_gemini=True, skip_vertex=True)
+
+    assert results["status"] == "success", results
+    assert results["calls_exported"] == 5
+    assert len(results["files_created"]) == 3
+    assert len(results["gcs_uris"]) == 3
+    assert results["gcs_upload"] == "success"
+
+    uploaded = [Path(uri[len("file://"):]) for uri in results["gcs_uris"]]
+    exported = [doc["id"] for path in uploaded for doc in read_lines(path)]
+    assert exported == [f"call_rec{n}" for n in range(5)]
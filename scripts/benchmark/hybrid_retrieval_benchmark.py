@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+"""
+Relevance / latency benchmark for local hybrid retrieval
+(rag_integration.services.hybrid_retriever).
+
+Loads synthetic topic-labelled call documents (RAG document layout:
+analysis header, then [TRANSCRIPT]) with hash-provider embeddings into
+scratch tables, then runs topic queries and measures precision@k, MRR and
+latency of:
+
+    text        full-text leg only
+    vector      vector leg only
+    hybrid      both legs fused with RRF
+
+and, for filtered queries (one employee, ~5% of calls):
+
+    prefilter           filters applied before ranking (HybridRetriever)
+    retrieve+filter     top-k over all calls, then filtered - what remote
+                        retrieval with post-filtering returns
+
+A result is relevant when its call has the query's topic (and matches the
+filter). Runs fully offline: no model, network or API key. Needs a
+PostgreSQL database with pgvector; tables are dropped afterwards unless
+--keep is given.
+
+Usage:
+    python scripts/benchmark/hybrid_retrieval_benchmark.py [--dsn DSN] [--docs 20000]
+        [--queries 100] [--k 10] [--keep]
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+from pathlib import Path
+
+import psycopg2
+from psycopg2.extras import Json, execute_values
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.insights.vector_index import build_vector_index
+from rag_integration.services.hybrid_retriever import HybridRetriever
+
+DOCUMENTS_TABLE = "hybrid_bench_documents"
+EMBEDDINGS_TABLE = "hybrid_bench_embeddings"
+EMPLOYEES = 20
+LOAD_CHUNK = 2_000
+
+TOPICS = {
+    'billing': ['invoice', 'charge', 'refund', 'payment', 'credit', 'card', 'billing', 'overcharged'],
+    'login': ['password', 'login', 'locked', 'reset', 'credentials', 'signin', 'account', 'authentication'],
+    'sync': ['calendar', 'sync', 'outlook', 'email', 'integration', 'duplicate', 'contacts', 'import'],
+    'reporting': ['report', 'dashboard', 'export', 'metrics', 'chart', 'spreadsheet', 'columns', 'pipeline'],
+    'search': ['search', 'boolean', 'keyword', 'candidates', 'results', 'filter', 'query', 'resume'],
+    'cancellation': ['cancel', 'contract', 'renewal', 'competitor', 'pricing', 'downgrade', 'subscription', 'terminate'],
+}
+FILLER = ('okay thanks so yes right well let me check that for you one moment please '
+          'sure understand great perfect hold on see what happened there today call back').split()
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list."""
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def make_document(rng, doc_id):
+    """One synthetic call: topic words in the summary and transcript, some off-topic noise."""
+    topic = rng.choice(list(TOPICS))
+    other = rng.choice([t for t in TOPICS if t != topic])
+    employee = f"employee_{rng.randrange(EMPLOYEES):02d}"
+    summary = ' '.join(rng.sample(TOPICS[topic], 3) + rng.sample(FILLER, 4))
+    transcript = ' '.join(
+        rng.choice(TOPICS[topic]) if roll < 0.12 else rng.choice(TOPICS[other]) if roll < 0.17
+        else rng.choice(FILLER)
+        for roll in (rng.random() for _ in range(rng.randint(60, 160)))
+    )
+    struct_data = {
+        'call_id': f"bench_{doc_id}",
+        'employee_name': employee,
+        'customer_sentiment': rng.choice(['positive', 'neutral', 'negative']),
+        'call_quality_score': rng.randint(1, 10),
+        'churn_risk_score': rng.randint(0, 10),
+        'topic': topic,
+    }
+    content = (f"[CALL METADATA]\nEmployee: {employee}\n\n[LAYER 2 - SENTIMENT & QUALITY]\n"
+               f"Summary: {summary}\n\n[TRANSCRIPT]\n{transcript}")
+    call_date = f"2025-{1 + doc_id % 12:02d}-{1 + doc_id % 28:02d}"
+    return f"bench_{doc_id}", content, struct_data, call_date
+
+
+def load_tables(conn, retriever, docs, seed):
+    """Create and fill the scratch document and embedding tables."""
+    cursor = conn.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS {DOCUMENTS_TABLE}, {EMBEDDINGS_TABLE}")
+    # Same layout as rag_search_documents (migration 012)
+    cursor.execute(f"""
+        CREATE UNLOGGED TABLE {DOCUMENTS_TABLE} (
+            recording_id TEXT PRIMARY KEY,
+            content_text TEXT NOT NULL,
+            struct_data JSONB NOT NULL,
+            call_date DATE,
+            search_tsv TSVECTOR GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', split_part(content_text, E'\\n[TRANSCRIPT]\\n', 1)), 'A') ||
+                setweight(to_tsvector('english', split_part(content_text, E'\\n[TRANSCRIPT]\\n', 2)), 'D')
+            ) STORED,
+            content_hash TEXT,
+            indexed_at TIMESTAMPTZ DEFAULT NOW()
+        )
+    """)
+    cursor.execute(f"""
+        CREATE UNLOGGED TABLE {EMBEDDINGS_TABLE} (
+            id BIGSERIAL PRIMARY KEY,
+            recording_id TEXT,
+            embedding_model TEXT,
+            embedding vector(1536)
+        )
+    """)
+    conn.commit()
+
+    rng = random.Random(seed)
+    embeddings = retriever.embeddings
+    labels = {}
+    started = time.time()
+    for low in range(0, docs, LOAD_CHUNK):
+        batch = [make_document(rng, doc_id) for doc_id in range(low, min(docs, low + LOAD_CHUNK))]
+        vectors = embeddings.provider.embed([content for _, content, _, _ in batch])
+        execute_values(cursor, f"""
+            INSERT INTO {DOCUMENTS_TABLE} (recording_id, content_text, struct_data, call_date)
+            VALUES %s
+        """, [(rid, content, Json(data), call_date) for rid, content, data, call_date in batch],
+            page_size=len(batch))
+        execute_values(cursor, f"""
+            INSERT INTO {EMBEDDINGS_TABLE} (recording_id, embedding_model, embedding)
+            VALUES %s
+        """, [(rid, embeddings.embedding_model, embeddings.to_storage_vector(vector))
+              for (rid, _, _, _), vector in zip(batch, vectors)],
+            template="(%s, %s, %s::vector)", page_size=len(batch))
+        conn.commit()
+        labels.update({rid: (data['topic'], data['employee_name']) for rid, _, data, _ in batch})
+        print(f"  loaded {low + len(batch):,}/{docs:,} documents ({time.time() - started:.0f}s)", end='\r')
+
+    cursor.execute(f"CREATE INDEX ON {DOCUMENTS_TABLE} USING GIN (search_tsv)")
+    cursor.execute(f"CREATE INDEX ON {DOCUMENTS_TABLE} USING GIN (struct_data jsonb_path_ops)")
+    cursor.execute(f"CREATE INDEX ON {EMBEDDINGS_TABLE} (recording_id)")
+    cursor.execute(f"ANALYZE {DOCUMENTS_TABLE}")
+    cursor.execute(f"ANALYZE {EMBEDDINGS_TABLE}")
+    conn.commit()
+    print(f"  loaded {docs:,} documents in {time.time() - started:.0f}s" + " " * 20)
+    return labels
+
+
+def make_queries(count, seed):
+    """(query text, topic, employee) triples; three words of the topic's vocabulary."""
+    rng = random.Random(seed + 1)
+    queries = []
+    for _ in range(count):
+        topic = rng.choice(list(TOPICS))
+        queries.append((' '.join(rng.sample(TOPICS[topic], 3)), topic, f"employee_{rng.randrange(EMPLOYEES):02d}"))
+    return queries
+
+
+def run_queries(retriever, queries, labels, k, legs, filtered=False, post_filter=False):
+    """Precision@k, MRR, average results returned and latencies (ms) for one configuration."""
+    precisions, reciprocal_ranks, returned, timings = [], [], [], []
+    for text, topic, employee in queries:
+        filters = {'employee': employee} if filtered and not post_filter else None
+        start = time.perf_counter()
+        results, _ = retriever.search(text, filters=filters, limit=k, legs=legs)
+        timings.append((time.perf_counter() - start) * 1000)
+
+        ids = [result['recording_id'] for result in results]
+        if post_filter:
+            ids = [rid for rid in ids if labels[rid][1] == employee]
+        relevant = [labels[rid][0] == topic and (not filtered or labels[rid][1] == employee) for rid in ids]
+        precisions.append(sum(relevant) / k)
+        reciprocal_ranks.append(next((1 / rank for rank, hit in enumerate(relevant, 1) if hit), 0.0))
+        returned.append(len(ids))
+
+    timings.sort()
+    return {
+        'precision': sum(precisions) / len(precisions),
+        'mrr': sum(reciprocal_ranks) / len(reciprocal_ranks),
+        'returned': sum(returned) / len(returned),
+        'p50': percentile(timings, 50),
+        'p95': percentile(timings, 95),
+    }
+
+
+def print_row(scenario, label, result):
+    print(f"  {scenario:<10} {label:<16} {result['precision']:>8.3f} {result['mrr']:>7.3f} "
+          f"{result['returned']:>8.1f} {result['p50']:>8.2f} {result['p95']:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark local hybrid retrieval')
+    parser.add_argument('--dsn', default=os.getenv('RAG_DATABASE_URL') or os.getenv('DATABASE_URL'),
+                        help='PostgreSQL DSN with pgvector (default: RAG_DATABASE_URL)')
+    parser.add_argument('--docs', type=int, default=20_000, help='Synthetic documents (default: 20000)')
+    parser.add_argument('--queries', type=int, default=100, help='Queries per configuration (default: 100)')
+    parser.add_argument('--k', type=int, default=10, help='Results per query (default: 10)')
+    parser.add_argument('--seed', type=int, default=7, help='Random seed (default: 7)')
+    parser.add_argument('--no-index', action='store_true', help='Skip the HNSW index (exact vector search)')
+    parser.add_argument('--keep', action='store_true', help='Keep the scratch tables')
+    args = parser.parse_args()
+
+    if not args.dsn:
+        parser.error('--dsn or RAG_DATABASE_URL is required')
+
+    logging.basicConfig(level=logging.WARNING)
+
+    print("\n" + "="*50)
+    print("HYBRID RETRIEVAL BENCHMARK")
+    print("="*50)
+
+    retriever = HybridRetriever(database_url=args.dsn, embedding_provider='hash',
+                                documents_table=DOCUMENTS_TABLE, embeddings_table=EMBEDDINGS_TABLE)
+    # Query embeddings are cheap; keep them out of the embedding cache
+    retriever.embeddings.cache_enabled = False
+
+    conn = psycopg2.connect(args.dsn)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS vector")
+        conn.commit()
+
+        print(f"\n{args.docs:,} documents, {args.queries} queries, k={args.k}")
+        labels = load_tables(conn, retriever, args.docs, args.seed)
+        if not args.no_index:
+            started = time.time()
+            build_vector_index(conn, EMBEDDINGS_TABLE, 'embedding', method='hnsw')
+            conn.autocommit = False
+            print(f"  HNSW index built in {time.time() - started:.1f}s")
+
+        queries = make_queries(args.queries, args.seed)
+        # Warm the pool, caches and the vector search context
+        run_queries(retriever, queries[:5], labels, args.k, ('text', 'vector'))
+
+        print(f"\n  {'scenario':<10} {'config':<16} {'prec@k':>8} {'MRR':>7} {'returned':>8} "
+              f"{'p50 ms':>8} {'p95 ms':>8}")
+        for label, legs in (('text', ('text',)), ('vector', ('vector',)), ('hybrid', ('text', 'vector'))):
+            print_row('open', label, run_queries(retriever, queries, labels, args.k, legs))
+        for label, post_filter in (('prefilter', False), ('retrieve+filter', True)):
+            result = run_queries(retriever, queries, labels, args.k, ('text', 'vector'),
+                                 filtered=True, post_filter=post_filter)
+            print_row('employee', label, result)
+    finally:
+        if not args.keep:
+            conn.rollback()
+            conn.autocommit = True
+            conn.cursor().execute(f"DROP TABLE IF EXISTS {DOCUMENTS_TABLE}, {EMBEDDINGS_TABLE}")
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
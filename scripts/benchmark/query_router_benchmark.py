@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""
+Micro-benchmark for QueryRouter routing and filter extraction.
+
+Times QueryRouter.route() over a corpus of real queries (the query page
+suggestions, RAG_INTEGRATION.md examples and router smoke tests) and exits
+non-zero if the p99 exceeds the budget, so new patterns can't quietly push
+routing past a millisecond.
+
+Usage:
+    python scripts/benchmark/query_router_benchmark.py [--iterations N] [--budget-us US]
+"""
+
+import sys
+import time
+import logging
+import argparse
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from rag_integration.services.query_router import QueryRouter
+
+QUERY_CORPUS = [
+    # Query page suggestions (semantic)
+    "What are the main reasons customers are unhappy?",
+    "What patterns do you see in calls that escalated?",
+    "Summarize the most common product issues mentioned",
+    "What do customers say about competitors?",
+    "Identify training opportunities for the support team",
+    "What makes customers happy in calls with high satisfaction?",
+    "Find examples of excellent customer service",
+    "What are the recurring themes in billing disputes?",
+    "How do agents handle frustrated customers?",
+    "What upsell opportunities are being missed?",
+    # Query page suggestions (structured)
+    "Show all calls with high churn risk",
+    "List calls where quality score is below 5",
+    "Find all escalated calls",
+    "Show calls with negative sentiment that need follow-up",
+    "List all calls for customer company Acme Corp",
+    "Agent performance metrics for Robin",
+    "Calls where issue was not resolved",
+    "Show billing-related calls",
+    "Find calls with customer effort score above 8",
+    # RAG_INTEGRATION.md examples
+    "What are the most common customer complaints?",
+    "Summarize competitor mentions in calls",
+    "Find patterns in calls that resulted in escalation",
+    "What training do agents need?",
+    "Which customers seem at risk of churning?",
+    "Show all calls with churn risk > 7",
+    "Agent John's performance this week",
+    "All escalated calls from last month",
+    "Calls with quality score < 5",
+    # Router smoke tests
+    "What are customers complaining about?",
+    "Agent John's calls this week",
+    "How many support calls did we get today?",
+    "Find patterns in negative sentiment calls",
+    "Calls where quality score < 5",
+    # Query page date range context
+    "What are customers complaining about this week? (limit to last 30 days)",
+    "Summarize onboarding calls (limit to date range 2025-01-01 to 2025-03-31)",
+]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list."""
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark QueryRouter.route()')
+    parser.add_argument('--iterations', type=int, default=200,
+                        help='Passes over the query corpus (default: 200)')
+    parser.add_argument('--budget-us', type=float, default=1000.0,
+                        help='Fail if p99 routing time exceeds this (default: 1000us)')
+    args = parser.parse_args()
+
+    # Routing logs every decision at INFO
+    logging.disable(logging.INFO)
+
+    router = QueryRouter()
+    for query in QUERY_CORPUS:
+        router.route(query)
+
+    timings = []
+    for _ in range(args.iterations):
+        for query in QUERY_CORPUS:
+            start = time.perf_counter_ns()
+            router.route(query)
+            timings.append((time.perf_counter_ns() - start) / 1000)
+
+    timings.sort()
+    p99 = percentile(timings, 99)
+
+    print("\n" + "="*50)
+    print("QUERY ROUTER BENCHMARK")
+    print("="*50)
+    print(f"Queries: {len(QUERY_CORPUS)} x {args.iterations} iterations")
+    print(f"Patterns: {len(router.VERTEX_PATTERNS)} vertex, {len(router.GEMINI_PATTERNS)} gemini")
+    print(f"Mean: {sum(timings) / len(timings):.1f}us")
+    print(f"p50: {percentile(timings, 50):.1f}us")
+    print(f"p99: {p99:.1f}us")
+    print(f"Max: {timings[-1]:.1f}us")
+
+    print("\nRouting:")
+    for query in QUERY_CORPUS:
+        result = router.analyze(query)
+        print(f"  {result['system'].value:<7} {query[:60]:<60} <- {result['rule'] or 'default'}")
+
+    if p99 > args.budget_us:
+        print(f"\nFAIL: p99 {p99:.1f}us exceeds budget {args.budget_us:.0f}us")
+        sys.exit(1)
+    print(f"\nOK: p99 within {args.budget_us:.0f}us budget")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+"""
+Recall / latency benchmark for filtered vector search (src.insights.vector_index).
+
+Loads synthetic clustered vectors (with employee / date / sentiment filter
+columns shaped like transcript_embeddings) into scratch tables of 100k and
+1M rows, computes exact top-k ground truth, then for each index method
+measures recall@k and latency of:
+
+    unfiltered   ANN scan, swept over ef_search (HNSW) or probes (IVFFlat)
+    selective    one employee (~2% of rows): prefilter vs postfilter vs auto
+    broad        last 9 months (~75% of rows): prefilter vs postfilter vs auto
+
+Needs a PostgreSQL database with pgvector and room for the scratch tables
+(~6GB at 1M x 1536 dims; use --dims 384 for a quicker run). Tables are
+dropped afterwards unless --keep is given.
+
+Usage:
+    python scripts/benchmark/vector_search_benchmark.py [--dsn DSN] [--sizes 100000,1000000]
+        [--dims 1536] [--queries 100] [--k 10] [--methods hnsw,ivfflat] [--keep]
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+from pathlib import Path
+
+import psycopg2
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.insights.vector_index import (
+    build_vector_index,
+    get_search_context,
+    nearest_neighbors
+)
+
+EMPLOYEES = 50
+CLUSTERS = 100
+LOAD_CHUNK = 50_000
+
+SCENARIOS = {
+    'unfiltered': ([], {}),
+    'selective': (["employee_name = %(employee)s"], {'employee': 'employee_7'}),
+    'broad': (["call_date >= %(date_from)s"], {'date_from': '2025-04-01'}),
+}
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list."""
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def load_table(conn, table, rows, dims, noise):
+    """Create `table` with `rows` clustered vectors, generated server-side."""
+    cursor = conn.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS {table}")
+    cursor.execute(f"""
+        CREATE UNLOGGED TABLE {table} (
+            id BIGINT PRIMARY KEY,
+            employee_name TEXT,
+            call_date DATE,
+            customer_sentiment TEXT,
+            embedding vector({dims})
+        )
+    """)
+    cursor.execute("DROP TABLE IF EXISTS vector_bench_centers")
+    cursor.execute("""
+        CREATE UNLOGGED TABLE vector_bench_centers AS
+        SELECT c AS cid,
+               -- Referencing c keeps the subquery from being evaluated once for all centres
+               (SELECT array_agg(random()::real - 0.5 ORDER BY d) FROM generate_series(1, %(dims)s) d
+                WHERE c IS NOT NULL) AS v
+        FROM generate_series(0, %(clusters)s - 1) c
+    """, {'dims': dims, 'clusters': CLUSTERS})
+    conn.commit()
+
+    started = time.time()
+    for low in range(0, rows, LOAD_CHUNK):
+        high = min(rows, low + LOAD_CHUNK)
+        cursor.execute(f"""
+            INSERT INTO {table}
+            SELECT
+                g.id,
+                'employee_' || floor(random() * %(employees)s)::int,
+                DATE '2025-01-01' + floor(random() * 365)::int,
+                (ARRAY['positive', 'neutral', 'negative'])[1 + floor(random() * 3)::int],
+                (SELECT array_agg(c.v[d] + (random()::real - 0.5) * %(noise)s ORDER BY d)
+                 FROM generate_series(1, %(dims)s) d)::vector
+            FROM generate_series(%(low)s, %(high)s - 1) g(id)
+            JOIN vector_bench_centers c ON c.cid = g.id %% %(clusters)s
+        """, {'employees': EMPLOYEES, 'noise': noise, 'dims': dims,
+              'low': low, 'high': high, 'clusters': CLUSTERS})
+        conn.commit()
+        print(f"  loaded {high:,}/{rows:,} rows ({time.time() - started:.0f}s)", end='\r')
+
+    cursor.execute(f"CREATE INDEX ON {table} (employee_name)")
+    cursor.execute(f"CREATE INDEX ON {table} (call_date)")
+    cursor.execute(f"ANALYZE {table}")
+    conn.commit()
+    print(f"  loaded {rows:,} rows in {time.time() - started:.0f}s" + " " * 20)
+
+
+def make_queries(conn, count, dims, noise):
+    """Query vectors drawn from the same clusters as the data."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT (SELECT array_agg(c.v[d] + (random()::real - 0.5) * %(noise)s ORDER BY d)
+                FROM generate_series(1, %(dims)s) d)::vector::text
+        FROM generate_series(1, %(count)s) q
+        JOIN vector_bench_centers c ON c.cid = (q * 37) %% %(clusters)s
+    """, {'noise': noise, 'dims': dims, 'count': count, 'clusters': CLUSTERS})
+    queries = [row[0] for row in cursor.fetchall()]
+    conn.rollback()
+    return queries
+
+
+def exact_top_k(conn, table, queries, k, conditions, params):
+    """Ground truth: exact distance over every matching row."""
+    truth = []
+    cursor = conn.cursor()
+    for query_vector in queries:
+        rows, _ = nearest_neighbors(cursor, table, 'embedding', ['id'], query_vector, k,
+                                    conditions=conditions, params=params, strategy='prefilter')
+        truth.append({row['id'] for row in rows})
+        conn.rollback()
+    return truth
+
+
+def run_searches(conn, table, queries, truth, k, conditions, params, **search_kwargs):
+    """Recall@k and latencies (ms) for one configuration."""
+    cursor = conn.cursor()
+    recalls, timings, strategies = [], [], set()
+    for query_vector, expected in zip(queries, truth):
+        start = time.perf_counter()
+        rows, plan = nearest_neighbors(cursor, table, 'embedding', ['id'], query_vector, k,
+                                       conditions=conditions, params=params, **search_kwargs)
+        timings.append((time.perf_counter() - start) * 1000)
+        conn.rollback()
+
+        found = {row['id'] for row in rows}
+        recalls.append(len(found & expected) / len(expected) if expected else 1.0)
+        strategies.add(plan['strategy'])
+
+    timings.sort()
+    return {
+        'recall': sum(recalls) / len(recalls),
+        'p50': percentile(timings, 50),
+        'p95': percentile(timings, 95),
+        'strategy': '/'.join(sorted(strategies)),
+    }
+
+
+def print_row(size, method, scenario, label, result):
+    print(f"  {size:>9,} {method:<8} {scenario:<11} {label:<22} {result['strategy']:<11} "
+          f"{result['recall']:>7.3f} {result['p50']:>8.2f} {result['p95']:>8.2f}")
+
+
+def benchmark_size(conn, rows, args):
+    table = f"vector_bench_{rows}"
+    print(f"\n{rows:,} vectors x {args.dims} dims")
+    load_table(conn, table, rows, args.dims, args.noise)
+    queries = make_queries(conn, args.queries, args.dims, args.noise)
+
+    truth = {}
+    for scenario, (conditions, params) in SCENARIOS.items():
+        started = time.time()
+        truth[scenario] = exact_top_k(conn, table, queries, args.k, conditions, params)
+        print(f"  ground truth ({scenario}): {time.time() - started:.1f}s")
+
+    try:
+        for method in args.methods:
+            started = time.time()
+            index = build_vector_index(conn, table, 'embedding', method=method)
+            build_seconds = time.time() - started
+            conn.autocommit = False
+
+            cursor = conn.cursor()
+            cursor.execute("SELECT pg_relation_size(to_regclass(%s))", (index['name'],))
+            index_mb = cursor.fetchone()[0] / 1024 / 1024
+            get_search_context(cursor, table, 'embedding', refresh=True)
+            conn.rollback()
+            print(f"\n  {method}: built in {build_seconds:.1f}s, {index_mb:.0f}MB ({index['definition']})")
+            print(f"  {'rows':>9} {'method':<8} {'scenario':<11} {'setting':<22} {'strategy':<11} "
+                  f"{'recall':>7} {'p50 ms':>8} {'p95 ms':>8}")
+
+            widths = args.ef_search if method == 'hnsw' else args.probes
+            width_arg = 'ef_search' if method == 'hnsw' else 'probes'
+            for width in widths:
+                result = run_searches(conn, table, queries, truth['unfiltered'], args.k, [], {},
+                                      strategy='ann', **{width_arg: width})
+                print_row(rows, method, 'unfiltered', f"{width_arg}={width}", result)
+
+            for scenario in ('selective', 'broad'):
+                conditions, params = SCENARIOS[scenario]
+                for strategy in ('prefilter', 'postfilter', None):
+                    result = run_searches(conn, table, queries, truth[scenario], args.k,
+                                          conditions, params, strategy=strategy)
+                    print_row(rows, method, scenario, strategy or 'auto', result)
+    finally:
+        if not args.keep:
+            conn.autocommit = True
+            conn.cursor().execute(f"DROP TABLE IF EXISTS {table}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark filtered pgvector search')
+    parser.add_argument('--dsn', default=os.getenv('RAG_DATABASE_URL') or os.getenv('DATABASE_URL'),
+                        help='PostgreSQL DSN with pgvector (default: RAG_DATABASE_URL)')
+    parser.add_argument('--sizes', default='100000,1000000',
+                        help='Comma-separated table sizes (default: 100000,1000000)')
+    parser.add_argument('--dims', type=int, default=1536, help='Vector dimensions (default: 1536)')
+    parser.add_argument('--queries', type=int, default=100, help='Queries per configuration (default: 100)')
+    parser.add_argument('--k', type=int, default=10, help='Neighbours per query (default: 10)')
+    parser.add_argument('--methods', default='hnsw,ivfflat', help='Index methods (default: hnsw,ivfflat)')
+    parser.add_argument('--ef-search', default='40,100,200', help='HNSW ef_search sweep')
+    parser.add_argument('--probes', default='10,20,40', help='IVFFlat probes sweep')
+    parser.add_argument('--noise', type=float, default=0.5,
+                        help='Spread of points around their cluster centre (default: 0.5)')
+    parser.add_argument('--keep', action='store_true', help='Keep the scratch tables')
+    args = parser.parse_args()
+
+    if not args.dsn:
+        parser.error('--dsn or RAG_DATABASE_URL is required')
+    args.methods = [m.strip() for m in args.methods.split(',') if m.strip()]
+    args.ef_search = [int(v) for v in args.ef_search.split(',')]
+    args.probes = [int(v) for v in args.probes.split(',')]
+    sizes = [int(v) for v in args.sizes.split(',')]
+
+    logging.basicConfig(level=logging.WARNING)
+
+    print("\n" + "="*50)
+    print("VECTOR SEARCH BENCHMARK")
+    print("="*50)
+
+    conn = psycopg2.connect(args.dsn)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS vector")
+        conn.commit()
+        for rows in sizes:
+            benchmark_size(conn, rows, args)
+    finally:
+        if not args.keep:
+            conn.autocommit = True
+            conn.cursor().execute("DROP TABLE IF EXISTS vector_bench_centers")
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
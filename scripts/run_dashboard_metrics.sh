@@ -13,6 +13,10 @@ mkdir -p "$LOG_DIR"
 
 echo "$(date '+%Y-%m-%d %H:%M:%S') - Starting dashboard metrics aggregation" >> "$LOG_FILE"
 
+# Talk/listen metrics for newly transcribed calls (non-fatal)
+python -m rag_integration.jobs.compute_conversation_dynamics 2>&1 >> "$LOG_FILE" || \
+    echo "$(date '+%Y-%m-%d %H:%M:%S') - Conversation dynamics failed, continuing" >> "$LOG_FILE"
+
 if [ "$1" == "--full" ]; then
     # Full daily aggregation (typically run at midnight)
     echo "$(date '+%Y-%m-%d %H:%M:%S') - Running full daily aggregation" >> "$LOG_FILE"
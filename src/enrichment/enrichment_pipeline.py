@@ -15,6 +15,9 @@ from .transcript_enrichment_service import TranscriptEnrichmentService
 
 logger = logging.getLogger(__name__)
 
+# Transcripts enriched at once by enrich_transcripts_async
+ENRICHMENT_MAX_TRANSCRIPTS = int(os.getenv('ENRICHMENT_MAX_TRANSCRIPTS', '10'))
+
 
 class EnrichmentPipeline:
     """
@@ -110,14 +113,19 @@ class EnrichmentPipeline:
         """
         Synchronous wrapper for enrich_transcript_async
         """
-        import asyncio
+        return self._run_sync(
+            self.enrich_transcript_async(transcript_data, call_metadata, salad_result)
+        )
+
+    def _run_sync(self, coroutine):
+        """Run a coroutine in a fresh event loop, closing the shared HTTP session"""
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
         try:
-            return loop.run_until_complete(
-                self.enrich_transcript_async(transcript_data, call_metadata, salad_result)
-            )
+            return loop.run_until_complete(coroutine)
         finally:
+            if self.enable_llm_enrichment:
+                loop.run_until_complete(self.enrichment_service.aclose())
             loop.close()
 
     def enrich_transcript(
@@ -194,12 +202,60 @@ class EnrichmentPipeline:
         # 5. Generate alerts if needed
         enriched['alerts'] = self._generate_alerts(enriched)
 
-        # 6. Save enriched metadata
+        # 6. Save enriched metadata (off the event loop)
         if self.save_enriched_metadata:
-            self._save_enriched_data(enriched, call_metadata.get('recording_id', 'unknown'))
+            await asyncio.to_thread(
+                self._save_enriched_data, enriched, call_metadata.get('recording_id', 'unknown')
+            )
 
         return enriched
 
+    async def enrich_transcripts_async(
+        self,
+        items: List[Dict[str, Any]],
+        max_concurrent: int = ENRICHMENT_MAX_TRANSCRIPTS
+    ) -> List[Dict[str, Any]]:
+        """
+        Enrich many transcripts concurrently in the running event loop
+
+        LLM requests from all transcripts share one HTTP session and the
+        per-provider limits of TranscriptEnrichmentService; max_concurrent
+        caps how many transcripts are in progress at once.
+
+        Args:
+            items: Dicts with 'transcript_data', 'call_metadata' and
+                optionally 'salad_result'
+            max_concurrent: Transcripts enriched at the same time
+
+        Returns:
+            Enriched transcripts in the order of items (a dict with 'error'
+            and 'call_metadata' for any that failed)
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrent))
+
+        async def enrich_one(item):
+            async with semaphore:
+                try:
+                    return await self.enrich_transcript_async(
+                        item['transcript_data'], item['call_metadata'], item.get('salad_result')
+                    )
+                except Exception as e:
+                    recording_id = item.get('call_metadata', {}).get('recording_id')
+                    logger.error(f"Enrichment failed for transcript {recording_id}: {e}")
+                    return {'error': str(e), 'call_metadata': item.get('call_metadata')}
+
+        return await asyncio.gather(*(enrich_one(item) for item in items))
+
+    def enrich_transcripts(
+        self,
+        items: List[Dict[str, Any]],
+        max_concurrent: int = ENRICHMENT_MAX_TRANSCRIPTS
+    ) -> List[Dict[str, Any]]:
+        """
+        Synchronous wrapper for enrich_transcripts_async
+        """
+        return self._run_sync(self.enrich_transcripts_async(items, max_concurrent))
+
     def _extract_salad_features(self, salad_result: Dict[str, Any]) -> Dict[str, Any]:
         """
         Extract advanced features from Salad API result
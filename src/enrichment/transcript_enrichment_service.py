@@ -11,11 +11,26 @@ from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timezone
 from dataclasses import dataclass, asdict
 import re
-import requests
+import aiohttp
 from enum import Enum
 
 logger = logging.getLogger(__name__)
 
+# Concurrent requests per provider across all transcripts in an event loop
+ENRICHMENT_PROVIDER_CONCURRENCY = {
+    'openai': int(os.getenv('ENRICHMENT_OPENAI_CONCURRENCY', '16')),
+    'anthropic': int(os.getenv('ENRICHMENT_ANTHROPIC_CONCURRENCY', '8')),
+    'ollama': int(os.getenv('ENRICHMENT_OLLAMA_CONCURRENCY', '2')),
+}
+# Per-enrichment deadline, counted from when its request gets a provider
+# slot; enrichment types still running get an error entry
+ENRICHMENT_DEADLINE_SECONDS = float(os.getenv('ENRICHMENT_DEADLINE_SECONDS', '60'))
+ENRICHMENT_REQUEST_TIMEOUT = float(os.getenv('ENRICHMENT_REQUEST_TIMEOUT', '30'))
+
+OPENAI_CHAT_URL = "https://api.openai.com/v1/chat/completions"
+ANTHROPIC_MESSAGES_URL = "https://api.anthropic.com/v1/messages"
+SYSTEM_PROMPT = "You are a call center analytics expert. Always respond with valid JSON."
+
 
 class Sentiment(Enum):
     """Sentiment classification"""
@@ -84,37 +99,58 @@ class TranscriptEnrichmentService:
         # Initialize provider clients
         self._init_providers()
 
+        # Shared HTTP session and provider semaphores, bound to one event loop
+        self._loop = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
         # Prompt templates
         self.prompts = self._load_prompt_templates()
 
     def _init_providers(self):
-        """Initialize LLM provider clients"""
+        """Register the LLM providers that have credentials"""
         self.providers = {}
 
-        # OpenAI
         if self.openai_api_key:
-            try:
-                import openai
-                openai.api_key = self.openai_api_key
-                self.providers['openai'] = openai
-                logger.info("OpenAI provider initialized")
-            except ImportError:
-                logger.warning("OpenAI library not installed")
-
-        # Anthropic
+            self.providers['openai'] = {'url': OPENAI_CHAT_URL}
+            logger.info("OpenAI provider initialized")
+
         if self.anthropic_api_key:
-            try:
-                from anthropic import Anthropic
-                self.providers['anthropic'] = Anthropic(api_key=self.anthropic_api_key)
-                logger.info("Anthropic provider initialized")
-            except ImportError:
-                logger.warning("Anthropic library not installed")
+            self.providers['anthropic'] = {'url': ANTHROPIC_MESSAGES_URL}
+            logger.info("Anthropic provider initialized")
 
         # Ollama (local)
         if self.ollama_url:
             self.providers['ollama'] = {'url': self.ollama_url}
             logger.info(f"Ollama provider initialized at {self.ollama_url}")
 
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        HTTP session shared by every request in the running event loop
+
+        Sessions and semaphores cannot cross event loops, so a new loop
+        (e.g. one per enrich_transcript_sync call) gets its own.
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._loop = loop
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=ENRICHMENT_REQUEST_TIMEOUT),
+                connector=aiohttp.TCPConnector(limit=sum(ENRICHMENT_PROVIDER_CONCURRENCY.values()))
+            )
+            self._semaphores = {
+                provider: asyncio.Semaphore(limit)
+                for provider, limit in ENRICHMENT_PROVIDER_CONCURRENCY.items()
+            }
+        return self._session
+
+    async def aclose(self):
+        """Close the shared HTTP session (call before the event loop closes)"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
     def _load_prompt_templates(self) -> Dict[str, str]:
         """Load prompt templates for different enrichment tasks"""
         return {
@@ -261,27 +297,64 @@ class TranscriptEnrichmentService:
             'provider': self.default_provider
         }
 
-        # Run enrichments
-        for enrichment_type in enrichment_types:
-            try:
-                if enrichment_type == 'summary':
-                    enriched_data['summary'] = await self._generate_summary(transcript_text)
-                elif enrichment_type == 'sentiment':
-                    enriched_data['sentiment'] = await self._analyze_sentiment(transcript_text)
-                elif enrichment_type == 'topics_and_intent':
-                    enriched_data['topics_and_intent'] = await self._extract_topics_intent(transcript_text)
-                elif enrichment_type == 'action_items':
-                    enriched_data['action_items'] = await self._extract_action_items(transcript_text)
-                elif enrichment_type == 'insights':
-                    enriched_data['insights'] = await self._extract_insights(transcript_text)
-                elif enrichment_type == 'entities':
-                    enriched_data['entities'] = await self._extract_entities(transcript_text)
-                elif enrichment_type == 'compliance':
-                    enriched_data['compliance'] = await self._check_compliance(transcript_text)
-
-            except Exception as e:
-                logger.error(f"Failed to enrich {enrichment_type}: {e}")
-                enriched_data[enrichment_type] = {'error': str(e)}
+        # Run enrichments concurrently; the provider semaphores bound how
+        # many requests are in flight across all transcripts, and each
+        # deadline starts once the request has its slot
+        extractors = {
+            'summary': self._generate_summary,
+            'sentiment': self._analyze_sentiment,
+            'topics_and_intent': self._extract_topics_intent,
+            'action_items': self._extract_action_items,
+            'insights': self._extract_insights,
+            'entities': self._extract_entities,
+            'compliance': self._check_compliance
+        }
+        loop = asyncio.get_running_loop()
+        started: Dict[str, float] = {}
+        tasks = {
+            asyncio.ensure_future(self._run_extractor(
+                extractors[enrichment_type], transcript_text, started, enrichment_type
+            )): enrichment_type
+            for enrichment_type in dict.fromkeys(enrichment_types)
+            if enrichment_type in extractors
+        }
+
+        if tasks:
+            def deadline(enrichment_type):
+                # A request still waiting for a slot can't expire before a
+                # full deadline from now
+                return started.get(enrichment_type, loop.time()) + ENRICHMENT_DEADLINE_SECONDS
+
+            pending = set(tasks)
+            expired = set()
+            while pending:
+                next_deadline = min(deadline(tasks[task]) for task in pending)
+                _, pending = await asyncio.wait(pending, timeout=max(0.0, next_deadline - loop.time()),
+                                                return_when=asyncio.FIRST_COMPLETED)
+                now = loop.time()
+                for task in list(pending):
+                    if tasks[task] in started and now >= deadline(tasks[task]):
+                        task.cancel()
+                        pending.discard(task)
+                        expired.add(task)
+            if expired:
+                await asyncio.gather(*expired, return_exceptions=True)
+
+            # Keep the requested order in the output
+            results = {}
+            for task, enrichment_type in tasks.items():
+                if task in expired:
+                    logger.error(f"Failed to enrich {enrichment_type}: "
+                                 f"deadline of {ENRICHMENT_DEADLINE_SECONDS:g}s exceeded")
+                    results[enrichment_type] = {'error': 'deadline exceeded'}
+                elif task.exception() is not None:
+                    logger.error(f"Failed to enrich {enrichment_type}: {task.exception()}")
+                    results[enrichment_type] = {'error': str(task.exception())}
+                else:
+                    results[enrichment_type] = task.result()
+            for enrichment_type in enrichment_types:
+                if enrichment_type in results:
+                    enriched_data[enrichment_type] = results[enrichment_type]
 
         # Add categorization
         enriched_data['categorization'] = self._categorize_call(enriched_data)
@@ -294,6 +367,18 @@ class TranscriptEnrichmentService:
 
         return enriched_data
 
+    async def _run_extractor(self, extractor, transcript: str,
+                             started: Dict[str, float], enrichment_type: str) -> Dict[str, Any]:
+        """Run one enrichment holding a provider slot, stamping when it got it"""
+        if self.default_provider not in self.providers:
+            # Regex fallback, no request to queue for
+            started[enrichment_type] = asyncio.get_running_loop().time()
+            return await extractor(transcript)
+        self._get_session()
+        async with self._semaphores[self.default_provider]:
+            started[enrichment_type] = asyncio.get_running_loop().time()
+            return await extractor(transcript)
+
     async def _generate_summary(self, transcript: str) -> Dict[str, Any]:
         """Generate summary using LLM"""
         prompt = self.prompts['summary'].format(transcript=transcript[:3000])  # Limit context
@@ -394,46 +479,61 @@ class TranscriptEnrichmentService:
             LLM response text
         """
         provider = self.default_provider
+        if provider not in self.providers:
+            return self._fallback_extraction(prompt)
 
+        # Callers hold the provider semaphore (see _run_extractor)
+        session = self._get_session()
         try:
-            if provider == 'openai' and 'openai' in self.providers:
-                import openai
-                response = await asyncio.to_thread(
-                    openai.ChatCompletion.create,
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "You are a call center analytics expert. Always respond with valid JSON."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.3,
-                    max_tokens=500
-                )
-                return response['choices'][0]['message']['content']
-
-            elif provider == 'anthropic' and 'anthropic' in self.providers:
-                client = self.providers['anthropic']
-                response = await asyncio.to_thread(
-                    client.messages.create,
-                    model="claude-3-haiku-20240307",
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=500,
-                    temperature=0.3
-                )
-                return response.content[0].text
-
-            elif provider == 'ollama' and 'ollama' in self.providers:
-                response = requests.post(
+            if provider == 'openai':
+                async with session.post(
+                    OPENAI_CHAT_URL,
+                    headers={"Authorization": f"Bearer {self.openai_api_key}"},
+                    json={
+                        "model": "gpt-3.5-turbo",
+                        "messages": [
+                            {"role": "system", "content": SYSTEM_PROMPT},
+                            {"role": "user", "content": prompt}
+                        ],
+                        "temperature": 0.3,
+                        "max_tokens": 500
+                    }
+                ) as response:
+                    response.raise_for_status()
+                    data = await response.json()
+                    return data['choices'][0]['message']['content']
+
+            elif provider == 'anthropic':
+                async with session.post(
+                    ANTHROPIC_MESSAGES_URL,
+                    headers={
+                        "x-api-key": self.anthropic_api_key,
+                        "anthropic-version": "2023-06-01"
+                    },
+                    json={
+                        "model": "claude-3-haiku-20240307",
+                        "messages": [{"role": "user", "content": prompt}],
+                        "max_tokens": 500,
+                        "temperature": 0.3
+                    }
+                ) as response:
+                    response.raise_for_status()
+                    data = await response.json()
+                    return data['content'][0]['text']
+
+            elif provider == 'ollama':
+                async with session.post(
                     f"{self.ollama_url}/api/generate",
                     json={
                         "model": "llama2",
                         "prompt": prompt,
                         "stream": False,
                         "options": {"temperature": 0.3}
-                    },
-                    timeout=30
-                )
-                if response.status_code == 200:
-                    return response.json()['response']
+                    }
+                ) as response:
+                    if response.status == 200:
+                        data = await response.json()
+                        return data['response']
 
             # Fallback to regex-based extraction
             return self._fallback_extraction(prompt)
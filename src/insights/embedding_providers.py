@@ -0,0 +1,306 @@
+"""
+Embedding Providers
+Backends that turn batches of text into vectors for EmbeddingsManager
+
+- openai: text-embedding-ada-002 over HTTPS (default)
+- local:  sentence-transformers on CPU (torch or ONNX), no external quota
+- hash:   deterministic feature-hashing stand-in for tests and offline runs
+
+Select with EMBEDDING_PROVIDER or pass a provider to EmbeddingsManager.
+Vectors from different providers are never compared: embeddings are cached
+and stored under the provider's model name.
+"""
+
+import os
+import re
+import abc
+import math
+import time
+import random
+import hashlib
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_PROVIDER = os.getenv('EMBEDDING_PROVIDER', 'openai').lower()
+
+# OpenAI request packing: the API allows 2048 inputs and 300k tokens per request
+EMBEDDING_BATCH_MAX_INPUTS = int(os.getenv('EMBEDDING_BATCH_MAX_INPUTS', '256'))
+EMBEDDING_BATCH_MAX_TOKENS = int(os.getenv('EMBEDDING_BATCH_MAX_TOKENS', '100000'))
+# Batch requests in flight at once
+EMBEDDING_CONCURRENCY = int(os.getenv('EMBEDDING_CONCURRENCY', '4'))
+# Retries for 429 / 5xx / connection errors, with exponential backoff
+EMBEDDING_MAX_RETRIES = int(os.getenv('EMBEDDING_MAX_RETRIES', '5'))
+EMBEDDING_TIMEOUT = float(os.getenv('EMBEDDING_TIMEOUT', '60'))
+
+# Local CPU model (sentence-transformers name or path) and runtime
+EMBEDDING_LOCAL_MODEL = os.getenv('EMBEDDING_LOCAL_MODEL', 'sentence-transformers/all-MiniLM-L6-v2')
+EMBEDDING_LOCAL_BACKEND = os.getenv('EMBEDDING_LOCAL_BACKEND', 'torch')  # torch or onnx
+EMBEDDING_LOCAL_THREADS = int(os.getenv('EMBEDDING_LOCAL_THREADS', str(min(4, os.cpu_count() or 1))))
+EMBEDDING_LOCAL_BATCH_SIZE = int(os.getenv('EMBEDDING_LOCAL_BATCH_SIZE', '32'))
+
+# Dimensions of the deterministic hash provider
+EMBEDDING_HASH_DIMENSIONS = int(os.getenv('EMBEDDING_HASH_DIMENSIONS', '256'))
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Conservative token estimate (~3 characters per token for English)."""
+    return len(text) // 3 + 1
+
+
+class EmbeddingProvider(abc.ABC):
+    """
+    Base class for embedding backends.
+
+    Subclasses set model, dimensions and the batching hints, and implement
+    embed(). EmbeddingsManager handles caching, de-duplication and packing.
+    """
+
+    name = 'base'
+    # Name stored with cached and persisted vectors
+    model = ''
+    # Models whose stored vectors are interchangeable with this provider's
+    storage_models: Tuple[str, ...] = ()
+    dimensions = 0
+    # Packing limits per embed() call
+    max_batch_inputs = 256
+    max_batch_tokens = None
+    # embed() calls EmbeddingsManager may run at once
+    concurrency = 1
+
+    @abc.abstractmethod
+    def embed(self, texts: List[str]) -> Optional[List[List[float]]]:
+        """
+        Embed a batch of texts.
+
+        Returns:
+            One vector per text, or None if the batch failed as a whole
+        """
+
+    def get_stats(self) -> Dict[str, int]:
+        """Provider counters (requests, retries, ...)."""
+        return {}
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """text-embedding-ada-002 via the OpenAI embeddings endpoint."""
+
+    name = 'openai'
+    model = 'text-embedding-ada-002'
+    storage_models = ('text-embedding-ada-002', 'openai/text-embedding-ada-002')
+    dimensions = 1536
+
+    def __init__(self, api_key: str = None,
+                 concurrency: int = EMBEDDING_CONCURRENCY,
+                 max_retries: int = EMBEDDING_MAX_RETRIES,
+                 timeout: float = EMBEDDING_TIMEOUT):
+        self.api_key = api_key or os.getenv('OPENAI_API_KEY', '')
+        self.concurrency = max(1, concurrency)
+        self.max_batch_inputs = EMBEDDING_BATCH_MAX_INPUTS
+        self.max_batch_tokens = EMBEDDING_BATCH_MAX_TOKENS
+        self.max_retries = max_retries
+        self.timeout = timeout
+
+        # Shared keep-alive connections for the batch requests
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'retries': 0}
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def embed(self, texts: List[str]) -> Optional[List[List[float]]]:
+        """POST texts to the embeddings endpoint, retrying 429 / 5xx with backoff."""
+        if not self.api_key:
+            # OpenRouter currently has API issues, focusing on OpenAI only
+            logger.error("OpenAI API key not set and OpenRouter fallback is temporarily disabled")
+            return None
+
+        error = None
+        for attempt in range(self.max_retries + 1):
+            self._count('requests')
+            retry_after = None
+            try:
+                response = self.session.post(
+                    "https://api.openai.com/v1/embeddings",
+                    headers={
+                        "Authorization": f"Bearer {self.api_key}",
+                        "Content-Type": "application/json"
+                    },
+                    json={
+                        "model": self.model,
+                        "input": texts
+                    },
+                    timeout=self.timeout
+                )
+            except requests.RequestException as e:
+                error = str(e)
+            else:
+                if response.status_code == 200:
+                    data = sorted(response.json()['data'], key=lambda d: d['index'])
+                    return [d['embedding'] for d in data]
+
+                error = f"{response.status_code} - {response.text[:200]}"
+                if response.status_code not in RETRYABLE_STATUS:
+                    logger.warning(f"OpenAI embedding failed for {len(texts)} inputs: {error}")
+                    return None
+                try:
+                    retry_after = float(response.headers.get('Retry-After', ''))
+                except ValueError:
+                    retry_after = None
+
+            if attempt == self.max_retries:
+                break
+
+            delay = retry_after if retry_after is not None else min(60, 2 ** attempt) * random.uniform(0.5, 1)
+            self._count('retries')
+            logger.warning(f"OpenAI embedding error: {error}, retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+            time.sleep(delay)
+
+        logger.error(f"OpenAI embedding failed after {self.max_retries} retries: {error}")
+        return None
+
+
+class LocalEmbeddingProvider(EmbeddingProvider):
+    """
+    sentence-transformers model on CPU.
+
+    Batches are split into sub-batches encoded on a small thread pool;
+    torch and onnxruntime release the GIL inside their kernels, so the
+    sub-batches run in parallel. Needs `pip install sentence-transformers`
+    (plus `optimum[onnxruntime]` for the ONNX backend).
+    """
+
+    name = 'local'
+
+    def __init__(self, model_name: str = EMBEDDING_LOCAL_MODEL,
+                 backend: str = EMBEDDING_LOCAL_BACKEND,
+                 threads: int = EMBEDDING_LOCAL_THREADS,
+                 batch_size: int = EMBEDDING_LOCAL_BATCH_SIZE):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "EMBEDDING_PROVIDER=local needs sentence-transformers: pip install sentence-transformers"
+            ) from e
+
+        kwargs = {'device': 'cpu'}
+        if backend and backend != 'torch':
+            kwargs['backend'] = backend
+        self._model = SentenceTransformer(model_name, **kwargs)
+
+        self.model = f"local/{model_name}" + (f"@{backend}" if backend and backend != 'torch' else '')
+        self.storage_models = (self.model,)
+        self.dimensions = self._model.get_sentence_embedding_dimension()
+        self.threads = max(1, threads)
+        self.batch_size = max(1, batch_size)
+        self.max_batch_inputs = self.batch_size * self.threads
+
+        self._pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="embed-local")
+
+        logger.info(f"Local embedding model {model_name} ({backend}, {self.dimensions} dims, "
+                    f"{self.threads} threads)")
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        vectors = self._model.encode(
+            texts,
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        return vectors.tolist()
+
+    def embed(self, texts: List[str]) -> Optional[List[List[float]]]:
+        sub_batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        try:
+            results = list(self._pool.map(self._encode, sub_batches))
+        except Exception as e:
+            logger.error(f"Local embedding failed for {len(texts)} inputs: {e}")
+            return None
+        return [vector for batch in results for vector in batch]
+
+
+class HashEmbeddingProvider(EmbeddingProvider):
+    """
+    Deterministic feature-hashing embeddings.
+
+    Each word and word bigram is hashed (blake2b, stable across processes)
+    to a signed bucket, and the vector is L2-normalized. Texts sharing words
+    score higher than texts that don't, which is enough for tests, CI and
+    offline development of search code without any model or network.
+    """
+
+    name = 'hash'
+    max_batch_inputs = 4096
+
+    def __init__(self, dimensions: int = EMBEDDING_HASH_DIMENSIONS):
+        self.dimensions = dimensions
+        self.model = f"hash/{dimensions}"
+        self.storage_models = (self.model,)
+
+    def _bucket(self, feature: str) -> Tuple[int, float]:
+        digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+        value = int.from_bytes(digest, 'little')
+        return value % self.dimensions, 1.0 if value >> 63 else -1.0
+
+    def embed_one(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        tokens = _TOKEN_PATTERN.findall(text.lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        for feature in features:
+            index, sign = self._bucket(feature)
+            vector[index] += sign
+
+        norm = math.sqrt(sum(v * v for v in vector))
+        return [v / norm for v in vector] if norm else vector
+
+    def embed(self, texts: List[str]) -> Optional[List[List[float]]]:
+        return [self.embed_one(text) for text in texts]
+
+
+PROVIDERS = {
+    'openai': OpenAIEmbeddingProvider,
+    'local': LocalEmbeddingProvider,
+    'hash': HashEmbeddingProvider,
+}
+
+# Shared provider instances (local models are expensive to load)
+_providers: Dict[str, EmbeddingProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def get_embedding_provider(name: str = None) -> EmbeddingProvider:
+    """
+    Get the shared provider for `name` (default EMBEDDING_PROVIDER).
+
+    Raises:
+        ValueError: Unknown provider name
+        ImportError: local provider without sentence-transformers
+    """
+    name = (name or EMBEDDING_PROVIDER).lower()
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown embedding provider '{name}' (expected one of {', '.join(PROVIDERS)})")
+
+    with _providers_lock:
+        if name not in _providers:
+            _providers[name] = PROVIDERS[name]()
+        return _providers[name]
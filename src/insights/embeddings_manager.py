@@ -1,25 +1,84 @@
 """
 Embeddings Manager for Semantic Search
 Generates and manages embeddings with comprehensive metadata using OpenRouter
+
+Texts are embedded in batches: many chunks per request up to the
+provider's input and token limits, a few requests in flight at once over
+a shared keep-alive session. Every embedding is cached in embedding_cache
+keyed on a hash of model + text, so unchanged chunks are never sent twice
+(re-transcription, re-chunking, re-runs of the backfill).
+
+The embedding backend is pluggable (see embedding_providers): OpenAI by
+default, a CPU-local sentence-transformers model, or a deterministic hash
+stand-in for tests.
 """
 
 import os
 import json
-import requests
+import hashlib
+import threading
 import psycopg2
-from psycopg2.extras import RealDictCursor, Json
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from psycopg2.extras import RealDictCursor, Json, execute_values
+from typing import List, Dict, Any, Optional, Tuple
 import numpy as np
 from datetime import datetime
 import logging
 
+from src.insights.embedding_providers import (
+    EmbeddingProvider,
+    estimate_tokens,
+    get_embedding_provider
+)
+from src.insights.vector_index import (
+    build_vector_index,
+    format_vector,
+    get_search_context,
+    nearest_neighbors
+)
+
 logger = logging.getLogger(__name__)
 
+# Persistent content-hash cache (embedding_cache table, migration 007)
+EMBEDDING_CACHE_ENABLED = os.getenv('EMBEDDING_CACHE_ENABLED', 'true').lower() == 'true'
+
+UNDEFINED_TABLE = '42P01'
+
+
+def content_hash(model: str, text: str) -> str:
+    """Cache key for an embedding: sha256 of model and exact text."""
+    return hashlib.sha256(f"{model}\n{text}".encode('utf-8')).hexdigest()
+
+
 class EmbeddingsManager:
     """Manages embeddings generation and semantic search"""
 
-    def __init__(self):
-        """Initialize the embeddings manager"""
+    # Columns returned by semantic_search (plus similarity)
+    SEARCH_COLUMNS = [
+        'recording_id',
+        'customer_name',
+        'employee_name',
+        'call_date',
+        'customer_sentiment',
+        'call_quality_score',
+        'customer_satisfaction_score',
+        'summary',
+        'call_type',
+        'issue_category',
+        'key_topics',
+        'duration_seconds',
+        'word_count',
+        'transcript_text',
+        'metadata',
+    ]
+
+    def __init__(self, provider: EmbeddingProvider = None):
+        """
+        Initialize the embeddings manager
+
+        Args:
+            provider: Embedding backend (default: EMBEDDING_PROVIDER)
+        """
         self.db_config = {
             'dbname': 'call_insights',
             'user': 'call_insights_user',
@@ -28,19 +87,24 @@ class EmbeddingsManager:
             'port': 5432
         }
 
-        # Try OpenAI directly if available, else fall back to OpenRouter
-        self.openai_api_key = os.getenv('OPENAI_API_KEY', '')
-        self.openrouter_api_key = os.getenv('OPENROUTER_API_KEY', '')
-
-        # Use OpenAI if available
-        self.use_openai_direct = bool(self.openai_api_key)
+        self.provider = provider or get_embedding_provider()
+        self.embedding_model = self.provider.model
 
-        # Using text-embedding-ada-002 (1536 dimensions) to match our database
-        # This is compatible with the existing transcript_embeddings table
-        self.embedding_model = "text-embedding-ada-002" if self.use_openai_direct else "openai/text-embedding-ada-002"
+        # transcript_embeddings.embedding is vector(1536) (text-embedding-ada-002).
+        # Smaller local vectors are zero-padded to fit, which leaves cosine
+        # similarity unchanged; searches only compare vectors of one model.
         self.embedding_dimensions = 1536
 
-        logger.info("Embeddings Manager initialized")
+        self.cache_enabled = EMBEDDING_CACHE_ENABLED
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'texts': 0,
+            'cache_hits': 0,
+            'embedded': 0,
+            'failed': 0,
+        }
+
+        logger.info(f"Embeddings Manager initialized ({self.provider.name}: {self.embedding_model})")
 
     def get_connection(self):
         """Get database connection"""
@@ -97,48 +161,191 @@ class EmbeddingsManager:
         return chunks
 
     def generate_embedding(self, text: str) -> Optional[List[float]]:
-        """Generate embedding for text using OpenAI with OpenRouter fallback"""
+        """Generate embedding for text with the configured provider"""
+        return self.generate_embeddings([text])[0]
+
+    def generate_embeddings(self, texts: List[str],
+                            concurrency: int = None) -> List[Optional[List[float]]]:
+        """
+        Generate embeddings for many texts.
 
-        # Try OpenAI first if available
-        if self.openai_api_key:
+        Identical texts are embedded once, cached texts are not embedded at
+        all, and the rest are packed into as few requests as the provider
+        limits allow, with up to `concurrency` requests in flight
+        (default: the provider's own concurrency).
+
+        Returns:
+            One embedding per input text (None where embedding failed)
+        """
+        if not texts:
+            return []
+
+        hashes = [content_hash(self.embedding_model, text) for text in texts]
+        unique = dict(zip(hashes, texts))
+        embeddings = self._cache_get(list(unique))
+
+        missing = [(h, unique[h]) for h in unique if h not in embeddings]
+        if missing:
+            batches = self._pack_batches(missing)
+            workers = min(len(batches), concurrency or self.provider.concurrency)
+            new = {}
+            if workers <= 1:
+                for batch in batches:
+                    new.update(self._embed_batch(batch))
+            else:
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embed") as pool:
+                    for result in pool.map(self._embed_batch, batches):
+                        new.update(result)
+            self._cache_put(new)
+            embeddings.update(new)
+
+        self._count('texts', len(texts))
+        self._count('cache_hits', len(unique) - len(missing))
+        self._count('failed', sum(1 for h in unique if h not in embeddings))
+        return [embeddings.get(h) for h in hashes]
+
+    def _count(self, key: str, n: int = 1):
+        with self._stats_lock:
+            self._stats[key] += n
+
+    def get_stats(self) -> Dict[str, int]:
+        """Embedding counters since the manager was created."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats.update(self.provider.get_stats())
+        return stats
+
+    def to_storage_vector(self, embedding: List[float]) -> str:
+        """pgvector literal for an embedding, zero-padded to the column's dimensions."""
+        return format_vector(embedding, self.embedding_dimensions)
+
+    def _pack_batches(self, items: List[Tuple[str, str]]) -> List[List[Tuple[str, str]]]:
+        """Group (hash, text) items into requests within the input and token limits."""
+        batches, batch, tokens = [], [], 0
+        for item in items:
+            item_tokens = estimate_tokens(item[1])
+            max_tokens = self.provider.max_batch_tokens
+            if batch and (len(batch) >= self.provider.max_batch_inputs
+                          or (max_tokens and tokens + item_tokens > max_tokens)):
+                batches.append(batch)
+                batch, tokens = [], 0
+            batch.append(item)
+            tokens += item_tokens
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _embed_batch(self, batch: List[Tuple[str, str]]) -> Dict[str, List[float]]:
+        """Embed one packed request, splitting it if the provider rejects it."""
+        vectors = self.provider.embed([text for _, text in batch])
+        if vectors is not None:
+            self._count('embedded', len(batch))
+            return {h: v for (h, _), v in zip(batch, vectors)}
+
+        if len(batch) > 1:
+            # One oversized or malformed input shouldn't fail its neighbours
+            mid = len(batch) // 2
+            result = self._embed_batch(batch[:mid])
+            result.update(self._embed_batch(batch[mid:]))
+            return result
+        return {}
+
+    # =========================================
+    # Content-hash embedding cache
+    # =========================================
+
+    def _cache_get(self, hashes: List[str]) -> Dict[str, List[float]]:
+        """Cached embeddings for the given content hashes."""
+        if not self.cache_enabled or not hashes:
+            return {}
+        try:
+            conn = self.get_connection()
             try:
-                response = requests.post(
-                    "https://api.openai.com/v1/embeddings",
-                    headers={
-                        "Authorization": f"Bearer {self.openai_api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": "text-embedding-ada-002",
-                        "input": text
-                    },
-                    timeout=20
-                )
-
-                if response.status_code == 200:
-                    data = response.json()
-                    return data['data'][0]['embedding']
-                else:
-                    logger.warning(f"OpenAI embedding failed: {response.status_code} - {response.text}, trying OpenRouter")
-
-            except Exception as e:
-                logger.warning(f"OpenAI embedding error: {e}, trying OpenRouter")
-
-        # OpenRouter currently has API issues, focusing on OpenAI only
-        logger.error("OpenAI API failed and OpenRouter fallback is temporarily disabled")
-        return None
+                with conn.cursor() as cursor:
+                    cursor.execute("""
+                        SELECT content_hash, embedding
+                        FROM embedding_cache
+                        WHERE content_hash = ANY(%s)
+                    """, (hashes,))
+                    return {row['content_hash']: list(row['embedding']) for row in cursor.fetchall()}
+            finally:
+                conn.close()
+        except Exception as e:
+            if getattr(e, 'pgcode', None) == UNDEFINED_TABLE:
+                logger.warning("embedding_cache table missing (run migrations/007_embedding_cache.sql), cache disabled")
+                self.cache_enabled = False
+            else:
+                logger.warning(f"Embedding cache lookup failed: {e}")
+        return {}
+
+    def _cache_put(self, embeddings: Dict[str, List[float]]):
+        """Store new embeddings under their content hashes."""
+        if not self.cache_enabled or not embeddings:
+            return
+        try:
+            conn = self.get_connection()
+            try:
+                with conn.cursor() as cursor:
+                    execute_values(cursor, """
+                        INSERT INTO embedding_cache (content_hash, model, dimensions, embedding)
+                        VALUES %s
+                        ON CONFLICT (content_hash) DO NOTHING
+                    """, [
+                        (h, self.embedding_model, len(v), v) for h, v in embeddings.items()
+                    ], page_size=200)
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.warning(f"Embedding cache write failed: {e}")
 
     def store_transcript_embedding(self, recording_id: str, embedding: List[float],
                                   metadata: Dict[str, Any]) -> bool:
         """Store transcript embedding with all metadata"""
+        return self.store_transcript_embeddings([(recording_id, embedding, metadata)]) == 1
+
+    def store_transcript_embeddings(self, items: List[Tuple[str, List[float], Dict[str, Any]]]) -> int:
+        """
+        Store many transcript embeddings in one statement.
+
+        Args:
+            items: (recording_id, embedding, metadata) tuples
+
+        Returns:
+            Number of embeddings stored
+        """
+        if not items:
+            return 0
+
         conn = self.get_connection()
         cursor = conn.cursor()
 
         try:
-            # Convert embedding to PostgreSQL vector format
-            embedding_str = '[' + ','.join(map(str, embedding)) + ']'
-
-            cursor.execute("""
+            rows = []
+            for recording_id, embedding, metadata in items:
+                # Convert embedding to PostgreSQL vector format
+                embedding_str = self.to_storage_vector(embedding)
+                rows.append((
+                    recording_id,
+                    embedding_str,
+                    metadata.get('transcript_text', ''),
+                    metadata.get('customer_name'),
+                    metadata.get('employee_name'),
+                    metadata.get('call_date'),
+                    metadata.get('duration_seconds'),
+                    metadata.get('word_count'),
+                    metadata.get('customer_sentiment'),
+                    metadata.get('call_quality_score'),
+                    metadata.get('customer_satisfaction_score'),
+                    metadata.get('call_type'),
+                    metadata.get('issue_category'),
+                    metadata.get('summary'),
+                    metadata.get('key_topics', []),
+                    Json(metadata.get('additional_metadata', {})),
+                    self.embedding_model
+                ))
+
+            execute_values(cursor, """
                 INSERT INTO transcript_embeddings (
                     recording_id,
                     embedding,
@@ -157,54 +364,87 @@ class EmbeddingsManager:
                     key_topics,
                     metadata,
                     embedding_model
-                ) VALUES (
-                    %s, %s::vector, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                )
+                ) VALUES %s
                 ON CONFLICT (recording_id) DO UPDATE SET
                     embedding = EXCLUDED.embedding,
                     transcript_text = EXCLUDED.transcript_text,
                     customer_name = EXCLUDED.customer_name,
                     employee_name = EXCLUDED.employee_name,
                     metadata = EXCLUDED.metadata,
+                    embedding_model = EXCLUDED.embedding_model,
                     updated_at = NOW()
-            """, (
-                recording_id,
-                embedding_str,
-                metadata.get('transcript_text', ''),
-                metadata.get('customer_name'),
-                metadata.get('employee_name'),
-                metadata.get('call_date'),
-                metadata.get('duration_seconds'),
-                metadata.get('word_count'),
-                metadata.get('customer_sentiment'),
-                metadata.get('call_quality_score'),
-                metadata.get('customer_satisfaction_score'),
-                metadata.get('call_type'),
-                metadata.get('issue_category'),
-                metadata.get('summary'),
-                metadata.get('key_topics', []),
-                Json(metadata.get('additional_metadata', {})),
-                self.embedding_model
-            ))
+            """, rows,
+                template="(%s, %s::vector, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+                page_size=100)
 
             conn.commit()
-            return True
+            return len(rows)
 
         except Exception as e:
-            logger.error(f"Error storing embedding for {recording_id}: {e}")
+            logger.error(f"Error storing {len(items)} embeddings: {e}")
             conn.rollback()
-            return False
+            return 0
         finally:
             cursor.close()
             conn.close()
 
+    def _build_embedding_texts(self, record: Dict[str, Any]) -> List[str]:
+        """Texts to embed for a transcript (one, or overlapping chunks to average)."""
+        # Create enhanced text for embedding (includes metadata for better search)
+        enhanced_text = f"""
+            Customer: {record.get('customer_name', 'Unknown')}
+            Employee: {record.get('employee_name', 'Unknown')}
+            Date: {record.get('call_date', '')}
+            Sentiment: {record.get('customer_sentiment', '')}
+            Call Type: {record.get('call_type', '')}
+            Issue: {record.get('issue_category', '')}
+            Summary: {record.get('summary', '')}
+
+            Transcript:
+            {record.get('transcript_text', '')}
+            """
+
+        # Check if text exceeds token limit and chunk if necessary
+        if len(enhanced_text) <= 1028:
+            return [enhanced_text]
+
+        # Get metadata part and transcript part
+        metadata_part = enhanced_text.split("Transcript:")[0] + "Transcript:\n"
+        transcript_part = record.get('transcript_text', '')
+        max_transcript_length = 1028 - len(metadata_part)
+
+        if max_transcript_length <= 128:  # Not enough space for meaningful chunks
+            # Fallback to truncation
+            return [enhanced_text[:1028]]
+
+        # Create overlapping chunks with 100+ character overlap
+        chunks = self._create_overlapping_chunks(transcript_part, max_transcript_length, overlap=128)
+        return [metadata_part + chunk for chunk in chunks]
+
     def process_transcript(self, recording_id: str) -> bool:
         """Process a transcript and generate embedding with metadata"""
+        return self.process_transcripts([recording_id])['processed'] == 1
+
+    def process_transcripts(self, recording_ids: List[str],
+                            concurrency: int = None) -> Dict[str, int]:
+        """
+        Generate and store embeddings for many transcripts.
+
+        Chunks from all transcripts go through one generate_embeddings()
+        call, so they share requests and the content-hash cache.
+
+        Returns:
+            dict with 'processed' and 'failed' counts
+        """
+        stats = {'processed': 0, 'failed': 0}
+        if not recording_ids:
+            return stats
+
         conn = self.get_connection()
         cursor = conn.cursor()
 
         try:
-            # Get transcript and metadata
+            # Get transcripts and metadata
             cursor.execute("""
                 SELECT
                     t.recording_id,
@@ -223,68 +463,42 @@ class EmbeddingsManager:
                     i.key_topics
                 FROM transcripts t
                 LEFT JOIN insights i ON t.recording_id = i.recording_id
-                WHERE t.recording_id = %s
-            """, (recording_id,))
+                WHERE t.recording_id = ANY(%s)
+            """, (list(recording_ids),))
+            records = {row['recording_id']: row for row in cursor.fetchall()}
+        except Exception as e:
+            logger.error(f"Error loading transcripts: {e}")
+            stats['failed'] = len(recording_ids)
+            return stats
+        finally:
+            cursor.close()
+            conn.close()
 
-            record = cursor.fetchone()
-            if not record:
+        for recording_id in recording_ids:
+            if recording_id not in records:
                 logger.warning(f"No transcript found for {recording_id}")
-                return False
+                stats['failed'] += 1
 
-            # Create enhanced text for embedding (includes metadata for better search)
-            enhanced_text = f"""
-            Customer: {record.get('customer_name', 'Unknown')}
-            Employee: {record.get('employee_name', 'Unknown')}
-            Date: {record.get('call_date', '')}
-            Sentiment: {record.get('customer_sentiment', '')}
-            Call Type: {record.get('call_type', '')}
-            Issue: {record.get('issue_category', '')}
-            Summary: {record.get('summary', '')}
-
-            Transcript:
-            {record.get('transcript_text', '')}
-            """
+        texts_by_recording = {
+            recording_id: self._build_embedding_texts(record)
+            for recording_id, record in records.items()
+        }
+        all_texts = [text for texts in texts_by_recording.values() for text in texts]
+        all_embeddings = iter(self.generate_embeddings(all_texts, concurrency=concurrency))
 
-            # Check if text exceeds token limit and chunk if necessary
-            if len(enhanced_text) > 1028:
-                logger.info(f"Text too long ({len(enhanced_text)} chars), creating overlapping chunks")
-
-                # Get metadata part and transcript part
-                metadata_part = enhanced_text.split("Transcript:")[0] + "Transcript:\n"
-                transcript_part = record.get('transcript_text', '')
-                max_transcript_length = 1028 - len(metadata_part)
-
-                if max_transcript_length <= 128:  # Not enough space for meaningful chunks
-                    # Fallback to truncation
-                    enhanced_text = enhanced_text[:1028]
-                    embedding = self.generate_embedding(enhanced_text)
-                else:
-                    # Create overlapping chunks with 100+ character overlap
-                    chunks = self._create_overlapping_chunks(transcript_part, max_transcript_length, overlap=128)
-                    embeddings = []
-
-                    for i, chunk in enumerate(chunks):
-                        chunk_text = metadata_part + chunk
-                        embedding = self.generate_embedding(chunk_text)
-                        if embedding:
-                            embeddings.append(embedding)
-                            logger.info(f"Generated embedding for chunk {i+1}/{len(chunks)}")
-
-                    if embeddings:
-                        # Average all embeddings to create a single representative embedding
-                        embedding = [sum(vals) / len(vals) for vals in zip(*embeddings)]
-                        logger.info(f"Created averaged embedding from {len(embeddings)} chunks")
-                    else:
-                        embedding = None
-            else:
-                # Generate embedding for normal-sized text
-                embedding = self.generate_embedding(enhanced_text)
-            if not embedding:
+        items = []
+        for recording_id, texts in texts_by_recording.items():
+            embeddings = [e for e in (next(all_embeddings) for _ in texts) if e]
+            if not embeddings:
                 logger.error(f"Failed to generate embedding for {recording_id}")
-                return False
+                stats['failed'] += 1
+                continue
 
-            # Store embedding with metadata
-            metadata = {
+            # Average all embeddings to create a single representative embedding
+            embedding = [sum(vals) / len(vals) for vals in zip(*embeddings)]
+
+            record = records[recording_id]
+            items.append((recording_id, embedding, {
                 'transcript_text': record.get('transcript_text'),
                 'customer_name': record.get('customer_name'),
                 'employee_name': record.get('employee_name'),
@@ -298,20 +512,21 @@ class EmbeddingsManager:
                 'issue_category': record.get('issue_category'),
                 'summary': record.get('summary'),
                 'key_topics': record.get('key_topics', [])
-            }
-
-            return self.store_transcript_embedding(recording_id, embedding, metadata)
+            }))
 
-        except Exception as e:
-            logger.error(f"Error processing transcript {recording_id}: {e}")
-            return False
-        finally:
-            cursor.close()
-            conn.close()
+        stored = self.store_transcript_embeddings(items)
+        stats['processed'] += stored
+        stats['failed'] += len(items) - stored
+        return stats
 
     def semantic_search(self, query: str, filters: Dict[str, Any] = None,
                        limit: int = 10) -> List[Dict[str, Any]]:
-        """Perform semantic search with optional filters"""
+        """
+        Perform semantic search with optional filters
+
+        Selective filters are searched exactly over the matching rows,
+        broad ones through the ANN index (see vector_index).
+        """
 
         # Generate query embedding
         query_embedding = self.generate_embedding(query)
@@ -323,74 +538,54 @@ class EmbeddingsManager:
         cursor = conn.cursor()
 
         try:
-            embedding_str = '[' + ','.join(map(str, query_embedding)) + ']'
-
-            # Build filter conditions
+            # Only compare vectors from this provider's model. Nearly every
+            # row matches, so it is kept out of the selectivity estimate.
+            scope_conditions = ["COALESCE(embedding_model, 'openai/text-embedding-ada-002') = ANY(%(models)s)"]
             filter_conditions = []
-            params = [embedding_str]
+            params = {'models': list(self.provider.storage_models)}
 
             if filters:
                 if filters.get('employee'):
-                    filter_conditions.append("employee_name ILIKE %s")
-                    params.append(f"%{filters['employee']}%")
+                    filter_conditions.append("employee_name ILIKE %(employee)s")
+                    params['employee'] = f"%{filters['employee']}%"
 
                 if filters.get('customer'):
-                    filter_conditions.append("customer_name ILIKE %s")
-                    params.append(f"%{filters['customer']}%")
+                    filter_conditions.append("customer_name ILIKE %(customer)s")
+                    params['customer'] = f"%{filters['customer']}%"
 
                 if filters.get('sentiment'):
-                    filter_conditions.append("customer_sentiment = %s")
-                    params.append(filters['sentiment'])
+                    filter_conditions.append("customer_sentiment = %(sentiment)s")
+                    params['sentiment'] = filters['sentiment']
 
                 if filters.get('date_from'):
-                    filter_conditions.append("call_date >= %s")
-                    params.append(filters['date_from'])
+                    filter_conditions.append("call_date >= %(date_from)s")
+                    params['date_from'] = filters['date_from']
 
                 if filters.get('date_to'):
-                    filter_conditions.append("call_date <= %s")
-                    params.append(filters['date_to'])
+                    filter_conditions.append("call_date <= %(date_to)s")
+                    params['date_to'] = filters['date_to']
 
                 if filters.get('min_quality'):
-                    filter_conditions.append("call_quality_score >= %s")
-                    params.append(filters['min_quality'])
-
-            where_clause = ""
-            if filter_conditions:
-                where_clause = "WHERE " + " AND ".join(filter_conditions)
-
-            params.append(limit)
-
-            query = f"""
-                SELECT
-                    recording_id,
-                    1 - (embedding <=> %s::vector) as similarity,
-                    customer_name,
-                    employee_name,
-                    call_date,
-                    customer_sentiment,
-                    call_quality_score,
-                    customer_satisfaction_score,
-                    summary,
-                    call_type,
-                    issue_category,
-                    key_topics,
-                    duration_seconds,
-                    word_count,
-                    transcript_text,
-                    metadata
-                FROM transcript_embeddings
-                {where_clause}
-                ORDER BY embedding <=> %s::vector
-                LIMIT %s
-            """
-
-            # Add embedding parameter again for ORDER BY
-            params.insert(len(params)-1, embedding_str)
-
-            cursor.execute(query, params)
-            results = cursor.fetchall()
-
-            return [dict(row) for row in results]
+                    filter_conditions.append("call_quality_score >= %(min_quality)s")
+                    params['min_quality'] = filters['min_quality']
+
+            results, plan = nearest_neighbors(
+                cursor,
+                'transcript_embeddings',
+                'embedding',
+                self.SEARCH_COLUMNS,
+                self.to_storage_vector(query_embedding),
+                limit,
+                conditions=filter_conditions,
+                params=params,
+                scope_conditions=scope_conditions
+            )
+            logger.info(f"Semantic search: {len(results)} results via {plan['strategy']} "
+                        f"(~{plan['estimated_rows']:.0f} of {plan['total_rows']:.0f} rows)")
+
+            for row in results:
+                row.pop('distance', None)
+            return results
 
         except Exception as e:
             logger.error(f"Semantic search error: {e}")
@@ -399,6 +594,33 @@ class EmbeddingsManager:
             cursor.close()
             conn.close()
 
+    def ensure_vector_index(self, method: str = None, rebuild: bool = False,
+                            lists: int = None) -> Dict[str, Any]:
+        """
+        Create or rebuild the ANN index on transcript_embeddings.embedding
+
+        Args:
+            method: 'hnsw' or 'ivfflat' (default VECTOR_INDEX_METHOD)
+            rebuild: Rebuild an existing index of the same method
+            lists: IVFFlat lists (default sized from the row count)
+        """
+        conn = self.get_connection()
+        try:
+            return build_vector_index(conn, 'transcript_embeddings', 'embedding',
+                                      method=method, rebuild=rebuild, lists=lists)
+        finally:
+            conn.close()
+
+    def get_vector_index_status(self) -> Dict[str, Any]:
+        """Current ANN index, row estimate and pgvector version"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        try:
+            return get_search_context(cursor, 'transcript_embeddings', 'embedding', refresh=True)
+        finally:
+            cursor.close()
+            conn.close()
+
     def process_all_transcripts(self, batch_size: int = 10) -> Dict[str, int]:
         """Process all transcripts and generate embeddings"""
         conn = self.get_connection()
@@ -418,18 +640,13 @@ class EmbeddingsManager:
                 LIMIT %s
             """, (batch_size,))
 
-            recordings = cursor.fetchall()
-
-            for record in recordings:
-                recording_id = record['recording_id']
-                print(f"Processing {recording_id}...")
+            recording_ids = [record['recording_id'] for record in cursor.fetchall()]
+            print(f"Processing {len(recording_ids)} transcripts...")
 
-                if self.process_transcript(recording_id):
-                    stats['processed'] += 1
-                    print(f"  ✅ Processed {recording_id}")
-                else:
-                    stats['failed'] += 1
-                    print(f"  ❌ Failed {recording_id}")
+            batch_stats = self.process_transcripts(recording_ids)
+            stats['processed'] += batch_stats['processed']
+            stats['failed'] += batch_stats['failed']
+            print(f"  ✅ Processed {batch_stats['processed']}, ❌ failed {batch_stats['failed']}")
 
             # Count existing embeddings
             cursor.execute("SELECT COUNT(*) as count FROM transcript_embeddings")
@@ -445,12 +662,20 @@ class EmbeddingsManager:
             cursor.close()
             conn.close()
 
-# Singleton instance
-_embeddings_manager = None
+# Singleton instances, one per provider
+_embeddings_managers: Dict[str, EmbeddingsManager] = {}
+_embeddings_managers_lock = threading.Lock()
+
+
+def get_embeddings_manager(provider: str = None) -> EmbeddingsManager:
+    """
+    Get or create the embeddings manager for a provider
 
-def get_embeddings_manager():
-    """Get or create embeddings manager instance"""
-    global _embeddings_manager
-    if _embeddings_manager is None:
-        _embeddings_manager = EmbeddingsManager()
-    return _embeddings_manager
\ No newline at end of file
+    Args:
+        provider: 'openai', 'local' or 'hash' (default: EMBEDDING_PROVIDER)
+    """
+    embedding_provider = get_embedding_provider(provider)
+    with _embeddings_managers_lock:
+        if embedding_provider.name not in _embeddings_managers:
+            _embeddings_managers[embedding_provider.name] = EmbeddingsManager(embedding_provider)
+        return _embeddings_managers[embedding_provider.name]
@@ -6,8 +6,11 @@ Comprehensive AI analysis for support and sales calls with customer/phone/person
 
 import json
 import re
+import time
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, List, Optional, Any, Tuple
 from datetime import datetime
 from openai import OpenAI
 import os
@@ -19,6 +22,21 @@ from config.task_optimized_llm_config import TaskOptimizedLLMConfig
 
 logger = logging.getLogger(__name__)
 
+# Analyses of one call run concurrently; each gets INSIGHTS_TASK_TIMEOUT
+# seconds from its start before its default result is used instead
+INSIGHTS_MAX_WORKERS = int(os.getenv('INSIGHTS_MAX_WORKERS', '8'))
+INSIGHTS_TASK_TIMEOUT = float(os.getenv('INSIGHTS_TASK_TIMEOUT', '90'))
+
+# Call types (from classify_call_type) that need the support / sales deep
+# dives; 'other' and failed classifications get both
+SUPPORT_CALL_TYPES = {
+    'support_technical', 'support_billing', 'support_feature_request',
+    'account_management', 'onboarding', 'training', 'escalation'
+}
+SALES_CALL_TYPES = {
+    'sales_discovery', 'sales_demo', 'sales_negotiation', 'account_management'
+}
+
 
 class EnhancedCallAnalyzer:
     """
@@ -30,6 +48,11 @@ class EnhancedCallAnalyzer:
         """Initialize with task-optimized LLM configuration"""
         self.api_key = api_key or os.getenv('OPENROUTER_API_KEY')
         self.task_config = TaskOptimizedLLMConfig()
+        self._clients: Dict[str, OpenAI] = {}
+        self._clients_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=INSIGHTS_MAX_WORKERS, thread_name_prefix="insights"
+        )
 
         logger.info(f"EnhancedCallAnalyzer initialized with task-optimized LLMs")
         logger.info(f"Available tasks: {list(self.task_config.TASK_MODELS.keys())}")
@@ -82,12 +105,18 @@ class EnhancedCallAnalyzer:
             return fallback_data
 
     def _get_client_for_task(self, task: str) -> OpenAI:
-        """Get OpenAI client configured for specific task"""
-        client_config = self.task_config.get_client_config_for_task(task)
-        if self.api_key:
-            client_config['api_key'] = self.api_key
-
-        return OpenAI(**client_config)
+        """Get OpenAI client configured for specific task (reused across calls)"""
+        with self._clients_lock:
+            client = self._clients.get(task)
+            if client is None:
+                client_config = self.task_config.get_client_config_for_task(task)
+                if self.api_key:
+                    client_config['api_key'] = self.api_key
+                # Requests end by themselves once their analysis has timed out
+                client_config['timeout'] = INSIGHTS_TASK_TIMEOUT
+                client = OpenAI(**client_config)
+                self._clients[task] = client
+        return client
 
     def __init_prompts__(self):
         """Initialize enhanced prompts for deeper analysis"""
@@ -328,13 +357,6 @@ class EnhancedCallAnalyzer:
     def extract_contact_information(self, transcript: str, metadata: Dict) -> Dict[str, Any]:
         """Extract comprehensive contact information using Claude Haiku (optimized for extraction)"""
 
-        # Extract using regex patterns
-        phone_pattern = r'(\d{3}[-.]?\d{3}[-.]?\d{4}|\(\d{3}\)\s?\d{3}[-.]?\d{4})'
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-
-        phones = list(set(re.findall(phone_pattern, transcript)))
-        emails = list(set(re.findall(email_pattern, transcript)))
-
         # Extract names using Claude Haiku (optimized for customer extraction)
         name_prompt = f"""
         Extract all person names mentioned in this call transcript.
@@ -379,11 +401,21 @@ class EnhancedCallAnalyzer:
             name_analysis.get("participants", []), transcript, metadata
         )
 
+        contact_info = self._basic_contact_information(transcript, metadata)
+        contact_info["participants"] = validated_participants
+        contact_info["mentioned_contacts"] = name_analysis.get("mentioned_contacts", [])
+        return contact_info
+
+    def _basic_contact_information(self, transcript: str, metadata: Dict) -> Dict[str, Any]:
+        """Regex / metadata part of the contact information (no LLM calls)"""
+        phone_pattern = r'(\d{3}[-.]?\d{3}[-.]?\d{4}|\(\d{3}\)\s?\d{3}[-.]?\d{4})'
+        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+
         return {
-            "phone_numbers": phones,
-            "email_addresses": emails,
-            "participants": validated_participants,
-            "mentioned_contacts": name_analysis.get("mentioned_contacts", []),
+            "phone_numbers": list(set(re.findall(phone_pattern, transcript))),
+            "email_addresses": list(set(re.findall(email_pattern, transcript))),
+            "participants": [],
+            "mentioned_contacts": [],
             "recording_metadata": {
                 "from_number": metadata.get("call_metadata", {}).get("from", {}).get("number"),
                 "to_number": metadata.get("call_metadata", {}).get("to", {}).get("number"),
@@ -729,21 +761,19 @@ class EnhancedCallAnalyzer:
                 messages=[{"role": "user", "content": classification_prompt}],
                 temperature=0.1
             )
-            fallback_classification = {
-                "call_type": "other",
-                "call_purpose": ["general_inquiry"],
-                "urgency_level": "medium",
-                "outcome_status": "pending"
-            }
-            return self._safe_json_parse(response.choices[0].message.content, fallback_classification)
+            return self._safe_json_parse(response.choices[0].message.content, self._fallback_classification())
         except Exception as e:
             logger.error(f"Call classification failed: {e}")
-            return {
-                "call_type": "other",
-                "call_purpose": ["general_inquiry"],
-                "urgency_level": "medium",
-                "outcome_status": "pending"
-            }
+            return self._fallback_classification()
+
+    def _fallback_classification(self) -> Dict[str, Any]:
+        """Classification used when the call could not be classified"""
+        return {
+            "call_type": "other",
+            "call_purpose": ["general_inquiry"],
+            "urgency_level": "medium",
+            "outcome_status": "pending"
+        }
 
     def generate_comprehensive_insights(self, transcript_data: Dict[str, Any]) -> Dict[str, Any]:
         """Generate comprehensive insights combining all analysis types"""
@@ -757,29 +787,23 @@ class EnhancedCallAnalyzer:
 
         logger.info("🧠 Generating comprehensive call insights (v3.0 - Enhanced for RAG)...")
 
-        # Extract contact information
-        contact_info = self.extract_contact_information(transcript, metadata)
-
-        # Classify call
-        call_classification = self.classify_call_type(transcript)
-
-        # Generate analyses
-        customer_profile = self.analyze_customer_profile(transcript)
-        support_analysis = self.analyze_support_call(transcript)
-        sales_analysis = self.analyze_sales_call(transcript)
-        relationship_analysis = self.analyze_relationship_dynamics(transcript)
-
-        # NEW: Enhanced metrics for Vertex AI RAG
-        logger.info("📊 Extracting enhanced RAG metadata...")
-        rag_metadata = self.extract_rag_metadata(transcript)
-        conversation_quality = self.analyze_conversation_quality(transcript, segments)
-        sales_signals = self.detect_sales_signals(transcript)
+        results, analysis_status = self._run_analyses(transcript, segments, metadata)
+        contact_info = results["contact_information"]
+        call_classification = results["call_classification"]
+        customer_profile = results["customer_profile"]
+        support_analysis = results["support_analysis"]
+        sales_analysis = results["sales_analysis"]
+        relationship_analysis = results["relationship_analysis"]
+        rag_metadata = results["rag_metadata"]
+        conversation_quality = results["conversation_quality"]
+        sales_signals = results["sales_signals"]
 
         # Combine all insights
         comprehensive_insights = {
             "recording_id": transcript_data.get("recording_id"),
             "analysis_timestamp": datetime.now().isoformat(),
             "analysis_version": "3.0",  # Updated version
+            "analysis_status": analysis_status,
 
             # Contact and identification
             "contact_information": contact_info,
@@ -823,9 +847,127 @@ class EnhancedCallAnalyzer:
             }
         }
 
-        logger.info("✅ Comprehensive insights generated successfully (v3.0)")
+        if analysis_status["partial"]:
+            logger.warning(f"⚠️ Partial insights: timed out {analysis_status['timed_out']}, "
+                           f"failed {analysis_status['failed']}")
+        else:
+            logger.info(f"✅ Comprehensive insights generated successfully (v3.0) "
+                        f"in {analysis_status['elapsed_seconds']}s")
         return comprehensive_insights
 
+    def _analysis_tasks(self, transcript: str, segments: List,
+                        metadata: Dict) -> Dict[str, Tuple[Callable[[], Dict], Callable[[], Dict]]]:
+        """Analyses of one call as name -> (run, default result)"""
+        rag_default = {"key_quotes": [], "qa_pairs": [], "searchable_tags": [], "semantic_themes": []}
+        return {
+            "contact_information": (
+                lambda: self.extract_contact_information(transcript, metadata),
+                lambda: self._basic_contact_information(transcript, metadata)),
+            "call_classification": (
+                lambda: self.classify_call_type(transcript), self._fallback_classification),
+            "customer_profile": (lambda: self.analyze_customer_profile(transcript), dict),
+            "support_analysis": (lambda: self.analyze_support_call(transcript), dict),
+            "sales_analysis": (lambda: self.analyze_sales_call(transcript), dict),
+            "relationship_analysis": (lambda: self.analyze_relationship_dynamics(transcript), dict),
+            "rag_metadata": (lambda: self.extract_rag_metadata(transcript), lambda: dict(rag_default)),
+            "conversation_quality": (lambda: self.analyze_conversation_quality(transcript, segments), dict),
+            "sales_signals": (lambda: self.detect_sales_signals(transcript), dict),
+        }
+
+    def _gated_analyses(self, classification: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+        """Support / sales analyses the classified call type needs: (run, skip)"""
+        call_type = str(classification.get("call_type", "other")).lower()
+        if call_type not in SUPPORT_CALL_TYPES | SALES_CALL_TYPES:
+            return ["support_analysis", "sales_analysis"], []
+
+        run, skip = [], []
+        for name, call_types in (("support_analysis", SUPPORT_CALL_TYPES),
+                                 ("sales_analysis", SALES_CALL_TYPES)):
+            (run if call_type in call_types else skip).append(name)
+        return run, skip
+
+    def _run_analyses(self, transcript: str, segments: List,
+                      metadata: Dict) -> Tuple[Dict[str, Dict], Dict[str, Any]]:
+        """
+        Run the analyses of one call as a small dependency graph.
+
+        Everything except the support / sales deep dives starts at once;
+        those two start when classification finishes, and only if the call
+        type needs them. An analysis that raises, or is still running
+        INSIGHTS_TASK_TIMEOUT seconds after it started, gets its default
+        result and the call's insights are marked partial.
+
+        Returns:
+            (results by analysis name, analysis status)
+        """
+        tasks = self._analysis_tasks(transcript, segments, metadata)
+        gated = {"support_analysis", "sales_analysis"}
+        started_at = time.monotonic()
+
+        results: Dict[str, Dict] = {}
+        status = {"completed": [], "skipped": [], "timed_out": [], "failed": []}
+        pending = {}  # future -> (name, {"at": monotonic start time once running})
+
+        def submit(name):
+            # Stamp the start in the worker: time queued behind other calls'
+            # analyses on the shared executor doesn't count against the timeout
+            started = {}
+
+            def run():
+                started["at"] = time.monotonic()
+                return tasks[name][0]()
+
+            pending[self._executor.submit(run)] = (name, started)
+
+        def deadline(started):
+            # A task that hasn't started yet can't expire before a full timeout from now
+            return started.get("at", time.monotonic()) + INSIGHTS_TASK_TIMEOUT
+
+        def gate(classification):
+            run, skip = self._gated_analyses(classification)
+            for name in run:
+                submit(name)
+            for name in skip:
+                results[name] = tasks[name][1]()
+                status["skipped"].append(name)
+
+        for name in tasks:
+            if name not in gated:
+                submit(name)
+
+        while pending:
+            next_deadline = min(deadline(started) for _, started in pending.values())
+            done, _ = wait(list(pending), timeout=max(0.0, next_deadline - time.monotonic()),
+                           return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name, _ = pending.pop(future)
+                try:
+                    results[name] = future.result()
+                    status["completed"].append(name)
+                except Exception as e:
+                    logger.error(f"{name} failed: {e}")
+                    results[name] = tasks[name][1]()
+                    status["failed"].append(name)
+                if name == "call_classification":
+                    gate(results[name])
+
+            now = time.monotonic()
+            for future, (name, started) in list(pending.items()):
+                if "at" in started and now >= deadline(started):
+                    # The request itself is bounded by the client timeout
+                    future.cancel()
+                    del pending[future]
+                    logger.warning(f"{name} timed out after {INSIGHTS_TASK_TIMEOUT:g}s")
+                    results[name] = tasks[name][1]()
+                    status["timed_out"].append(name)
+                    if name == "call_classification":
+                        gate(results[name])
+
+        status["partial"] = bool(status["timed_out"] or status["failed"])
+        status["elapsed_seconds"] = round(time.monotonic() - started_at, 2)
+        return results, status
+
     def _extract_key_metrics(self, classification: Dict, customer: Dict,
                            support: Dict, sales: Dict, relationship: Dict,
                            sales_signals: Dict = None, conversation_quality: Dict = None) -> Dict[str, Any]:
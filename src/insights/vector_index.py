@@ -0,0 +1,421 @@
+"""
+Vector Index Management
+ANN indexes and filtered nearest-neighbour search over pgvector columns
+
+transcript_embeddings was set up with a single IVFFlat index (lists = 100,
+built before the table had data) and searched with ORDER BY embedding <=> q
+behind arbitrary ILIKE/date filters. This module:
+
+- creates or rebuilds an HNSW or IVFFlat index, with IVFFlat lists sized
+  from the row count, without blocking searches (CREATE INDEX CONCURRENTLY)
+- tunes hnsw.ef_search / ivfflat.probes per query (transaction-local)
+- picks a strategy from the planner's estimate of how many rows the
+  filters keep:
+    prefilter   exact distance over the filtered rows (btree/bitmap scans
+                on the filter columns, no ANN index), for selective filters
+    postfilter  ANN index scan with the filters applied to its candidates,
+                with ef_search / probes widened by 1 / selectivity and
+                pgvector 0.8 iterative scans when available
+    ann         plain ANN index scan when there are no filters
+- binds the query vector once, as one parameter of a MATERIALIZED CTE
+
+Usage:
+    python -m src.insights.vector_index --status
+    python -m src.insights.vector_index --method hnsw [--rebuild]
+"""
+
+import os
+import json
+import math
+import time
+import threading
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+VECTOR_INDEX_METHOD = os.getenv('VECTOR_INDEX_METHOD', 'hnsw').lower()  # hnsw or ivfflat
+# HNSW build / search parameters (pgvector defaults)
+VECTOR_HNSW_M = int(os.getenv('VECTOR_HNSW_M', '16'))
+VECTOR_HNSW_EF_CONSTRUCTION = int(os.getenv('VECTOR_HNSW_EF_CONSTRUCTION', '64'))
+VECTOR_HNSW_EF_SEARCH = int(os.getenv('VECTOR_HNSW_EF_SEARCH', '40'))
+# IVFFlat lists probed per query (lists are sized at build time)
+VECTOR_IVFFLAT_PROBES = int(os.getenv('VECTOR_IVFFLAT_PROBES', '10'))
+# Memory for index builds; HNSW builds are much faster when the graph fits
+VECTOR_INDEX_BUILD_MEMORY = os.getenv('VECTOR_INDEX_BUILD_MEMORY', '1GB')
+
+# Filters keeping at most this many rows, or this share of the table,
+# are searched exactly instead of through the ANN index
+VECTOR_PREFILTER_MAX_ROWS = int(os.getenv('VECTOR_PREFILTER_MAX_ROWS', '20000'))
+VECTOR_PREFILTER_SELECTIVITY = float(os.getenv('VECTOR_PREFILTER_SELECTIVITY', '0.05'))
+
+# How long index / row-count lookups are reused between searches
+VECTOR_INDEX_INFO_TTL = float(os.getenv('VECTOR_INDEX_INFO_TTL', '300'))
+
+INDEX_METHODS = ('hnsw', 'ivfflat')
+HNSW_MAX_EF_SEARCH = 1000
+
+_index_info: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
+_index_info_lock = threading.Lock()
+
+
+def format_vector(embedding: Sequence[float], dimensions: int = None) -> str:
+    """
+    pgvector text form of an embedding, optionally zero-padded.
+
+    pgvector stores float4, and '%.9g' round-trips every float4 exactly
+    while being about half the size of repr() of a Python float.
+    """
+    values = list(embedding)
+    if dimensions is not None:
+        if len(values) > dimensions:
+            raise ValueError(f"{len(values)}-dim embedding exceeds vector({dimensions})")
+        values += [0.0] * (dimensions - len(values))
+    return '[' + ','.join('%.9g' % v for v in values) + ']'
+
+
+def ivfflat_lists(rows: float) -> int:
+    """pgvector's guidance: rows / 1000 up to 1M rows, sqrt(rows) beyond."""
+    if rows <= 1_000_000:
+        return max(10, int(rows // 1000))
+    return int(math.sqrt(rows))
+
+
+def _fetch_value(cursor, key: str):
+    """First column of the next row for both tuple and RealDictCursor cursors."""
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    return row[key] if isinstance(row, dict) else row[0]
+
+
+def get_pgvector_version(cursor) -> Tuple[int, ...]:
+    """Installed pgvector version, (0,) if the extension is missing."""
+    cursor.execute("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+    version = _fetch_value(cursor, 'extversion')
+    if not version:
+        return (0,)
+    return tuple(int(part) for part in version.split('.') if part.isdigit())
+
+
+def estimate_table_rows(cursor, table: str) -> float:
+    """Row count from pg_class statistics, counted if the table was never analyzed."""
+    cursor.execute("SELECT reltuples FROM pg_class WHERE oid = to_regclass(%s)", (table,))
+    rows = _fetch_value(cursor, 'reltuples')
+    if rows is None or rows < 0:
+        cursor.execute(f"SELECT COUNT(*) AS count FROM {table}")
+        rows = _fetch_value(cursor, 'count')
+    return float(rows or 0)
+
+
+def estimate_filtered_rows(cursor, table: str, conditions: List[str], params: Dict[str, Any]) -> float:
+    """Planner estimate of the rows matching `conditions` (no rows are read)."""
+    where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
+    cursor.execute(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM {table} {where_clause}", params)
+    plan = _fetch_value(cursor, 'QUERY PLAN')
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return float(plan[0]['Plan']['Plan Rows'])
+
+
+def list_vector_indexes(cursor, table: str, column: str) -> List[Dict[str, Any]]:
+    """
+    HNSW / IVFFlat indexes on table.column, valid ones first.
+
+    Returns:
+        [{'name', 'method', 'options', 'valid', 'definition'}, ...]
+    """
+    cursor.execute("""
+        SELECT
+            i.relname AS name,
+            am.amname AS method,
+            i.reloptions AS options,
+            x.indisvalid AS valid,
+            pg_get_indexdef(i.oid) AS definition
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        JOIN pg_am am ON am.oid = i.relam
+        JOIN pg_attribute a ON a.attrelid = x.indrelid AND a.attnum = x.indkey[0]
+        WHERE x.indrelid = to_regclass(%s)
+            AND a.attname = %s
+            AND am.amname IN ('hnsw', 'ivfflat')
+        ORDER BY x.indisvalid DESC, i.relname
+    """, (table, column))
+
+    indexes = []
+    for row in cursor.fetchall():
+        if not isinstance(row, dict):
+            row = dict(zip(('name', 'method', 'options', 'valid', 'definition'), row))
+        index = dict(row)
+        options = {}
+        for option in index['options'] or []:
+            key, _, value = option.partition('=')
+            options[key] = int(value) if value.isdigit() else value
+        index['options'] = options
+        indexes.append(index)
+    return indexes
+
+
+def get_vector_index(cursor, table: str, column: str) -> Optional[Dict[str, Any]]:
+    """The ANN index on table.column (see list_vector_indexes), or None."""
+    indexes = list_vector_indexes(cursor, table, column)
+    return indexes[0] if indexes else None
+
+
+def get_search_context(cursor, table: str, column: str, refresh: bool = False) -> Dict[str, Any]:
+    """Index, row count and pgvector version for a table, cached for VECTOR_INDEX_INFO_TTL."""
+    key = (table, column)
+    now = time.monotonic()
+    with _index_info_lock:
+        cached = _index_info.get(key)
+    if cached and not refresh and now - cached[0] < VECTOR_INDEX_INFO_TTL:
+        return cached[1]
+
+    index = get_vector_index(cursor, table, column)
+    context = {
+        'index': index if index and index['valid'] else None,
+        'rows': estimate_table_rows(cursor, table),
+        'pgvector_version': get_pgvector_version(cursor),
+    }
+    with _index_info_lock:
+        _index_info[key] = (now, context)
+    return context
+
+
+def choose_strategy(total_rows: float, filtered_rows: float, has_filters: bool,
+                    has_index: bool = True) -> str:
+    """
+    Pick 'prefilter', 'postfilter' or 'ann' for a filtered top-k search.
+
+    Exact distance over a small candidate set is both faster and exact;
+    once the filters keep a large share of the table an ANN scan that
+    discards non-matching candidates wins.
+    """
+    if not has_index or filtered_rows <= VECTOR_PREFILTER_MAX_ROWS:
+        return 'prefilter'
+    if not has_filters:
+        return 'ann'
+    if total_rows and filtered_rows / total_rows <= VECTOR_PREFILTER_SELECTIVITY:
+        return 'prefilter'
+    return 'postfilter'
+
+
+def apply_search_settings(cursor, strategy: str, index: Optional[Dict[str, Any]], limit: int,
+                          selectivity: float = 1.0, pgvector_version: Tuple[int, ...] = (0,),
+                          ef_search: int = None, probes: int = None) -> Dict[str, Any]:
+    """
+    Set transaction-local planner / index parameters for one search.
+
+    Post-filtering throws away (1 - selectivity) of the index candidates,
+    so ef_search / probes are widened by 1 / selectivity to keep roughly
+    `limit` matches. Must run inside the search's transaction.
+
+    Returns:
+        The settings applied
+    """
+    settings = {}
+    if strategy == 'prefilter':
+        # Vector indexes only support plain index scans; bitmap scans on
+        # the filter columns stay available
+        settings['enable_indexscan'] = 'off'
+    elif index:
+        widen = 1.0 / max(selectivity, 1e-6)
+        iterative = strategy == 'postfilter' and pgvector_version >= (0, 8)
+        if index['method'] == 'hnsw':
+            base = max(ef_search or VECTOR_HNSW_EF_SEARCH, limit)
+            settings['hnsw.ef_search'] = str(min(HNSW_MAX_EF_SEARCH, math.ceil(base * widen)))
+            if iterative:
+                settings['hnsw.iterative_scan'] = 'relaxed_order'
+        else:
+            lists = index['options'].get('lists', 100)
+            base = probes or VECTOR_IVFFLAT_PROBES
+            settings['ivfflat.probes'] = str(min(lists, math.ceil(base * widen)))
+            if iterative:
+                settings['ivfflat.iterative_scan'] = 'relaxed_order'
+
+    for name, value in settings.items():
+        cursor.execute("SELECT set_config(%s, %s, true)", (name, value))
+    return settings
+
+
+def nearest_neighbors(cursor, table: str, column: str, columns: List[str], query_vector: str,
+                      limit: int, conditions: List[str] = None, params: Dict[str, Any] = None,
+                      scope_conditions: List[str] = None, ef_search: int = None,
+                      probes: int = None, strategy: str = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Top-`limit` rows of `table` by cosine distance to `query_vector`.
+
+    Args:
+        cursor: Cursor inside an open transaction (settings are SET LOCAL)
+        table, column: Table and vector column (trusted identifiers)
+        columns: Output columns (trusted identifiers)
+        query_vector: pgvector literal (see format_vector)
+        limit: Rows to return
+        conditions: User filters with %(name)s placeholders; they drive
+            the selectivity estimate
+        params: Values for the placeholders
+        scope_conditions: Filters that keep nearly every row (e.g. the
+            embedding model); applied but left out of the estimate
+        ef_search, probes: Base search widths (default from env)
+        strategy: Force 'prefilter', 'postfilter' or 'ann' (benchmarks);
+            chosen by choose_strategy by default
+
+    Returns:
+        (rows with 'distance' and 'similarity', plan info)
+    """
+    conditions = list(conditions or [])
+    scope_conditions = list(scope_conditions or [])
+    params = dict(params or {})
+
+    context = get_search_context(cursor, table, column)
+    index = context['index']
+    total_rows = context['rows']
+    filtered_rows = estimate_filtered_rows(cursor, table, conditions, params) if conditions else total_rows
+    selectivity = min(1.0, filtered_rows / total_rows) if total_rows else 1.0
+
+    if strategy is None or index is None:
+        strategy = choose_strategy(total_rows, filtered_rows, bool(conditions), index is not None)
+    settings = apply_search_settings(cursor, strategy, index, limit, selectivity,
+                                     context['pgvector_version'], ef_search, probes)
+
+    all_conditions = scope_conditions + conditions
+    where_clause = "WHERE " + " AND ".join(all_conditions) if all_conditions else ""
+    params.update({'query_vector': query_vector, 'limit': limit})
+
+    # The vector is bound once; (SELECT v FROM query_vector) is an InitPlan
+    # parameter, which the ANN index accepts as its ORDER BY operand.
+    # Iterative scans may return rows slightly out of order, hence the outer sort.
+    cursor.execute(f"""
+        WITH query_vector AS MATERIALIZED (
+            SELECT %(query_vector)s::vector AS v
+        ),
+        nearest AS MATERIALIZED (
+            SELECT
+                {', '.join(columns)},
+                {column} <=> (SELECT v FROM query_vector) AS distance
+            FROM {table}
+            {where_clause}
+            ORDER BY {column} <=> (SELECT v FROM query_vector)
+            LIMIT %(limit)s
+        )
+        SELECT *, 1 - distance AS similarity
+        FROM nearest
+        ORDER BY distance
+    """, params)
+    names = [column.name for column in cursor.description]
+    rows = [dict(row) if isinstance(row, dict) else dict(zip(names, row)) for row in cursor.fetchall()]
+
+    plan = {
+        'strategy': strategy,
+        'index': index['name'] if index else None,
+        'index_method': index['method'] if index else None,
+        'total_rows': total_rows,
+        'estimated_rows': filtered_rows,
+        'selectivity': round(selectivity, 6),
+        'settings': settings,
+    }
+    logger.debug(f"Vector search on {table}: {plan}")
+    return rows, plan
+
+
+def build_vector_index(conn, table: str = 'transcript_embeddings', column: str = 'embedding',
+                       method: str = None, rebuild: bool = False, lists: int = None,
+                       m: int = VECTOR_HNSW_M,
+                       ef_construction: int = VECTOR_HNSW_EF_CONSTRUCTION) -> Dict[str, Any]:
+    """
+    Create (or replace) the ANN index on table.column.
+
+    Builds with CREATE INDEX CONCURRENTLY under a temporary name, then
+    drops the old index and renames the new one, so searches keep using
+    the old index during the build. Leaves `conn` in autocommit mode.
+
+    Args:
+        method: 'hnsw' or 'ivfflat' (default VECTOR_INDEX_METHOD)
+        rebuild: Rebuild even if an index with this method exists
+            (e.g. IVFFlat after the table has grown 10x)
+        lists: IVFFlat lists (default sized from the row count)
+
+    Returns:
+        The index as returned by get_vector_index
+    """
+    method = (method or VECTOR_INDEX_METHOD).lower()
+    if method not in INDEX_METHODS:
+        raise ValueError(f"Unknown vector index method '{method}' (expected hnsw or ivfflat)")
+
+    conn.autocommit = True
+    cursor = conn.cursor()
+    try:
+        existing = get_vector_index(cursor, table, column)
+        if existing and existing['valid'] and existing['method'] == method and not rebuild:
+            logger.info(f"{existing['name']} already exists: {existing['definition']}")
+            return existing
+
+        rows = estimate_table_rows(cursor, table)
+        if method == 'hnsw':
+            options = f"m = {int(m)}, ef_construction = {int(ef_construction)}"
+        else:
+            lists = lists or ivfflat_lists(rows)
+            if rows < lists * 40:
+                logger.warning(f"{table} has ~{rows:.0f} rows for {lists} lists; "
+                               f"IVFFlat recall suffers until it is rebuilt on more data")
+            options = f"lists = {int(lists)}"
+
+        name = f"idx_{table}_{column}_{method}"
+        building = f"{name}_new"
+
+        cursor.execute("SELECT set_config('maintenance_work_mem', %s, false)", (VECTOR_INDEX_BUILD_MEMORY,))
+        # Leftover from an interrupted build
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {building}")
+
+        logger.info(f"Building {method} index on {table}.{column} (~{rows:.0f} rows, {options})...")
+        started = time.time()
+        cursor.execute(f"""
+            CREATE INDEX CONCURRENTLY {building}
+            ON {table}
+            USING {method} ({column} vector_cosine_ops)
+            WITH ({options})
+        """)
+        logger.info(f"Built {building} in {time.time() - started:.1f}s")
+
+        # Drop the old index(es), including a previous one named `name`
+        for old in list_vector_indexes(cursor, table, column):
+            if old['name'] != building:
+                logger.info(f"Dropping old index {old['name']}")
+                cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {old['name']}")
+
+        cursor.execute(f"ALTER INDEX {building} RENAME TO {name}")
+        cursor.execute(f"ANALYZE {table}")
+
+        with _index_info_lock:
+            _index_info.pop((table, column), None)
+        return get_vector_index(cursor, table, column)
+    finally:
+        cursor.close()
+
+
+def main():
+    import argparse
+    from src.insights.embeddings_manager import get_embeddings_manager
+
+    parser = argparse.ArgumentParser(description='Manage the transcript_embeddings ANN index')
+    parser.add_argument('--status', action='store_true', help='Show the current index and exit')
+    parser.add_argument('--method', choices=INDEX_METHODS, default=VECTOR_INDEX_METHOD,
+                        help=f'Index method (default: {VECTOR_INDEX_METHOD})')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild even if the index exists')
+    parser.add_argument('--lists', type=int, help='IVFFlat lists (default: sized from row count)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    manager = get_embeddings_manager()
+    if args.status:
+        status = manager.get_vector_index_status()
+        print(json.dumps(status, indent=2, default=str))
+        return
+
+    index = manager.ensure_vector_index(method=args.method, rebuild=args.rebuild, lists=args.lists)
+    print(f"\n✅ {index['name']}: {index['definition']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,11 @@ RingCentral Call Log Checker v2
 Tracks ALL calls (with or without recordings) for complete workflow visibility
 Runs every 12 hours via cron
 
+Ingestion is a pipeline: call-log pages are fetched within the call-log
+rate budget, each page is bulk-inserted as it arrives, and its recordings
+are downloaded by a small worker pool within the heavy-group budget while
+the next page is fetched.
+
 Updated: 2025-12-21
 """
 
@@ -13,10 +18,11 @@ import json
 import logging
 import time
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, Set
 
 # Add parent directory to path
 sys.path.insert(0, '/var/www/call-recording-system')
@@ -27,6 +33,8 @@ load_dotenv('/var/www/call-recording-system/.env')
 
 from ringcentral import SDK
 
+from src.ringcentral.rate_limiter import AdaptiveRateLimiter
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -34,6 +42,27 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Call-log records per page (the API allows up to 1000)
+RC_CALL_LOG_PAGE_SIZE = int(os.getenv('RC_CALL_LOG_PAGE_SIZE', '1000'))
+# Concurrent recording downloads (the heavy group allows 10 requests/minute)
+RC_DOWNLOAD_WORKERS = int(os.getenv('RC_DOWNLOAD_WORKERS', '3'))
+# Attempts per API request when rate limited (429)
+RC_MAX_ATTEMPTS = int(os.getenv('RC_MAX_ATTEMPTS', '3'))
+
+# Rate limiter keys: every request of a kind shares one budget
+CALL_LOG_ENDPOINT = '/account/~/call-log'
+RECORDING_ENDPOINT = '/account/~/recording/content'
+
+CALL_LOG_COLUMNS = (
+    'ringcentral_id', 'session_id', 'telephony_session_id',
+    'start_time', 'duration_seconds',
+    'direction', 'call_type', 'call_action', 'call_result',
+    'from_phone_number', 'from_name', 'from_location', 'from_extension_number',
+    'to_phone_number', 'to_name', 'to_location', 'to_extension_number',
+    'has_recording', 'recording_id', 'recording_uri', 'recording_type',
+    'call_legs', 'raw_metadata'
+)
+
 
 class RingCentralCheckerV2:
     """
@@ -62,6 +91,9 @@ class RingCentralCheckerV2:
         # Authenticate
         self._authenticate()
 
+        # Shared by the page fetcher and the download workers
+        self.rate_limiter = AdaptiveRateLimiter()
+
         # Set up paths
         self.queue_dir = Path('/var/www/call-recording-system/data/audio_queue')
         self.queue_dir.mkdir(parents=True, exist_ok=True)
@@ -87,6 +119,45 @@ class RingCentralCheckerV2:
         """Get database connection"""
         return psycopg2.connect(self.db_url)
 
+    def _api_get(self, endpoint: str, params: Optional[Dict] = None, budget: Optional[str] = None):
+        """
+        GET through the SDK within the rate limiter's budget for `budget`.
+
+        Waits out the group's window before sending, and on a 429 waits the
+        Retry-After (or penalty) interval and retries, up to RC_MAX_ATTEMPTS.
+
+        Args:
+            endpoint: API path or URI
+            params: Query parameters
+            budget: Rate limiter key (default: endpoint)
+        """
+        budget = budget or endpoint
+        for attempt in range(1, RC_MAX_ATTEMPTS + 1):
+            reset_wait = self.rate_limiter.check_rate_limit_reset(budget)
+            if reset_wait:
+                time.sleep(reset_wait)
+            self.rate_limiter.wait_if_needed(budget)
+
+            try:
+                response = self.platform.get(endpoint, params)
+            except Exception as e:
+                # SDK ApiException wraps the HTTP response
+                api_response = e.api_response() if callable(getattr(e, 'api_response', None)) else None
+                http_response = api_response.response() if api_response is not None else None
+                if getattr(http_response, 'status_code', None) != 429 or attempt == RC_MAX_ATTEMPTS:
+                    raise
+                retry_after = self.rate_limiter.handle_rate_limit_response(
+                    budget, 429, http_response.headers
+                )
+                self.rate_limiter.update_adaptive_limit(budget, False)
+                logger.warning(f"Rate limited on {budget}, retrying in {retry_after}s "
+                               f"(attempt {attempt}/{RC_MAX_ATTEMPTS})")
+                time.sleep(retry_after)
+                continue
+
+            self.rate_limiter.update_adaptive_limit(budget, True)
+            return response
+
     def _load_state(self) -> Dict:
         """Load the last check timestamp and state"""
         if self.state_file.exists():
@@ -193,6 +264,49 @@ class RingCentralCheckerV2:
             'raw_metadata': self._to_dict(record)
         }
 
+    def _fetch_window(self, hours_back: int):
+        """(date_from, date_to) of the next check: since the last check, at most hours_back."""
+        last_check = datetime.fromisoformat(self.state['last_check'].replace('Z', '+00:00'))
+        now = datetime.now(timezone.utc)
+
+        # Don't go back more than specified hours
+        max_lookback = now - timedelta(hours=hours_back)
+        return max(last_check, max_lookback), now
+
+    def iter_call_pages(self, date_from: datetime, date_to: datetime) -> Iterator[List[Dict]]:
+        """
+        Yield the calls between date_from and date_to, one call-log page at a time.
+
+        Pages are requested within the call-log rate budget, so a page
+        is only waited for when the budget is spent.
+        """
+        logger.info(f"Fetching calls from {date_from.isoformat()} to {date_to.isoformat()}")
+
+        page = 1
+        while True:
+            params = {
+                'dateFrom': date_from.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+                'dateTo': date_to.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+                'perPage': RC_CALL_LOG_PAGE_SIZE,
+                'page': page,
+                'view': 'Detailed'  # Get all fields including legs, extensions
+            }
+
+            # Use account-level call log to get ALL extensions' calls
+            response = self._api_get(CALL_LOG_ENDPOINT, params)
+            data = response.json()
+
+            # JsonObject uses attribute access, not dict access
+            records = data.records if hasattr(data, 'records') else []
+            if not records:
+                return
+
+            yield [self._extract_call_data(record) for record in records]
+
+            if len(records) < RC_CALL_LOG_PAGE_SIZE:
+                return
+            page += 1
+
     def fetch_all_calls(self, hours_back: int = 14) -> List[Dict]:
         """
         Fetch ALL calls from RingCentral (with or without recordings).
@@ -203,48 +317,12 @@ class RingCentralCheckerV2:
         Returns:
             List of call data dictionaries
         """
-        last_check = datetime.fromisoformat(self.state['last_check'].replace('Z', '+00:00'))
-        now = datetime.now(timezone.utc)
-
-        # Don't go back more than specified hours
-        max_lookback = now - timedelta(hours=hours_back)
-        date_from = max(last_check, max_lookback)
-
-        logger.info(f"Fetching calls from {date_from.isoformat()} to {now.isoformat()}")
+        date_from, now = self._fetch_window(hours_back)
 
         all_calls = []
-        page = 1
-        per_page = 100
-
         try:
-            while True:
-                params = {
-                    'dateFrom': date_from.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
-                    'dateTo': now.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
-                    'perPage': per_page,
-                    'page': page,
-                    'view': 'Detailed'  # Get all fields including legs, extensions
-                }
-
-                # Use account-level call log to get ALL extensions' calls
-                response = self.platform.get('/account/~/call-log', params)
-                data = response.json()
-
-                # JsonObject uses attribute access, not dict access
-                records = data.records if hasattr(data, 'records') else []
-                if not records:
-                    break
-
-                for record in records:
-                    call_data = self._extract_call_data(record)
-                    all_calls.append(call_data)
-
-                if len(records) < per_page:
-                    break
-
-                page += 1
-                time.sleep(1)  # Rate limiting
-
+            for calls in self.iter_call_pages(date_from, now):
+                all_calls.extend(calls)
         except Exception as e:
             logger.error(f"Error fetching calls: {e}")
             raise
@@ -256,6 +334,77 @@ class RingCentralCheckerV2:
         logger.info(f"Found {len(all_calls)} total calls")
         return all_calls
 
+    def _call_log_row(self, call_data: Dict) -> tuple:
+        """call_log column values (CALL_LOG_COLUMNS order) for a call."""
+        start_time = call_data['start_time']
+        if isinstance(start_time, str):
+            start_time = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
+
+        row = dict(call_data, start_time=start_time)
+        row['call_legs'] = json.dumps(call_data['call_legs']) if call_data['call_legs'] else None
+        row['raw_metadata'] = json.dumps(call_data['raw_metadata'])
+        return tuple(row[column] for column in CALL_LOG_COLUMNS)
+
+    def save_calls_to_db(self, calls: List[Dict], conn=None) -> Set[str]:
+        """
+        Insert calls into call_log, skipping ones already logged.
+
+        One INSERT ... ON CONFLICT DO NOTHING per batch. If the batch fails
+        (e.g. one malformed record) its calls are inserted one at a time,
+        so only the bad ones are lost.
+
+        Args:
+            calls: Extracted call data
+            conn: Open connection to use (default: a new one)
+
+        Returns:
+            ringcentral_ids of the calls that were new
+        """
+        rows, failed = {}, 0
+        for call_data in calls:
+            try:
+                rows.setdefault(call_data['ringcentral_id'], self._call_log_row(call_data))
+            except Exception as e:
+                failed += 1
+                logger.error(f"Invalid call record {call_data.get('ringcentral_id')}: {e}")
+        if not rows:
+            return set()
+
+        sql = f"""
+            INSERT INTO call_log ({', '.join(CALL_LOG_COLUMNS)})
+            VALUES %s
+            ON CONFLICT (ringcentral_id) DO NOTHING
+            RETURNING ringcentral_id
+        """
+        own_conn = conn is None
+        conn = conn or self._get_db_connection()
+        inserted = set()
+        try:
+            try:
+                with conn.cursor() as cur:
+                    result = execute_values(cur, sql, list(rows.values()), fetch=True, page_size=len(rows))
+                    inserted = {row[0] for row in result}
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                logger.warning(f"Bulk insert of {len(rows)} calls failed ({e}), inserting individually")
+                for ringcentral_id, row in rows.items():
+                    try:
+                        with conn.cursor() as cur:
+                            if execute_values(cur, sql, [row], fetch=True):
+                                inserted.add(ringcentral_id)
+                        conn.commit()
+                    except Exception as e:
+                        conn.rollback()
+                        logger.error(f"Database error saving call {ringcentral_id}: {e}")
+        finally:
+            if own_conn:
+                conn.close()
+
+        logger.info(f"Logged {len(inserted)} new of {len(rows)} calls"
+                    + (f" ({failed} invalid)" if failed else ""))
+        return inserted
+
     def save_call_to_db(self, call_data: Dict) -> bool:
         """
         Save a call record to the call_log table.
@@ -266,77 +415,40 @@ class RingCentralCheckerV2:
         Returns:
             True if saved, False if duplicate
         """
-        conn = self._get_db_connection()
+        return bool(self.save_calls_to_db([call_data]))
+
+    def _mark_downloaded(self, ringcentral_ids: List[str], conn=None):
+        """Record downloaded audio for the given calls in one UPDATE."""
+        if not ringcentral_ids:
+            return
+        own_conn = conn is None
+        conn = conn or self._get_db_connection()
         try:
             with conn.cursor() as cur:
-                # Check for duplicate
-                cur.execute(
-                    "SELECT id FROM call_log WHERE ringcentral_id = %s",
-                    (call_data['ringcentral_id'],)
-                )
-                if cur.fetchone():
-                    return False  # Already exists
-
-                # Parse start_time
-                start_time = call_data['start_time']
-                if isinstance(start_time, str):
-                    start_time = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-
-                # Insert new record
                 cur.execute("""
-                    INSERT INTO call_log (
-                        ringcentral_id, session_id, telephony_session_id,
-                        start_time, duration_seconds,
-                        direction, call_type, call_action, call_result,
-                        from_phone_number, from_name, from_location, from_extension_number,
-                        to_phone_number, to_name, to_location, to_extension_number,
-                        has_recording, recording_id, recording_uri, recording_type,
-                        call_legs, raw_metadata
-                    ) VALUES (
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                    )
-                """, (
-                    call_data['ringcentral_id'],
-                    call_data['session_id'],
-                    call_data['telephony_session_id'],
-                    start_time,
-                    call_data['duration_seconds'],
-                    call_data['direction'],
-                    call_data['call_type'],
-                    call_data['call_action'],
-                    call_data['call_result'],
-                    call_data['from_phone_number'],
-                    call_data['from_name'],
-                    call_data['from_location'],
-                    call_data['from_extension_number'],
-                    call_data['to_phone_number'],
-                    call_data['to_name'],
-                    call_data['to_location'],
-                    call_data['to_extension_number'],
-                    call_data['has_recording'],
-                    call_data['recording_id'],
-                    call_data['recording_uri'],
-                    call_data['recording_type'],
-                    json.dumps(call_data['call_legs']) if call_data['call_legs'] else None,
-                    json.dumps(call_data['raw_metadata'])
-                ))
-
-                conn.commit()
-                return True
-
+                    UPDATE call_log
+                    SET audio_downloaded = TRUE, audio_download_time = NOW()
+                    WHERE ringcentral_id = ANY(%s)
+                """, (list(ringcentral_ids),))
+            conn.commit()
         except Exception as e:
-            logger.error(f"Database error saving call {call_data['ringcentral_id']}: {e}")
             conn.rollback()
-            return False
+            logger.error(f"Database error marking {len(ringcentral_ids)} downloads: {e}")
         finally:
-            conn.close()
+            if own_conn:
+                conn.close()
 
-    def download_recording(self, call_data: Dict) -> Optional[str]:
+    def download_recording(self, call_data: Dict, mark_downloaded: bool = True) -> Optional[str]:
         """
         Download recording audio for a call that has a recording.
 
+        Requests share the heavy-group rate budget, so this is safe to
+        call from several threads.
+
         Args:
             call_data: Call data with recording info
+            mark_downloaded: Set call_log.audio_downloaded (run_check does
+                this in bulk instead)
 
         Returns:
             Path to downloaded file or None
@@ -369,7 +481,7 @@ class RingCentralCheckerV2:
             else:
                 content_uri = recording_uri
 
-            response = self.platform.get(content_uri)
+            response = self._api_get(content_uri, budget=RECORDING_ENDPOINT)
             content = response.body()
 
             # Validate we got actual audio content (not JSON metadata)
@@ -391,17 +503,8 @@ class RingCentralCheckerV2:
             logger.info(f"Downloaded {recording_id} ({file_size:,} bytes)")
 
             # Update call_log with download status
-            conn = self._get_db_connection()
-            try:
-                with conn.cursor() as cur:
-                    cur.execute("""
-                        UPDATE call_log
-                        SET audio_downloaded = TRUE, audio_download_time = NOW()
-                        WHERE ringcentral_id = %s
-                    """, (recording_id,))
-                    conn.commit()
-            finally:
-                conn.close()
+            if mark_downloaded:
+                self._mark_downloaded([recording_id])
 
             return str(output_path)
 
@@ -436,43 +539,61 @@ class RingCentralCheckerV2:
             'errors': []
         }
 
+        downloads = []
+        executor = ThreadPoolExecutor(max_workers=RC_DOWNLOAD_WORKERS,
+                                      thread_name_prefix='rc-download') if download_recordings else None
+        conn = None
         try:
-            # Fetch all calls
-            all_calls = self.fetch_all_calls(hours_back=hours_back)
-            summary['total_calls_found'] = len(all_calls)
-
-            for call_data in all_calls:
-                # Count by result
-                result = call_data.get('call_result', '').lower()
-                if result == 'missed':
-                    summary['missed_calls'] += 1
-                elif result == 'voicemail':
-                    summary['voicemails'] += 1
-                elif result in ('accepted', 'call connected'):
-                    summary['answered_calls'] += 1
+            conn = self._get_db_connection()
+            date_from, now = self._fetch_window(hours_back)
+
+            # Each page is logged and its downloads queued while the next one is fetched
+            for calls in self.iter_call_pages(date_from, now):
+                summary['total_calls_found'] += len(calls)
 
                 # Save to database
-                if self.save_call_to_db(call_data):
-                    summary['new_calls_logged'] += 1
+                summary['new_calls_logged'] += len(self.save_calls_to_db(calls, conn=conn))
+
+                for call_data in calls:
+                    # Count by result
+                    result = (call_data.get('call_result') or '').lower()
+                    if result == 'missed':
+                        summary['missed_calls'] += 1
+                    elif result == 'voicemail':
+                        summary['voicemails'] += 1
+                    elif result in ('accepted', 'call connected'):
+                        summary['answered_calls'] += 1
+
+                    # Download recording if exists
+                    if call_data['has_recording']:
+                        summary['calls_with_recordings'] += 1
+                        if executor:
+                            downloads.append((call_data['ringcentral_id'], executor.submit(
+                                self.download_recording, call_data, mark_downloaded=False
+                            )))
+
+            logger.info(f"Found {summary['total_calls_found']} total calls")
+            self.state['last_check'] = now.isoformat()
 
-                # Download recording if exists
-                if call_data['has_recording']:
-                    summary['calls_with_recordings'] += 1
+        except Exception as e:
+            logger.error(f"Check cycle error: {e}")
+            summary['errors'].append(str(e))
 
-                    if download_recordings:
-                        time.sleep(5)  # Rate limit downloads
-                        if self.download_recording(call_data):
-                            summary['recordings_downloaded'] += 1
+        finally:
+            # Recordings already queued are still downloaded and recorded
+            if executor:
+                downloaded = [ringcentral_id for ringcentral_id, future in downloads if future.result()]
+                executor.shutdown()
+                self._mark_downloaded(downloaded, conn=conn)
+                summary['recordings_downloaded'] = len(downloaded)
+            if conn:
+                conn.close()
 
             # Update state
             self.state['total_calls_logged'] += summary['new_calls_logged']
             self.state['total_recordings_downloaded'] += summary['recordings_downloaded']
             self._save_state()
 
-        except Exception as e:
-            logger.error(f"Check cycle error: {e}")
-            summary['errors'].append(str(e))
-
         elapsed = time.time() - start_time
         summary['elapsed_seconds'] = round(elapsed, 1)
 
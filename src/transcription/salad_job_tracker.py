@@ -0,0 +1,381 @@
+"""
+Salad Job Tracker
+Keeps many Salad transcription jobs in flight from a single polling thread
+
+SaladTranscriberEnhanced.transcribe_file blocks its thread polling one job.
+The tracker instead submits up to max_in_flight jobs and checks all of them
+from one loop, each on its own adaptive schedule: polls start after
+min_poll_interval and back off by backoff_factor while a job's status is
+unchanged (up to max_poll_interval). Completed results are handed to
+on_complete on a small dispatch pool as soon as each job finishes, so
+slow saves never delay polling. Failed attempts are resubmitted once the
+transcriber's retry_delay has passed, without holding up other jobs.
+
+With a webhook URL configured on the transcriber, Salad's completion
+callbacks (received by start_webhook_server, or passed to notify) make the
+tracker check the job immediately. The callback body is only used to find
+the job id; the job itself is always re-read from the Salad API, so a
+forged callback can at most cause an extra status check.
+
+Usage:
+    tracker = SaladJobTracker(transcriber, on_complete=save, on_failure=mark_failed)
+    for path in files:
+        tracker.submit(path.stem, url_for(path))
+    stats = tracker.run()
+"""
+
+import os
+import json
+import time
+import heapq
+import logging
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional
+
+from .salad_transcriber_enhanced import (
+    SaladTranscriberEnhanced,
+    TranscriptionResult,
+    TranscriptionStatus
+)
+
+logger = logging.getLogger(__name__)
+
+SALAD_MAX_IN_FLIGHT = int(os.getenv('SALAD_MAX_IN_FLIGHT', '50'))
+SALAD_MIN_POLL_INTERVAL = float(os.getenv('SALAD_MIN_POLL_INTERVAL', '5'))
+SALAD_MAX_POLL_INTERVAL = float(os.getenv('SALAD_MAX_POLL_INTERVAL', '60'))
+SALAD_POLL_BACKOFF = float(os.getenv('SALAD_POLL_BACKOFF', '1.5'))
+
+TERMINAL_STATUSES = ('succeeded', 'failed', 'cancelled')
+
+
+class TrackedJob:
+    """One queued or in-flight transcription"""
+
+    def __init__(self, key: str, audio_url: str, metadata: Dict[str, Any]):
+        self.key = key
+        self.audio_url = audio_url
+        self.metadata = metadata
+        self.job_id: Optional[str] = None
+        self.attempt = 0
+        self.status: Optional[str] = None
+        self.status_changes = []
+        self.start_time = time.time()
+        self.submitted_at = 0.0
+        self.poll_interval = SALAD_MIN_POLL_INTERVAL
+        self.next_poll = 0.0
+        self.timestamps = {
+            'started': datetime.now(timezone.utc).isoformat(),
+            'submitted': None,
+            'completed': None
+        }
+
+
+class SaladJobTracker:
+    """
+    Submit many Salad jobs and poll them all from one thread
+    """
+
+    def __init__(
+        self,
+        transcriber: SaladTranscriberEnhanced,
+        on_complete: Callable[[str, TranscriptionResult], Any],
+        on_failure: Optional[Callable[[str, str], Any]] = None,
+        max_in_flight: int = SALAD_MAX_IN_FLIGHT,
+        min_poll_interval: float = SALAD_MIN_POLL_INTERVAL,
+        max_poll_interval: float = SALAD_MAX_POLL_INTERVAL,
+        backoff_factor: float = SALAD_POLL_BACKOFF,
+        dispatch_workers: int = 4
+    ):
+        """
+        Args:
+            transcriber: Configured transcriber (its SDK client, retries,
+                max_wait_time and webhook_url are used)
+            on_complete: Called as on_complete(key, result) on the dispatch
+                pool for every successful transcription
+            on_failure: Called as on_failure(key, error) once a job has
+                failed all its attempts
+            max_in_flight: Jobs submitted to Salad at once; the rest wait
+            min_poll_interval, max_poll_interval: Bounds on the per-job
+                delay between status checks (seconds)
+            backoff_factor: Delay multiplier while a job's status is unchanged
+            dispatch_workers: Threads running on_complete / on_failure
+        """
+        self.transcriber = transcriber
+        self.on_complete = on_complete
+        self.on_failure = on_failure
+        self.max_in_flight = max_in_flight
+        self.min_poll_interval = min_poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.backoff_factor = backoff_factor
+
+        self._queued = deque()
+        self._retries = []  # (not_before, seq, job) heap, waiting out retry_delay
+        self._retry_seq = itertools.count()
+        self._active: Dict[str, TrackedJob] = {}  # job_id -> job
+        self._schedule = []  # (next_poll, job_id) heap
+        self._notified = set()
+        self._wakeup = threading.Condition()
+        self._dispatch = ThreadPoolExecutor(max_workers=dispatch_workers, thread_name_prefix="salad-dispatch")
+        self._dispatched = []
+        self._webhook_server: Optional[ThreadingHTTPServer] = None
+
+        self.stats = {'submitted': 0, 'succeeded': 0, 'failed': 0, 'retried': 0,
+                      'polls': 0, 'webhooks': 0}
+
+    def submit(self, key: str, audio_url: str, custom_metadata: Optional[Dict[str, Any]] = None):
+        """Queue an audio URL; it is submitted to Salad by run()"""
+        if not audio_url.startswith(('http://', 'https://')):
+            raise ValueError(f"Audio must be accessible via HTTP/HTTPS URL, got: {audio_url}")
+        metadata = self.transcriber.build_job_metadata(audio_url, custom_metadata)
+        with self._wakeup:
+            self._queued.append(TrackedJob(key, audio_url, metadata))
+            self._wakeup.notify()
+
+    def notify(self, job_id: str):
+        """Check job_id at the next loop iteration (webhook / external signal)"""
+        with self._wakeup:
+            self.stats['webhooks'] += 1
+            self._notified.add(job_id)
+            self._wakeup.notify()
+
+    def run(self) -> Dict[str, int]:
+        """
+        Submit and poll until every queued job has finished, then wait for
+        the dispatched callbacks
+
+        Returns:
+            Counts of submitted / succeeded / failed / retried jobs, status
+            polls and webhook notifications
+        """
+        started = time.time()
+        try:
+            while True:
+                self._submit_queued()
+                with self._wakeup:
+                    if not self._active and not self._queued and not self._retries:
+                        break
+                    due_at = self._schedule[0][0] if self._schedule else time.monotonic() + self.max_poll_interval
+                    if self._retries:
+                        due_at = min(due_at, self._retries[0][0])
+                    delay = due_at - time.monotonic()
+                    if delay > 0 and not self._notified:
+                        self._wakeup.wait(delay)
+                    notified, self._notified = self._notified, set()
+
+                for job_id in self._due_jobs(notified):
+                    self._poll(job_id)
+        finally:
+            for future in self._dispatched:
+                future.result()
+            self._dispatched = []
+
+        logger.info(f"Salad jobs finished in {time.time() - started:.1f}s: {self.stats}")
+        return dict(self.stats)
+
+    def close(self):
+        """Stop the webhook server and dispatch pool"""
+        self.stop_webhook_server()
+        self._dispatch.shutdown(wait=True)
+
+    def _submit_queued(self):
+        """Submit queued jobs (and retries whose delay has passed) while there is room in flight"""
+        with self._wakeup:
+            now = time.monotonic()
+            while self._retries and self._retries[0][0] <= now:
+                self._queued.append(heapq.heappop(self._retries)[2])
+        while True:
+            with self._wakeup:
+                if not self._queued or len(self._active) >= self.max_in_flight:
+                    return
+                job = self._queued.popleft()
+            self._submit(job)
+
+    def _submit(self, job: TrackedJob):
+        job.attempt += 1
+        try:
+            job.timestamps['submitted'] = datetime.now(timezone.utc).isoformat()
+            job.job_id = self.transcriber.submit_job(job.audio_url, job.metadata, job.attempt)
+        except Exception as e:
+            logger.error(f"[{job.key}] Submission attempt {job.attempt} failed: {e}")
+            self._retry_or_fail(job, str(e))
+            return
+
+        self.stats['submitted'] += 1
+        job.status = TranscriptionStatus.PENDING.value
+        job.status_changes = []
+        job.submitted_at = time.monotonic()
+        job.poll_interval = self.min_poll_interval
+        with self._wakeup:
+            self._active[job.job_id] = job
+            self._schedule_poll(job)
+
+    def _schedule_poll(self, job: TrackedJob):
+        job.next_poll = time.monotonic() + job.poll_interval
+        heapq.heappush(self._schedule, (job.next_poll, job.job_id))
+
+    def _due_jobs(self, notified):
+        """Job ids whose next poll is due, plus notified ones still active"""
+        now = time.monotonic()
+        due = set()
+        with self._wakeup:
+            while self._schedule and self._schedule[0][0] <= now:
+                next_poll, job_id = heapq.heappop(self._schedule)
+                job = self._active.get(job_id)
+                # Skip entries superseded by a reschedule
+                if job and job.next_poll == next_poll:
+                    due.add(job_id)
+            due.update(job_id for job_id in notified if job_id in self._active)
+        return due
+
+    def _poll(self, job_id: str):
+        job = self._active[job_id]
+        elapsed = time.monotonic() - job.submitted_at
+        if elapsed > self.transcriber.max_wait_time:
+            try:
+                self.transcriber.cancel_job(job_id)
+            except Exception as e:
+                logger.error(f"[{job.key}] Could not cancel timed out job {job_id}: {e}")
+            self._finish_failed(job, f"Transcription timed out after {self.transcriber.max_wait_time}s")
+            return
+
+        self.stats['polls'] += 1
+        try:
+            salad_job = self.transcriber.fetch_job(job_id)
+        except Exception as e:
+            logger.warning(f"[{job.key}] Error checking job status: {e}")
+            self._backoff(job)
+            return
+
+        status = salad_job.status
+        if status != job.status:
+            job.status = status
+            job.status_changes.append({
+                'status': status,
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'elapsed_seconds': round(elapsed, 2)
+            })
+            job.poll_interval = self.min_poll_interval
+            logger.info(f"[{job.key}] Job {job_id} status: {status} (elapsed: {elapsed:.1f}s)")
+
+        if status == 'succeeded':
+            try:
+                result_data = self.transcriber.job_output(salad_job)
+            except Exception as e:
+                self._finish_failed(job, str(e))
+                return
+            result_data['status_history'] = job.status_changes
+            self._finish_succeeded(job, result_data)
+        elif status == 'failed':
+            self._finish_failed(job, f"Transcription job failed: {getattr(salad_job, 'error', 'Unknown error')}")
+        elif status == 'cancelled':
+            self._finish_failed(job, "Transcription job was cancelled")
+        else:
+            self._backoff(job)
+
+    def _backoff(self, job: TrackedJob):
+        with self._wakeup:
+            job.poll_interval = min(self.max_poll_interval, job.poll_interval * self.backoff_factor)
+            self._schedule_poll(job)
+
+    def _finish_succeeded(self, job: TrackedJob, result_data: Dict[str, Any]):
+        with self._wakeup:
+            self._active.pop(job.job_id, None)
+        job.timestamps['completed'] = datetime.now(timezone.utc).isoformat()
+        try:
+            result = self.transcriber.complete_job(
+                job.job_id, result_data, job.start_time, job.metadata, job.timestamps
+            )
+        except Exception as e:
+            logger.error(f"[{job.key}] Could not process result of {job.job_id}: {e}")
+            self._retry_or_fail(job, str(e))
+            return
+
+        self.stats['succeeded'] += 1
+        self._dispatched.append(self._dispatch.submit(self._call, self.on_complete, job.key, result))
+
+    def _finish_failed(self, job: TrackedJob, error: str):
+        with self._wakeup:
+            self._active.pop(job.job_id, None)
+        logger.error(f"[{job.key}] Attempt {job.attempt} failed: {error}")
+        self.transcriber.record_failure(error, job.attempt, job.job_id)
+        self._retry_or_fail(job, error)
+
+    def _retry_or_fail(self, job: TrackedJob, error: str):
+        if job.attempt < self.transcriber.max_retries:
+            self.stats['retried'] += 1
+            not_before = time.monotonic() + self.transcriber.retry_delay
+            with self._wakeup:
+                heapq.heappush(self._retries, (not_before, next(self._retry_seq), job))
+            return
+
+        self.stats['failed'] += 1
+        if self.on_failure:
+            message = f"Transcription failed after {job.attempt} attempts: {error}"
+            self._dispatched.append(self._dispatch.submit(self._call, self.on_failure, job.key, message))
+
+    @staticmethod
+    def _call(callback, *args):
+        try:
+            callback(*args)
+        except Exception as e:
+            logger.error(f"Callback for {args[0]} failed: {e}")
+
+    def start_webhook_server(self, host: str = '0.0.0.0', port: int = 8090,
+                             path: str = '/salad/webhook') -> ThreadingHTTPServer:
+        """
+        Accept Salad completion callbacks on http://host:port/path
+
+        Point the transcriber's webhook_url at this endpoint (through
+        whatever proxy exposes it). Runs in a daemon thread.
+        """
+        tracker = self
+
+        class WebhookHandler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path.split('?')[0] != path:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                length = int(self.headers.get('Content-Length', 0))
+                try:
+                    payload = json.loads(self.rfile.read(length) or b'{}')
+                except ValueError:
+                    payload = {}
+                job_id = webhook_job_id(payload)
+                if job_id:
+                    tracker.notify(job_id)
+                self.send_response(200 if job_id else 400)
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                logger.debug(f"Webhook: {format % args}")
+
+        self._webhook_server = ThreadingHTTPServer((host, port), WebhookHandler)
+        threading.Thread(target=self._webhook_server.serve_forever, daemon=True,
+                         name="salad-webhook").start()
+        logger.info(f"Salad webhook endpoint listening on {host}:{port}{path}")
+        return self._webhook_server
+
+    def stop_webhook_server(self):
+        if self._webhook_server:
+            self._webhook_server.shutdown()
+            self._webhook_server.server_close()
+            self._webhook_server = None
+
+
+def webhook_job_id(payload: Dict[str, Any]) -> Optional[str]:
+    """Job id from a Salad webhook body ({'data': {'id': ...}} or a bare job)"""
+    if not isinstance(payload, dict):
+        return None
+    data = payload.get('data')
+    if isinstance(data, dict) and data.get('id'):
+        return str(data['id'])
+    for key in ('job_id', 'id'):
+        if payload.get(key):
+            return str(payload[key])
+    return None
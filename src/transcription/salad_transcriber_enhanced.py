@@ -292,13 +292,7 @@ class SaladTranscriberEnhanced:
         logger.info(f"Starting transcription of {audio_url}")
 
         # Prepare metadata
-        metadata = {
-            'source_url': audio_url,
-            'engine': 'full',
-            'language': self.language,
-            'organization': self.organization_name,
-            'custom': custom_metadata or {}
-        }
+        metadata = self.build_job_metadata(audio_url, custom_metadata)
 
         # Retry logic
         last_error = None
@@ -306,115 +300,28 @@ class SaladTranscriberEnhanced:
             try:
                 logger.info(f"Transcription attempt {attempt}/{self.max_retries}")
 
-                # Create transcription request with best practices
-                job_input = TranscriptionJobInput(
-                    return_as_file=False,  # Get JSON response for metadata
-                    language_code=self.language,  # en-US for American English
-                    word_level_timestamps=True,  # Always capture word timestamps
-                    sentence_level_timestamps=True,  # Capture sentence timestamps
-                    diarization=self.enable_diarization,  # Speaker identification if needed
-                    sentence_diarization=self.enable_diarization,
-                    srt=True,  # Generate SRT format as well
-                    summarize=10 if self.enable_summarization else 0,  # 10 sentence summary
-                    custom_vocabulary=self.custom_vocabulary or '',
-                    custom_prompt=self.initial_prompt
-                )
-
-                request = TranscriptionRequest(
-                    options=job_input,
-                    webhook=self.webhook_url,
-                    metadata={
-                        'file_url': audio_url,
-                        'timestamp': datetime.now(timezone.utc).isoformat(),
-                        'attempt': attempt,
-                        **metadata
-                    }
-                )
-
-                # Submit transcription job
-                logger.info("Submitting transcription job to Salad Cloud")
                 timestamps['submitted'] = datetime.now(timezone.utc).isoformat()
-
-                # Use the SDK's transcribe method properly
-                from salad_cloud_transcription_sdk.models.transcription_engine import TranscriptionEngine
-
-                # Submit transcription job via SDK wrapper
-                job = self.sdk.transcribe(
-                    source=audio_url,
-                    organization_name=self.organization_name,
-                    request=request,
-                    engine=TranscriptionEngine.Full,  # Always use 'full' engine
-                    auto_poll=False  # Manual polling for better control
-                )
-
-                job_id = job.id_  # Note: underscore in attribute name
-                logger.info(f"Transcription job created: {job_id}")
-
-                # Track active job
-                with self._job_lock:
-                    self.active_jobs[job_id] = {
-                        'status': TranscriptionStatus.PENDING.value,
-                        'started': datetime.now(timezone.utc).isoformat(),
-                        'url': audio_url
-                    }
+                job_id = self.submit_job(audio_url, metadata, attempt)
 
                 # Poll for completion with monitoring
                 result_data = self._wait_for_completion_with_monitoring(job_id)
 
                 timestamps['completed'] = datetime.now(timezone.utc).isoformat()
-
-                # Process the result with enhanced metadata
-                transcription_result = self._process_enhanced_result(
-                    result_data,
-                    start_time,
-                    job_id,
-                    metadata,
-                    timestamps
+                transcription_result = self.complete_job(
+                    job_id, result_data, start_time, metadata, timestamps
                 )
 
                 # Save if output path provided
                 if output_path:
                     self._save_enhanced_transcript(transcription_result, output_path)
 
-                # Record metrics
-                if self.enable_monitoring:
-                    self.metrics.record_job({
-                        'job_id': job_id,
-                        'status': TranscriptionStatus.SUCCEEDED.value,
-                        'audio_duration': transcription_result.duration_seconds,
-                        'processing_time': transcription_result.processing_time_seconds,
-                        'word_count': transcription_result.word_count,
-                        'confidence': transcription_result.confidence,
-                        'language': transcription_result.language,
-                        'timestamp': timestamps['completed']
-                    })
-
-                # Clean up tracking
-                with self._job_lock:
-                    if job_id in self.active_jobs:
-                        del self.active_jobs[job_id]
-
-                logger.info(
-                    f"Transcription completed successfully: "
-                    f"{transcription_result.word_count} words, "
-                    f"{transcription_result.duration_seconds:.1f}s audio, "
-                    f"{transcription_result.processing_time_seconds:.1f}s processing, "
-                    f"confidence: {transcription_result.confidence:.2%}"
-                )
-
                 return transcription_result
 
             except Exception as e:
                 last_error = str(e)
                 logger.error(f"Transcription attempt {attempt} failed: {e}")
 
-                if self.enable_monitoring:
-                    self.metrics.record_job({
-                        'status': TranscriptionStatus.FAILED.value,
-                        'error': last_error,
-                        'attempt': attempt,
-                        'timestamp': datetime.now(timezone.utc).isoformat()
-                    })
+                self.record_failure(last_error, attempt)
 
                 if attempt < self.max_retries:
                     logger.info(f"Retrying in {self.retry_delay} seconds...")
@@ -442,6 +349,190 @@ class SaladTranscriberEnhanced:
 
                 raise RuntimeError(f"Transcription failed after {self.max_retries} attempts: {last_error}")
 
+    def build_job_metadata(
+        self,
+        audio_url: str,
+        custom_metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Metadata recorded with a job and carried into its TranscriptionResult"""
+        return {
+            'source_url': audio_url,
+            'engine': 'full',
+            'language': self.language,
+            'organization': self.organization_name,
+            'custom': custom_metadata or {}
+        }
+
+    def submit_job(self, audio_url: str, metadata: Dict[str, Any], attempt: int = 1) -> str:
+        """
+        Submit a transcription job without waiting for it
+
+        Args:
+            audio_url: URL to audio file
+            metadata: Job metadata (see build_job_metadata)
+            attempt: Attempt number recorded in the job metadata
+
+        Returns:
+            Salad job ID
+        """
+        # Create transcription request with best practices
+        job_input = TranscriptionJobInput(
+            return_as_file=False,  # Get JSON response for metadata
+            language_code=self.language,  # en-US for American English
+            word_level_timestamps=True,  # Always capture word timestamps
+            sentence_level_timestamps=True,  # Capture sentence timestamps
+            diarization=self.enable_diarization,  # Speaker identification if needed
+            sentence_diarization=self.enable_diarization,
+            srt=True,  # Generate SRT format as well
+            summarize=10 if self.enable_summarization else 0,  # 10 sentence summary
+            custom_vocabulary=self.custom_vocabulary or '',
+            custom_prompt=self.initial_prompt
+        )
+
+        request = TranscriptionRequest(
+            options=job_input,
+            webhook=self.webhook_url,
+            metadata={
+                'file_url': audio_url,
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'attempt': attempt,
+                **metadata
+            }
+        )
+
+        # Submit transcription job via SDK wrapper
+        logger.info("Submitting transcription job to Salad Cloud")
+        job = self.sdk.transcribe(
+            source=audio_url,
+            organization_name=self.organization_name,
+            request=request,
+            engine=TranscriptionEngine.Full,  # Always use 'full' engine
+            auto_poll=False  # Manual polling for better control
+        )
+
+        job_id = job.id_  # Note: underscore in attribute name
+        logger.info(f"Transcription job created: {job_id}")
+
+        # Track active job
+        with self._job_lock:
+            self.active_jobs[job_id] = {
+                'status': TranscriptionStatus.PENDING.value,
+                'started': datetime.now(timezone.utc).isoformat(),
+                'url': audio_url
+            }
+
+        return job_id
+
+    def fetch_job(self, job_id: str):
+        """Current state of a job from the Salad API (one request)"""
+        return self.sdk.get_transcription_job(
+            organization_name=self.organization_name,
+            job_id=job_id
+        )
+
+    def job_output(self, job) -> Dict[str, Any]:
+        """
+        Output of a succeeded job as a dict
+
+        Raises:
+            RuntimeError: If the job has no output
+        """
+        if not (hasattr(job, 'output') and job.output):
+            raise RuntimeError("Job succeeded but no output available")
+
+        # Convert TranscriptionJobOutput to dict
+        if hasattr(job.output, 'to_dict'):
+            return job.output.to_dict()
+        if isinstance(job.output, str):
+            return json.loads(job.output)
+
+        # Fallback: extract attributes manually
+        return {
+            'text': getattr(job.output, 'text', ''),
+            'duration': getattr(job.output, 'duration', 0),
+            'duration_in_seconds': getattr(job.output, 'duration_in_seconds', 0),
+            'summary': getattr(job.output, 'summary', ''),
+            'srt_content': getattr(job.output, 'srt_content', ''),
+            'word_segments': getattr(job.output, 'word_segments', []),
+            'sentence_level_timestamps': getattr(job.output, 'sentence_level_timestamps', []),
+            'processing_time': getattr(job.output, 'processing_time', 0),
+            'overall_processing_time': getattr(job.output, 'overall_processing_time', 0)
+        }
+
+    def complete_job(
+        self,
+        job_id: str,
+        result_data: Dict[str, Any],
+        start_time: float,
+        metadata: Dict[str, Any],
+        timestamps: Dict[str, str]
+    ) -> TranscriptionResult:
+        """
+        Turn a finished job's output into a TranscriptionResult, recording
+        metrics and dropping the job from active_jobs
+
+        Args:
+            job_id: Job ID
+            result_data: Job output (see job_output) plus 'status_history'
+            start_time: time.time() when transcription started
+            metadata: Job metadata
+            timestamps: Timing information
+
+        Returns:
+            TranscriptionResult object with full metadata
+        """
+        # Process the result with enhanced metadata
+        transcription_result = self._process_enhanced_result(
+            result_data,
+            start_time,
+            job_id,
+            metadata,
+            timestamps
+        )
+
+        # Record metrics
+        if self.enable_monitoring:
+            self.metrics.record_job({
+                'job_id': job_id,
+                'status': TranscriptionStatus.SUCCEEDED.value,
+                'audio_duration': transcription_result.duration_seconds,
+                'processing_time': transcription_result.processing_time_seconds,
+                'word_count': transcription_result.word_count,
+                'confidence': transcription_result.confidence,
+                'language': transcription_result.language,
+                'timestamp': timestamps.get('completed')
+            })
+
+        # Clean up tracking
+        with self._job_lock:
+            if job_id in self.active_jobs:
+                del self.active_jobs[job_id]
+
+        logger.info(
+            f"Transcription completed successfully: "
+            f"{transcription_result.word_count} words, "
+            f"{transcription_result.duration_seconds:.1f}s audio, "
+            f"{transcription_result.processing_time_seconds:.1f}s processing, "
+            f"confidence: {transcription_result.confidence:.2%}"
+        )
+
+        return transcription_result
+
+    def record_failure(self, error: str, attempt: int, job_id: Optional[str] = None):
+        """Record a failed attempt in the metrics and drop the job from active_jobs"""
+        if self.enable_monitoring:
+            self.metrics.record_job({
+                'job_id': job_id,
+                'status': TranscriptionStatus.FAILED.value,
+                'error': error,
+                'attempt': attempt,
+                'timestamp': datetime.now(timezone.utc).isoformat()
+            })
+
+        if job_id:
+            with self._job_lock:
+                self.active_jobs.pop(job_id, None)
+
     def _wait_for_completion_with_monitoring(self, job_id: str) -> Dict[str, Any]:
         """
         Enhanced polling with monitoring and progress tracking
@@ -480,10 +571,7 @@ class SaladTranscriberEnhanced:
 
             try:
                 # Get job status
-                job = self.sdk.get_transcription_job(
-                    organization_name=self.organization_name,
-                    job_id=job_id
-                )
+                job = self.fetch_job(job_id)
 
                 status = job.status
 
@@ -506,29 +594,9 @@ class SaladTranscriberEnhanced:
 
                 # Check completion status
                 if status == 'succeeded':
-                    if hasattr(job, 'output') and job.output:
-                        # Convert TranscriptionJobOutput to dict
-                        if hasattr(job.output, 'to_dict'):
-                            result = job.output.to_dict()
-                        elif isinstance(job.output, str):
-                            result = json.loads(job.output)
-                        else:
-                            # Fallback: extract attributes manually
-                            result = {
-                                'text': getattr(job.output, 'text', ''),
-                                'duration': getattr(job.output, 'duration', 0),
-                                'duration_in_seconds': getattr(job.output, 'duration_in_seconds', 0),
-                                'summary': getattr(job.output, 'summary', ''),
-                                'srt_content': getattr(job.output, 'srt_content', ''),
-                                'word_segments': getattr(job.output, 'word_segments', []),
-                                'sentence_level_timestamps': getattr(job.output, 'sentence_level_timestamps', []),
-                                'processing_time': getattr(job.output, 'processing_time', 0),
-                                'overall_processing_time': getattr(job.output, 'overall_processing_time', 0)
-                            }
-                        result['status_history'] = status_changes
-                        return result
-                    else:
-                        raise RuntimeError("Job succeeded but no output available")
+                    result = self.job_output(job)
+                    result['status_history'] = status_changes
+                    return result
 
                 elif status == 'failed':
                     error_msg = getattr(job, 'error', 'Unknown error')